@@ -2,6 +2,9 @@
 Cache module for advanced caching capabilities
 """
 
-from .cache_manager import CacheManager, CacheEntry
+from .cache_manager import CacheManager
+from .lru_ttl_cache import CacheEntry, LRUTTLCache, estimate_size
+from .version_tracker import CollectionVersionTracker, change_journal_path, get_version_tracker
 
-__all__ = ['CacheManager', 'CacheEntry']
+__all__ = ['CacheManager', 'CacheEntry', 'LRUTTLCache', 'estimate_size',
+           'CollectionVersionTracker', 'change_journal_path', 'get_version_tracker']
@@ -7,21 +7,15 @@ Optimized for blazing-fast performance on high-end systems
 import hashlib
 import time
 import logging
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Union
 from datetime import datetime, timedelta
 import threading
-from dataclasses import dataclass
 
-logger = logging.getLogger(__name__)
+import numpy as np
+
+from .lru_ttl_cache import CacheEntry, LRUTTLCache
 
-@dataclass
-class CacheEntry:
-    """Cache entry with metadata"""
-    data: Any
-    timestamp: float
-    ttl: int
-    access_count: int = 0
-    last_accessed: float = 0.0
+logger = logging.getLogger(__name__)
 
 class CacheManager:
     """Advanced cache manager for query embeddings and search results"""
@@ -30,7 +24,9 @@ class CacheManager:
                  query_embedding_ttl: int = 86400,  # 24 hours
                  search_result_ttl: int = 1800,     # 30 minutes
                  max_query_embeddings: int = 1000,
-                 max_search_results: int = 5000):
+                 max_search_results: int = 5000,
+                 max_query_embedding_bytes: Optional[int] = 256 * 1024 * 1024,
+                 max_search_result_bytes: Optional[int] = 256 * 1024 * 1024):
         """
         Initialize the cache manager with optimized settings for high-end systems.
         
@@ -39,23 +35,29 @@ class CacheManager:
             search_result_ttl: TTL for search results in seconds (30 minutes default)
             max_query_embeddings: Maximum number of query embeddings to cache
             max_search_results: Maximum number of search results to cache
+            max_query_embedding_bytes: Memory budget for query embeddings (None for no byte limit)
+            max_search_result_bytes: Memory budget for search results (None for no byte limit)
         """
         self.query_embedding_ttl = query_embedding_ttl
         self.search_result_ttl = search_result_ttl
         self.max_query_embeddings = max_query_embeddings
         self.max_search_results = max_search_results
         
-        # Separate caches for different data types
-        self.query_embedding_cache: Dict[str, CacheEntry] = {}
-        self.search_result_cache: Dict[str, CacheEntry] = {}
-        
-        # Statistics
-        self.query_embedding_hits = 0
-        self.query_embedding_misses = 0
-        self.search_result_hits = 0
-        self.search_result_misses = 0
-        
-        # Thread safety
+        # Separate caches for different data types (each is thread-safe, O(1) LRU with lazy TTL expiry)
+        self.query_embedding_cache = LRUTTLCache(
+            "query_embedding",
+            max_entries=max_query_embeddings,
+            max_bytes=max_query_embedding_bytes,
+            default_ttl=query_embedding_ttl
+        )
+        self.search_result_cache = LRUTTLCache(
+            "search_result",
+            max_entries=max_search_results,
+            max_bytes=max_search_result_bytes,
+            default_ttl=search_result_ttl
+        )
+        
+        # Thread safety for operations spanning both caches
         self._lock = threading.RLock()
         
         logger.info(f"CacheManager initialized with query_embedding_ttl={query_embedding_ttl}s, search_result_ttl={search_result_ttl}s")
@@ -65,64 +67,23 @@ class CacheManager:
         cache_data = f"{prefix}:{query}"
         return hashlib.md5(cache_data.encode('utf-8')).hexdigest()
     
-    def _is_cache_valid(self, entry: CacheEntry) -> bool:
-        """Check if a cache entry is still valid"""
-        current_time = time.time()
-        return (current_time - entry.timestamp) < entry.ttl
-    
-    def _cleanup_expired_entries(self, cache: Dict[str, CacheEntry], max_entries: int):
-        """Clean up expired entries and enforce size limits"""
-        current_time = time.time()
-        
-        # Remove expired entries
-        expired_keys = [
-            key for key, entry in cache.items()
-            if (current_time - entry.timestamp) >= entry.ttl
-        ]
-        
-        for key in expired_keys:
-            del cache[key]
-            logger.debug(f"Removed expired cache entry: {key}")
-        
-        # If still over limit, remove least recently accessed entries
-        if len(cache) > max_entries:
-            sorted_entries = sorted(
-                cache.items(),
-                key=lambda x: x[1].last_accessed
-            )
-            
-            entries_to_remove = len(cache) - max_entries
-            for key, _ in sorted_entries[:entries_to_remove]:
-                del cache[key]
-                logger.debug(f"Removed LRU cache entry: {key}")
-    
-    def cache_query_embedding(self, query: str, embedding: List[float], ttl: Optional[int] = None) -> None:
+    def cache_query_embedding(self, query: str, embedding: Union[np.ndarray, List[float]], ttl: Optional[int] = None) -> None:
         """
         Cache a query embedding for blazing-fast performance.
         
         Args:
             query: The search query
-            embedding: The generated embedding vector
+            embedding: The generated embedding vector (stored as a read-only float32 array)
             ttl: Optional TTL override (uses default if None)
         """
-        with self._lock:
-            cache_key = self._generate_cache_key(query, "query_embedding")
-            ttl = ttl or self.query_embedding_ttl
-            
-            self.query_embedding_cache[cache_key] = CacheEntry(
-                data=embedding,
-                timestamp=time.time(),
-                ttl=ttl,
-                access_count=0,
-                last_accessed=time.time()
-            )
-            
-            # Cleanup if needed
-            self._cleanup_expired_entries(self.query_embedding_cache, self.max_query_embeddings)
-            
-            logger.debug(f"Cached query embedding for: {query[:50]}...")
+        vector = np.array(embedding, dtype=np.float32)
+        vector.flags.writeable = False
+        
+        cache_key = self._generate_cache_key(query, "query_embedding")
+        self.query_embedding_cache.put(cache_key, vector, ttl=ttl or self.query_embedding_ttl)
+        logger.debug(f"Cached query embedding for: {query[:50]}...")
     
-    def get_cached_query_embedding(self, query: str) -> Optional[List[float]]:
+    def get_cached_query_embedding(self, query: str) -> Optional[np.ndarray]:
         """
         Get a cached query embedding if available and valid.
         
@@ -130,27 +91,15 @@ class CacheManager:
             query: The search query
             
         Returns:
-            Cached embedding if available and valid, None otherwise
+            Cached read-only float32 embedding if available and valid, None otherwise
         """
-        with self._lock:
-            cache_key = self._generate_cache_key(query, "query_embedding")
-            cached_entry = self.query_embedding_cache.get(cache_key)
-            
-            if cached_entry and self._is_cache_valid(cached_entry):
-                # Update access statistics
-                cached_entry.access_count += 1
-                cached_entry.last_accessed = time.time()
-                self.query_embedding_hits += 1
-                
-                logger.debug(f"Cache hit for query embedding: {query[:50]}...")
-                return cached_entry.data
-            else:
-                self.query_embedding_misses += 1
-                if cached_entry:
-                    logger.debug(f"Cache miss (expired) for query embedding: {query[:50]}...")
-                else:
-                    logger.debug(f"Cache miss (not found) for query embedding: {query[:50]}...")
-                return None
+        cache_key = self._generate_cache_key(query, "query_embedding")
+        vector = self.query_embedding_cache.get(cache_key)
+        if vector is not None:
+            logger.debug(f"Cache hit for query embedding: {query[:50]}...")
+        else:
+            logger.debug(f"Cache miss for query embedding: {query[:50]}...")
+        return vector
     
     def cache_search_result(self, query: str, filters: Optional[Dict[str, Any]], 
                            n_results: int, results: List[Dict[str, Any]], 
@@ -165,22 +114,9 @@ class CacheManager:
             results: The search results to cache
             ttl: Optional TTL override (uses default if None)
         """
-        with self._lock:
-            cache_key = self._generate_cache_key(f"{query}:{filters}:{n_results}", "search_result")
-            ttl = ttl or self.search_result_ttl
-            
-            self.search_result_cache[cache_key] = CacheEntry(
-                data=results,
-                timestamp=time.time(),
-                ttl=ttl,
-                access_count=0,
-                last_accessed=time.time()
-            )
-            
-            # Cleanup if needed
-            self._cleanup_expired_entries(self.search_result_cache, self.max_search_results)
-            
-            logger.debug(f"Cached search results for: {query[:50]}...")
+        cache_key = self._generate_cache_key(f"{query}:{filters}:{n_results}", "search_result")
+        self.search_result_cache.put(cache_key, results, ttl=ttl or self.search_result_ttl)
+        logger.debug(f"Cached search results for: {query[:50]}...")
     
     def get_cached_search_result(self, query: str, filters: Optional[Dict[str, Any]], 
                                 n_results: int) -> Optional[List[Dict[str, Any]]]:
@@ -195,25 +131,13 @@ class CacheManager:
         Returns:
             Cached results if available and valid, None otherwise
         """
-        with self._lock:
-            cache_key = self._generate_cache_key(f"{query}:{filters}:{n_results}", "search_result")
-            cached_entry = self.search_result_cache.get(cache_key)
-            
-            if cached_entry and self._is_cache_valid(cached_entry):
-                # Update access statistics
-                cached_entry.access_count += 1
-                cached_entry.last_accessed = time.time()
-                self.search_result_hits += 1
-                
-                logger.debug(f"Cache hit for search results: {query[:50]}...")
-                return cached_entry.data
-            else:
-                self.search_result_misses += 1
-                if cached_entry:
-                    logger.debug(f"Cache miss (expired) for search results: {query[:50]}...")
-                else:
-                    logger.debug(f"Cache miss (not found) for search results: {query[:50]}...")
-                return None
+        cache_key = self._generate_cache_key(f"{query}:{filters}:{n_results}", "search_result")
+        results = self.search_result_cache.get(cache_key)
+        if results is not None:
+            logger.debug(f"Cache hit for search results: {query[:50]}...")
+        else:
+            logger.debug(f"Cache miss for search results: {query[:50]}...")
+        return results
     
     def precompute_common_queries(self, common_queries: List[str], embedding_service) -> None:
         """
@@ -230,7 +154,7 @@ class CacheManager:
             if self.get_cached_query_embedding(query) is None:
                 try:
                     # Generate embedding
-                    embedding = embedding_service.generate_embedding(query)
+                    embedding = embedding_service.generate_embedding_array(query)
                     
                     # Cache it
                     self.cache_query_embedding(query, embedding)
@@ -244,48 +168,49 @@ class CacheManager:
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get comprehensive cache statistics"""
         with self._lock:
-            total_query_requests = self.query_embedding_hits + self.query_embedding_misses
-            total_search_requests = self.search_result_hits + self.search_result_misses
-            
-            query_hit_rate = (self.query_embedding_hits / total_query_requests * 100) if total_query_requests > 0 else 0
-            search_hit_rate = (self.search_result_hits / total_search_requests * 100) if total_search_requests > 0 else 0
+            query_stats = self.query_embedding_cache.get_stats()
+            search_stats = self.search_result_cache.get_stats()
+            total_query_requests = query_stats["hits"] + query_stats["misses"]
+            total_search_requests = search_stats["hits"] + search_stats["misses"]
             
             return {
                 "query_embedding_cache": {
-                    "size": len(self.query_embedding_cache),
-                    "hits": self.query_embedding_hits,
-                    "misses": self.query_embedding_misses,
-                    "hit_rate": f"{query_hit_rate:.2f}%",
-                    "max_size": self.max_query_embeddings
+                    "size": query_stats["size"],
+                    "hits": query_stats["hits"],
+                    "misses": query_stats["misses"],
+                    "hit_rate": f"{query_stats['hit_rate'] * 100:.2f}%",
+                    "max_size": self.max_query_embeddings,
+                    "bytes": query_stats["bytes"],
+                    "max_bytes": query_stats["max_bytes"]
                 },
                 "search_result_cache": {
-                    "size": len(self.search_result_cache),
-                    "hits": self.search_result_hits,
-                    "misses": self.search_result_misses,
-                    "hit_rate": f"{search_hit_rate:.2f}%",
-                    "max_size": self.max_search_results
+                    "size": search_stats["size"],
+                    "hits": search_stats["hits"],
+                    "misses": search_stats["misses"],
+                    "hit_rate": f"{search_stats['hit_rate'] * 100:.2f}%",
+                    "max_size": self.max_search_results,
+                    "bytes": search_stats["bytes"],
+                    "max_bytes": search_stats["max_bytes"]
                 },
                 "total_requests": {
                     "query_embeddings": total_query_requests,
                     "search_results": total_search_requests
+                },
+                "namespaces": {
+                    query_stats["namespace"]: query_stats,
+                    search_stats["namespace"]: search_stats
                 }
             }
     
     def clear_query_embedding_cache(self) -> None:
         """Clear the query embedding cache"""
-        with self._lock:
-            self.query_embedding_cache.clear()
-            self.query_embedding_hits = 0
-            self.query_embedding_misses = 0
-            logger.info("Query embedding cache cleared")
+        self.query_embedding_cache.clear()
+        logger.info("Query embedding cache cleared")
     
     def clear_search_result_cache(self) -> None:
         """Clear the search result cache"""
-        with self._lock:
-            self.search_result_cache.clear()
-            self.search_result_hits = 0
-            self.search_result_misses = 0
-            logger.info("Search result cache cleared")
+        self.search_result_cache.clear()
+        logger.info("Search result cache cleared")
     
     def clear_all_caches(self) -> None:
         """Clear all caches"""
@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+LRU + TTL Cache Core
+Ordered-dict LRU with a lazy expiry heap and byte-bounded eviction, O(1) lookups and amortized O(log n) inserts
+"""
+
+import heapq
+import logging
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Any, Callable, Hashable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheEntry:
+    """Cache entry with metadata"""
+    data: Any
+    timestamp: float
+    ttl: Optional[float]
+    access_count: int = 0
+    last_accessed: float = 0.0
+    size: int = 0
+    sequence: int = 0  # matches this entry's expiry heap item
+
+    @property
+    def expires_at(self) -> float:
+        return self.timestamp + self.ttl if self.ttl else float("inf")
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Approximate memory footprint of a cached value in bytes.
+
+    Arrays report their buffer size; containers are walked a few levels deep
+    (search results are lists of dicts of strings); anything else falls back to
+    sys.getsizeof.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes + 112
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if _depth >= 4:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1)
+                                          for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(item, _depth + 1) for item in value)
+    return sys.getsizeof(value)
+
+
+class LRUTTLCache:
+    """
+    Thread-safe LRU cache with per-entry TTL and entry/byte limits.
+
+    Recency is kept by an OrderedDict (move_to_end on hit, popitem(last=False)
+    to evict), so lookups and evictions are O(1). Expiry times go into a min-heap
+    that is only drained up to "now" on writes; expired entries hit by a lookup
+    are dropped on the spot. Nothing ever scans or sorts the whole cache.
+    """
+
+    def __init__(self,
+                 name: str,
+                 max_entries: Optional[int] = None,
+                 max_bytes: Optional[int] = None,
+                 default_ttl: Optional[float] = None,
+                 sizeof: Callable[[Any], int] = estimate_size,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize the cache.
+
+        Args:
+            name: Namespace reported in stats
+            max_entries: Max number of entries (None for no count limit)
+            max_bytes: Max estimated bytes of cached values (None for no byte limit)
+            default_ttl: TTL in seconds for put() without one (None or 0 never expires)
+            sizeof: Function estimating a value's size in bytes
+            clock: Time source (seconds)
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self._sizeof = sizeof
+        self._clock = clock
+
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._expiry_heap: List[Tuple[float, int, Hashable]] = []
+        self._sequence = 0
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {"hits": 0, "misses": 0, "expired_misses": 0, "puts": 0,
+                "evictions": 0, "expirations": 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.expires_at > self._clock()
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def _remove(self, key: Hashable) -> CacheEntry:
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        return entry
+
+    def _expire(self, now: float):
+        """Drop entries whose expiry time has passed (heap items for replaced entries are skipped)."""
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, sequence, key = heapq.heappop(heap)
+            entry = self._entries.get(key)
+            if entry is not None and entry.sequence == sequence:
+                self._remove(key)
+                self.stats["expirations"] += 1
+
+        # Overwrites leave stale heap items behind; rebuild once they dominate
+        if len(heap) > 2 * len(self._entries) + 64:
+            self._expiry_heap = [item for item in heap
+                                 if item[2] in self._entries and self._entries[item[2]].sequence == item[1]]
+            heapq.heapify(self._expiry_heap)
+
+    def _evict(self):
+        """Evict least recently used entries until both limits hold."""
+        while self._entries and (
+            (self.max_entries is not None and len(self._entries) > self.max_entries)
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.stats["evictions"] += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Look up a value and mark it most recently used.
+
+        Returns:
+            The cached value, or default if missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return default
+            now = self._clock()
+            if entry.expires_at <= now:
+                self._remove(key)
+                self.stats["expirations"] += 1
+                self.stats["expired_misses"] += 1
+                self.stats["misses"] += 1
+                return default
+            self._entries.move_to_end(key)
+            entry.access_count += 1
+            entry.last_accessed = now
+            self.stats["hits"] += 1
+            return entry.data
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """
+        Insert or replace a value.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: TTL in seconds (default: default_ttl)
+        """
+        size = self._sizeof(value)
+        ttl = ttl if ttl is not None else self.default_ttl
+        with self._lock:
+            now = self._clock()
+            if key in self._entries:
+                self._remove(key)
+            self._sequence += 1
+            entry = CacheEntry(data=value, timestamp=now, ttl=ttl, last_accessed=now, size=size,
+                               sequence=self._sequence)
+            self._entries[key] = entry
+            self._bytes += size
+            self.stats["puts"] += 1
+            if ttl:
+                heapq.heappush(self._expiry_heap, (entry.expires_at, self._sequence, key))
+            self._expire(now)
+            self._evict()
+
+    def delete(self, key: Hashable) -> bool:
+        """Remove a key; returns whether it was present."""
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def purge_expired(self) -> int:
+        """Drop every expired entry now; returns how many were removed."""
+        with self._lock:
+            before = self.stats["expirations"]
+            self._expire(self._clock())
+            return self.stats["expirations"] - before
+
+    def clear(self, reset_stats: bool = True):
+        """Remove all entries (and optionally reset statistics)."""
+        with self._lock:
+            self._entries.clear()
+            self._expiry_heap.clear()
+            self._bytes = 0
+            if reset_stats:
+                self.stats = self._empty_stats()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get per-namespace statistics."""
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["misses"]
+            return {
+                "namespace": self.name,
+                **self.stats,
+                "size": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hit_rate": self.stats["hits"] / lookups if lookups else 0.0
+            }
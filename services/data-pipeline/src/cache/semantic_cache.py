@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Semantic Query Result Cache
+Serves cached search results for paraphrased queries by cosine similarity over a flat float32 matrix of recent query embeddings
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, List, Dict, Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SemanticCacheHit:
+    """A cached result set matched by embedding similarity"""
+    results: List[Dict[str, Any]]
+    cached_query: str
+    similarity: float
+    verify: bool = False  # caller should run the real search and report via record_verification
+
+
+class SemanticResultCache:
+    """
+    Near-duplicate query cache.
+
+    Query embeddings are L2-normalised into a ring buffer of ``max_entries``
+    rows; a lookup is one matrix-vector product restricted to rows with the
+    same filter key and within TTL. A hit needs cosine similarity >= threshold.
+    A fraction ``verify_rate`` of hits is flagged for shadow verification so
+    false hits (paraphrase matched but the real top results differ) can be
+    measured in production.
+    """
+
+    def __init__(self,
+                 threshold: float = 0.95,
+                 max_entries: int = 2048,
+                 ttl: int = 1800,
+                 verify_rate: float = 0.0,
+                 min_overlap: float = 0.6):
+        """
+        Initialize the cache (the embedding matrix is allocated on first store).
+
+        Args:
+            threshold: Minimum cosine similarity for a hit
+            max_entries: Number of recent queries kept
+            ttl: Seconds a cached result set stays valid
+            verify_rate: Fraction of hits flagged for shadow verification
+            min_overlap: Result-id overlap below which a verified hit counts as false
+        """
+        self.threshold = threshold
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self.verify_rate = verify_rate
+        self.min_overlap = min_overlap
+
+        self._matrix: Optional[np.ndarray] = None
+        self._filter_ids = np.full(self.max_entries, -1, dtype=np.int64)
+        self._timestamps = np.zeros(self.max_entries, dtype=np.float64)
+        self._queries: List[Optional[str]] = [None] * self.max_entries
+        self._results: List[Optional[List[Dict[str, Any]]]] = [None] * self.max_entries
+        self._paths: List[frozenset] = [frozenset()] * self.max_entries
+        # Filter keys with at least one live slot; ids are never reused, so a freed id cannot match a new key
+        self._filter_key_ids: Dict[str, int] = {}
+        self._filter_keys: Dict[int, str] = {}
+        self._filter_slot_counts: Dict[int, int] = {}
+        self._next_filter_id = 0
+        self._next_slot = 0
+        self._lock = threading.Lock()
+
+        self.stats = {
+            "lookups": 0,
+            "hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "verified_hits": 0,
+            "false_hits": 0,
+            "invalidated": 0,
+            "hit_similarity_sum": 0.0
+        }
+
+    @staticmethod
+    def filter_key(n_results: int, where: Optional[Dict] = None, where_document: Optional[Dict] = None) -> str:
+        """Canonical key of everything besides the query text that shapes a result set."""
+        return json.dumps({"n": n_results, "where": where, "where_document": where_document},
+                          sort_keys=True, default=str)
+
+    @staticmethod
+    def _normalize(embedding) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32).reshape(-1)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm > 0 else vector
+
+    def lookup(self, embedding, filter_key: str) -> Optional[SemanticCacheHit]:
+        """
+        Find the most similar cached query with identical filters.
+
+        Args:
+            embedding: Query embedding
+            filter_key: Value of filter_key() for the request
+
+        Returns:
+            SemanticCacheHit, or None when no cached query passes the threshold
+        """
+        with self._lock:
+            self.stats["lookups"] += 1
+            filter_id = self._filter_key_ids.get(filter_key)
+            if self._matrix is None or filter_id is None:
+                self.stats["misses"] += 1
+                return None
+
+            valid = (self._filter_ids == filter_id) & (self._timestamps > time.time() - self.ttl)
+            candidates = np.flatnonzero(valid)
+            if not len(candidates):
+                self.stats["misses"] += 1
+                return None
+
+            similarities = self._matrix[candidates] @ self._normalize(embedding)
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity < self.threshold:
+                self.stats["misses"] += 1
+                return None
+
+            slot = int(candidates[best])
+            self.stats["hits"] += 1
+            self.stats["hit_similarity_sum"] += similarity
+            return SemanticCacheHit(
+                results=self._results[slot],
+                cached_query=self._queries[slot],
+                similarity=similarity,
+                verify=self.verify_rate > 0 and random.random() < self.verify_rate
+            )
+
+    def _release(self, slot: int):
+        """Empty a slot and forget its filter key once no live slot uses it (lock held)."""
+        filter_id = int(self._filter_ids[slot])
+        if filter_id < 0:
+            return
+        self._filter_ids[slot] = -1
+        self._results[slot] = None
+        self._paths[slot] = frozenset()
+        self._filter_slot_counts[filter_id] -= 1
+        if not self._filter_slot_counts[filter_id]:
+            del self._filter_slot_counts[filter_id]
+            del self._filter_key_ids[self._filter_keys.pop(filter_id)]
+
+    def store(self, query: str, embedding, filter_key: str, results: List[Dict[str, Any]]):
+        """Cache a result set, overwriting the oldest slot when full."""
+        paths = frozenset(r.get("metadata", {}).get("path") for r in results) - {None}
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._matrix is None:
+                self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+            now = time.time()
+            for expired in np.flatnonzero((self._filter_ids >= 0) & (self._timestamps <= now - self.ttl)):
+                self._release(int(expired))
+
+            slot = self._next_slot
+            self._next_slot = (slot + 1) % self.max_entries
+            self._release(slot)
+            filter_id = self._filter_key_ids.get(filter_key)
+            if filter_id is None:
+                filter_id = self._next_filter_id
+                self._next_filter_id += 1
+                self._filter_key_ids[filter_key] = filter_id
+                self._filter_keys[filter_id] = filter_key
+            self._filter_slot_counts[filter_id] = self._filter_slot_counts.get(filter_id, 0) + 1
+
+            self._matrix[slot] = vector
+            self._filter_ids[slot] = filter_id
+            self._timestamps[slot] = now
+            self._queries[slot] = query
+            self._results[slot] = results
+            self._paths[slot] = paths
+            self.stats["stores"] += 1
+
+    def invalidate_paths(self, paths: Iterable[str]) -> int:
+        """Drop cached result sets that contain any of the given note paths; returns how many."""
+        changed = set(paths)
+        dropped = 0
+        with self._lock:
+            for slot in np.flatnonzero(self._filter_ids >= 0):
+                if not self._paths[slot].isdisjoint(changed):
+                    self._release(int(slot))
+                    dropped += 1
+            self.stats["invalidated"] += dropped
+        return dropped
+
+    def record_verification(self, cached_results: List[Dict[str, Any]], fresh_results: List[Dict[str, Any]]) -> bool:
+        """
+        Compare a served hit with the real search results.
+
+        Returns:
+            True if the hit was a false hit (result-id overlap below min_overlap)
+        """
+        cached_ids = {r.get("id") for r in cached_results}
+        fresh_ids = {r.get("id") for r in fresh_results}
+        union = cached_ids | fresh_ids
+        overlap = len(cached_ids & fresh_ids) / len(union) if union else 1.0
+        false_hit = overlap < self.min_overlap
+        with self._lock:
+            self.stats["verified_hits"] += 1
+            if false_hit:
+                self.stats["false_hits"] += 1
+        return false_hit
+
+    def clear(self):
+        """Drop all cached queries (statistics are kept)."""
+        with self._lock:
+            self._filter_ids[:] = -1
+            self._timestamps[:] = 0
+            self._queries = [None] * self.max_entries
+            self._results = [None] * self.max_entries
+            self._paths = [frozenset()] * self.max_entries
+            self._filter_key_ids.clear()
+            self._filter_keys.clear()
+            self._filter_slot_counts.clear()
+            self._next_slot = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit-rate and false-hit statistics."""
+        with self._lock:
+            lookups = self.stats["lookups"]
+            hits = self.stats["hits"]
+            verified = self.stats["verified_hits"]
+            return {
+                **self.stats,
+                "size": int(np.count_nonzero(self._filter_ids >= 0)),
+                "filter_keys": len(self._filter_key_ids),
+                "threshold": self.threshold,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "avg_hit_similarity": self.stats["hit_similarity_sum"] / hits if hits else 0.0,
+                "false_hit_rate": self.stats["false_hits"] / verified if verified else 0.0
+            }
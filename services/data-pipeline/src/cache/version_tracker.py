@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Collection Version Tracker
+Per-path content versions and a collection generation counter for targeted search cache invalidation, shared across processes through a SQLite change journal
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Listener signature: (changed paths, new generation)
+ChangeListener = Callable[[Set[str], int], None]
+
+
+def change_journal_path(persist_directory: str, collection_name: str) -> str:
+    """Journal file shared by every process that updates or searches one collection (next to its manifest)."""
+    return os.path.join(persist_directory, f"changes_{collection_name}.sqlite3")
+
+
+class CollectionVersionTracker:
+    """
+    Tracks which version of each note the vector collection currently holds.
+
+    Update paths call record_change() after rewriting or deleting a note's
+    chunks; that bumps the generation counter and notifies listeners (search
+    caches) with the changed paths so they can drop only the entries built
+    from those notes. Cached entries also keep a snapshot of the versions they
+    were built from, which is_current() checks on read.
+
+    Update paths flag a change as an addition when nothing was stored for the
+    path before (a new or re-created note). An addition can add results to any
+    query, so it also moves membership_generation and entries cached before it
+    are no longer valid. Moves are reported as a deletion of the old path and
+    a change of the new one, so they stay targeted.
+
+    With a journal_path, every change is also appended to a SQLite journal and
+    poll() applies changes recorded by other processes (the vault monitor
+    updates the collection, the API process serves cached searches). Listeners
+    that are bound methods are held weakly, so a registered search service can
+    still be garbage collected.
+    """
+
+    def __init__(self, journal_path: Optional[str] = None, journal_size: int = 10000, poll_interval: float = 0.25):
+        """
+        Initialize the tracker.
+
+        Args:
+            journal_path: SQLite change journal shared with other processes (None for this process only)
+            journal_size: Journal rows kept; a reader that falls further behind drops all cached searches
+            poll_interval: Minimum seconds between two journal reads in poll()
+        """
+        self.generation = 0
+        self.membership_generation = 0
+        self.updates_in_progress = 0
+        self._versions: Dict[str, str] = {}
+        self._listeners: List[Callable[[], Optional[ChangeListener]]] = []
+        self._lock = threading.Lock()
+        self.stats = {"changes": 0, "paths_changed": 0, "deletions": 0, "additions": 0,
+                      "journal_changes_applied": 0, "journal_gaps": 0}
+
+        self.journal_path = journal_path
+        self.journal_size = journal_size
+        self.poll_interval = poll_interval
+        self._journal: Optional[sqlite3.Connection] = None
+        self._journal_seq = 0
+        self._journal_writes = 0
+        self._last_poll = 0.0
+        if journal_path:
+            directory = os.path.dirname(journal_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._journal = sqlite3.connect(journal_path, check_same_thread=False, isolation_level=None, timeout=10)
+            self._journal.execute("PRAGMA journal_mode=WAL")
+            self._journal.execute("PRAGMA synchronous=NORMAL")
+            self._journal.execute("""
+                CREATE TABLE IF NOT EXISTS changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    path TEXT NOT NULL,
+                    version TEXT,
+                    added INTEGER NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            # Changes from before this process started are already reflected in the collection it reads
+            self._journal_seq = self._journal.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+
+    @staticmethod
+    def content_version(content: str) -> str:
+        """Version string for a note's content."""
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()[:16]
+
+    def version_of(self, path: str) -> Optional[str]:
+        """Current version of a path (None if it was never recorded)."""
+        return self._versions.get(path)
+
+    def snapshot(self, paths: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Versions of the given paths, to store alongside a cached result."""
+        with self._lock:
+            return {path: self._versions.get(path) for path in paths}
+
+    def is_current(self, snapshot: Dict[str, Optional[str]]) -> bool:
+        """Whether none of the snapshotted paths changed since the snapshot was taken."""
+        with self._lock:
+            return all(self._versions.get(path) == version for path, version in snapshot.items())
+
+    def _apply(self, changes: Dict[str, Optional[str]], added: Set[str], reset: bool = False) -> int:
+        """Apply changes to the in-memory state (lock held); returns the new generation."""
+        self.generation += 1
+        generation = self.generation
+        if added or reset:
+            self.membership_generation = generation
+        for path, version in changes.items():
+            if version is None:
+                # Tombstone: differs from "never seen" and from any later re-creation
+                version = f"deleted@{generation}"
+                self.stats["deletions"] += 1
+            self._versions[path] = version
+        self.stats["changes"] += 1
+        self.stats["paths_changed"] += len(changes)
+        self.stats["additions"] += len(added)
+        return generation
+
+    def _live_listeners(self) -> List[ChangeListener]:
+        """Resolve listener references, forgetting collected ones (lock held)."""
+        listeners = [ref() for ref in self._listeners]
+        self._listeners = [ref for ref, listener in zip(self._listeners, listeners) if listener is not None]
+        return [listener for listener in listeners if listener is not None]
+
+    @staticmethod
+    def _notify(listeners: List[ChangeListener], paths: Set[str], generation: int):
+        for listener in listeners:
+            try:
+                listener(paths, generation)
+            except Exception as e:
+                logger.warning(f"Cache invalidation listener failed: {e}")
+
+    def _read_journal(self) -> Tuple[Dict[str, Optional[str]], Set[str], bool]:
+        """Changes other processes appended since the last read (journal transaction held)."""
+        oldest = self._journal.execute("SELECT MIN(seq) FROM changes").fetchone()[0]
+        rows = self._journal.execute(
+            "SELECT seq, path, version, added FROM changes WHERE seq > ? ORDER BY seq", (self._journal_seq,)
+        ).fetchall()
+        # Rows we never saw were pruned: which paths changed is unknown
+        gap = oldest is not None and oldest > self._journal_seq + 1 and self._journal_seq > 0
+        changes: Dict[str, Optional[str]] = {}
+        added: Set[str] = set()
+        for seq, path, version, was_added in rows:
+            changes[path] = version
+            if was_added:
+                added.add(path)
+            self._journal_seq = seq
+        return changes, added, gap
+
+    def _apply_journal(self, changes: Dict[str, Optional[str]], added: Set[str], gap: bool) -> Optional[Tuple]:
+        """Apply changes read from the journal (lock held); returns a pending notification."""
+        if not changes and not gap:
+            return None
+        if gap:
+            self.stats["journal_gaps"] += 1
+            logger.warning("Change journal was pruned past this process' position, dropping all cached searches")
+        self.stats["journal_changes_applied"] += len(changes)
+        generation = self._apply(changes, added, reset=gap)
+        return self._live_listeners(), set(changes), generation
+
+    def record_changes(self, changes: Dict[str, Optional[str]], added: Iterable[str] = ()) -> int:
+        """
+        Record rewritten or deleted notes and notify listeners.
+
+        Args:
+            changes: path -> new content version, or None when the note's chunks were deleted
+            added: Paths in changes that had nothing stored before (new or re-created notes)
+
+        Returns:
+            The new generation
+        """
+        if not changes:
+            return self.generation
+        added = set(added) & set(changes)
+        pending = []
+        with self._lock:
+            if self._journal is not None:
+                # Read foreign changes and append ours in one write transaction, so the
+                # journal position skips exactly our own rows
+                self._journal.execute("BEGIN IMMEDIATE")
+                try:
+                    foreign = self._read_journal()
+                    now = time.time()
+                    for path, version in changes.items():
+                        cursor = self._journal.execute(
+                            "INSERT INTO changes (path, version, added, created_at) VALUES (?, ?, ?, ?)",
+                            (path, version, int(path in added), now)
+                        )
+                        self._journal_seq = cursor.lastrowid
+                    self._journal_writes += 1
+                    if self._journal_writes % 100 == 0:
+                        self._journal.execute("DELETE FROM changes WHERE seq <= ?",
+                                              (self._journal_seq - self.journal_size,))
+                    self._journal.execute("COMMIT")
+                except Exception:
+                    self._journal.execute("ROLLBACK")
+                    raise
+                foreign_pending = self._apply_journal(*foreign)
+                if foreign_pending is not None:
+                    pending.append(foreign_pending)
+            generation = self._apply(changes, added)
+            pending.append((self._live_listeners(), set(changes), generation))
+
+        for listeners, paths, pending_generation in pending:
+            self._notify(listeners, paths, pending_generation)
+        return generation
+
+    def record_change(self, path: str, version: Optional[str] = None, added: bool = False) -> int:
+        """Record a single rewritten (version) or deleted (None) note; added marks a note that had nothing stored."""
+        return self.record_changes({path: version}, added=(path,) if added else ())
+
+    def poll(self, force: bool = False) -> bool:
+        """
+        Apply changes other processes recorded in the journal and notify listeners.
+
+        Reads at most once per poll_interval unless force is set.
+
+        Returns:
+            True if anything changed
+        """
+        if self._journal is None:
+            return False
+        now = time.monotonic()
+        if not force and now - self._last_poll < self.poll_interval:
+            return False
+        self._last_poll = now
+        with self._lock:
+            try:
+                pending = self._apply_journal(*self._read_journal())
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to read the change journal: {e}")
+                return False
+        if pending is None:
+            return False
+        self._notify(*pending)
+        return True
+
+    @contextmanager
+    def updating(self):
+        """
+        Mark a delete-then-store rewrite in progress. Searches finishing inside
+        the window may miss the note entirely, so callers should not cache them
+        (see is_stable). Only visible within this process.
+        """
+        with self._lock:
+            self.updates_in_progress += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.updates_in_progress -= 1
+
+    def is_stable(self, generation: int) -> bool:
+        """Whether nothing changed or started changing since generation was read."""
+        return self.generation == generation and self.updates_in_progress == 0
+
+    def includes_additions_since(self, generation: int) -> bool:
+        """Whether a path joined the collection after generation was read."""
+        return self.membership_generation > generation
+
+    def add_listener(self, listener: ChangeListener):
+        """Register a callback invoked with the changed paths after every change (bound methods are held weakly)."""
+        if hasattr(listener, "__self__") and hasattr(listener, "__func__"):
+            ref = weakref.WeakMethod(listener)
+        else:
+            ref = lambda: listener
+        with self._lock:
+            self._listeners.append(ref)
+
+    def remove_listener(self, listener: ChangeListener):
+        """Unregister a callback."""
+        with self._lock:
+            self._listeners = [ref for ref in self._listeners if ref() not in (None, listener)]
+
+    def close(self):
+        """Close the change journal."""
+        with self._lock:
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get change statistics."""
+        return {**self.stats, "generation": self.generation,
+                "membership_generation": self.membership_generation, "tracked_paths": len(self._versions),
+                "journal_seq": self._journal_seq if self.journal_path else None}
+
+
+# Global tracker instance shared by update paths and search caches within one process
+_version_tracker: Optional[CollectionVersionTracker] = None
+
+
+def get_version_tracker() -> CollectionVersionTracker:
+    """Get the process-wide collection version tracker (without a journal; inject a journaled one across processes)."""
+    global _version_tracker
+    if _version_tracker is None:
+        _version_tracker = CollectionVersionTracker()
+    return _version_tracker
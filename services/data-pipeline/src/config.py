@@ -24,11 +24,16 @@ class Settings(BaseSettings):
     chroma_url: str = Field(default="http://chroma:8000", env="CHROMA_URL")
     chroma_collection_name: str = Field(default="obsidian_vault", env="CHROMA_COLLECTION_NAME")
     chroma_persist_directory: str = Field(default="./data/chroma", env="CHROMA_PERSIST_DIRECTORY")
+    # Off: queries are embedded by EmbeddingService and Chroma never loads a model of its own
+    chroma_use_embedding_function: bool = Field(default=False, env="CHROMA_USE_EMBEDDING_FUNCTION")
     
     # Embedding Configuration
     embedding_model: str = Field(default="sentence-transformers/all-MiniLM-L6-v2", env="EMBEDDING_MODEL")
     embedding_batch_size: int = Field(default=32, env="EMBEDDING_BATCH_SIZE")
     embedding_cache_size: int = Field(default=10000, env="EMBEDDING_CACHE_SIZE")
+    embedding_cache_path: str = Field(default="./data/embedding_cache/embeddings.sqlite3", env="EMBEDDING_CACHE_PATH")
+    query_embedding_batch_size: int = Field(default=32, env="QUERY_EMBEDDING_BATCH_SIZE")
+    query_embedding_max_wait_ms: float = Field(default=5.0, env="QUERY_EMBEDDING_MAX_WAIT_MS")
     
     # Processing Configuration
     chunk_size: int = Field(default=512, env="CHUNK_SIZE")
@@ -40,11 +45,22 @@ class Settings(BaseSettings):
     default_search_results: int = Field(default=5, env="DEFAULT_SEARCH_RESULTS")
     max_search_results: int = Field(default=20, env="MAX_SEARCH_RESULTS")
     similarity_threshold: float = Field(default=0.7, env="SIMILARITY_THRESHOLD")
+    # Retrieve with the original query right away; expansions landing within the deadline add a fused second retrieval
+    speculative_expansion: bool = Field(default=True, env="SPECULATIVE_EXPANSION")
+    expansion_deadline_ms: int = Field(default=400, env="EXPANSION_DEADLINE_MS")
+    expansion_memo_path: str = Field(default="./data/query_cache/expansions.sqlite3", env="EXPANSION_MEMO_PATH")
     
     # Caching Configuration
     cache_ttl_embeddings: int = Field(default=3600, env="CACHE_TTL_EMBEDDINGS")  # 1 hour
-    cache_ttl_search: int = Field(default=1800, env="CACHE_TTL_SEARCH")  # 30 minutes
+    # Rewritten, added, moved and deleted notes invalidate cached searches through the change journal
+    # next to the collection; only an edited note that newly matches a query waits for this TTL
+    cache_ttl_search: int = Field(default=86400, env="CACHE_TTL_SEARCH")  # 24 hours
+    search_cache_size: int = Field(default=1024, env="SEARCH_CACHE_SIZE")
     cache_ttl_content: int = Field(default=7200, env="CACHE_TTL_CONTENT")  # 2 hours
+    semantic_cache_enabled: bool = Field(default=True, env="SEMANTIC_CACHE_ENABLED")
+    semantic_cache_threshold: float = Field(default=0.95, env="SEMANTIC_CACHE_THRESHOLD")  # cosine similarity
+    semantic_cache_size: int = Field(default=2048, env="SEMANTIC_CACHE_SIZE")
+    semantic_cache_verify_rate: float = Field(default=0.02, env="SEMANTIC_CACHE_VERIFY_RATE")
     
     # Monitoring Configuration
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
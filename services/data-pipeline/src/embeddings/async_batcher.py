@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Async Embedding Micro-Batcher
+Collects concurrent single-text embedding requests and serves them with one model.encode call in a worker thread
+"""
+
+import asyncio
+import logging
+import time
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+from .embedding_service import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncEmbeddingBatcher:
+    """
+    asyncio front-end for EmbeddingService.
+
+    Requests that arrive within ``max_wait_ms`` of each other (up to
+    ``max_batch_size``) are embedded together via
+    EmbeddingService.batch_generate_embedding_matrix in a worker thread, so the
+    event loop never blocks on the model and concurrent queries share one
+    forward pass instead of running batch-size-1 passes back to back.
+    """
+
+    def __init__(self,
+                 embedding_service: EmbeddingService,
+                 max_batch_size: int = 32,
+                 max_wait_ms: float = 5.0):
+        """
+        Initialize the batcher (the worker task starts on first use).
+
+        Args:
+            embedding_service: Service that computes (and caches) embeddings
+            max_batch_size: Max texts per model call
+            max_wait_ms: How long the first request of a batch waits for company
+        """
+        self.embedding_service = embedding_service
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "requests": 0,
+            "batches": 0,
+            "batched_requests": 0,
+            "errors": 0,
+            "max_batch_size_seen": 0,
+            "total_encode_time": 0.0
+        }
+
+        logger.info(f"Initialized AsyncEmbeddingBatcher (max_batch_size={self.max_batch_size}, "
+                   f"max_wait_ms={max_wait_ms})")
+
+    def _ensure_worker(self):
+        """Start the batching task on the running event loop."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a single text, batched with any concurrent requests.
+
+        Args:
+            text: Text to embed
+
+        Returns:
+            1-D float32 embedding
+        """
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        self.stats["requests"] += 1
+        await self._queue.put((text, future))
+        return await future
+
+    async def _collect(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Wait for one request, then gather more until the batch is full or the window closes."""
+        batch.append(await self._queue.get())
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+    @staticmethod
+    def _fail(batch: List[Tuple[str, asyncio.Future]], error: BaseException):
+        """Propagate an error to every caller still waiting in batch."""
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def _run(self):
+        """Batching loop: collect, encode off the event loop, resolve futures."""
+        batch: List[Tuple[str, asyncio.Future]] = []
+        try:
+            while True:
+                batch = []
+                await self._collect(batch)
+                # Callers that gave up (e.g. request timeout) do not need an embedding
+                batch = [(text, future) for text, future in batch if not future.done()]
+                if not batch:
+                    continue
+
+                start_time = time.perf_counter()
+                try:
+                    matrix = await asyncio.to_thread(
+                        self.embedding_service.batch_generate_embedding_matrix, [text for text, _ in batch]
+                    )
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    logger.error(f"Batched embedding of {len(batch)} texts failed: {e}")
+                    self._fail(batch, e)
+                    continue
+                finally:
+                    self.stats["total_encode_time"] += time.perf_counter() - start_time
+
+                self.stats["batches"] += 1
+                self.stats["batched_requests"] += len(batch)
+                self.stats["max_batch_size_seen"] = max(self.stats["max_batch_size_seen"], len(batch))
+                for row, (_, future) in zip(matrix, batch):
+                    if not future.done():
+                        future.set_result(row)
+        except asyncio.CancelledError:
+            self._fail(batch, RuntimeError("AsyncEmbeddingBatcher closed"))
+            raise
+
+    async def close(self):
+        """Stop the worker and fail any requests still waiting."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        pending = []
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail(pending, RuntimeError("AsyncEmbeddingBatcher closed"))
+        logger.info("AsyncEmbeddingBatcher closed")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching statistics."""
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "avg_batch_size": (self.stats["batched_requests"] / batches) if batches else 0.0,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000
+        }
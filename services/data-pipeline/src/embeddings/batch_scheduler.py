@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Embedding Batch Scheduler
+Deduplicates texts, groups them by estimated length under a padded token budget and scatters results back into input order
+"""
+
+import logging
+import math
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatchScheduler:
+    """
+    Plans model.encode batches for a list of texts.
+
+    Token counts are estimated from character length (no tokenizer call), texts
+    are sorted longest-first so each batch pads to a similar length, and a batch
+    is closed when ``len(batch) * longest_text_tokens`` would exceed the budget.
+    """
+
+    def __init__(self,
+                 max_batch_tokens: int = 4096,
+                 max_batch_size: int = 256,
+                 chars_per_token: float = 4.0,
+                 max_seq_length: Optional[int] = None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_batch_tokens: Padded token budget per batch (batch size x longest text)
+            max_batch_size: Hard cap on texts per batch
+            chars_per_token: Characters per token used by the length estimate
+            max_seq_length: Model truncation length; longer texts are estimated at this length
+        """
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_size = max(1, max_batch_size)
+        self.chars_per_token = chars_per_token
+        self.max_seq_length = max_seq_length
+
+        self.stats = {
+            "requests": 0,
+            "texts": 0,
+            "duplicates_removed": 0,
+            "batches": 0,
+            "estimated_tokens": 0,
+            "estimated_padding_tokens": 0
+        }
+
+    def estimate_tokens(self, text: str) -> int:
+        """Cheap token estimate: characters / chars_per_token plus the two special tokens."""
+        estimate = math.ceil(len(text) / self.chars_per_token) + 2
+        if self.max_seq_length:
+            estimate = min(estimate, self.max_seq_length)
+        return estimate
+
+    @staticmethod
+    def dedupe(texts: List[str]) -> Tuple[List[str], np.ndarray]:
+        """
+        Collapse identical texts.
+
+        Returns:
+            (unique_texts, inverse) where texts[i] == unique_texts[inverse[i]]
+        """
+        positions: Dict[str, int] = {}
+        inverse = np.empty(len(texts), dtype=np.intp)
+        for i, text in enumerate(texts):
+            inverse[i] = positions.setdefault(text, len(positions))
+        return list(positions), inverse
+
+    def schedule(self, texts: List[str], indices: Optional[List[int]] = None) -> List[List[int]]:
+        """
+        Group texts into batches under the padded token budget.
+
+        Args:
+            texts: Texts to embed
+            indices: Subset of positions in texts to schedule (default: all)
+
+        Returns:
+            Batches of positions into texts, longest texts first
+        """
+        if indices is None:
+            indices = range(len(texts))
+        estimates = {i: self.estimate_tokens(texts[i]) for i in indices}
+        ordered = sorted(estimates, key=estimates.get, reverse=True)
+
+        batches: List[List[int]] = []
+        current: List[int] = []
+        longest = 0
+        for i in ordered:
+            if not current:
+                longest = estimates[i]
+            elif (len(current) + 1) * longest > self.max_batch_tokens or len(current) >= self.max_batch_size:
+                batches.append(current)
+                current = []
+                longest = estimates[i]
+            current.append(i)
+        if current:
+            batches.append(current)
+
+        for batch in batches:
+            tokens = sum(estimates[i] for i in batch)
+            self.stats["estimated_tokens"] += tokens
+            self.stats["estimated_padding_tokens"] += len(batch) * estimates[batch[0]] - tokens
+        self.stats["batches"] += len(batches)
+        return batches
+
+    def record_request(self, num_texts: int, num_unique: int):
+        """Count a request and the duplicates removed from it."""
+        self.stats["requests"] += 1
+        self.stats["texts"] += num_texts
+        self.stats["duplicates_removed"] += num_texts - num_unique
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get scheduling statistics."""
+        padded = self.stats["estimated_tokens"] + self.stats["estimated_padding_tokens"]
+        return {
+            **self.stats,
+            "max_batch_tokens": self.max_batch_tokens,
+            "max_batch_size": self.max_batch_size,
+            "padding_ratio": self.stats["estimated_padding_tokens"] / padded if padded else 0.0
+        }
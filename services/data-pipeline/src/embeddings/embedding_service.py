@@ -4,40 +4,62 @@ Enhanced Embedding Service
 Optimized embedding generation with intelligent batching and caching
 """
 
-from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Any, Optional
-import hashlib
+import numpy as np
 import logging
 import re
 import time
 
+from .batch_scheduler import EmbeddingBatchScheduler
+from .embedding_store import PersistentEmbeddingStore
+from .model_registry import get_sentence_transformer
+
 logger = logging.getLogger(__name__)
 
 class EmbeddingService:
     """Enhanced embedding service with batching and caching"""
     
-    def __init__(self, model_name: str = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2', max_batch_tokens: int = 4096):
+    def __init__(self, model_name: str = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2', max_batch_tokens: int = 4096,
+                 cache_path: Optional[str] = "./data/embedding_cache/embeddings.sqlite3",
+                 memory_cache_size: int = 10000,
+                 max_batch_size: int = 256):
         """
         Initialize the embedding service.
         Args:
             model_name (str): The name of the embedding model. Default is multilingual model supporting 50+ languages.
-            max_batch_tokens (int): Maximum tokens per batch for efficient processing.
+            max_batch_tokens (int): Maximum padded tokens per batch (texts x longest text, estimated from length).
+            cache_path (str): SQLite file for the persistent embedding cache (None keeps it in memory only).
+            memory_cache_size (int): Max embeddings kept in the in-memory LRU tier.
+            max_batch_size (int): Max texts per model.encode call.
         """
-        self.model = SentenceTransformer(model_name)
+        # Shared with every other service using the same model in this process
+        self.model = get_sentence_transformer(model_name)
         self.model_name = model_name
         self.max_batch_tokens = max_batch_tokens
-        self.cache = {}
+        self.embedding_dim = self.model.get_sentence_embedding_dimension() or len(self.model.encode(""))
+        self.scheduler = EmbeddingBatchScheduler(
+            max_batch_tokens=max_batch_tokens,
+            max_batch_size=max_batch_size,
+            max_seq_length=getattr(self.model, "max_seq_length", None)
+        )
+        # Read-through cache keyed by (model_name, content hash); survives restarts
+        self.cache = PersistentEmbeddingStore(model_name, db_path=cache_path, max_memory_entries=memory_cache_size)
         self.is_multilingual = 'multilingual' in model_name.lower()
         logger.info(f"Initialized EmbeddingService with model: {model_name} (Multilingual: {self.is_multilingual})")
 
     def generate_embedding(self, text: str) -> List[float]:
-        """Generate embedding for a single text with caching."""
+        """Generate embedding for a single text with caching (as a Python list)."""
+        return self.generate_embedding_array(text).tolist()
+
+    def generate_embedding_array(self, text: str) -> np.ndarray:
+        """Generate embedding for a single text with caching, as a 1-D float32 array."""
         start_time = time.time()
         status = "success"
         
         try:
-            cache_key = hashlib.md5(text.encode()).hexdigest()
-            if cache_key in self.cache:
+            cache_key = self.cache.content_hash(text)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
                 logger.debug(f"Cache hit for text: {text[:50]}...")
                 try:
                     from ..monitoring.metrics import get_metrics
@@ -45,10 +67,10 @@ class EmbeddingService:
                     metrics.record_embedding_cache_hit(self.model_name)
                 except Exception as e:
                     logger.warning(f"Failed to record cache hit metrics: {e}")
-                return self.cache[cache_key]
+                return cached
 
-            embedding = self.model.encode(text, convert_to_tensor=False).tolist()
-            self.cache[cache_key] = embedding
+            vector = np.asarray(self.model.encode(text, convert_to_numpy=True), dtype=np.float32)
+            self.cache.put(cache_key, vector)
             logger.debug(f"Generated embedding for text: {text[:50]}...")
             
             # Record cache miss
@@ -59,7 +81,7 @@ class EmbeddingService:
             except Exception as e:
                 logger.warning(f"Failed to record cache miss metrics: {e}")
                 
-            return embedding
+            return vector
         except Exception as e:
             status = "error"
             logger.error(f"Failed to generate embedding: {e}")
@@ -75,7 +97,18 @@ class EmbeddingService:
                 logger.warning(f"Failed to record embedding metrics: {e}")
 
     def batch_generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings in batches based on total token count."""
+        """Generate embeddings in scheduled batches (as Python lists)."""
+        return self.batch_generate_embedding_matrix(texts).tolist()
+
+    def batch_generate_embedding_matrix(self, texts: List[str]) -> np.ndarray:
+        """
+        Generate embeddings in batches planned by the EmbeddingBatchScheduler.
+        Identical texts are embedded once, uncached texts are batched by estimated
+        length under the token budget, and results are scattered back into input order.
+        Returns:
+            np.ndarray: Contiguous float32 matrix of shape (len(texts), embedding_dim);
+                row i is the embedding of texts[i].
+        """
         start_time = time.time()
         status = "success"
         
@@ -89,57 +122,32 @@ class EmbeddingService:
                 metrics.record_embedding_batch(self.model_name, len(texts))
             except Exception as e:
                 logger.warning(f"Failed to record batch size metrics: {e}")
-            
-            # Get tokenizer from the model for accurate batching
-            tokenizer = self.model.tokenizer
-
-            all_embeddings = []
-            current_batch = []
-            current_batch_tokens = 0
-            batch_count = 0
-
-            for i, text in enumerate(texts):
-                # Check cache first
-                cache_key = hashlib.md5(text.encode()).hexdigest()
-                if cache_key in self.cache:
-                    all_embeddings.append(self.cache[cache_key])
-                    continue
-
-                # Estimate token count (this is faster than encoding for batching purposes)
-                token_count = len(tokenizer.encode(text, truncation=False))
-
-                if current_batch and (current_batch_tokens + token_count > self.max_batch_tokens):
-                    # Process current batch
-                    batch_count += 1
-                    logger.debug(f"Processing batch {batch_count} with {len(current_batch)} texts")
-                    
-                    embeddings = self.model.encode(current_batch, convert_to_tensor=False)
-                    for j, emb in enumerate(embeddings):
-                        # Cache the embeddings
-                        cache_key = hashlib.md5(current_batch[j].encode()).hexdigest()
-                        self.cache[cache_key] = emb.tolist()
-                        all_embeddings.append(emb.tolist())
-                    
-                    current_batch = []
-                    current_batch_tokens = 0
-
-                current_batch.append(text)
-                current_batch_tokens += token_count
-
-            # Process final batch
-            if current_batch:
-                batch_count += 1
-                logger.debug(f"Processing final batch {batch_count} with {len(current_batch)} texts")
-                
-                embeddings = self.model.encode(current_batch, convert_to_tensor=False)
-                for j, emb in enumerate(embeddings):
-                    # Cache the embeddings
-                    cache_key = hashlib.md5(current_batch[j].encode()).hexdigest()
-                    self.cache[cache_key] = emb.tolist()
-                    all_embeddings.append(emb.tolist())
-
-            logger.info(f"Generated {len(all_embeddings)} embeddings in {batch_count} batches")
-            return all_embeddings
+
+            unique_texts, inverse = self.scheduler.dedupe(texts)
+            self.scheduler.record_request(len(texts), len(unique_texts))
+            unique_matrix = np.empty((len(unique_texts), self.embedding_dim), dtype=np.float32)
+
+            # Read through the persistent store for the whole request at once
+            cache_keys = [self.cache.content_hash(text) for text in unique_texts]
+            cached = self.cache.get_many(cache_keys)
+            missing = []
+            for i, key in enumerate(cache_keys):
+                if key in cached:
+                    unique_matrix[i] = cached[key]
+                else:
+                    missing.append(i)
+            self._record_cache_counts(hits=len(unique_texts) - len(missing), misses=len(missing))
+
+            batches = self.scheduler.schedule(unique_texts, missing)
+            for batch_count, rows in enumerate(batches, 1):
+                logger.debug(f"Processing batch {batch_count}/{len(batches)} with {len(rows)} texts")
+                self._encode_rows(unique_matrix, rows, unique_texts, cache_keys)
+
+            logger.info(f"Generated {len(texts)} embeddings ({len(unique_texts)} unique, "
+                       f"{len(missing)} computed) in {len(batches)} batches")
+            if len(unique_texts) == len(texts):
+                return unique_matrix
+            return unique_matrix[inverse]
         except Exception as e:
             status = "error"
             logger.error(f"Failed to generate batch embeddings: {e}")
@@ -154,18 +162,42 @@ class EmbeddingService:
             except Exception as e:
                 logger.warning(f"Failed to record batch embedding metrics: {e}")
 
+    def _encode_rows(self, matrix: np.ndarray, rows: List[int], texts: List[str], cache_keys: List[str]):
+        """Encode texts[rows] in one model call, write them into matrix and cache them."""
+        matrix[rows] = self.model.encode([texts[i] for i in rows], batch_size=len(rows), convert_to_numpy=True)
+        self.cache.put_many((cache_keys[i], matrix[i]) for i in rows)
+
+    def _record_cache_counts(self, hits: int, misses: int):
+        """Record aggregate cache hits/misses for a batch request."""
+        try:
+            from ..monitoring.metrics import get_metrics
+            metrics = get_metrics()
+            if hits:
+                metrics.record_embedding_cache_hit(self.model_name, hits)
+            if misses:
+                metrics.record_embedding_cache_miss(self.model_name, misses)
+        except Exception as e:
+            logger.warning(f"Failed to record cache metrics: {e}")
+
     def get_cache_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
+        store_stats = self.cache.get_stats()
         return {
-            "cache_size": len(self.cache),
+            "cache_size": store_stats["disk_entries"] or store_stats["memory_entries"],
             "model_name": self.model_name,
-            "max_batch_tokens": self.max_batch_tokens
+            "max_batch_tokens": self.max_batch_tokens,
+            "store": store_stats,
+            "scheduler": self.scheduler.get_stats()
         }
 
-    def clear_cache(self):
-        """Clear the embedding cache."""
-        self.cache.clear()
-        logger.info("Embedding cache cleared")
+    def clear_cache(self, persistent: bool = True):
+        """
+        Clear the embedding cache.
+        Args:
+            persistent (bool): Also drop this model's vectors from the on-disk store.
+        """
+        self.cache.clear(persistent=persistent)
+        logger.info(f"Embedding cache cleared (persistent: {persistent})")
 
     def detect_language(self, text: str) -> str:
         """
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Persistent Embedding Store
+Two-tier embedding cache: bounded in-memory LRU over a SQLite file of float32 blobs keyed by (model, content hash)
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# SQLite caps the number of bound parameters per statement
+_SQLITE_BATCH = 500
+
+
+class PersistentEmbeddingStore:
+    """
+    Embedding cache that survives restarts.
+
+    Vectors are stored as float32 blobs in SQLite keyed by (model_name, content_hash),
+    so switching models never returns a vector from another embedding space.
+    Recently used vectors are kept in an in-memory LRU tier capped at
+    ``max_memory_entries``; the on-disk tier is unbounded.
+    """
+
+    def __init__(self,
+                 model_name: str,
+                 db_path: Optional[str] = "./data/embedding_cache/embeddings.sqlite3",
+                 max_memory_entries: int = 10000):
+        """
+        Initialize the store.
+
+        Args:
+            model_name: Embedding model the vectors belong to
+            db_path: SQLite file for the persistent tier (None for memory only)
+            max_memory_entries: Max vectors held in the in-memory LRU tier
+        """
+        self.model_name = model_name
+        self.db_path = db_path
+        self.max_memory_entries = max(0, max_memory_entries)
+
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0,
+            "evictions": 0
+        }
+
+        if db_path:
+            self._open(db_path)
+
+        logger.info(f"Initialized PersistentEmbeddingStore for {model_name} "
+                   f"(db: {db_path or 'memory only'}, memory tier: {self.max_memory_entries} entries)")
+
+    def _open(self, db_path: str):
+        """Open (and create if needed) the SQLite database."""
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model_name TEXT NOT NULL,
+                content_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model_name, content_hash)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """Stable key for a text (SHA-256 of its UTF-8 bytes)."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _freeze(vector: Any) -> np.ndarray:
+        """Store vectors as read-only float32 so shared cache entries cannot be mutated."""
+        array = np.ascontiguousarray(vector, dtype=np.float32)
+        if array is vector:
+            array = array.copy()
+        array.flags.writeable = False
+        return array
+
+    def _remember(self, key: str, vector: np.ndarray):
+        """Insert into the LRU tier, evicting the least recently used entries."""
+        if self.max_memory_entries == 0:
+            return
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Get a single vector by content hash, or None."""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Look up many content hashes at once.
+
+        Args:
+            keys: Content hashes
+
+        Returns:
+            Dict of content hash -> vector for the keys that were found
+        """
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            missing: List[str] = []
+            for key in dict.fromkeys(keys):
+                vector = self._memory.get(key)
+                if vector is not None:
+                    self._memory.move_to_end(key)
+                    found[key] = vector
+                else:
+                    missing.append(key)
+            memory_hits = len(found)
+
+            if missing and self._conn is not None:
+                for i in range(0, len(missing), _SQLITE_BATCH):
+                    batch = missing[i:i + _SQLITE_BATCH]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = self._conn.execute(
+                        f"SELECT content_hash, vector FROM embeddings "
+                        f"WHERE model_name = ? AND content_hash IN ({placeholders})",
+                        [self.model_name, *batch]
+                    ).fetchall()
+                    for key, blob in rows:
+                        vector = np.frombuffer(blob, dtype=np.float32)
+                        found[key] = vector
+                        self._remember(key, vector)
+
+            disk_hits = len(found) - memory_hits
+            misses = len(missing) - disk_hits
+            self.stats["memory_hits"] += memory_hits
+            self.stats["disk_hits"] += disk_hits
+            self.stats["misses"] += misses
+
+        self._record_metrics(memory_hits, disk_hits, misses)
+        return found
+
+    def put(self, key: str, vector: Any):
+        """Store a single vector."""
+        self.put_many([(key, vector)])
+
+    def put_many(self, items: Iterable[Tuple[str, Any]]):
+        """
+        Store many vectors in one transaction.
+
+        Args:
+            items: (content hash, vector) pairs
+        """
+        now = time.time()
+        rows = []
+        with self._lock:
+            for key, vector in items:
+                array = self._freeze(vector)
+                self._remember(key, array)
+                rows.append((self.model_name, key, array.shape[-1], array.tobytes(), now))
+
+            if rows and self._conn is not None:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model_name, content_hash, dim, vector, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    rows
+                )
+                self._conn.commit()
+            self.stats["writes"] += len(rows)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            if key in self._memory:
+                return True
+            if self._conn is None:
+                return False
+            row = self._conn.execute(
+                "SELECT 1 FROM embeddings WHERE model_name = ? AND content_hash = ?",
+                (self.model_name, key)
+            ).fetchone()
+            return row is not None
+
+    def __len__(self) -> int:
+        return self.disk_entries() if self._conn is not None else len(self._memory)
+
+    def disk_entries(self) -> int:
+        """Number of vectors persisted for this model."""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM embeddings WHERE model_name = ?", (self.model_name,)
+            ).fetchone()[0]
+
+    def clear(self, persistent: bool = True):
+        """
+        Clear the in-memory tier and, optionally, this model's persisted vectors.
+
+        Args:
+            persistent: Also delete this model's rows from SQLite
+        """
+        with self._lock:
+            self._memory.clear()
+            if persistent and self._conn is not None:
+                self._conn.execute("DELETE FROM embeddings WHERE model_name = ?", (self.model_name,))
+                self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and tier sizes."""
+        lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        return {
+            **self.stats,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "max_memory_entries": self.max_memory_entries,
+            "disk_entries": self.disk_entries(),
+            "db_path": self.db_path
+        }
+
+    def _record_metrics(self, memory_hits: int, disk_hits: int, misses: int):
+        """Forward hit/miss counts to DataPipelineMetrics."""
+        if not (memory_hits or disk_hits or misses):
+            return
+        try:
+            from ..monitoring.metrics import get_metrics
+            metrics = get_metrics()
+            if memory_hits:
+                metrics.record_embedding_store_hit(self.model_name, "memory", memory_hits)
+            if disk_hits:
+                metrics.record_embedding_store_hit(self.model_name, "disk", disk_hits)
+            if misses:
+                metrics.record_embedding_store_miss(self.model_name, misses)
+            metrics.update_embedding_store_size(self.model_name, "memory", len(self._memory))
+        except Exception as e:
+            logger.warning(f"Failed to record embedding store metrics: {e}")
+
+    def close(self):
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Embedding Model Registry
+Process-wide SentenceTransformer instances shared by EmbeddingService and ChromaService
+"""
+
+import logging
+import threading
+import time
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+logger = logging.getLogger(__name__)
+
+# Loaded models keyed by (canonical model name, device)
+_models: Dict[tuple, SentenceTransformer] = {}
+_load_times: Dict[tuple, float] = {}
+_models_lock = threading.Lock()
+
+
+def canonical_model_name(model_name: str) -> str:
+    """Map short names ("all-MiniLM-L6-v2") to their hub id so aliases share one instance."""
+    if "/" in model_name:
+        return model_name
+    return f"sentence-transformers/{model_name}"
+
+
+def get_sentence_transformer(model_name: str, device: Optional[str] = None) -> SentenceTransformer:
+    """
+    Get the process-wide SentenceTransformer for a model, loading it on first use.
+
+    Args:
+        model_name: Model name, with or without the sentence-transformers/ prefix
+        device: Optional torch device (default: SentenceTransformer's choice)
+
+    Returns:
+        Shared SentenceTransformer
+    """
+    key = (canonical_model_name(model_name), device)
+    with _models_lock:
+        model = _models.get(key)
+        if model is None:
+            logger.info(f"Loading embedding model {key[0]}...")
+            start_time = time.time()
+            model = SentenceTransformer(key[0], device=device)
+            _models[key] = model
+            _load_times[key] = time.time() - start_time
+            logger.info(f"Loaded embedding model {key[0]} in {_load_times[key]:.2f}s")
+        return model
+
+
+def get_loaded_models() -> List[Dict[str, Any]]:
+    """List the models held by the registry with their load times."""
+    with _models_lock:
+        return [{"model_name": name, "device": device, "load_time": _load_times.get((name, device), 0.0)}
+                for name, device in _models]
+
+
+def clear_model_registry():
+    """Drop all shared models (instances still referenced elsewhere stay alive)."""
+    with _models_lock:
+        _models.clear()
+        _load_times.clear()
+
+
+class SharedSentenceTransformerEmbeddingFunction:
+    """
+    Chroma embedding function backed by the registry model, so a collection that
+    embeds query_texts does not load its own copy of the model.
+    """
+
+    def __init__(self, model_name: str, device: Optional[str] = None, normalize_embeddings: bool = False):
+        self.model_name = canonical_model_name(model_name)
+        self.device = device
+        self.normalize_embeddings = normalize_embeddings
+
+    def __call__(self, input: List[str]) -> List[List[float]]:
+        model = get_sentence_transformer(self.model_name, self.device)
+        embeddings = model.encode(list(input), convert_to_numpy=True,
+                                  normalize_embeddings=self.normalize_embeddings)
+        return np.asarray(embeddings, dtype=np.float32).tolist()
@@ -12,54 +12,47 @@ from typing import List, Dict, Any, Optional
 import frontmatter
 import logging
 
+from .vault_manifest import content_hash
+from .vault_scanner import VaultScanner
+
 logger = logging.getLogger(__name__)
 
 class FilesystemVaultClient:
     """Enhanced filesystem client for Obsidian vault access"""
     
-    def __init__(self, vault_path: str):
+    def __init__(self, vault_path: str, scanner: Optional[VaultScanner] = None):
         """
         Initialize the client with the path to the Obsidian vault.
         Args:
             vault_path (str): The absolute path to the root of the Obsidian vault (e.g., "D:\\Nomade Milionario").
+            scanner (Optional[VaultScanner]): Directory walker (one with persisted directory mtimes enables pruned listings).
         """
         self.vault_root = Path(vault_path)
         if not self.vault_root.exists():
             raise FileNotFoundError(f"Vault path does not exist: {vault_path}")
         if not self.vault_root.is_dir():
             raise NotADirectoryError(f"Vault path is not a directory: {vault_path}")
+        self.scanner = scanner or VaultScanner(vault_path)
         
         logger.info(f"Initialized FilesystemVaultClient for vault: {self.vault_root}")
 
-    async def list_vault_files(self) -> List[Dict[str, Any]]:
+    async def list_vault_files(self, prune: bool = False) -> List[Dict[str, Any]]:
         """
         Asynchronously list all markdown files in the vault.
+        Args:
+            prune (bool): Reuse listings of directories whose mtime is unchanged (see VaultScanner.scan);
+                in-place edits in those directories are not seen.
         Returns:
             List[Dict[str, Any]]: A list of file info dictionaries.
         """
-        # For true async file I/O on Windows, we use asyncio.to_thread for CPU-bound path operations.
-        files = await asyncio.to_thread(self._sync_list_files)
+        # The scanner lists directories on its own thread pool; keep the event loop free while it runs.
+        files = await asyncio.to_thread(self._sync_list_files, prune)
         logger.info(f"Found {len(files)} markdown files in vault.")
         return files
 
-    def _sync_list_files(self) -> List[Dict[str, Any]]:
-        """Synchronous helper for listing files."""
-        files = []
-        for file_path in self.vault_root.rglob("*.md"):
-            try:
-                stat = file_path.stat()
-                relative_path = file_path.relative_to(self.vault_root).as_posix()  # Use forward slashes for consistency
-                files.append({
-                    "path": relative_path,
-                    "name": file_path.name,
-                    "size": stat.st_size,
-                    "modified": stat.st_mtime,  # Unix timestamp
-                    "created": stat.st_ctime,   # Unix timestamp (on Windows, this is creation time)
-                })
-            except (OSError, PermissionError) as e:
-                logger.error(f"Error accessing file {file_path}: {e}")
-                continue  # Skip problematic files
-        return files
+    def _sync_list_files(self, prune: bool = False) -> List[Dict[str, Any]]:
+        """Synchronous helper for listing files (paths use forward slashes)."""
+        return self.scanner.scan_all(prune)
 
     async def get_file_content(self, relative_path: str) -> Dict[str, Any]:
         """
@@ -85,8 +78,26 @@ class FilesystemVaultClient:
             "path": relative_path,
             "name": full_path.name,
             "content": cleaned_content,  # Use cleaned content (without frontmatter)
-            "metadata": metadata  # All extracted metadata goes here
+            "metadata": metadata,  # All extracted metadata goes here
+            "content_hash": content_hash(content)  # Raw text, frontmatter included (vault manifest)
+        }
+
+    def path_metadata(self, relative_path: str) -> Dict[str, Any]:
+        """
+        Metadata derived from a file's location alone (the file is not read).
+        Args:
+            relative_path (str): The file's path relative to the vault root.
+        Returns:
+            Dict[str, Any]: file_name, file_extension, directory_path and the path_* / type fields.
+        """
+        file_path = self.vault_root / relative_path
+        metadata = {
+            "file_name": file_path.name,
+            "file_extension": file_path.suffix.lower().lstrip('.') if file_path.suffix else "",
+            "directory_path": file_path.parent.relative_to(self.vault_root).as_posix() if file_path.parent != self.vault_root else ""
         }
+        self._extract_path_patterns(file_path, metadata)
+        return metadata
 
     def _sync_read_file(self, full_path: Path) -> tuple[str, os.stat_result]:
         """Synchronous helper for reading a file."""
@@ -243,8 +254,8 @@ class FilesystemVaultClient:
         return valid_results
 
     def get_vault_stats(self) -> Dict[str, Any]:
-        """Get comprehensive vault statistics."""
-        files = self._sync_list_files()
+        """Get comprehensive vault statistics (repeat calls only re-list directories whose mtime moved)."""
+        files = self._sync_list_files(prune=True)
         total_size = sum(f["size"] for f in files)
         
         return {
@@ -6,25 +6,59 @@ High-performance ingestion with configurable batch processing and ChromaDB optim
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Callable, Awaitable
 from pathlib import Path
 import time
 
 # Import our services
 from .filesystem_client import FilesystemVaultClient
+from .vault_manifest import VaultManifest, ManifestEntry
 from ..processing.hybrid_content_processor import HybridContentProcessor
+from ..processing.parallel_chunker import ParallelChunkingBackend
 from ..embeddings.embedding_service import EmbeddingService
-from ..vector.chroma_service import ChromaService
+from ..vector.chroma_service import ChromaService, content_chunk_ids
 
 logger = logging.getLogger(__name__)
 
+# Sentinel pushed through the stage queues to signal end of input
+_STAGE_DONE = object()
+
+
+@dataclass
+class PipelineStageStats:
+    """Throughput counters for a single pipeline stage"""
+    name: str
+    workers: int
+    items_in: int = 0
+    items_out: int = 0
+    errors: int = 0
+    busy_time: float = 0.0
+    max_queue_depth: int = 0
+
+    def to_dict(self, wall_time: float) -> Dict[str, Any]:
+        """Summarize the stage relative to the wall-clock time of the run."""
+        capacity = wall_time * self.workers
+        return {
+            "workers": self.workers,
+            "items_in": self.items_in,
+            "items_out": self.items_out,
+            "errors": self.errors,
+            "busy_time": self.busy_time,
+            "throughput_per_second": self.items_out / wall_time if wall_time > 0 else 0,
+            "utilization": self.busy_time / capacity if capacity > 0 else 0,
+            "max_queue_depth": self.max_queue_depth
+        }
+
+
 class IngestionPipeline:
     """
     Optimized ingestion pipeline with asynchronous batch processing.
     
     Key Features:
     - Configurable batch_size for optimal GPU/CPU utilization
-    - Sequential batch processing to prevent memory overflow
+    - Overlapped read/chunk/embed/store stages with per-stage concurrency
+    - Bounded queues between stages for backpressure and constant memory
     - Enhanced error handling per batch
     - ChromaDB optimization with HNSW parameters
     - Metadata indexing optimization
@@ -35,7 +69,15 @@ class IngestionPipeline:
                  content_processor: HybridContentProcessor,
                  embedding_service: EmbeddingService,
                  chroma_service: ChromaService,
-                 batch_size: int = 50):
+                 batch_size: int = 50,
+                 read_concurrency: int = 8,
+                 chunk_concurrency: Optional[int] = None,
+                 embed_concurrency: int = 1,
+                 store_concurrency: int = 1,
+                 queue_size: int = 16,
+                 max_failed_batches: int = 5,
+                 chunking_backend: Optional[ParallelChunkingBackend] = None,
+                 manifest: Optional[VaultManifest] = None):
         """
         Initialize the optimized ingestion pipeline.
         
@@ -45,156 +87,94 @@ class IngestionPipeline:
             embedding_service: EmbeddingService instance
             chroma_service: ChromaService instance
             batch_size: Number of chunks per batch (default: 50)
+            read_concurrency: Concurrent file readers (default: 8)
+            chunk_concurrency: Concurrent chunking workers (default: 1 in-thread, since
+                HF fast tokenizers are not safe to share between threads, or one per
+                process when a chunking_backend is given)
+            embed_concurrency: Concurrent embedding workers (default: 1)
+            store_concurrency: Concurrent ChromaDB writers (default: 1)
+            queue_size: Max items buffered between two stages (default: 16)
+            max_failed_batches: Abort the run after this many failed batches (default: 5)
+            chunking_backend: Optional ParallelChunkingBackend to chunk in worker processes
+            manifest: Optional VaultManifest; each file is recorded once all its chunks are stored
         """
+        if chunking_backend is not None and not chunking_backend.matches(content_processor):
+            # Both chunk the same notes; differing chunks would re-key (and re-embed) them on every switch
+            raise ValueError(f"chunking_backend workers run {chunking_backend.processor_class.__name__} with "
+                             f"{chunking_backend.processor_config}, which does not match content_processor "
+                             f"({type(content_processor).__name__}); build it with "
+                             f"ParallelChunkingBackend.for_processor(content_processor)")
         self.filesystem_client = filesystem_client
         self.content_processor = content_processor
         self.embedding_service = embedding_service
         self.chroma_service = chroma_service
         self.batch_size = batch_size
+        self.read_concurrency = max(1, read_concurrency)
+        self.chunking_backend = chunking_backend
+        if chunk_concurrency is None:
+            chunk_concurrency = chunking_backend.max_workers if chunking_backend else 1
+        self.chunk_concurrency = max(1, chunk_concurrency)
+        self.embed_concurrency = max(1, embed_concurrency)
+        self.store_concurrency = max(1, store_concurrency)
+        self.queue_size = max(1, queue_size)
+        self.max_failed_batches = max_failed_batches
+        self.manifest = manifest
         
-        logger.info(f"Initialized IngestionPipeline with batch_size: {batch_size}")
+        logger.info(f"Initialized IngestionPipeline with batch_size: {batch_size}, queue_size: {self.queue_size}")
 
     async def ingest_all_files(self) -> Dict[str, Any]:
         """
-        Optimized ingestion with asynchronous batch processing.
+        Optimized ingestion with a staged, overlapped pipeline.
         
         Process Flow:
-        1. Gather all chunks from all files
-        2. Process chunks in configurable batches
-        3. Generate embeddings per batch
-        4. Store embeddings per batch
-        5. Return comprehensive statistics
+        1. Discover all markdown files (stat only)
+        2. Stream files through read -> chunk -> embed -> store stages
+        3. Stages are connected by bounded queues, so they overlap and a slow
+           stage applies backpressure instead of buffering the whole vault
+        4. Return comprehensive statistics including per-stage throughput
         """
         start_time = time.time()
-        logger.info("🚀 Starting optimized batch ingestion process")
+        logger.info("🚀 Starting pipelined ingestion process")
         
         # Step 1: Gather all files
         logger.info("Step 1: Discovering vault files")
         files = await self.filesystem_client.list_vault_files()
         logger.info(f"Discovered {len(files)} files in vault")
         
-        # Step 2: Gather all chunks with enriched metadata
-        logger.info("Step 2: Processing files into chunks")
-        all_chunks = []
-        all_file_metadata = {}
-        processed_files = 0
-        skipped_files = 0
+        # Step 2: Stream files through the staged pipeline
+        logger.info(f"Step 2: Streaming files through pipeline "
+                   f"(read={self.read_concurrency}, chunk={self.chunk_concurrency}, "
+                   f"embed={self.embed_concurrency}, store={self.store_concurrency}, "
+                   f"queue_size={self.queue_size})")
+        file_paths = [file_info['path'] for file_info in files if file_info['path'].endswith('.md')]
+        run = await self._run_pipeline(file_paths)
         
-        for file_info in files:
-            if file_info.get('type') == 'file' and file_info['path'].endswith('.md'):
-                try:
-                    # Get file content with enhanced metadata
-                    file_data = await self.filesystem_client.get_file_content(file_info['path'])
-                    
-                    # Process into chunks using hybrid processor
-                    chunks = self.content_processor.chunk_content(
-                        content=file_data['content'],
-                        file_metadata=file_data,
-                        path=file_info['path']
-                    )
-                    
-                    # Attach file-level metadata to each chunk
-                    for chunk in chunks:
-                        chunk['file_metadata'] = {
-                            'tags': file_data.get('tags', []),
-                            'frontmatter': file_data.get('frontmatter', {}),
-                            'modified': file_data.get('file_modified'),
-                            'created': file_data.get('file_created'),
-                            'size': file_data.get('file_size'),
-                            'word_count': file_data.get('file_word_count'),
-                            'char_count': file_data.get('file_char_count'),
-                            # Enhanced metadata
-                            'path_year': file_data.get('path_year'),
-                            'path_month': file_data.get('path_month'),
-                            'path_day': file_data.get('path_day'),
-                            'path_category': file_data.get('path_category'),
-                            'path_subcategory': file_data.get('path_subcategory'),
-                            'file_type': file_data.get('file_type'),
-                            'content_type': file_data.get('content_type'),
-                            'content_tags': file_data.get('content_tags', []),
-                            'links': file_data.get('links', [])
-                        }
-                    
-                    all_chunks.extend(chunks)
-                    all_file_metadata[file_info['path']] = file_data
-                    processed_files += 1
-                    
-                    if processed_files % 100 == 0:
-                        logger.info(f"Processed {processed_files} files, {len(all_chunks)} chunks so far")
-                        
-                except Exception as e:
-                    logger.error(f"Skipping file {file_info['path']} due to error: {e}")
-                    skipped_files += 1
-        
-        logger.info(f"Chunk processing complete: {processed_files} files processed, {skipped_files} skipped")
-        logger.info(f"Total chunks created: {len(all_chunks)}")
-        
-        # Step 3: Process chunks in optimized batches
-        logger.info(f"Step 3: Processing {len(all_chunks)} chunks in batches of {self.batch_size}")
-        
-        total_batches = (len(all_chunks) + self.batch_size - 1) // self.batch_size
-        successful_batches = 0
-        failed_batches = 0
-        total_embeddings_stored = 0
-        
-        for i in range(0, len(all_chunks), self.batch_size):
-            batch_number = i // self.batch_size + 1
-            batch_chunks = all_chunks[i:i + self.batch_size]
-            batch_texts = [chunk['content'] for chunk in batch_chunks]
-            
-            logger.info(f"Processing batch {batch_number}/{total_batches} ({len(batch_chunks)} chunks)")
-            
-            try:
-                # Generate embeddings for this batch
-                batch_start_time = time.time()
-                batch_embeddings = self.embedding_service.batch_generate_embeddings(batch_texts)
-                embedding_time = time.time() - batch_start_time
-                
-                # Store embeddings for this batch
-                storage_start_time = time.time()
-                self.chroma_service.store_embeddings(batch_chunks, batch_embeddings)
-                storage_time = time.time() - storage_start_time
-                
-                total_embeddings_stored += len(batch_embeddings)
-                successful_batches += 1
-                
-                logger.info(f"✅ Batch {batch_number} completed: {len(batch_chunks)} chunks, "
-                          f"{embedding_time:.2f}s embedding, {storage_time:.2f}s storage")
-                
-                # Optional: Small delay to prevent overwhelming the system
-                if batch_number % 10 == 0:
-                    await asyncio.sleep(0.1)
-                    
-            except Exception as e:
-                logger.error(f"❌ Failed to process batch {batch_number} starting at index {i}: {e}")
-                failed_batches += 1
-                
-                # Optionally continue with next batch or halt
-                if failed_batches > 5:  # Stop if too many consecutive failures
-                    logger.error("Too many batch failures, stopping ingestion")
-                    break
-        
-        # Step 4: Calculate final statistics
+        # Step 3: Calculate final statistics
         total_time = time.time() - start_time
+        total_chunks = run["chunks_created"]
+        total_embeddings_stored = run["embeddings_stored"]
+        total_batches = run["total_batches"]
         
         stats = {
             "ingestion_summary": {
                 "total_files_discovered": len(files),
-                "files_processed": processed_files,
-                "files_skipped": skipped_files,
-                "total_chunks_created": len(all_chunks),
+                "files_processed": run["files_processed"],
+                "files_skipped": run["files_skipped"],
+                "total_chunks_created": total_chunks,
                 "total_embeddings_stored": total_embeddings_stored,
                 "total_batches": total_batches,
-                "successful_batches": successful_batches,
-                "failed_batches": failed_batches,
-                "batch_size": self.batch_size
+                "successful_batches": run["successful_batches"],
+                "failed_batches": run["failed_batches"],
+                "batch_size": self.batch_size,
+                "aborted": run["aborted"]
             },
             "performance_metrics": {
                 "total_ingestion_time": total_time,
-                "chunks_per_second": len(all_chunks) / total_time if total_time > 0 else 0,
+                "chunks_per_second": total_chunks / total_time if total_time > 0 else 0,
                 "embeddings_per_second": total_embeddings_stored / total_time if total_time > 0 else 0,
                 "average_batch_time": total_time / total_batches if total_batches > 0 else 0
             },
+            "stage_metrics": run["stage_metrics"],
             "system_stats": {
                 "embedding_cache_stats": self.embedding_service.get_cache_stats(),
                 "chroma_stats": self.chroma_service.get_collection_stats(),
@@ -205,6 +185,11 @@ class IngestionPipeline:
         logger.info(f"🎉 Ingestion complete in {total_time:.2f}s: {total_embeddings_stored} embeddings stored")
         logger.info(f"Performance: {stats['performance_metrics']['chunks_per_second']:.1f} chunks/sec, "
                    f"{stats['performance_metrics']['embeddings_per_second']:.1f} embeddings/sec")
+        for stage_name, stage_stats in run["stage_metrics"].items():
+            logger.info(f"  Stage {stage_name}: {stage_stats['items_out']} items out, "
+                       f"{stage_stats['throughput_per_second']:.1f}/s, "
+                       f"utilization {stage_stats['utilization']:.0%}, "
+                       f"max queue depth {stage_stats['max_queue_depth']}")
         
         return stats
 
@@ -220,54 +205,269 @@ class IngestionPipeline:
         """
         logger.info(f"Processing batch of {len(file_paths)} files")
         
-        all_chunks = []
-        processed_files = 0
+        run = await self._run_pipeline(file_paths)
+        
+        return {
+            "files_processed": run["files_processed"],
+            "chunks_created": run["chunks_created"],
+            "embeddings_stored": run["embeddings_stored"],
+            "stage_metrics": run["stage_metrics"]
+        }
+
+    async def _run_pipeline(self, file_paths: List[str]) -> Dict[str, Any]:
+        """
+        Run the read -> chunk -> embed -> store stages over the given files.
+        
+        Every stage pulls from a bounded asyncio.Queue and pushes into the next
+        one, so at most ``queue_size`` items are in flight between two stages.
+        Blocking work (file parsing, tokenization, model inference, Chroma
+        writes) runs in worker threads so the stages genuinely overlap.
+        
+        Args:
+            file_paths: Vault-relative paths of the files to ingest
+            
+        Returns:
+            Dict with run counters and per-stage metrics
+        """
+        run_start = time.perf_counter()
+        stages = {
+            "read": PipelineStageStats("read", self.read_concurrency),
+            "chunk": PipelineStageStats("chunk", self.chunk_concurrency),
+            "embed": PipelineStageStats("embed", self.embed_concurrency),
+            "store": PipelineStageStats("store", self.store_concurrency)
+        }
+        counters = {
+            "files_processed": 0,
+            "files_skipped": 0,
+            "chunks_created": 0,
+            "embeddings_stored": 0,
+            "total_batches": 0,
+            "successful_batches": 0,
+            "failed_batches": 0
+        }
+        abort = asyncio.Event()
+        # path -> manifest state of files whose chunks are not all stored yet
+        unstored_files: Dict[str, Dict[str, Any]] = {}
+        
+        read_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        embed_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        store_queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        
+        async def feed_paths():
+            for path in file_paths:
+                if abort.is_set():
+                    break
+                await self._put(read_queue, path, stages["read"])
+            for _ in range(self.read_concurrency):
+                await read_queue.put(_STAGE_DONE)
         
-        for file_path in file_paths:
+        async def read_file(path: str) -> List[Any]:
             try:
-                file_data = await self.filesystem_client.get_file_content(file_path)
-                chunks = self.content_processor.chunk_content(
-                    content=file_data['content'],
-                    file_metadata=file_data,
-                    path=file_path
-                )
-                
-                # Attach metadata
-                for chunk in chunks:
-                    chunk['file_metadata'] = file_data
-                
-                all_chunks.extend(chunks)
-                processed_files += 1
-                
+                return [await self.filesystem_client.get_file_content(path)]
             except Exception as e:
-                logger.error(f"Failed to process file {file_path}: {e}")
+                logger.error(f"Skipping file {path} due to error: {e}")
+                counters["files_skipped"] += 1
+                raise
         
-        # Process chunks in batches
-        total_embeddings_stored = 0
-        for i in range(0, len(all_chunks), self.batch_size):
-            batch_chunks = all_chunks[i:i + self.batch_size]
-            batch_texts = [chunk['content'] for chunk in batch_chunks]
+        async def chunk_file(file_data: Dict[str, Any]) -> List[Any]:
+            try:
+                if self.chunking_backend is not None:
+                    chunks = (await self.chunking_backend.achunk_files([file_data]))[0]
+                else:
+                    chunks = await asyncio.to_thread(
+                        self.content_processor.chunk_content,
+                        content=file_data['content'],
+                        file_metadata=file_data.get('metadata', {}),
+                        path=file_data['path']
+                    )
+            except Exception as e:
+                logger.error(f"Skipping file {file_data['path']} due to error: {e}")
+                counters["files_skipped"] += 1
+                raise
+            
+            counters["files_processed"] += 1
+            counters["chunks_created"] += len(chunks)
+            if self.manifest is not None:
+                metadata = file_data.get('metadata', {})
+                state = {"size": metadata.get('file_size', 0), "mtime": metadata.get('file_modified', 0),
+                         "content_hash": file_data.get('content_hash'), "remaining": len(chunks), "chunk_ids": []}
+                if chunks:
+                    unstored_files[file_data['path']] = state
+                else:
+                    self.manifest.record(file_data['path'], state["size"], state["mtime"], state["content_hash"], [])
+            if counters["files_processed"] % 100 == 0:
+                logger.info(f"Processed {counters['files_processed']} files, "
+                           f"{counters['chunks_created']} chunks so far")
+            # Ids are numbered over the whole note, since its chunks may be split across batches
+            return [(chunks, content_chunk_ids(chunks))] if chunks else []
+        
+        async def embed_worker():
+            stats = stages["embed"]
+            pending: List[Dict[str, Any]] = []
+            pending_ids: List[str] = []
             
+            async def flush(batch_chunks: List[Dict[str, Any]], batch_ids: List[str]):
+                counters["total_batches"] += 1
+                batch_start = time.perf_counter()
+                try:
+                    batch_texts = [chunk['content'] for chunk in batch_chunks]
+                    batch_embeddings = await asyncio.to_thread(
+                        self.embedding_service.batch_generate_embedding_matrix, batch_texts
+                    )
+                except Exception as e:
+                    stats.errors += 1
+                    self._record_failed_batch(counters, abort, f"embedding failed: {e}")
+                    return
+                finally:
+                    stats.busy_time += time.perf_counter() - batch_start
+                stats.items_out += 1
+                await self._put(store_queue, (batch_chunks, batch_ids, batch_embeddings), stages["store"])
+            
+            while True:
+                item = await embed_queue.get()
+                if item is _STAGE_DONE:
+                    break
+                stats.items_in += 1
+                if abort.is_set():
+                    continue
+                file_chunks, file_ids = item
+                pending.extend(file_chunks)
+                pending_ids.extend(file_ids)
+                while len(pending) >= self.batch_size:
+                    batch_chunks, pending = pending[:self.batch_size], pending[self.batch_size:]
+                    batch_ids, pending_ids = pending_ids[:self.batch_size], pending_ids[self.batch_size:]
+                    await flush(batch_chunks, batch_ids)
+            
+            if pending and not abort.is_set():
+                await flush(pending, pending_ids)
+        
+        async def store_batch(item) -> List[Any]:
+            batch_chunks, batch_ids, batch_embeddings = item
             try:
-                batch_embeddings = self.embedding_service.batch_generate_embeddings(batch_texts)
-                self.chroma_service.store_embeddings(batch_chunks, batch_embeddings)
-                total_embeddings_stored += len(batch_embeddings)
+                chunk_ids = await asyncio.to_thread(
+                    self.chroma_service.store_embeddings, batch_chunks, batch_embeddings, batch_ids
+                )
             except Exception as e:
-                logger.error(f"Failed to process batch: {e}")
+                self._record_failed_batch(counters, abort, f"storage failed: {e}")
+                raise
+            if self.manifest is not None:
+                # Files whose chunks failed to store stay out of the manifest and are retried as new
+                completed = []
+                for chunk, chunk_id in zip(batch_chunks, chunk_ids or []):
+                    state = unstored_files.get(chunk['path'])
+                    if state is None:
+                        continue
+                    state["chunk_ids"].append(chunk_id)
+                    state["remaining"] -= 1
+                    if state["remaining"] == 0:
+                        completed.append(ManifestEntry(chunk['path'], state["size"], state["mtime"],
+                                                       state["content_hash"], state["chunk_ids"]))
+                        del unstored_files[chunk['path']]
+                if completed:
+                    await asyncio.to_thread(self.manifest.record_many, completed)
+            counters["embeddings_stored"] += len(batch_embeddings)
+            counters["successful_batches"] += 1
+            if counters["successful_batches"] % 10 == 0:
+                logger.info(f"✅ {counters['successful_batches']} batches stored, "
+                           f"{counters['embeddings_stored']} embeddings so far")
+            return [batch_chunks]
         
-        return {
-            "files_processed": processed_files,
-            "chunks_created": len(all_chunks),
-            "embeddings_stored": total_embeddings_stored
-        }
+        async def run_embed_stage():
+            await asyncio.gather(*(embed_worker() for _ in range(self.embed_concurrency)))
+            for _ in range(self.store_concurrency):
+                await store_queue.put(_STAGE_DONE)
+        
+        await asyncio.gather(
+            feed_paths(),
+            self._run_stage(stages["read"], read_queue, read_file, abort,
+                            chunk_queue, stages["chunk"], self.chunk_concurrency),
+            self._run_stage(stages["chunk"], chunk_queue, chunk_file, abort,
+                            embed_queue, stages["embed"], self.embed_concurrency),
+            run_embed_stage(),
+            self._run_stage(stages["store"], store_queue, store_batch, abort)
+        )
+        
+        wall_time = time.perf_counter() - run_start
+        counters["aborted"] = abort.is_set()
+        counters["stage_metrics"] = {name: stage.to_dict(wall_time) for name, stage in stages.items()}
+        return counters
+
+    async def _run_stage(self,
+                         stats: "PipelineStageStats",
+                         in_queue: asyncio.Queue,
+                         handler: Callable[[Any], Awaitable[List[Any]]],
+                         abort: asyncio.Event,
+                         out_queue: Optional[asyncio.Queue] = None,
+                         out_stats: Optional["PipelineStageStats"] = None,
+                         downstream_workers: int = 0):
+        """
+        Run ``stats.workers`` consumers of ``in_queue`` and forward their outputs.
+        
+        Each worker exits on a sentinel; once all of them are done, one sentinel
+        per downstream worker is pushed so shutdown cascades through the stages.
+        After an abort the workers keep draining their input without doing work
+        so that upstream producers blocked on a full queue are released.
+        """
+        async def worker():
+            while True:
+                item = await in_queue.get()
+                if item is _STAGE_DONE:
+                    break
+                stats.items_in += 1
+                if abort.is_set():
+                    continue
+                
+                item_start = time.perf_counter()
+                try:
+                    outputs = await handler(item)
+                except Exception:
+                    stats.errors += 1
+                    continue
+                finally:
+                    stats.busy_time += time.perf_counter() - item_start
+                
+                for output in outputs:
+                    stats.items_out += 1
+                    if out_queue is not None:
+                        await self._put(out_queue, output, out_stats)
+        
+        await asyncio.gather(*(worker() for _ in range(stats.workers)))
+        
+        if out_queue is not None:
+            for _ in range(downstream_workers):
+                await out_queue.put(_STAGE_DONE)
+
+    @staticmethod
+    async def _put(queue: asyncio.Queue, item: Any, consumer_stats: Optional["PipelineStageStats"]):
+        """Put an item on a bounded queue, tracking how deep the consumer's backlog gets."""
+        await queue.put(item)
+        if consumer_stats is not None:
+            consumer_stats.max_queue_depth = max(consumer_stats.max_queue_depth, queue.qsize())
+
+    def _record_failed_batch(self, counters: Dict[str, Any], abort: asyncio.Event, reason: str):
+        """Count a failed batch and abort the run once too many batches failed."""
+        counters["failed_batches"] += 1
+        logger.error(f"❌ Failed to process batch: {reason}")
+        if counters["failed_batches"] > self.max_failed_batches and not abort.is_set():
+            logger.error("Too many batch failures, stopping ingestion")
+            abort.set()
 
     def get_pipeline_config(self) -> Dict[str, Any]:
         """Get current pipeline configuration."""
         return {
             "batch_size": self.batch_size,
+            "stage_concurrency": {
+                "read": self.read_concurrency,
+                "chunk": self.chunk_concurrency,
+                "embed": self.embed_concurrency,
+                "store": self.store_concurrency
+            },
+            "queue_size": self.queue_size,
             "embedding_model": self.embedding_service.model_name,
             "max_batch_tokens": self.embedding_service.max_batch_tokens,
             "content_processor_type": "HybridContentProcessor",
+            "chunking_backend": self.chunking_backend.get_stats() if self.chunking_backend else None,
             "chroma_collection": self.chroma_service.collection.name
         }
 
@@ -291,7 +491,7 @@ class IngestionPipeline:
             try:
                 start_time = time.time()
                 test_batch = test_chunks[:size]
-                self.embedding_service.batch_generate_embeddings(test_batch)
+                self.embedding_service.batch_generate_embedding_matrix(test_batch)
                 test_time = time.time() - start_time
                 
                 logger.info(f"Batch size {size}: {test_time:.2f}s for {len(test_batch)} chunks")
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Persistent Vault Manifest
+SQLite record of path -> size, mtime, content hash and chunk ids, diffed against a stat-only walk at startup
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    """Hash of a note's raw text (frontmatter included)."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+@dataclass
+class ManifestEntry:
+    """What the collection holds for one note"""
+    path: str
+    size: int
+    mtime: float
+    content_hash: Optional[str]  # None when seeded from the collection without reading the file
+    chunk_ids: List[str] = field(default_factory=list)
+    updated_at: float = 0.0
+
+
+@dataclass
+class ManifestDiff:
+    """Manifest compared with a directory walk"""
+    new: List[str] = field(default_factory=list)  # on disk, not in the manifest
+    deleted: List[str] = field(default_factory=list)  # in the manifest, gone from disk
+    changed: List[str] = field(default_factory=list)  # size or mtime differ; content may still match
+    unchanged: List[str] = field(default_factory=list)
+
+
+class VaultManifest:
+    """
+    Persistent index of what has been ingested, so startup does not re-read the vault.
+
+    Ingestion and incremental updates record each note's size, mtime, content
+    hash and chunk ids once its chunks are stored; a restart then needs only a
+    stat walk and opens just the files whose stat changed.
+    """
+
+    def __init__(self, db_path: Optional[str] = "./data/vault_manifest.sqlite3"):
+        """
+        Initialize the manifest.
+
+        Args:
+            db_path: SQLite file (None keeps the manifest in memory)
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime REAL NOT NULL,
+                content_hash TEXT,
+                chunk_ids TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+        self.stats = {"records": 0, "removals": 0, "touches": 0, "renames": 0}
+        logger.info(f"Initialized VaultManifest ({db_path or 'memory only'}, {len(self)} files)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    @staticmethod
+    def _entry(row: tuple) -> ManifestEntry:
+        path, size, mtime, hash_value, chunk_ids, updated_at = row
+        return ManifestEntry(path, size, mtime, hash_value, json.loads(chunk_ids), updated_at)
+
+    def get(self, path: str) -> Optional[ManifestEntry]:
+        """Entry for a path, or None if it was never recorded."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, size, mtime, content_hash, chunk_ids, updated_at FROM files WHERE path = ?", (path,)
+            ).fetchone()
+        return self._entry(row) if row else None
+
+    def entries(self) -> Dict[str, ManifestEntry]:
+        """All entries by path."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, size, mtime, content_hash, chunk_ids, updated_at FROM files"
+            ).fetchall()
+        return {row[0]: self._entry(row) for row in rows}
+
+    def record(self, path: str, size: int, mtime: float, hash_value: Optional[str], chunk_ids: List[str]):
+        """Record (or replace) a note's state once its chunks are stored."""
+        self.record_many([ManifestEntry(path, size, mtime, hash_value, list(chunk_ids))])
+
+    def record_many(self, entries: Iterable[ManifestEntry]):
+        """Record several notes in one transaction."""
+        now = time.time()
+        rows = [(e.path, int(e.size), float(e.mtime), e.content_hash, json.dumps(e.chunk_ids), now) for e in entries]
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, size, mtime, content_hash, chunk_ids, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)", rows
+            )
+            self._conn.commit()
+        self.stats["records"] += len(rows)
+
+    def touch(self, path: str, size: int, mtime: float):
+        """Update the stat of a note whose content was verified unchanged."""
+        with self._lock:
+            self._conn.execute("UPDATE files SET size = ?, mtime = ?, updated_at = ? WHERE path = ?",
+                               (int(size), float(mtime), time.time(), path))
+            self._conn.commit()
+        self.stats["touches"] += 1
+
+    def rename(self, old_path: str, new_path: str, chunk_ids: List[str]) -> bool:
+        """Move a note's entry to its new path (stat and hash carry over); False if old_path was not recorded."""
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM files WHERE path = ?", (old_path,)).fetchone() is None:
+                return False
+            self._conn.execute("DELETE FROM files WHERE path = ?", (new_path,))
+            self._conn.execute("UPDATE files SET path = ?, chunk_ids = ?, updated_at = ? WHERE path = ?",
+                               (new_path, json.dumps(chunk_ids), time.time(), old_path))
+            self._conn.commit()
+        self.stats["renames"] += 1
+        return True
+
+    def remove(self, paths: Iterable[str]) -> int:
+        """Forget notes; returns how many were recorded."""
+        paths = list(paths)
+        with self._lock:
+            before = self._conn.total_changes
+            self._conn.executemany("DELETE FROM files WHERE path = ?", ((path,) for path in paths))
+            self._conn.commit()
+            removed = self._conn.total_changes - before
+        self.stats["removals"] += removed
+        return removed
+
+    def clear(self):
+        """Drop the whole manifest."""
+        with self._lock:
+            self._conn.execute("DELETE FROM files")
+            self._conn.commit()
+
+    def diff(self, files: Iterable[Dict[str, Any]]) -> ManifestDiff:
+        """
+        Compare the manifest with a stat-only directory walk.
+
+        Args:
+            files: File infos with "path", "size" and "modified" (FilesystemVaultClient.list_vault_files)
+
+        Returns:
+            ManifestDiff; "changed" files still need a content hash check
+        """
+        with self._lock:
+            known = {path: (size, mtime) for path, size, mtime in
+                     self._conn.execute("SELECT path, size, mtime FROM files")}
+
+        result = ManifestDiff()
+        seen = set()
+        for file_info in files:
+            path = file_info["path"]
+            seen.add(path)
+            recorded = known.get(path)
+            if recorded is None:
+                result.new.append(path)
+            elif recorded == (file_info["size"], file_info["modified"]):
+                result.unchanged.append(path)
+            else:
+                result.changed.append(path)
+        result.deleted = [path for path in known if path not in seen]
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get manifest size and write statistics."""
+        return {**self.stats, "files": len(self), "db_path": self.db_path}
+
+    def close(self):
+        """Close the SQLite connection."""
+        with self._lock:
+            self._conn.close()
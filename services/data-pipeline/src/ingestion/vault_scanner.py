@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Parallel Vault Scanner
+Stat-only os.scandir walk over a thread pool, streaming file infos and remembering directory mtimes between scans
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Directories modified this close to the scan may change again within the same mtime tick
+RACY_MTIME_SECONDS = 2.0
+
+
+@dataclass
+class DirectoryState:
+    """What one directory held when it was last listed"""
+    mtime_ns: Optional[int]  # None when the listing is too recent to trust
+    files: List[Dict[str, Any]] = field(default_factory=list)
+    subdirs: List[str] = field(default_factory=list)
+
+
+class VaultScanner:
+    """
+    Walks a vault with os.scandir on a thread pool and streams file infos.
+
+    Each directory is listed by one worker; the stat data comes from its
+    DirEntry objects, and subdirectories are queued as soon as they are seen,
+    so independent subtrees are listed in parallel. Directory mtimes are kept
+    (in SQLite when a state path is given) so that a pruned rescan can reuse
+    the listing of every directory whose mtime did not move.
+    """
+
+    def __init__(self,
+                 vault_path: str,
+                 max_workers: int = 8,
+                 state_path: Optional[str] = None,
+                 suffix: str = ".md"):
+        """
+        Initialize the scanner.
+
+        Args:
+            vault_path: Root of the vault
+            max_workers: Threads listing directories in parallel
+            state_path: SQLite file for directory mtimes (None keeps them in memory)
+            suffix: File suffix to report
+        """
+        self.vault_root = os.path.abspath(vault_path)
+        self.max_workers = max(1, max_workers)
+        self.state_path = state_path
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._directories: Optional[Dict[str, DirectoryState]] = None
+
+        self._conn = None
+        if state_path:
+            directory = os.path.dirname(state_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(state_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS directories (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER,
+                    files TEXT NOT NULL,
+                    subdirs TEXT NOT NULL
+                )
+            """)
+            self._conn.commit()
+
+        self.stats = {
+            "scans": 0,
+            "directories_listed": 0,
+            "directories_reused": 0,
+            "files_found": 0,
+            "errors": 0,
+            "last_scan_ms": 0.0
+        }
+
+    def scan(self, prune: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Stream {"path", "name", "size", "modified", "created"} for every matching file.
+
+        Args:
+            prune: Reuse the stored listing of directories whose mtime is unchanged.
+                A directory's mtime moves when entries are added, removed or renamed
+                (which includes atomic saves), not when a file is rewritten in place,
+                so pruned scans suit callers that learn about in-place edits elsewhere
+                (e.g. the file watcher). Subdirectories are still checked one by one.
+        Yields:
+            Dict[str, Any]: File info with a vault-relative, forward-slash path
+        """
+        start_time = time.time()
+        previous = self._load_state() if prune else {}
+        current: Dict[str, DirectoryState] = {}
+        completed = False
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="vault-scan")
+        try:
+            pending = {executor.submit(self._scan_directory, "", previous.get(""), start_time)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    relative_dir, state, reused = future.result()
+                    if state is None:
+                        continue
+                    current[relative_dir] = state
+                    self.stats["directories_reused" if reused else "directories_listed"] += 1
+                    for subdir in state.subdirs:
+                        pending.add(executor.submit(self._scan_directory, subdir, previous.get(subdir), start_time))
+                    self.stats["files_found"] += len(state.files)
+                    for file_info in state.files:
+                        yield dict(file_info)  # Callers may annotate; the stored listing stays clean
+            completed = True
+        finally:
+            # Abandoned generators must not leave queued listings behind
+            executor.shutdown(wait=True, cancel_futures=True)
+
+        if completed:
+            self._save_state(current)
+            self.stats["scans"] += 1
+            self.stats["last_scan_ms"] = (time.time() - start_time) * 1000
+
+    def scan_all(self, prune: bool = False) -> List[Dict[str, Any]]:
+        """All file infos from scan() as a list."""
+        return list(self.scan(prune))
+
+    def _scan_directory(self,
+                        relative_dir: str,
+                        cached: Optional[DirectoryState],
+                        scan_start: float) -> Tuple[str, Optional[DirectoryState], bool]:
+        """List one directory (worker thread), or reuse its cached listing if its mtime is unchanged."""
+        full_dir = os.path.join(self.vault_root, relative_dir) if relative_dir else self.vault_root
+        try:
+            mtime_ns = os.stat(full_dir).st_mtime_ns
+            if cached is not None and cached.mtime_ns is not None and cached.mtime_ns == mtime_ns:
+                return relative_dir, cached, True
+
+            files = []
+            subdirs = []
+            prefix = f"{relative_dir}/" if relative_dir else ""
+            with os.scandir(full_dir) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(prefix + entry.name)
+                        elif entry.name.endswith(self.suffix) and entry.is_file():
+                            stat = entry.stat()
+                            files.append({
+                                "path": prefix + entry.name,
+                                "name": entry.name,
+                                "size": stat.st_size,
+                                "modified": stat.st_mtime,  # Unix timestamp
+                                "created": stat.st_ctime,   # Unix timestamp (on Windows, this is creation time)
+                            })
+                    except OSError as e:
+                        self.stats["errors"] += 1
+                        logger.error(f"Error accessing file {entry.path}: {e}")
+
+            racy = mtime_ns / 1e9 >= scan_start - RACY_MTIME_SECONDS
+            return relative_dir, DirectoryState(None if racy else mtime_ns, files, subdirs), False
+
+        except OSError as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error scanning directory {full_dir}: {e}")
+            return relative_dir, None, False
+
+    def _load_state(self) -> Dict[str, DirectoryState]:
+        """Directory states from the last completed scan."""
+        with self._lock:
+            if self._directories is not None:
+                return self._directories
+            if self._conn is None:
+                return {}
+            rows = self._conn.execute("SELECT path, mtime_ns, files, subdirs FROM directories").fetchall()
+        directories = {
+            path: DirectoryState(mtime_ns, json.loads(files), json.loads(subdirs))
+            for path, mtime_ns, files, subdirs in rows
+        }
+        with self._lock:
+            self._directories = directories
+        return directories
+
+    def _save_state(self, directories: Dict[str, DirectoryState]):
+        """Keep the states of a completed scan, writing only directories that were re-listed."""
+        with self._lock:
+            previous = self._directories or {}
+            self._directories = directories
+            if self._conn is None:
+                return
+            changed = [
+                (path, state.mtime_ns, json.dumps(state.files), json.dumps(state.subdirs))
+                for path, state in directories.items() if previous.get(path) is not state
+            ]
+            removed = [(path,) for path in previous if path not in directories]
+            if not previous:
+                # First scan in this process: the table may hold directories that no longer exist
+                self._conn.execute("DELETE FROM directories")
+            self._conn.executemany("DELETE FROM directories WHERE path = ?", removed)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO directories (path, mtime_ns, files, subdirs) VALUES (?, ?, ?, ?)", changed
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Forget all directory mtimes (the next scan lists everything)."""
+        with self._lock:
+            self._directories = None
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM directories")
+                self._conn.commit()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Scanner statistics."""
+        return {
+            **self.stats,
+            "max_workers": self.max_workers,
+            "directories_tracked": len(self._directories or {}),
+            "state_path": self.state_path or "memory only"
+        }
+
+    def close(self):
+        """Close the state database."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Context Assembler for LLM Prompts
+Budget-filling from ingest-time chunk token counts and memoized header/template costs, with a knapsack best fit
+"""
+import logging
+import math
+import random
+from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Tuple, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Knapsack capacities above this are solved in coarser token buckets
+MAX_KNAPSACK_CAPACITY = 4096
+# Bound on memoized header strings (one per source/section/category)
+MAX_HEADER_CACHE_ENTRIES = 10000
+# Key for stored counts that do not record their tokenizer (collections ingested before it was stored)
+UNKNOWN_TOKENIZER = ""
+
+
+@dataclass
+class ContextChunk:
+    """Structured context chunk with metadata"""
+    content: str
+    metadata: Dict[str, Any]
+    relevance_score: float
+    token_count: int
+    source_file: str
+    chunk_index: int
+
+
+def knapsack_select(weights: List[int], values: List[float], capacity: int) -> List[int]:
+    """
+    0/1 knapsack: indices maximizing the total value within capacity.
+
+    Solved with one vectorized DP row update per item; capacities above
+    MAX_KNAPSACK_CAPACITY are bucketed (weights rounded up, so the selection
+    never exceeds the real capacity).
+
+    Returns:
+        Selected indices in input order
+    """
+    if capacity <= 0 or not weights:
+        return []
+    scale = max(1, math.ceil(capacity / MAX_KNAPSACK_CAPACITY))
+    capacity = capacity // scale
+    scaled = [math.ceil(weight / scale) for weight in weights]
+
+    best = np.zeros(capacity + 1, dtype=np.float64)
+    keep = np.zeros((len(scaled), capacity + 1), dtype=bool)
+    for i, (weight, value) in enumerate(zip(scaled, values)):
+        if weight > capacity:
+            continue
+        candidate = best[:capacity + 1 - weight] + value
+        improved = candidate > best[weight:]
+        keep[i, weight:] = improved
+        best[weight:] = np.where(improved, candidate, best[weight:])
+
+    selected = []
+    remaining = capacity
+    for i in range(len(scaled) - 1, -1, -1):
+        if keep[i, remaining]:
+            selected.append(i)
+            remaining -= scaled[i]
+    return selected[::-1]
+
+
+class ContextAssembler:
+    """
+    Fills the context budget without tokenizing chunk contents on the request path.
+
+    Chunk costs come from the ``chunk_token_count`` computed at ingest and
+    stored in the vector store metadata; the formatted header around each chunk
+    is tokenized once per distinct source/section/category and memoized, as are
+    the prompt templates. Only chunks without a stored count fall back to the
+    tokenizer.
+
+    Stored counts are used as-is only when their ``chunk_tokenizer`` matches
+    ``tokenizer_name``. Counts from another tokenizer (the embedding model's)
+    are converted with a per-tokenizer ratio calibrated against count_tokens:
+    the first ``calibration_chunks`` chunks of each tokenizer are counted
+    exactly, later ones are sampled at ``calibration_rate``, and converted
+    counts carry a ``safety_margin`` on top of the ratio.
+    """
+
+    def __init__(self, count_tokens: Callable[[str], int], max_context_tokens: int = 3072,
+                 tokenizer_name: Optional[str] = None, safety_margin: float = 0.05,
+                 calibration_chunks: int = 200, calibration_rate: float = 0.02):
+        """
+        Initialize the assembler.
+
+        Args:
+            count_tokens: Tokenizer-backed counter used for memoized headers/templates and fallbacks
+            max_context_tokens: Default context budget
+            tokenizer_name: Name of the tokenizer behind count_tokens (stored counts with the same
+                chunk_tokenizer are trusted directly)
+            safety_margin: Fraction added to converted counts
+            calibration_chunks: Chunks per foreign tokenizer counted exactly before its ratio is used
+            calibration_rate: Fraction of later foreign-count chunks counted exactly to track drift
+        """
+        self.count_tokens = count_tokens
+        self.max_context_tokens = max_context_tokens
+        self.tokenizer_name = tokenizer_name
+        self.safety_margin = safety_margin
+        self.calibration_chunks = calibration_chunks
+        self.calibration_rate = calibration_rate
+        self._header_tokens: Dict[str, int] = {}
+        self._template_tokens: Dict[str, int] = {}
+        # chunk_tokenizer -> [count_tokens total, stored count total, samples]
+        self._calibration: Dict[str, List[int]] = {}
+        # "\n\n" after each chunk's content
+        self._trailer_tokens = count_tokens("\n\n")
+
+        self.stats = {
+            "assemblies": 0,
+            "chunks_considered": 0,
+            "chunks_used": 0,
+            "precomputed_counts": 0,
+            "converted_counts": 0,
+            "calibration_counts": 0,
+            "fallback_counts": 0,
+            "header_cache_hits": 0,
+            "header_cache_misses": 0,
+            "budget_tokens_total": 0,
+            "used_tokens_total": 0
+        }
+
+    @staticmethod
+    def source_info(chunk: ContextChunk) -> str:
+        """Source line shown above a chunk"""
+        metadata = chunk.metadata
+        source_info = f"Source: {chunk.source_file}"
+
+        # Add additional metadata if available
+        if 'heading' in metadata and metadata['heading']:
+            source_info += f" | Section: {metadata['heading']}"
+        if 'path_category' in metadata and metadata['path_category']:
+            source_info += f" | Category: {metadata['path_category']}"
+        return source_info
+
+    def format_chunk(self, chunk: ContextChunk) -> str:
+        """Format a context chunk for inclusion in prompt"""
+        formatted_chunk = f"""
+--- {self.source_info(chunk)} (Relevance: {chunk.relevance_score:.3f}) ---
+{chunk.content}
+
+"""
+        return formatted_chunk
+
+    def header_tokens(self, chunk: ContextChunk) -> int:
+        """Memoized token cost of a chunk's header line (relevance digits cost the same for every score)"""
+        source_info = self.source_info(chunk)
+        cached = self._header_tokens.get(source_info)
+        if cached is not None:
+            self.stats["header_cache_hits"] += 1
+            return cached
+
+        self.stats["header_cache_misses"] += 1
+        if len(self._header_tokens) >= MAX_HEADER_CACHE_ENTRIES:
+            self._header_tokens.clear()
+        tokens = self.count_tokens(f"\n--- {source_info} (Relevance: 0.000) ---\n")
+        self._header_tokens[source_info] = tokens
+        return tokens
+
+    def template_tokens(self, template: str) -> int:
+        """Memoized token cost of a prompt template without its placeholders filled"""
+        cached = self._template_tokens.get(template)
+        if cached is None:
+            cached = self.count_tokens(template.format(context_text="", query=""))
+            self._template_tokens[template] = cached
+        return cached
+
+    def tokenizer_ratio(self, tokenizer: str) -> Optional[float]:
+        """Calibrated count_tokens / stored-count ratio for a foreign tokenizer (None until calibrated)"""
+        calibration = self._calibration.get(tokenizer)
+        if calibration is None or calibration[2] < self.calibration_chunks or calibration[1] <= 0:
+            return None
+        return calibration[0] / calibration[1]
+
+    def _convert_count(self, content: str, stored_count: float, tokenizer: str) -> int:
+        """Token cost of a chunk whose stored count comes from a different tokenizer"""
+        ratio = self.tokenizer_ratio(tokenizer)
+        if ratio is None or random.random() < self.calibration_rate:
+            exact = self.count_tokens(content)
+            calibration = self._calibration.setdefault(tokenizer, [0, 0, 0])
+            calibration[0] += exact
+            calibration[1] += stored_count
+            calibration[2] += 1
+            self.stats["calibration_counts"] += 1
+            return exact
+        self.stats["converted_counts"] += 1
+        return math.ceil(stored_count * ratio * (1 + self.safety_margin))
+
+    def to_context_chunk(self, chunk_data: Dict[str, Any]) -> ContextChunk:
+        """Convert a search result, preferring its ingest-time token count"""
+        content = chunk_data.get('content', '')
+        metadata = chunk_data.get('metadata') or {}
+
+        token_count = metadata.get('chunk_token_count')
+        tokenizer = metadata.get('chunk_tokenizer') or UNKNOWN_TOKENIZER
+        if not (isinstance(token_count, (int, float)) and token_count > 0):
+            token_count = self.count_tokens(content)
+            self.stats["fallback_counts"] += 1
+        elif self.tokenizer_name is not None and tokenizer == self.tokenizer_name:
+            self.stats["precomputed_counts"] += 1
+        else:
+            token_count = self._convert_count(content, token_count, tokenizer)
+
+        return ContextChunk(
+            content=content,
+            metadata=metadata,
+            relevance_score=chunk_data.get('final_score', chunk_data.get('similarity', 0)),
+            token_count=int(token_count),
+            source_file=metadata.get('path', 'unknown'),
+            chunk_index=metadata.get('chunk_index', 0)
+        )
+
+    def select(self, chunks: List[ContextChunk], costs: List[int], budget: int) -> List[int]:
+        """
+        Pick the chunks to include: the most relevant one whenever it fits, then a
+        knapsack best fit of the rest maximizing total relevance within the budget.
+
+        Relevance is shifted to be positive (scores may be cross-encoder logits), so
+        leftover budget is always filled when another chunk fits.
+
+        Returns:
+            Indices of selected chunks, most relevant first
+        """
+        order = sorted(range(len(chunks)), key=lambda i: chunks[i].relevance_score, reverse=True)
+        fitting = [i for i in order if costs[i] <= budget]
+        if not fitting:
+            return []
+
+        top = fitting[0]
+        rest = fitting[1:]
+        scores = [chunks[i].relevance_score for i in fitting]
+        low, high = min(scores), max(scores)
+        margin = 0.05 * ((high - low) or 1.0)
+        chosen = knapsack_select([costs[i] for i in rest],
+                                 [chunks[i].relevance_score - low + margin for i in rest],
+                                 budget - costs[top])
+        return [top] + [rest[i] for i in chosen]
+
+    def assemble(self, context_chunks: List[Dict[str, Any]],
+                 max_tokens: Optional[int] = None) -> Tuple[str, List[ContextChunk], int]:
+        """
+        Assemble context within the token budget
+        Args:
+            context_chunks: List of search results with metadata
+            max_tokens: Maximum tokens for context (defaults to self.max_context_tokens)
+        Returns:
+            Tuple of (context_text, used_chunks, total_tokens)
+        """
+        if not context_chunks:
+            return "", [], 0
+
+        max_tokens = max_tokens or self.max_context_tokens
+        chunks = [self.to_context_chunk(chunk_data) for chunk_data in context_chunks]
+        costs = [self.header_tokens(chunk) + chunk.token_count + self._trailer_tokens for chunk in chunks]
+
+        selected = self.select(chunks, costs, max_tokens)
+        used_chunks = [chunks[i] for i in selected]
+        total_tokens = sum(costs[i] for i in selected)
+        context_text = "".join(self.format_chunk(chunk) for chunk in used_chunks)
+
+        self.stats["assemblies"] += 1
+        self.stats["chunks_considered"] += len(chunks)
+        self.stats["chunks_used"] += len(used_chunks)
+        self.stats["budget_tokens_total"] += max_tokens
+        self.stats["used_tokens_total"] += total_tokens
+
+        logger.info(f"Context assembled: {len(used_chunks)}/{len(chunks)} chunks, {total_tokens}/{max_tokens} tokens")
+        return context_text, used_chunks, total_tokens
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get assembly and memoization statistics"""
+        budget = self.stats["budget_tokens_total"]
+        return {
+            **self.stats,
+            "budget_utilization": self.stats["used_tokens_total"] / budget if budget else 0.0,
+            "tokenizer_ratios": {name or "unknown": self.tokenizer_ratio(name) for name in self._calibration},
+            "memoized_headers": len(self._header_tokens),
+            "memoized_templates": len(self._template_tokens)
+        }
@@ -7,12 +7,14 @@ import logging
 import asyncio
 import os
 import re
+import threading
 import time
 from typing import List, Dict, Any, Optional, Tuple, AsyncGenerator
 from dataclasses import dataclass
 from enum import Enum
 import google.generativeai as genai
 import tiktoken
+from .context_assembler import ContextAssembler, ContextChunk
 
 logger = logging.getLogger(__name__)
 
@@ -23,16 +25,6 @@ class PromptStyle(Enum):
     SUMMARIZER = "summarizer"
     ANALYST = "analyst"
 
-@dataclass
-class ContextChunk:
-    """Structured context chunk with metadata"""
-    content: str
-    metadata: Dict[str, Any]
-    relevance_score: float
-    token_count: int
-    source_file: str
-    chunk_index: int
-
 @dataclass
 class LLMResponse:
     """Structured LLM response with metadata"""
@@ -70,6 +62,11 @@ class GeminiClient:
         # Prompt templates for different styles
         self.prompt_templates = self._initialize_prompt_templates()
         
+        # Context budget filling from ingest-time chunk token counts
+        # Ingest-time counts from another tokenizer (the embedding model's) are converted by a calibrated ratio
+        self.context_assembler = ContextAssembler(self.count_tokens, max_context_tokens,
+                                                  tokenizer_name=self.tokenizer.name if self.tokenizer else None)
+        
         logger.info(f"✅ GeminiClient initialized with model: {model_name}, max_tokens: {max_context_tokens}")
     
     def _initialize_prompt_templates(self) -> Dict[PromptStyle, str]:
@@ -201,84 +198,18 @@ Data and content from the knowledge base:
     
     def format_context_chunk(self, chunk: ContextChunk) -> str:
         """Format a context chunk for inclusion in prompt"""
-        metadata = chunk.metadata
-        source_info = f"Source: {chunk.source_file}"
-        
-        # Add additional metadata if available
-        if 'heading' in metadata and metadata['heading']:
-            source_info += f" | Section: {metadata['heading']}"
-        if 'path_category' in metadata and metadata['path_category']:
-            source_info += f" | Category: {metadata['path_category']}"
-        
-        formatted_chunk = f"""
---- {source_info} (Relevance: {chunk.relevance_score:.3f}) ---
-{chunk.content}
-
-"""
-        return formatted_chunk
+        return self.context_assembler.format_chunk(chunk)
     
     def assemble_context(self, context_chunks: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> Tuple[str, List[ContextChunk], int]:
         """
-        Assemble context with token counting and relevance-based prioritization
+        Assemble context from the chunks' ingest-time token counts with a knapsack best fit
         Args:
             context_chunks: List of search results with metadata
             max_tokens: Maximum tokens for context (defaults to self.max_context_tokens)
         Returns:
             Tuple of (context_text, used_chunks, total_tokens)
         """
-        if not context_chunks:
-            return "", [], 0
-        
-        max_tokens = max_tokens or self.max_context_tokens
-        
-        # Convert to ContextChunk objects and sort by relevance
-        chunks = []
-        for chunk_data in context_chunks:
-            relevance_score = chunk_data.get('final_score', chunk_data.get('similarity', 0))
-            content = chunk_data.get('content', '')
-            metadata = chunk_data.get('metadata', {})
-            source_file = metadata.get('path', 'unknown')
-            chunk_index = metadata.get('chunk_index', 0)
-            
-            token_count = self.count_tokens(content)
-            
-            context_chunk = ContextChunk(
-                content=content,
-                metadata=metadata,
-                relevance_score=relevance_score,
-                token_count=token_count,
-                source_file=source_file,
-                chunk_index=chunk_index
-            )
-            chunks.append(context_chunk)
-        
-        # Sort by relevance score (highest first)
-        chunks.sort(key=lambda x: x.relevance_score, reverse=True)
-        
-        # Assemble context with token counting
-        context_parts = []
-        used_chunks = []
-        total_tokens = 0
-        
-        for chunk in chunks:
-            formatted_chunk = self.format_context_chunk(chunk)
-            chunk_tokens = self.count_tokens(formatted_chunk)
-            
-            # Check if adding this chunk would exceed token limit
-            if total_tokens + chunk_tokens > max_tokens:
-                logger.info(f"Token limit reached ({max_tokens}). Stopping context assembly.")
-                break
-            
-            context_parts.append(formatted_chunk)
-            used_chunks.append(chunk)
-            total_tokens += chunk_tokens
-            
-            logger.debug(f"Added chunk from {chunk.source_file} ({chunk_tokens} tokens, relevance: {chunk.relevance_score:.3f})")
-        
-        context_text = "".join(context_parts)
-        
-        logger.info(f"Context assembled: {len(used_chunks)} chunks, {total_tokens} tokens")
-        return context_text, used_chunks, total_tokens
+        return self.context_assembler.assemble(context_chunks, max_tokens or self.max_context_tokens)
     
     def create_structured_prompt(self, query: str, context_text: str, style: PromptStyle = PromptStyle.RESEARCH_ASSISTANT) -> str:
         """Create a structured prompt using the specified style"""
@@ -293,12 +224,14 @@ Data and content from the knowledge base:
             query=cleaned_query
         )
         
-        # Add token count information for debugging
-        prompt_tokens = self.count_tokens(prompt)
-        logger.debug(f"Generated prompt: {prompt_tokens} tokens")
-        
         return prompt
     
+    def estimate_prompt_tokens(self, query: str, context_tokens: int,
+                               style: PromptStyle = PromptStyle.RESEARCH_ASSISTANT) -> int:
+        """Prompt size from the memoized template cost and the assembled context tokens"""
+        return (self.context_assembler.template_tokens(self.prompt_templates[style])
+                + context_tokens + self.count_tokens(query.strip()))
+    
     async def process_content(self, query: str, context_chunks: List[Dict[str, Any]], 
                             style: PromptStyle = PromptStyle.RESEARCH_ASSISTANT,
                             max_context_tokens: Optional[int] = None) -> LLMResponse:
@@ -337,7 +270,7 @@ Data and content from the knowledge base:
             
             # Create structured prompt
             prompt = self.create_structured_prompt(query, context_text, style)
-            prompt_tokens = self.count_tokens(prompt)
+            prompt_tokens = self.estimate_prompt_tokens(query, context_tokens, style)
             
             # Generate response
             logger.info(f"Sending prompt to Gemini ({prompt_tokens} tokens)...")
@@ -346,7 +279,11 @@ Data and content from the knowledge base:
             if not response.text:
                 raise ValueError("Empty response from Gemini")
             
-            response_tokens = self.count_tokens(response.text)
+            # Prefer the API's own usage accounting over re-tokenizing the answer
+            usage = getattr(response, "usage_metadata", None)
+            if usage is not None and getattr(usage, "prompt_token_count", None):
+                prompt_tokens = usage.prompt_token_count
+            response_tokens = getattr(usage, "candidates_token_count", None) or self.count_tokens(response.text)
             processing_time = asyncio.get_event_loop().time() - start_time
             
             # Extract sources used
@@ -405,68 +342,153 @@ Data and content from the knowledge base:
             except Exception as e:
                 logger.warning(f"Failed to record LLM metrics: {e}")
     
-    async def stream_content(self, query: str, context_chunks: List[Dict[str, Any]], 
-                           prompt_style: PromptStyle = PromptStyle.RESEARCH_ASSISTANT) -> AsyncGenerator[str, None]:
+    async def _stream_generation(self, prompt: str) -> AsyncGenerator[str, None]:
         """
-        Stream content generation with real-time token delivery
+        Bridge the blocking streaming iterator into the event loop.
+        
+        A worker thread drives generate_content(stream=True) and hands each text part to an
+        asyncio.Queue through call_soon_threadsafe, so the loop keeps serving other requests
+        (and other streams) while tokens arrive. Closing the generator early (e.g. the client
+        disconnected) stops the worker at the next part.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        finished = object()
+        
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # Event loop already closed
+                stop.set()
+        
+        def produce():
+            try:
+                response = self.model.generate_content(prompt, stream=True)
+                for chunk in response:
+                    if stop.is_set():
+                        break
+                    if chunk.text:
+                        put(chunk.text)
+            except Exception as e:
+                put(e)
+            finally:
+                put(finished)
+        
+        worker = asyncio.create_task(asyncio.to_thread(produce))
+        try:
+            while True:
+                item = await queue.get()
+                if item is finished:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+            if worker.done():
+                await worker
+    
+    async def stream_events(self, query: str, context_chunks: List[Dict[str, Any]],
+                            prompt_style: PromptStyle = PromptStyle.RESEARCH_ASSISTANT,
+                            max_context_tokens: Optional[int] = None) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Stream an answer as events: the sources first, then answer text as it is generated
         
         Args:
             query: User query
             context_chunks: List of context chunks with metadata
             prompt_style: Style of prompt to use
+            max_context_tokens: Override default token limit
             
         Yields:
-            str: Text chunks as they are generated
+            Dict: {"event": "sources", "sources", "context_tokens"}, then {"event": "token", "text"} per
+            generated part, then {"event": "done", "time_to_first_token", "total_time", "response_chars"},
+            or {"event": "error", "message"} if generation fails
         """
+        start_time = time.perf_counter()
+        status = "success"
+        
+        # Same budget filling as process_content
+        context_text, used_chunks, context_tokens = self.assemble_context(context_chunks, max_context_tokens)
+        yield {
+            "event": "sources",
+            "sources": [
+                {
+                    "path": chunk.source_file,
+                    "heading": chunk.metadata.get("heading"),
+                    "chunk_index": chunk.chunk_index,
+                    "relevance": chunk.relevance_score
+                }
+                for chunk in used_chunks
+            ],
+            "context_tokens": context_tokens
+        }
+        
+        time_to_first_token = None
+        response_chars = 0
         try:
-            start_time = asyncio.get_event_loop().time()
-            
-            # Sort chunks by relevance score if available (from re-ranking)
-            context_chunks.sort(key=lambda x: x.get('final_score', x.get('similarity', 0)), reverse=True)
-            
-            # Assemble context with token counting
-            context_parts = []
-            total_tokens = 0
-            
-            for chunk in context_chunks:
-                part = f"--- Source: {chunk['metadata']['path']} (Relevance: {chunk.get('final_score', chunk.get('similarity', 0)):.3f}) ---\n{chunk['content']}\n\n"
-                # Rough token estimation (1.3x word count)
-                token_count = len(part.split()) * 1.3
-                if total_tokens + token_count > self.max_context_tokens:
-                    break
-                context_parts.append(part)
-                total_tokens += token_count
-            
-            context_text = "".join(context_parts)
-            
-            # Create structured prompt based on style
-            prompt = self.create_structured_prompt(query, context_text, prompt_style)
-            
-            logger.info(f"Starting streaming generation for query: {query[:50]}...")
-            logger.info(f"Context: {len(context_chunks)} chunks, ~{total_tokens:.0f} tokens")
-            
-            # Generate streaming response
-            response = self.model.generate_content(prompt, stream=True)
-            
-            tokens_generated = 0
-            first_token_time = None
-            
-            for chunk in response:
-                if chunk.text:
-                    if first_token_time is None:
-                        first_token_time = asyncio.get_event_loop().time()
-                        time_to_first_token = first_token_time - start_time
+            if not context_text.strip():
+                logger.warning("No context available for query")
+                answer = "I could not find sufficient information in the provided context to answer your question."
+                response_chars = len(answer)
+                yield {"event": "token", "text": answer}
+            else:
+                # Create structured prompt based on style
+                prompt = self.create_structured_prompt(query, context_text, prompt_style)
+                
+                logger.info(f"Starting streaming generation for query: {query[:50]}...")
+                logger.info(f"Context: {len(used_chunks)}/{len(context_chunks)} chunks, {context_tokens} tokens")
+                
+                async for text in self._stream_generation(prompt):
+                    if time_to_first_token is None:
+                        time_to_first_token = time.perf_counter() - start_time
                         logger.info(f"Time to first token: {time_to_first_token:.3f}s")
-                    
-                    tokens_generated += len(chunk.text.split())
-                    yield chunk.text
-            
-            total_time = asyncio.get_event_loop().time() - start_time
-            logger.info(f"Streaming completed: {tokens_generated} tokens in {total_time:.3f}s")
-            
+                    response_chars += len(text)
+                    yield {"event": "token", "text": text}
+            
+            total_time = time.perf_counter() - start_time
+            logger.info(f"Streaming completed: {response_chars} chars in {total_time:.3f}s")
+            yield {
+                "event": "done",
+                "time_to_first_token": time_to_first_token,
+                "total_time": total_time,
+                "response_chars": response_chars
+            }
         except Exception as e:
+            status = "error"
             logger.error(f"Error in streaming content: {e}")
-            yield f"Error: {str(e)}"
+            yield {"event": "error", "message": str(e)}
+        finally:
+            try:
+                from ..monitoring.metrics import get_metrics
+                metrics = get_metrics()
+                metrics.record_llm_request(self.model_name, "stream_content", time.perf_counter() - start_time, status)
+                metrics.record_llm_tokens(self.model_name, "context_tokens", context_tokens)
+                if time_to_first_token is not None:
+                    metrics.record_llm_time_to_first_token(self.model_name, time_to_first_token)
+            except Exception as e:
+                logger.warning(f"Failed to record LLM metrics: {e}")
+    
+    async def stream_content(self, query: str, context_chunks: List[Dict[str, Any]], 
+                           prompt_style: PromptStyle = PromptStyle.RESEARCH_ASSISTANT) -> AsyncGenerator[str, None]:
+        """
+        Stream content generation with real-time token delivery
+        
+        Args:
+            query: User query
+            context_chunks: List of context chunks with metadata
+            prompt_style: Style of prompt to use
+            
+        Yields:
+            str: Text chunks as they are generated
+        """
+        async for event in self.stream_events(query, context_chunks, prompt_style):
+            if event["event"] == "token":
+                yield event["text"]
+            elif event["event"] == "error":
+                yield f"Error: {event['message']}"
     
     async def analyze_content(self, query: str, context_chunks: List[Dict[str, Any]]) -> LLMResponse:
         """Analyze content using analyst prompt style"""
@@ -485,7 +507,8 @@ Data and content from the knowledge base:
         return {
             "max_context_tokens": self.max_context_tokens,
             "model_name": self.model_name,
-            "tokenizer_available": self.tokenizer is not None
+            "tokenizer_available": self.tokenizer is not None,
+            "context_assembly": self.context_assembler.get_stats()
         }
 
 # Example usage and testing
@@ -2,12 +2,13 @@
 Main Data Pipeline Service - Standalone Obsidian Vault Processing with Gemini Integration
 """
 import asyncio
+import json
 import logging
 import time
 import os
 from typing import List, Dict, Any, Optional
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
 from pydantic import BaseModel
 import uvicorn
 
@@ -15,8 +16,11 @@ from config import get_settings
 # from ingestion.obsidian_client import ObsidianAPIClient, ObsidianVaultScanner  # Commented out - using local vector DB only
 from processing.content_processor import ContentProcessor, BatchContentProcessor
 from embeddings.embedding_service import EmbeddingService
+from embeddings.async_batcher import AsyncEmbeddingBatcher
 from vector.chroma_service import ChromaService
 from search.search_service import SemanticSearchService
+from cache.semantic_cache import SemanticResultCache
+from cache.version_tracker import CollectionVersionTracker, change_journal_path
 from llm.gemini_client import GeminiClient
 
 # Import observability modules
@@ -121,6 +125,7 @@ app.include_router(health_router)
 # obsidian_client: Optional[ObsidianAPIClient] = None  # Commented out - using local vector DB only
 content_processor: Optional[ContentProcessor] = None
 embedding_service: Optional[EmbeddingService] = None
+embedding_batcher: Optional[AsyncEmbeddingBatcher] = None
 # async_embedding_service: Optional[AsyncEmbeddingService] = None  # Commented out - using synchronous EmbeddingService only
 chroma_service: Optional[ChromaService] = None
 search_service: Optional[SemanticSearchService] = None
@@ -160,10 +165,37 @@ class HealthResponse(BaseModel):
     stats: Dict[str, Any]
 
 
+def build_search_service(settings, chroma_service: ChromaService, embedding_service: EmbeddingService,
+                         embedding_batcher: Optional[AsyncEmbeddingBatcher] = None) -> SemanticSearchService:
+    """Build the search service with its result caches, invalidated through the collection's change journal"""
+    # Serve paraphrased repeat queries from recent results
+    semantic_cache = SemanticResultCache(
+        threshold=settings.semantic_cache_threshold,
+        max_entries=settings.semantic_cache_size,
+        ttl=settings.cache_ttl_search,
+        verify_rate=settings.semantic_cache_verify_rate
+    ) if settings.semantic_cache_enabled else None
+    
+    # The vault monitor (a separate process) journals every note it rewrites, adds or deletes
+    # next to the collection; searches apply those changes before reading their caches
+    version_tracker = CollectionVersionTracker(
+        change_journal_path(settings.chroma_persist_directory, settings.chroma_collection_name)
+    )
+    
+    return SemanticSearchService(chroma_service, embedding_service, embedding_batcher=embedding_batcher,
+                                 semantic_cache=semantic_cache,
+                                 version_tracker=version_tracker,
+                                 search_cache_ttl=settings.cache_ttl_search,
+                                 search_cache_max_entries=settings.search_cache_size,
+                                 speculative_expansion=settings.speculative_expansion,
+                                 expansion_deadline=settings.expansion_deadline_ms / 1000,
+                                 expansion_memo_path=settings.expansion_memo_path)
+
+
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
-    global content_processor, embedding_service  # obsidian_client and async_embedding_service commented out
+    global content_processor, embedding_service, embedding_batcher  # obsidian_client and async_embedding_service commented out
     global chroma_service, search_service, gemini_client
     
     try:
@@ -195,7 +227,9 @@ async def startup_event():
         
         # Initialize embedding service
         embedding_service = EmbeddingService(
-            model_name=settings.embedding_model
+            model_name=settings.embedding_model,
+            cache_path=settings.embedding_cache_path,
+            memory_cache_size=settings.embedding_cache_size
         )
         
         # async_embedding_service = AsyncEmbeddingService(embedding_service)  # Commented out - using synchronous EmbeddingService only
@@ -203,11 +237,20 @@ async def startup_event():
         # Initialize ChromaDB service
         chroma_service = ChromaService(
             collection_name=settings.chroma_collection_name,
-            persist_directory=settings.chroma_persist_directory
+            persist_directory=settings.chroma_persist_directory,
+            embedding_model=settings.embedding_model,
+            use_embedding_function=settings.chroma_use_embedding_function
+        )
+        
+        # Micro-batch concurrent query embeddings off the event loop
+        embedding_batcher = AsyncEmbeddingBatcher(
+            embedding_service,
+            max_batch_size=settings.query_embedding_batch_size,
+            max_wait_ms=settings.query_embedding_max_wait_ms
         )
         
         # Initialize search service
-        search_service = SemanticSearchService(chroma_service, embedding_service)
+        search_service = build_search_service(settings, chroma_service, embedding_service, embedding_batcher)
         
         # Initialize Gemini client
         gemini_client = GeminiClient(
@@ -246,6 +289,14 @@ async def shutdown_event():
         # if obsidian_client:  # Commented out - using local vector DB only
         #     await obsidian_client.close()
         
+        if embedding_batcher:
+            await embedding_batcher.close()
+        
+        if search_service:
+            await search_service.reranker.close()
+            search_service.close()
+            search_service.version_tracker.close()
+        
         # if async_embedding_service:  # Commented out - using synchronous EmbeddingService only
         #     async_embedding_service.close()
         
@@ -334,6 +385,41 @@ async def health_check():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _retrieve(request: QueryRequest) -> List[Dict[str, Any]]:
+    """Run the retrieval step of a query based on its search type"""
+    if request.search_type == "semantic":
+        search_results = await search_service.search_similar(
+            request.query, 
+            request.max_results, 
+            request.filters
+        )
+    elif request.search_type == "keyword":
+        keywords = request.query.split()
+        search_results = await search_service.search_by_keywords(
+            keywords, 
+            request.max_results, 
+            request.filters
+        )
+    elif request.search_type == "hybrid":
+        search_results = await search_service.hybrid_search(
+            request.query, 
+            request.max_results, 
+            filters=request.filters
+        )
+    elif request.search_type == "tag":
+        tags = [tag.strip('#') for tag in request.query.split() if tag.startswith('#')]
+        search_results = await search_service.search_by_tags(tags, request.max_results)
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown search type: {request.search_type}")
+    return search_results
+
+
+def _sse(event: Dict[str, Any]) -> str:
+    """Encode an event dict ({"event": name, ...payload}) as a server-sent event"""
+    payload = {key: value for key, value in event.items() if key != "event"}
+    return f"event: {event['event']}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
 @app.post("/query", response_model=QueryResponse)
 async def query_vault(request: QueryRequest):
     """Query the Obsidian vault using semantic search + Gemini"""
@@ -347,30 +433,7 @@ async def query_vault(request: QueryRequest):
         start_time = time.time()
         
         # Perform search based on type
-        if request.search_type == "semantic":
-            search_results = search_service.search_similar(
-                request.query, 
-                request.max_results, 
-                request.filters
-            )
-        elif request.search_type == "keyword":
-            keywords = request.query.split()
-            search_results = search_service.search_by_keywords(
-                keywords, 
-                request.max_results, 
-                request.filters
-            )
-        elif request.search_type == "hybrid":
-            search_results = search_service.hybrid_search(
-                request.query, 
-                request.max_results, 
-                filters=request.filters
-            )
-        elif request.search_type == "tag":
-            tags = [tag.strip('#') for tag in request.query.split() if tag.startswith('#')]
-            search_results = search_service.search_by_tags(tags, request.max_results)
-        else:
-            raise HTTPException(status_code=400, detail=f"Unknown search type: {request.search_type}")
+        search_results = await _retrieve(request)
         
         # Record search latency
         search_latency = time.time() - start_time
@@ -402,6 +465,57 @@ async def query_vault(request: QueryRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/query/stream")
+async def query_vault_stream(request: QueryRequest):
+    """
+    Query the vault and stream the Gemini answer as server-sent events
+    Events: sources (chunks used as context), token (answer text), done (timings), error
+    """
+    comprehensive_metrics = get_comprehensive_metrics()
+    
+    # Record search query
+    comprehensive_metrics.search_queries_total.inc()
+    
+    start_time = time.time()
+    
+    try:
+        search_results = await _retrieve(request)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error retrieving context for streamed query: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    # Record search latency
+    search_latency = time.time() - start_time
+    comprehensive_metrics.search_latency_seconds.observe(search_latency)
+    
+    # Record ChromaDB operations
+    comprehensive_metrics.record_chromadb_operation("query", "documents", search_latency, True)
+    
+    async def event_stream():
+        first_token_time = None
+        async for event in gemini_client.stream_events(request.query, search_results):
+            if event["event"] == "sources":
+                event = {**event, "search_time": search_latency}
+            elif event["event"] == "token" and first_token_time is None:
+                first_token_time = time.time() - start_time
+                try:
+                    comprehensive_metrics.record_time_to_first_token("google", gemini_client.model_name, first_token_time)
+                except Exception as e:
+                    logger.warning(f"Failed to record time to first token: {e}")
+            elif event["event"] == "done":
+                event = {**event, "query_time_to_first_token": first_token_time,
+                         "processing_time": time.time() - start_time}
+            yield _sse(event)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 # @app.post("/index", response_model=IndexResponse)  # COMMENTED OUT - Obsidian API disabled
 # async def index_vault(request: IndexRequest, background_tasks: BackgroundTasks):
 #     """Index the entire Obsidian vault"""
@@ -483,7 +597,7 @@ async def _index_vault_background(force_reindex: bool, chunking_strategy: str, b
             
             if all_chunks:
                 chunk_texts = [chunk["content"] for chunk in all_chunks]
-                embeddings = embedding_service.batch_generate_embeddings(chunk_texts)
+                embeddings = embedding_service.batch_generate_embedding_matrix(chunk_texts)
                 
                 # Store in ChromaDB
                 chroma_service.store_chunks(all_chunks, embeddings)
@@ -541,20 +655,20 @@ async def search_vault(request: QueryRequest):
         start_time = time.time()
         
         if request.search_type == "semantic":
-            results = search_service.search_similar(
+            results = await search_service.search_similar(
                 request.query, 
                 request.max_results, 
                 request.filters
             )
         elif request.search_type == "keyword":
             keywords = request.query.split()
-            results = search_service.search_by_keywords(
+            results = await search_service.search_by_keywords(
                 keywords, 
                 request.max_results, 
                 request.filters
             )
         elif request.search_type == "hybrid":
-            results = search_service.hybrid_search(
+            results = await search_service.hybrid_search(
                 request.query, 
                 request.max_results, 
                 filters=request.filters
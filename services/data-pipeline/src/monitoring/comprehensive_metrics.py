@@ -154,6 +154,14 @@ class ComprehensiveMetrics:
             registry=self.registry
         )
         
+        self.query_time_to_first_token_seconds = Histogram(
+            'query_time_to_first_token_seconds',
+            'Time from query received to first streamed answer token in seconds',
+            ['provider', 'model'],
+            buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0),
+            registry=self.registry
+        )
+        
         self.llm_cost_usd = Counter(
             'llm_cost_usd',
             'Total LLM cost in USD',
@@ -511,6 +519,13 @@ class ComprehensiveMetrics:
         
         self.embedding_batch_size.labels(model=model).observe(batch_size)
     
+    def record_time_to_first_token(self, provider: str, model: str, duration: float):
+        """Record end-to-end time to the first streamed answer token (retrieval included)"""
+        self.query_time_to_first_token_seconds.labels(
+            provider=provider,
+            model=model
+        ).observe(duration)
+    
     def record_llm_request(self, provider: str, model: str, duration: float, input_tokens: int, output_tokens: int, cost: float):
         """Record LLM request metrics"""
         self.llm_requests_total.labels(
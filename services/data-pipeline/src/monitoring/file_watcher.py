@@ -1,65 +1,108 @@
 #!/usr/bin/env python3
 """
 Optimized File Watcher for Large Vaults
-Handles 5,508+ files with intelligent debouncing and resource management
+Handles 5,508+ files with a coalescing event queue, batched dispatch and backpressure
 """
 
 import asyncio
+import inspect
 import logging
 import time
 import threading
 import psutil
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Set, Callable, Optional, List, Tuple
-from collections import deque
+from typing import Dict, Callable, Optional, List, Tuple, Awaitable
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler, FileModifiedEvent, FileCreatedEvent, FileDeletedEvent
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class PendingEvent:
+    """Last event seen for a path that has not been dispatched yet"""
+    event_type: str
+    first_seen: float  # monotonic time of the first event since the last dispatch (lag is measured from here)
+    last_seen: float  # monotonic time of the latest event (debounce is measured from here)
+    src_path: Optional[str] = None  # "moved": where the note was indexed before
+    then_update: bool = False  # "moved": content also changed, re-index after the move
+
+
+@dataclass
+class FileEventBatch:
+    """One dispatch of coalesced events (moves should be applied before updates)"""
+    created: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)  # includes moved files whose content also changed
+    deleted: List[str] = field(default_factory=list)
+    moved: List[Tuple[str, str]] = field(default_factory=list)  # (old path, new path)
+
+    @property
+    def updated(self) -> List[str]:
+        return self.created + self.modified
+
+
 class OptimizedFileWatcher:
     """Optimized file watcher for large vaults with intelligent debouncing and resource management"""
     
-    def __init__(self, vault_path: str, debounce_delay: float = 1.0, max_concurrent_tasks: int = 50):
+    def __init__(self, vault_path: str, debounce_delay: float = 1.0, max_concurrent_tasks: int = 50,
+                 max_pending_events: int = 10000):
         """
         Initialize the optimized file watcher for large vaults.
         Args:
             vault_path (str): Path to the Obsidian vault
-            debounce_delay (float): Delay in seconds before processing a file (optimized for large vaults)
-            max_concurrent_tasks (int): Maximum number of concurrent processing tasks
+            debounce_delay (float): Quiet time in seconds a file needs before it is dispatched
+            max_concurrent_tasks (int): Maximum number of per-file callbacks running at once within a batch
+            max_pending_events (int): Queue depth at which the observer thread blocks (backpressure) instead of queueing more paths
         """
         self.vault_path = Path(vault_path)
         self.debounce_delay = debounce_delay
         self.max_concurrent_tasks = max_concurrent_tasks
-        self.debounce_tasks: Dict[str, asyncio.Task] = {}
+        self.max_pending_events = max_pending_events
         self.observer: Optional[Observer] = None
         self.is_running = False
         
+        # Coalescing queue: one entry per path (its last event), in first-seen order
+        self.pending_events: "OrderedDict[str, PendingEvent]" = OrderedDict()
+        self.in_flight: List[str] = []
+        self._queue_condition = threading.Condition()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None  # private loop when started outside asyncio
+        self._loop_thread_id: Optional[int] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._dispatcher = None
+        self._stopping = False
+        
         # Performance monitoring
         self.processed_files = 0
-        self.cancelled_tasks = 0
+        self.coalesced_events = 0
+        self.backpressure_waits = 0
+        self.batches_dispatched = 0
+        self.total_lag = 0.0
+        self.max_lag = 0.0
         self.start_time = time.time()
-        self.last_cleanup = time.time()
         
         # Batch processing for efficiency
-        self.pending_batch: List[Tuple[str, str]] = []
         self.batch_size = 10
-        self.batch_delay = 0.5
+        self.batch_delay = 0.5  # longest a ready file waits for its batch to fill
         
         # Resource management
         self.memory_threshold = 512 * 1024 * 1024  # 512MB
-        self.task_cleanup_interval = 30.0  # seconds
         
         # Callbacks for different file events
-        self.on_file_modified: Optional[Callable[[str], None]] = None
-        self.on_file_created: Optional[Callable[[str], None]] = None
-        self.on_file_deleted: Optional[Callable[[str], None]] = None
+        self.on_file_modified: Optional[Callable[[str], Awaitable]] = None
+        self.on_file_created: Optional[Callable[[str], Awaitable]] = None
+        self.on_file_deleted: Optional[Callable[[str], Awaitable]] = None
+        self.on_file_moved: Optional[Callable[[str, str], Awaitable]] = None  # (old path, new path)
+        # Receives each whole FileEventBatch in one call (per-file callbacks are then skipped)
+        self.on_file_batch: Optional[Callable[[FileEventBatch], Awaitable]] = None
         self.on_batch_processed: Optional[Callable[[List[str]], None]] = None
         
         logger.info(f"Initialized OptimizedFileWatcher for vault: {vault_path}")
         logger.info(f"Configuration: delay={debounce_delay}s, max_tasks={max_concurrent_tasks}, batch_size={self.batch_size}")
 
-    async def _check_resource_limits(self) -> bool:
+    def _check_resource_limits(self) -> bool:
         """Check if we're within resource limits for processing."""
         # Check memory usage
         process = psutil.Process()
@@ -69,133 +112,242 @@ class OptimizedFileWatcher:
             logger.warning(f"Memory usage high: {memory_usage / 1024 / 1024:.1f}MB, threshold: {self.memory_threshold / 1024 / 1024:.1f}MB")
             return False
             
-        # Check concurrent task limit
-        if len(self.debounce_tasks) >= self.max_concurrent_tasks:
-            logger.warning(f"Too many concurrent tasks: {len(self.debounce_tasks)}/{self.max_concurrent_tasks}")
-            return False
-            
         return True
 
-    async def _cleanup_completed_tasks(self):
-        """Clean up completed tasks to free memory."""
-        current_time = time.time()
-        if current_time - self.last_cleanup < self.task_cleanup_interval:
-            return
-            
-        completed_tasks = []
-        for file_path, task in self.debounce_tasks.items():
-            if task.done():
-                completed_tasks.append(file_path)
-                
-        for file_path in completed_tasks:
-            self.debounce_tasks.pop(file_path, None)
+    def _enqueue(self, file_path: str, event_type: str, src_path: Optional[str] = None):
+        """
+        Record an event, keeping only the last one per path. Called from the observer
+        thread; when the queue is full it blocks there until the dispatcher catches up.
+        Moves are keyed by their destination and absorb pending events of their source.
+        """
+        now = time.monotonic()
+        with self._queue_condition:
+            first_seen, then_update = now, False
+            if event_type == "moved":
+                event_type, src_path, then_update, first_seen = self._coalesce_move_source(src_path, now)
             
-        if completed_tasks:
-            logger.debug(f"Cleaned up {len(completed_tasks)} completed tasks")
+            entry = self.pending_events.get(file_path)
+            if entry is None:
+                if len(self.pending_events) >= self.max_pending_events and threading.get_ident() != self._loop_thread_id:
+                    self.backpressure_waits += 1
+                    logger.debug(f"Event queue full ({len(self.pending_events)}), waiting before queueing {file_path}")
+                    while len(self.pending_events) >= self.max_pending_events and not self._stopping:
+                        self._queue_condition.wait(timeout=1.0)
+                self.pending_events[file_path] = PendingEvent(event_type, first_seen, now, src_path, then_update)
+                wake = len(self.pending_events) == 1
+            else:
+                if event_type == "moved":
+                    # Moved over a path with pending events: the move wins
+                    entry.event_type, entry.src_path, entry.then_update = "moved", src_path, then_update
+                elif entry.event_type == "moved":
+                    if event_type == "deleted":
+                        # Moved then deleted: the chunks still stored under the source go too
+                        self.pending_events.setdefault(entry.src_path, PendingEvent("deleted", entry.first_seen, now))
+                        entry.event_type, entry.src_path = "deleted", None
+                    else:
+                        entry.then_update = True
+                elif not (entry.event_type == "created" and event_type == "modified"):
+                    # A modification right after a creation is still a new file to index
+                    entry.event_type = event_type
+                entry.first_seen = min(entry.first_seen, first_seen)
+                entry.last_seen = now
+                self.coalesced_events += 1
+                wake = False
+        
+        if wake:
+            self._wake_dispatcher()
+
+    def _coalesce_move_source(self, src_path: str, now: float) -> Tuple[str, Optional[str], bool, float]:
+        """
+        Fold a pending event of a move's source path into the move (caller holds the lock).
+        Returns:
+            Tuple of (event type, source path, re-index after move, first seen) for the destination.
+        """
+        source = self.pending_events.pop(src_path, None)
+        if source is None:
+            return "moved", src_path, False, now
+        self.coalesced_events += 1
+        if source.event_type == "created":
+            # Never indexed under the old name: index the new one
+            return "created", None, False, source.first_seen
+        if source.event_type == "moved":
+            # a -> b -> c is a single move a -> c
+            return "moved", source.src_path, source.then_update, source.first_seen
+        return "moved", src_path, True, source.first_seen
+
+    def _wake_dispatcher(self):
+        loop, wakeup = self._loop, self._wakeup
+        if loop is not None and wakeup is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def _take_ready_batch(self) -> Tuple[List[Tuple[str, PendingEvent]], float]:
+        """
+        Pop the next batch if one is due: batch_size files past their debounce delay,
+        or fewer once the oldest ready file has waited batch_delay (everything when stopping).
+        Returns:
+            Tuple of the batch (possibly empty) and seconds until the next one can be due.
+        """
+        now = time.monotonic()
+        ready = []
+        oldest_ready = None
+        next_ready = None
+        with self._queue_condition:
+            for file_path, entry in self.pending_events.items():
+                ready_at = entry.last_seen + self.debounce_delay
+                if self._stopping or ready_at <= now:
+                    ready.append(file_path)
+                    oldest_ready = ready_at if oldest_ready is None else min(oldest_ready, ready_at)
+                else:
+                    next_ready = ready_at if next_ready is None else min(next_ready, ready_at)
             
-        self.last_cleanup = current_time
+            due = ready and (self._stopping or len(ready) >= self.batch_size
+                             or now - oldest_ready >= self.batch_delay)
+            if due:
+                batch = [(file_path, self.pending_events.pop(file_path)) for file_path in ready[:self.batch_size]]
+                self.in_flight = [file_path for file_path, _ in batch]
+                self._queue_condition.notify_all()
+                return batch, 0.0
+        
+        deadlines = [t for t in (next_ready, oldest_ready + self.batch_delay if oldest_ready is not None else None)
+                     if t is not None]
+        # Without pending files only a new event (or stop) wakes the dispatcher
+        wait = max(min(deadlines) - now, 0.01) if deadlines else None
+        return [], wait
 
-    async def _debounced_process_file(self, file_path: str, event_type: str):
-        """Wait for debounce delay, then process the file with resource management."""
+    async def _dispatch_loop(self):
+        """Single consumer of the queue: batches are dispatched one after another."""
+        self._loop_thread_id = threading.get_ident()
+        while True:
+            self._wakeup.clear()
+            batch, wait = self._take_ready_batch()
+            if batch:
+                await self._dispatch_batch(batch)
+                continue
+            if self._stopping and not self.pending_events:
+                break
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _dispatch_batch(self, batch: List[Tuple[str, PendingEvent]]):
+        """Hand a batch to the callbacks; never drops files, only delays them."""
+        start_time = time.monotonic()
+        lags = [start_time - entry.first_seen for _, entry in batch]
+        file_paths = [file_path for file_path, _ in batch]
+        
         try:
-            await asyncio.sleep(self.debounce_delay)
+            if not self._check_resource_limits():
+                # Give memory a moment to come down before adding to it
+                await asyncio.sleep(self.batch_delay)
             
-            # Check resource limits before processing
-            if not await self._check_resource_limits():
-                logger.warning(f"Skipping processing of {file_path} due to resource limits")
-                return
-                
-            # Process the file based on event type
-            start_time = time.time()
+            semaphore = asyncio.Semaphore(self.max_concurrent_tasks)
             
-            if event_type == "modified" and self.on_file_modified:
-                logger.debug(f"Processing modified file: {file_path}")
-                await self.on_file_modified(file_path)
-            elif event_type == "created" and self.on_file_created:
-                logger.debug(f"Processing created file: {file_path}")
-                await self.on_file_created(file_path)
-            elif event_type == "deleted" and self.on_file_deleted:
-                logger.debug(f"Processing deleted file: {file_path}")
-                await self.on_file_deleted(file_path)
-                
-            # Update performance metrics
-            processing_time = time.time() - start_time
-            self.processed_files += 1
+            async def run_callback(callback, *args):
+                async with semaphore:
+                    await callback(*args)
             
-            if processing_time > 1.0:  # Log slow processing
-                logger.warning(f"Slow file processing: {file_path} took {processing_time:.2f}s")
-                
-        except asyncio.CancelledError:
-            self.cancelled_tasks += 1
-            logger.debug(f"Debounced task cancelled for: {file_path}")
+            events = FileEventBatch()
+            for file_path, entry in batch:
+                if entry.event_type == "moved":
+                    events.moved.append((entry.src_path, file_path))
+                    if entry.then_update:
+                        events.modified.append(file_path)
+                else:
+                    getattr(events, entry.event_type).append(file_path)
+            
+            if self.on_file_batch:
+                calls = [self.on_file_batch(events)]
+            else:
+                if self.on_file_moved:
+                    # Moves first, so re-indexing a moved file finds its chunks under the new path
+                    results = await asyncio.gather(*(run_callback(self.on_file_moved, old_path, new_path)
+                                                     for old_path, new_path in events.moved),
+                                                   return_exceptions=True)
+                    for result in results:
+                        if isinstance(result, Exception):
+                            logger.error(f"Error processing file move: {result}")
+                else:
+                    events.deleted.extend(old_path for old_path, _ in events.moved)
+                    events.created.extend(new_path for _, new_path in events.moved if new_path not in events.modified)
+                calls = []
+                for callback, file_paths in ((self.on_file_created, events.created),
+                                             (self.on_file_modified, events.modified),
+                                             (self.on_file_deleted, events.deleted)):
+                    if callback:
+                        calls.extend(run_callback(callback, file_path) for file_path in file_paths)
+            
+            for result in await asyncio.gather(*calls, return_exceptions=True):
+                if isinstance(result, Exception):
+                    logger.error(f"Error processing file batch: {result}")
+            
+            if self.on_batch_processed:
+                result = self.on_batch_processed(file_paths)
+                if inspect.isawaitable(result):
+                    await result
         except Exception as e:
-            logger.error(f"Error processing file {file_path}: {e}")
+            logger.error(f"Error dispatching batch of {len(batch)} files: {e}")
         finally:
-            self.debounce_tasks.pop(file_path, None)
-            # Periodic cleanup
-            await self._cleanup_completed_tasks()
+            self.in_flight = []
+        
+        # Update performance metrics
+        processing_time = time.monotonic() - start_time
+        self.processed_files += len(batch)
+        self.batches_dispatched += 1
+        self.total_lag += sum(lags)
+        self.max_lag = max(self.max_lag, max(lags))
+        
+        if processing_time > 1.0:  # Log slow processing
+            logger.warning(f"Slow batch processing: {len(batch)} files took {processing_time:.2f}s")
+        
+        try:
+            from .metrics import get_metrics
+            metrics = get_metrics()
+            metrics.record_file_watcher_batch(len(batch), lags)
+            metrics.update_file_watcher_queue_depth(len(self.pending_events))
+        except Exception as e:
+            logger.warning(f"Failed to record metrics: {e}")
 
-    def _handle_file_event(self, event, event_type: str):
-        """Handle file system events with optimized debouncing for large vaults."""
-        if event.is_directory:
-            return
-            
+    def _relative_markdown_path(self, path: str) -> Optional[str]:
+        """Vault-relative path of a markdown file, or None for anything else."""
         # Only process markdown files
-        if not event.src_path.endswith('.md'):
-            return
-            
+        if not path.endswith('.md'):
+            return None
+        
         # Convert to relative path
         try:
-            relative_path = Path(event.src_path).relative_to(self.vault_path).as_posix()
+            return Path(path).relative_to(self.vault_path).as_posix()
         except ValueError:
             # File is outside vault, ignore
+            return None
+
+    def _handle_file_event(self, event, event_type: str):
+        """Handle file system events (observer thread) by queueing them for batched dispatch."""
+        if event.is_directory:
             return
-            
-        file_path = relative_path
         
-        # Skip if we're at resource limits
-        if len(self.debounce_tasks) >= self.max_concurrent_tasks:
-            logger.debug(f"Skipping {event_type} event for {file_path} - too many concurrent tasks")
+        relative_path = self._relative_markdown_path(event.src_path)
+        if relative_path is not None:
+            self._enqueue(relative_path, event_type)
+
+    def _on_moved(self, event):
+        """
+        Handle rename/move events. Directory moves need nothing here: watchdog also
+        emits a moved event for every file inside the directory.
+        """
+        if event.is_directory:
             return
         
-        # Cancel any existing task for this file
-        if file_path in self.debounce_tasks:
-            existing_task = self.debounce_tasks[file_path]
-            if hasattr(existing_task, 'cancel'):
-                existing_task.cancel()  # asyncio.Task
-            # Threads can't be cancelled, just replace them
-            self.cancelled_tasks += 1
-            logger.debug(f"Cancelled previous task for: {file_path}")
-
-        # Create a new debounced task
-        try:
-            loop = asyncio.get_running_loop()
-            task = loop.create_task(self._debounced_process_file(file_path, event_type))
-            self.debounce_tasks[file_path] = task
-            logger.debug(f"Created debounced task for {event_type}: {file_path} (total: {len(self.debounce_tasks)})")
-        except RuntimeError:
-            # No event loop running, use threading for debouncing
-            logger.debug(f"No event loop running, using threading for {event_type}: {file_path}")
-            
-            # Cancel any existing thread for this file
-            if file_path in self.debounce_tasks:
-                if hasattr(self.debounce_tasks[file_path], 'cancel'):
-                    self.debounce_tasks[file_path].cancel()
-                else:
-                    # It's a thread, we can't cancel it easily, just replace it
-                    pass
-            
-            # Create a new thread for debounced processing
-            def debounced_thread():
-                time.sleep(self.debounce_delay)
-                # Simulate processing by updating metrics
-                self.processed_files += 1
-                logger.debug(f"Processed {event_type} file: {file_path}")
-            
-            thread = threading.Thread(target=debounced_thread, daemon=True)
-            thread.start()
-            self.debounce_tasks[file_path] = thread
-            logger.debug(f"Created debounced thread for {event_type}: {file_path} (total: {len(self.debounce_tasks)})")
+        old_path = self._relative_markdown_path(event.src_path)
+        new_path = self._relative_markdown_path(event.dest_path)
+        if old_path is not None and new_path is not None:
+            self._enqueue(new_path, "moved", src_path=old_path)
+        elif new_path is not None:
+            # Atomic save (temp file renamed over the note) or moved into the vault
+            self._enqueue(new_path, "modified")
+        elif old_path is not None:
+            # Renamed away from .md or moved out of the vault
+            self._enqueue(old_path, "deleted")
 
     def _on_modified(self, event):
         """Handle file modification events."""
@@ -228,6 +380,22 @@ class OptimizedFileWatcher:
                 
             def on_deleted(self, event):
                 self.watcher._on_deleted(event)
+                
+            def on_moved(self, event):
+                self.watcher._on_moved(event)
+
+        # Events arrive on the observer thread and are dispatched on this loop
+        try:
+            self._loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Started outside asyncio: run the dispatcher on a private loop thread
+            self._loop = asyncio.new_event_loop()
+            self._loop_thread = threading.Thread(target=self._loop.run_forever, name="file-watcher-dispatch",
+                                                 daemon=True)
+            self._loop_thread.start()
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self._dispatcher = asyncio.run_coroutine_threadsafe(self._dispatch_loop(), self._loop)
 
         # Start observer
         self.observer = Observer()
@@ -242,22 +410,31 @@ class OptimizedFileWatcher:
         logger.info(f"Started file watcher for vault: {self.vault_path}")
 
     def stop(self):
-        """Stop the file watcher."""
+        """Stop the file watcher; queued events are still dispatched (see wait_for_quiet_period)."""
         if not self.is_running:
             return
-            
-        # Cancel all pending tasks/threads
-        for task in self.debounce_tasks.values():
-            if hasattr(task, 'cancel'):
-                task.cancel()  # asyncio.Task
-            # Threads can't be cancelled, they'll finish naturally
-        self.debounce_tasks.clear()
+        
+        # Release an observer thread blocked on a full queue, then flush without debounce
+        with self._queue_condition:
+            self._stopping = True
+            self._queue_condition.notify_all()
         
         # Stop observer
         if self.observer:
             self.observer.stop()
             self.observer.join()
             self.observer = None
+        
+        self._wake_dispatcher()
+        if self._loop_thread is not None:
+            # Nothing else runs on the private loop, so drain it here
+            try:
+                self._dispatcher.result(timeout=30.0)
+            except Exception as e:
+                logger.warning(f"File watcher dispatcher did not drain cleanly: {e}")
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._loop_thread.join(timeout=5.0)
+            self._loop_thread = None
             
         self.is_running = False
         logger.info("Stopped file watcher")
@@ -274,40 +451,54 @@ class OptimizedFileWatcher:
         # Performance metrics
         files_per_second = self.processed_files / uptime if uptime > 0 else 0
         
+        with self._queue_condition:
+            pending_files = list(self.pending_events)
+            oldest = min((entry.first_seen for entry in self.pending_events.values()), default=None)
+        in_flight = list(self.in_flight)
+        
         return {
             "is_running": self.is_running,
             "vault_path": str(self.vault_path),
             "debounce_delay": self.debounce_delay,
             "max_concurrent_tasks": self.max_concurrent_tasks,
-            "pending_tasks": len(self.debounce_tasks),
-            "pending_files": list(self.debounce_tasks.keys()),
+            "pending_tasks": len(pending_files) + len(in_flight),
+            "pending_files": pending_files[:100],
+            "queue": {
+                "depth": len(pending_files),
+                "max_depth": self.max_pending_events,
+                "in_flight": len(in_flight),
+                "oldest_event_age_seconds": round(time.monotonic() - oldest, 3) if oldest is not None else 0.0,
+                "coalesced_events": self.coalesced_events,
+                "backpressure_waits": self.backpressure_waits
+            },
             "performance": {
                 "processed_files": self.processed_files,
-                "cancelled_tasks": self.cancelled_tasks,
+                "batches_dispatched": self.batches_dispatched,
+                "avg_lag_seconds": round(self.total_lag / self.processed_files, 3) if self.processed_files else 0.0,
+                "max_lag_seconds": round(self.max_lag, 3),
                 "files_per_second": round(files_per_second, 2),
                 "uptime_seconds": round(uptime, 1)
             },
             "resource_usage": {
                 "memory_mb": round(memory_usage, 1),
                 "memory_threshold_mb": round(self.memory_threshold / 1024 / 1024, 1),
-                "concurrent_tasks": len(self.debounce_tasks),
+                "concurrent_tasks": len(in_flight),
                 "task_limit": self.max_concurrent_tasks
             },
             "configuration": {
                 "batch_size": self.batch_size,
-                "batch_delay": self.batch_delay,
-                "cleanup_interval": self.task_cleanup_interval
+                "batch_delay": self.batch_delay
             }
         }
 
     async def wait_for_quiet_period(self, timeout: float = 30.0) -> bool:
-        """Wait for all pending tasks to complete."""
+        """Wait until every queued event has been dispatched and processed."""
         start_time = time.time()
         
-        while self.debounce_tasks and (time.time() - start_time) < timeout:
+        while (self.pending_events or self.in_flight) and (time.time() - start_time) < timeout:
             await asyncio.sleep(0.1)
             
-        return len(self.debounce_tasks) == 0
+        return not self.pending_events and not self.in_flight
 
     def optimize_for_vault_size(self, file_count: int):
         """Optimize watcher configuration based on vault size."""
@@ -344,19 +535,21 @@ Status: {'🟢 Running' if status['is_running'] else '🔴 Stopped'}
 
 📈 PERFORMANCE METRICS
 - Files Processed: {status['performance']['processed_files']}
-- Cancelled Tasks: {status['performance']['cancelled_tasks']}
+- Batches Dispatched: {status['performance']['batches_dispatched']}
+- Coalesced Events: {status['queue']['coalesced_events']}
+- Event Lag: {status['performance']['avg_lag_seconds']}s avg, {status['performance']['max_lag_seconds']}s max
 - Processing Rate: {status['performance']['files_per_second']} files/sec
 - Uptime: {status['performance']['uptime_seconds']}s
 
 💾 RESOURCE USAGE
 - Memory: {status['resource_usage']['memory_mb']}MB / {status['resource_usage']['memory_threshold_mb']}MB
 - Concurrent Tasks: {status['resource_usage']['concurrent_tasks']}/{status['resource_usage']['task_limit']}
-- Pending Files: {len(status['pending_files'])}
+- Queue Depth: {status['queue']['depth']}/{status['queue']['max_depth']}
 
 ⚙️ CONFIGURATION
 - Debounce Delay: {status['debounce_delay']}s
 - Batch Size: {status['configuration']['batch_size']}
-- Cleanup Interval: {status['configuration']['cleanup_interval']}s
+- Batch Delay: {status['configuration']['batch_delay']}s
         """
         
         return report.strip()
@@ -6,13 +6,17 @@ Handles atomic updates to prevent duplicates and maintain consistency
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+import os
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 
 from ..ingestion.filesystem_client import FilesystemVaultClient
+from ..ingestion.vault_manifest import VaultManifest
 from ..processing.content_processor import ContentProcessor
+from ..processing.parallel_chunker import ParallelChunkingBackend
 from ..embeddings.embedding_service import EmbeddingService
-from ..vector.chroma_service import ChromaService
+from ..vector.chroma_service import ChromaService, content_chunk_ids
+from ..cache.version_tracker import CollectionVersionTracker, get_version_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -23,7 +27,12 @@ class IncrementalUpdateService:
                  vault_path: str,
                  chroma_service: ChromaService,
                  embedding_service: EmbeddingService,
-                 content_processor: ContentProcessor):
+                 content_processor: ContentProcessor,
+                 chunking_backend: Optional[ParallelChunkingBackend] = None,
+                 version_tracker: Optional[CollectionVersionTracker] = None,
+                 manifest: Optional[VaultManifest] = None,
+                 diff_updates: bool = True,
+                 filesystem_client: Optional[FilesystemVaultClient] = None):
         """
         Initialize the incremental update service.
         Args:
@@ -31,24 +40,142 @@ class IncrementalUpdateService:
             chroma_service (ChromaService): ChromaDB service instance
             embedding_service (EmbeddingService): Embedding service instance
             content_processor (ContentProcessor): Content processor instance
+            chunking_backend (ParallelChunkingBackend): Optional process-pool chunker used by batch_process_files;
+                must match content_processor (see ParallelChunkingBackend.for_processor)
+            version_tracker (CollectionVersionTracker): Receives rewritten/deleted paths to invalidate search caches
+            manifest (VaultManifest): Optional vault manifest kept current with every stored/deleted file
+            diff_updates (bool): Re-embed only chunks whose content changed (False deletes and re-embeds the whole file)
+            filesystem_client (FilesystemVaultClient): Vault reader to share (one is built for vault_path otherwise)
         """
+        if chunking_backend is not None and not chunking_backend.matches(content_processor):
+            # Both chunk the same notes; differing chunks would re-key (and re-embed) them on every switch
+            raise ValueError(f"chunking_backend workers run {chunking_backend.processor_class.__name__} with "
+                             f"{chunking_backend.processor_config}, which does not match content_processor "
+                             f"({type(content_processor).__name__}); build it with "
+                             f"ParallelChunkingBackend.for_processor(content_processor)")
         self.vault_path = vault_path
         self.chroma_service = chroma_service
         self.embedding_service = embedding_service
         self.content_processor = content_processor
-        self.filesystem_client = FilesystemVaultClient(vault_path)
+        self.chunking_backend = chunking_backend
+        self.version_tracker = version_tracker or get_version_tracker()
+        self.manifest = manifest
+        self.diff_updates = diff_updates
+        self.filesystem_client = filesystem_client or FilesystemVaultClient(vault_path)
         
         logger.info(f"Initialized IncrementalUpdateService for vault: {vault_path}")
 
-    async def process_file_update(self, file_path: str) -> Dict[str, Any]:
+    async def process_file_update(self,
+                                  file_path: str,
+                                  file_content: Optional[Dict[str, Any]] = None,
+                                  chunks: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
         """
         Process a single file update atomically.
         Args:
             file_path (str): Relative path to the file
+            file_content (Dict[str, Any]): Already-read get_file_content payload (optional)
+            chunks (List[Dict[str, Any]]): Precomputed chunks for file_content (optional)
         Returns:
             Dict[str, Any]: Processing results
         """
+        # Searches overlapping the delete-then-store window must not be cached
+        with self.version_tracker.updating():
+            if self.diff_updates:
+                return await self._apply_file_diff(file_path, file_content, chunks)
+            return await self._apply_file_update(file_path, file_content, chunks)
+
+    async def _apply_file_diff(self,
+                               file_path: str,
+                               file_content: Optional[Dict[str, Any]],
+                               chunks: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """
+        Re-chunk one file and write only the difference: chunks whose content-addressed id
+        is already stored keep their embedding (metadata is refreshed), new ones are
+        embedded and upserted, and chunks no longer produced are deleted last.
+        """
         start_time = asyncio.get_event_loop().time()
+        written = False
+        
+        try:
+            logger.info(f"Processing file update (diff): {file_path}")
+            
+            if file_content is None:
+                file_content = await self.filesystem_client.get_file_content(file_path)
+            if chunks is None:
+                chunks = self.content_processor.chunk_content(
+                    content=file_content['content'],
+                    file_metadata=file_content['metadata'],
+                    path=file_path
+                )
+            
+            new_ids = content_chunk_ids(chunks)
+            stored_ids = set(self.chroma_service.get_chunk_ids(file_path))
+            new_id_set = set(new_ids)
+            fresh = [i for i, chunk_id in enumerate(new_ids) if chunk_id not in stored_ids]
+            kept = [i for i, chunk_id in enumerate(new_ids) if chunk_id in stored_ids]
+            removed = [chunk_id for chunk_id in stored_ids if chunk_id not in new_id_set]
+            
+            # New chunks go in before old ones come out, so the note never drops out of search
+            written = True
+            if fresh:
+                embeddings = self.embedding_service.batch_generate_embedding_matrix(
+                    [chunks[i]['content'] for i in fresh]
+                )
+                self.chroma_service.store_embeddings(
+                    [chunks[i] for i in fresh], embeddings, ids=[new_ids[i] for i in fresh]
+                )
+            if kept:
+                self.chroma_service.update_chunk_metadata([chunks[i] for i in kept], [new_ids[i] for i in kept])
+            self.chroma_service.delete_chunks(removed)
+            
+            if chunks:
+                # Nothing stored before: the note joins the collection and may match any cached query
+                self.version_tracker.record_change(
+                    file_path, self.version_tracker.content_version(file_content['content']), added=not stored_ids
+                )
+            elif removed:
+                self.version_tracker.record_change(file_path, None)
+            self._record_manifest(file_path, file_content, new_ids)
+            
+            processing_time = (asyncio.get_event_loop().time() - start_time) * 1000
+            logger.info(f"Successfully processed file: {file_path} ({len(fresh)} embedded, {len(kept)} reused, "
+                        f"{len(removed)} deleted, {processing_time:.2f}ms)")
+            
+            return {
+                "success": True,
+                "file_path": file_path,
+                "chunks_processed": len(chunks),
+                "chunks_embedded": len(fresh),
+                "chunks_reused": len(kept),
+                "chunks_deleted": len(removed),
+                "processing_time_ms": processing_time,
+                "file_size": file_content['metadata'].get('file_size', 0),
+                "file_word_count": file_content['metadata'].get('file_word_count', 0)
+            }
+            
+        except Exception as e:
+            processing_time = (asyncio.get_event_loop().time() - start_time) * 1000
+            logger.error(f"Error processing file {file_path}: {e}")
+            if written:
+                # Some writes may have landed before the failure
+                self.version_tracker.record_change(file_path, None)
+            if self.manifest is not None:
+                self.manifest.remove([file_path])
+            
+            return {
+                "success": False,
+                "file_path": file_path,
+                "error": str(e),
+                "processing_time_ms": processing_time
+            }
+
+    async def _apply_file_update(self,
+                                 file_path: str,
+                                 file_content: Optional[Dict[str, Any]],
+                                 chunks: Optional[List[Dict[str, Any]]]) -> Dict[str, Any]:
+        """Delete, re-chunk, re-embed and store one file, then report its new version."""
+        start_time = asyncio.get_event_loop().time()
+        deleted_count = 0
         
         try:
             logger.info(f"Processing file update: {file_path}")
@@ -58,17 +185,22 @@ class IncrementalUpdateService:
             logger.info(f"Deleted {deleted_count} existing chunks for: {file_path}")
             
             # Step 2: Read and process the updated file
-            file_content = await self.filesystem_client.get_file_content(file_path)
+            if file_content is None:
+                file_content = await self.filesystem_client.get_file_content(file_path)
             
             # Step 3: Generate chunks
-            chunks = self.content_processor.chunk_content(
-                content=file_content['content'],
-                file_metadata=file_content['metadata'],
-                path=file_path
-            )
+            if chunks is None:
+                chunks = self.content_processor.chunk_content(
+                    content=file_content['content'],
+                    file_metadata=file_content['metadata'],
+                    path=file_path
+                )
             
             if not chunks:
                 logger.warning(f"No chunks generated for file: {file_path}")
+                if deleted_count:
+                    self.version_tracker.record_change(file_path, None)
+                self._record_manifest(file_path, file_content, [])
                 return {
                     "success": True,
                     "file_path": file_path,
@@ -79,10 +211,14 @@ class IncrementalUpdateService:
             
             # Step 4: Generate embeddings
             texts = [chunk['content'] for chunk in chunks]
-            embeddings = self.embedding_service.batch_generate_embeddings(texts)
+            embeddings = self.embedding_service.batch_generate_embedding_matrix(texts)
             
             # Step 5: Store new chunks atomically
-            self.chroma_service.store_embeddings(chunks, embeddings)
+            chunk_ids = self.chroma_service.store_embeddings(chunks, embeddings)
+            self.version_tracker.record_change(
+                file_path, self.version_tracker.content_version(file_content['content']), added=not deleted_count
+            )
+            self._record_manifest(file_path, file_content, chunk_ids)
             
             processing_time = (asyncio.get_event_loop().time() - start_time) * 1000
             
@@ -101,6 +237,12 @@ class IncrementalUpdateService:
         except Exception as e:
             processing_time = (asyncio.get_event_loop().time() - start_time) * 1000
             logger.error(f"Error processing file {file_path}: {e}")
+            if deleted_count:
+                # Old chunks are gone even though the new ones were not stored
+                self.version_tracker.record_change(file_path, None)
+            if self.manifest is not None:
+                # Forgotten files are picked up as new by the next startup sync
+                self.manifest.remove([file_path])
             
             return {
                 "success": False,
@@ -124,6 +266,9 @@ class IncrementalUpdateService:
             
             # Delete all chunks for this file
             deleted_count = await self._delete_existing_chunks(file_path)
+            self.version_tracker.record_change(file_path, None)
+            if self.manifest is not None:
+                self.manifest.remove([file_path])
             
             processing_time = (asyncio.get_event_loop().time() - start_time) * 1000
             
@@ -147,6 +292,158 @@ class IncrementalUpdateService:
                 "processing_time_ms": processing_time
             }
 
+    async def process_file_move(self, old_path: str, new_path: str) -> Dict[str, Any]:
+        """
+        Process a rename/move by re-keying the stored chunks under the new path.
+        Only path-derived metadata changes; embeddings are reused. Falls back to a
+        regular update when the old path was never indexed.
+        Args:
+            old_path (str): Relative path before the move
+            new_path (str): Relative path after the move
+        Returns:
+            Dict[str, Any]: Move results
+        """
+        start_time = asyncio.get_event_loop().time()
+        
+        try:
+            logger.info(f"Processing file move: {old_path} -> {new_path}")
+            
+            with self.version_tracker.updating():
+                new_ids = self.chroma_service.move_file_chunks(
+                    old_path, new_path, self.filesystem_client.path_metadata(new_path)
+                )
+                if new_ids:
+                    # Same content under a new path: cached searches that returned the old path are stale
+                    self.version_tracker.record_changes({
+                        old_path: None,
+                        new_path: self.version_tracker.version_of(old_path) or f"moved:{old_path}"
+                    })
+            
+            if not new_ids:
+                logger.info(f"Nothing indexed for {old_path}, indexing {new_path} as a new file")
+                if self.manifest is not None:
+                    self.manifest.remove([old_path])
+                result = await self.process_file_update(new_path)
+                result["moved_from"] = old_path
+                return result
+            
+            if self.manifest is not None and not self.manifest.rename(old_path, new_path, new_ids):
+                stat = os.stat(os.path.join(self.vault_path, new_path))
+                self.manifest.record(new_path, stat.st_size, stat.st_mtime, None, new_ids)
+            
+            processing_time = (asyncio.get_event_loop().time() - start_time) * 1000
+            logger.info(f"Successfully moved {len(new_ids)} chunks: {old_path} -> {new_path} ({processing_time:.2f}ms)")
+            
+            return {
+                "success": True,
+                "file_path": new_path,
+                "moved_from": old_path,
+                "chunks_moved": len(new_ids),
+                "chunks_embedded": 0,
+                "processing_time_ms": processing_time
+            }
+            
+        except Exception as e:
+            logger.error(f"Error moving file {old_path} -> {new_path}: {e}; re-indexing instead")
+            await self.process_file_deletion(old_path)
+            result = await self.process_file_update(new_path)
+            result["moved_from"] = old_path
+            return result
+
+    async def process_file_changes(self,
+                                   updated: List[str],
+                                   deleted: List[str],
+                                   moved: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """
+        Apply one batch of watcher events: moves first (metadata only), then updates, then deletions.
+        A deleted note and a new note with the same content hash (editors and sync tools that
+        report a rename as delete + create) are treated as a move.
+        Args:
+            updated (List[str]): Created or modified paths
+            deleted (List[str]): Deleted paths
+            moved (List[Tuple[str, str]]): (old path, new path) pairs
+        Returns:
+            Dict[str, Any]: Per-kind results
+        """
+        start_time = asyncio.get_event_loop().time()
+        moved = list(moved)
+        
+        paired = await self._match_moves_by_content(updated, deleted)
+        if paired:
+            logger.info(f"Matched {len(paired)} delete+create pairs by content hash")
+            paired_old = {old_path for old_path, _ in paired}
+            paired_new = {new_path for _, new_path in paired}
+            moved.extend(paired)
+            updated = [file_path for file_path in updated if file_path not in paired_new]
+            deleted = [file_path for file_path in deleted if file_path not in paired_old]
+        
+        move_results = [await self.process_file_move(old_path, new_path) for old_path, new_path in moved]
+        update_results = (await self.batch_process_files(updated))["results"] if updated else []
+        deletion_results = [await self.process_file_deletion(file_path) for file_path in deleted]
+        
+        results = move_results + list(update_results) + deletion_results
+        successful = sum(1 for r in results if isinstance(r, dict) and r.get('success', False))
+        processing_time = (asyncio.get_event_loop().time() - start_time) * 1000
+        
+        return {
+            "success": successful == len(results),
+            "moved": len(moved),
+            "paired_by_content": len(paired),
+            "updated": len(updated),
+            "deleted": len(deleted),
+            "successful": successful,
+            "failed": len(results) - successful,
+            "processing_time_ms": processing_time,
+            "results": results
+        }
+
+    async def _match_moves_by_content(self, created: List[str], deleted: List[str]) -> List[Tuple[str, str]]:
+        """
+        Pair deleted notes with unindexed new notes of identical content, using the manifest's
+        size and content hash (only new files whose size matches a deleted note are read).
+        """
+        if self.manifest is None or not created or not deleted:
+            return []
+        
+        by_size: Dict[int, List[Any]] = {}
+        for file_path in deleted:
+            entry = self.manifest.get(file_path)
+            if entry is not None and entry.content_hash:
+                by_size.setdefault(entry.size, []).append(entry)
+        if not by_size:
+            return []
+        
+        pairs = []
+        for file_path in created:
+            if self.manifest.get(file_path) is not None:
+                continue  # already indexed: a modification, not the target of a move
+            try:
+                candidates = by_size.get(os.stat(os.path.join(self.vault_path, file_path)).st_size)
+                if not candidates:
+                    continue
+                file_content = await self.filesystem_client.get_file_content(file_path)
+            except Exception:
+                continue  # unreadable now: left to the regular update path
+            for entry in candidates:
+                if entry.content_hash == file_content.get('content_hash'):
+                    pairs.append((entry.path, file_path))
+                    candidates.remove(entry)
+                    break
+        return pairs
+
+    def _record_manifest(self, file_path: str, file_content: Dict[str, Any], chunk_ids: List[str]):
+        """Record a stored file's stat, content hash and chunk ids in the manifest."""
+        if self.manifest is None:
+            return
+        metadata = file_content.get('metadata', {})
+        self.manifest.record(
+            file_path,
+            metadata.get('file_size', 0),
+            metadata.get('file_modified', 0),
+            file_content.get('content_hash'),
+            chunk_ids or []
+        )
+
     async def _delete_existing_chunks(self, file_path: str) -> int:
         """
         Delete all existing chunks for a file from ChromaDB.
@@ -166,7 +463,7 @@ class IncrementalUpdateService:
                 return 0
                 
             # Delete the chunks
-            self.chroma_service.collection.delete(ids=results['ids'])
+            self.chroma_service.delete_chunks(results['ids'])
             
             return len(results['ids'])
             
@@ -190,12 +487,32 @@ class IncrementalUpdateService:
         # Process files concurrently (but limit concurrency to avoid overwhelming the system)
         semaphore = asyncio.Semaphore(5)  # Max 5 concurrent file processes
         
-        async def process_with_semaphore(file_path: str):
+        async def process_with_semaphore(file_path: str, file_content=None, chunks=None):
             async with semaphore:
-                return await self.process_file_update(file_path)
+                return await self.process_file_update(file_path, file_content, chunks)
+        
+        if self.chunking_backend is not None and file_paths:
+            # Read everything first, then chunk the whole batch across the worker pool
+            async def read_with_semaphore(file_path: str):
+                async with semaphore:
+                    return await self.filesystem_client.get_file_content(file_path)
+            
+            contents = await asyncio.gather(*[read_with_semaphore(p) for p in file_paths], return_exceptions=True)
+            readable = [content for content in contents if not isinstance(content, Exception)]
+            chunked = iter(await self.chunking_backend.achunk_files(readable, return_exceptions=True))
+            
+            tasks = []
+            for file_path, content in zip(file_paths, contents):
+                # Unreadable or unchunkable files fall back to the regular per-file path
+                file_chunks = None if isinstance(content, Exception) else next(chunked)
+                if isinstance(content, Exception) or isinstance(file_chunks, Exception):
+                    tasks.append(process_with_semaphore(file_path))
+                else:
+                    tasks.append(process_with_semaphore(file_path, content, file_chunks))
+        else:
+            tasks = [process_with_semaphore(file_path) for file_path in file_paths]
         
         # Process all files
-        tasks = [process_with_semaphore(file_path) for file_path in file_paths]
         results = await asyncio.gather(*tasks, return_exceptions=True)
         
         # Analyze results
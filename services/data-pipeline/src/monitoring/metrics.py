@@ -6,7 +6,7 @@ Includes ChromaDB, Embedding Service, and Search Performance Metrics
 
 import time
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from prometheus_client import Counter, Histogram, Gauge, Info, CollectorRegistry, start_http_server
 from opentelemetry import metrics
 from opentelemetry.sdk.metrics import MeterProvider
@@ -91,6 +91,27 @@ class DataPipelineMetrics:
             registry=self.registry
         )
         
+        self.embedding_store_hits = Counter(
+            'embedding_store_hits_total',
+            'Total number of persistent embedding store hits',
+            ['model_name', 'tier'],
+            registry=self.registry
+        )
+        
+        self.embedding_store_misses = Counter(
+            'embedding_store_misses_total',
+            'Total number of persistent embedding store misses',
+            ['model_name'],
+            registry=self.registry
+        )
+        
+        self.embedding_store_entries = Gauge(
+            'embedding_store_entries',
+            'Number of vectors held by the embedding store',
+            ['model_name', 'tier'],
+            registry=self.registry
+        )
+        
         # === SEARCH SERVICE METRICS ===
         self.search_requests = Counter(
             'search_requests_total',
@@ -131,6 +152,14 @@ class DataPipelineMetrics:
             registry=self.registry
         )
         
+        self.llm_time_to_first_token = Histogram(
+            'llm_time_to_first_token_seconds',
+            'Time from request to the first streamed LLM token in seconds',
+            ['model_name'],
+            buckets=[0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0],
+            registry=self.registry
+        )
+        
         self.llm_tokens_used = Counter(
             'llm_tokens_used_total',
             'Total number of tokens used by LLM',
@@ -138,6 +167,27 @@ class DataPipelineMetrics:
             registry=self.registry
         )
         
+        # === FILE WATCHER METRICS ===
+        self.file_watcher_queue_depth = Gauge(
+            'file_watcher_queue_depth',
+            'Number of coalesced file events waiting to be dispatched',
+            registry=self.registry
+        )
+        
+        self.file_watcher_event_lag = Histogram(
+            'file_watcher_event_lag_seconds',
+            'Time from the first event for a file to its dispatch in seconds',
+            buckets=[0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 300.0],
+            registry=self.registry
+        )
+        
+        self.file_watcher_batch_size = Histogram(
+            'file_watcher_batch_size',
+            'Number of files dispatched per file watcher batch',
+            buckets=[1, 5, 10, 20, 50, 100, 500],
+            registry=self.registry
+        )
+        
         # === SYSTEM METRICS ===
         self.active_connections = Gauge(
             'active_connections',
@@ -210,13 +260,25 @@ class DataPipelineMetrics:
         """Record embedding batch size"""
         self.embedding_batch_size.labels(model_name=model_name).observe(batch_size)
     
-    def record_embedding_cache_hit(self, model_name: str):
+    def record_embedding_cache_hit(self, model_name: str, count: int = 1):
         """Record embedding cache hit"""
-        self.embedding_cache_hits.labels(model_name=model_name).inc()
+        self.embedding_cache_hits.labels(model_name=model_name).inc(count)
     
-    def record_embedding_cache_miss(self, model_name: str):
+    def record_embedding_cache_miss(self, model_name: str, count: int = 1):
         """Record embedding cache miss"""
-        self.embedding_cache_misses.labels(model_name=model_name).inc()
+        self.embedding_cache_misses.labels(model_name=model_name).inc(count)
+    
+    def record_embedding_store_hit(self, model_name: str, tier: str, count: int = 1):
+        """Record persistent embedding store hits ('memory' or 'disk' tier)"""
+        self.embedding_store_hits.labels(model_name=model_name, tier=tier).inc(count)
+    
+    def record_embedding_store_miss(self, model_name: str, count: int = 1):
+        """Record persistent embedding store misses"""
+        self.embedding_store_misses.labels(model_name=model_name).inc(count)
+    
+    def update_embedding_store_size(self, model_name: str, tier: str, size: int):
+        """Update number of vectors in an embedding store tier"""
+        self.embedding_store_entries.labels(model_name=model_name, tier=tier).set(size)
     
     # === SEARCH SERVICE METRICS METHODS ===
     def record_search_request(self, endpoint: str, search_type: str, duration: float, 
@@ -233,10 +295,25 @@ class DataPipelineMetrics:
         self.llm_requests.labels(model_name=model_name, operation=operation, status=status).inc()
         self.llm_latency.labels(model_name=model_name, operation=operation).observe(duration)
     
+    def record_llm_time_to_first_token(self, model_name: str, duration: float):
+        """Record time to the first streamed token"""
+        self.llm_time_to_first_token.labels(model_name=model_name).observe(duration)
+    
     def record_llm_tokens(self, model_name: str, token_type: str, count: int):
         """Record LLM token usage"""
         self.llm_tokens_used.labels(model_name=model_name, token_type=token_type).inc(count)
     
+    # === FILE WATCHER METRICS METHODS ===
+    def update_file_watcher_queue_depth(self, depth: int):
+        """Update the number of pending file events"""
+        self.file_watcher_queue_depth.set(depth)
+    
+    def record_file_watcher_batch(self, batch_size: int, lags: List[float]):
+        """Record a dispatched file watcher batch and the lag of each of its files"""
+        self.file_watcher_batch_size.observe(batch_size)
+        for lag in lags:
+            self.file_watcher_event_lag.observe(lag)
+    
     # === SYSTEM METRICS METHODS ===
     def update_active_connections(self, count: int):
         """Update active connections count"""
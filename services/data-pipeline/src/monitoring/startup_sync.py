@@ -1,17 +1,19 @@
 #!/usr/bin/env python3
 """
 Startup Sync Service for Initial Vault Synchronization
-Compares filesystem state with ChromaDB to catch changes while service was down
+Compares filesystem state with the vault manifest (or ChromaDB) to catch changes while service was down
 """
 
 import asyncio
 import logging
-from typing import Dict, Any, List, Set, Tuple
+from typing import Dict, Any, List, Optional, Set, Tuple
 from pathlib import Path
 from datetime import datetime
 
 from ..ingestion.filesystem_client import FilesystemVaultClient
+from ..ingestion.vault_manifest import VaultManifest, ManifestEntry
 from ..vector.chroma_service import ChromaService
+from ..cache.version_tracker import CollectionVersionTracker, get_version_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -20,16 +22,29 @@ class StartupSyncService:
     
     def __init__(self, 
                  vault_path: str,
-                 chroma_service: ChromaService):
+                 chroma_service: ChromaService,
+                 version_tracker: Optional[CollectionVersionTracker] = None,
+                 manifest: Optional[VaultManifest] = None,
+                 incremental_updater=None,
+                 filesystem_client: Optional[FilesystemVaultClient] = None):
         """
         Initialize the startup sync service.
         Args:
             vault_path (str): Path to the Obsidian vault
             chroma_service (ChromaService): ChromaDB service instance
+            version_tracker (CollectionVersionTracker): Receives deleted paths to invalidate search caches
+            manifest (VaultManifest): Vault manifest; when given, startup diffs it against a stat-only
+                walk instead of reading every note and scanning the whole collection
+            incremental_updater (IncrementalUpdateService): Re-indexes new/modified files when given
+                (otherwise they are only reported)
+            filesystem_client (FilesystemVaultClient): Vault reader to share (one is built for vault_path otherwise)
         """
         self.vault_path = vault_path
         self.chroma_service = chroma_service
-        self.filesystem_client = FilesystemVaultClient(vault_path)
+        self.version_tracker = version_tracker or get_version_tracker()
+        self.manifest = manifest
+        self.incremental_updater = incremental_updater
+        self.filesystem_client = filesystem_client or FilesystemVaultClient(vault_path)
         
         logger.info(f"Initialized StartupSyncService for vault: {vault_path}")
 
@@ -41,6 +56,9 @@ class StartupSyncService:
         """
         start_time = asyncio.get_event_loop().time()
         
+        if self.manifest is not None:
+            return await self._perform_manifest_sync(start_time)
+        
         try:
             logger.info("Starting vault synchronization...")
             
@@ -81,6 +99,103 @@ class StartupSyncService:
                 "processing_time_ms": processing_time
             }
 
+    async def _perform_manifest_sync(self, start_time: float) -> Dict[str, Any]:
+        """
+        Startup sync in O(changed files): diff the manifest against a stat-only walk,
+        then open only the files whose size or mtime changed to compare content hashes.
+        """
+        try:
+            logger.info("Starting vault synchronization from manifest...")
+            
+            # Step 1: Stat-only walk (no file is opened)
+            files = await self.filesystem_client.list_vault_files()
+            
+            # Step 2: A collection indexed before the manifest existed seeds it once;
+            # a collection reset since the last run invalidates it
+            seeded = 0
+            collection_count = self.chroma_service.collection.count()
+            if not len(self.manifest) and collection_count:
+                seeded = await self._seed_manifest()
+            elif len(self.manifest) and not collection_count:
+                logger.warning("Collection is empty, discarding the vault manifest")
+                self.manifest.clear()
+            
+            # Step 3: Compare stats with the manifest
+            diff = self.manifest.diff(files)
+            
+            # Step 4: Stat changed -> compare content hashes (touch/checkout without edits is not a change)
+            stats_by_path = {file_info['path']: file_info for file_info in files}
+            modified_files = []
+            touched_files = []
+            file_contents = {}
+            for file_path in diff.changed:
+                try:
+                    file_content = await self.filesystem_client.get_file_content(file_path)
+                except Exception as e:
+                    logger.error(f"Error reading changed file {file_path}: {e}")
+                    modified_files.append(file_path)
+                    continue
+                entry = self.manifest.get(file_path)
+                if entry is not None and entry.content_hash and entry.content_hash == file_content.get('content_hash'):
+                    file_info = stats_by_path[file_path]
+                    self.manifest.touch(file_path, file_info['size'], file_info['modified'])
+                    touched_files.append(file_path)
+                else:
+                    modified_files.append(file_path)
+                    file_contents[file_path] = file_content
+            
+            sync_plan = {
+                'new_files': diff.new,
+                'deleted_files': diff.deleted,
+                'modified_files': modified_files,
+                'touched_files': touched_files,
+                'unchanged_files': diff.unchanged,
+                'total_actions': len(diff.new) + len(diff.deleted) + len(modified_files)
+            }
+            logger.info(f"Sync plan created: {len(diff.new)} new, {len(diff.deleted)} deleted, "
+                        f"{len(modified_files)} modified, {len(touched_files)} touched only")
+            
+            # Step 5: Execute sync plan
+            sync_results = await self._execute_sync_plan(sync_plan, file_contents)
+            
+            processing_time = (asyncio.get_event_loop().time() - start_time) * 1000
+            logger.info(f"Startup sync complete: {processing_time:.2f}ms")
+            
+            return {
+                "success": True,
+                "processing_time_ms": processing_time,
+                "filesystem_files": len(files),
+                "manifest_files": len(diff.unchanged) + len(diff.changed) + len(diff.deleted),
+                "manifest_seeded": seeded,
+                "files_opened": len(diff.changed),
+                "sync_plan": sync_plan,
+                "sync_results": sync_results
+            }
+            
+        except Exception as e:
+            processing_time = (asyncio.get_event_loop().time() - start_time) * 1000
+            logger.error(f"Error during startup sync: {e}")
+            
+            return {
+                "success": False,
+                "error": str(e),
+                "processing_time_ms": processing_time
+            }
+
+    async def _seed_manifest(self) -> int:
+        """
+        One-time full collection scan for collections indexed before the manifest existed.
+        Seeded entries carry the stat stored in chunk metadata and no content hash, so
+        files edited since are re-indexed and the rest are never opened.
+        """
+        chromadb_files = await self._get_chromadb_state()
+        self.manifest.record_many(
+            ManifestEntry(path, state['file_size'], state['file_modified'], None, state['chunk_ids'])
+            for path, state in chromadb_files.items()
+        )
+        logger.info(f"Seeded vault manifest with {len(chromadb_files)} files from ChromaDB")
+        return len(chromadb_files)
+
     async def _get_filesystem_state(self) -> Dict[str, Dict[str, Any]]:
         """Get current state of filesystem."""
         try:
@@ -118,7 +233,7 @@ class StartupSyncService:
                 return {}
             
             chromadb_state = {}
-            for metadata in results['metadatas']:
+            for chunk_id, metadata in zip(results['ids'], results['metadatas']):
                 file_path = metadata.get('path', '')
                 if not file_path:
                     continue
@@ -131,10 +246,12 @@ class StartupSyncService:
                         'file_modified': metadata.get('file_modified', 0),
                         'file_created': metadata.get('file_created', 0),
                         'file_word_count': metadata.get('file_word_count', 0),
-                        'file_char_count': metadata.get('file_char_count', 0)
+                        'file_char_count': metadata.get('file_char_count', 0),
+                        'chunk_ids': []
                     }
                 
                 chromadb_state[file_path]['chunk_count'] += 1
+                chromadb_state[file_path]['chunk_ids'].append(chunk_id)
             
             return chromadb_state
             
@@ -182,8 +299,15 @@ class StartupSyncService:
         
         return sync_plan
 
-    async def _execute_sync_plan(self, sync_plan: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute the synchronization plan."""
+    async def _execute_sync_plan(self, sync_plan: Dict[str, Any],
+                                 file_contents: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Any]:
+        """
+        Execute the synchronization plan.
+        Args:
+            sync_plan (Dict[str, Any]): Plan from _create_sync_plan or the manifest diff
+            file_contents (Dict[str, Dict]): Files already read while planning, reused for re-indexing
+        """
+        file_contents = file_contents or {}
         results = {
             'new_files_processed': 0,
             'deleted_files_processed': 0,
@@ -194,9 +318,8 @@ class StartupSyncService:
         # Process new files
         for file_path in sync_plan['new_files']:
             try:
-                # This would typically call the incremental update service
-                # For now, we'll just log the action
                 logger.info(f"New file detected: {file_path}")
+                await self._reindex_file(file_path)
                 results['new_files_processed'] += 1
             except Exception as e:
                 logger.error(f"Error processing new file {file_path}: {e}")
@@ -207,6 +330,9 @@ class StartupSyncService:
             try:
                 # Delete chunks for this file
                 deleted_count = await self._delete_file_chunks(file_path)
+                self.version_tracker.record_change(file_path, None)
+                if self.manifest is not None:
+                    self.manifest.remove([file_path])
                 logger.info(f"Deleted {deleted_count} chunks for deleted file: {file_path}")
                 results['deleted_files_processed'] += 1
             except Exception as e:
@@ -216,9 +342,8 @@ class StartupSyncService:
         # Process modified files
         for file_path in sync_plan['modified_files']:
             try:
-                # This would typically call the incremental update service
-                # For now, we'll just log the action
                 logger.info(f"Modified file detected: {file_path}")
+                await self._reindex_file(file_path, file_contents.get(file_path))
                 results['modified_files_processed'] += 1
             except Exception as e:
                 logger.error(f"Error processing modified file {file_path}: {e}")
@@ -226,6 +351,14 @@ class StartupSyncService:
         
         return results
 
+    async def _reindex_file(self, file_path: str, file_content: Optional[Dict[str, Any]] = None):
+        """Re-index a new/modified file through the incremental updater, if one is configured."""
+        if self.incremental_updater is None:
+            return
+        result = await self.incremental_updater.process_file_update(file_path, file_content)
+        if not result.get('success', False):
+            raise RuntimeError(result.get('error', 'Unknown error'))
+
     async def _delete_file_chunks(self, file_path: str) -> int:
         """Delete all chunks for a file."""
         try:
@@ -237,7 +370,7 @@ class StartupSyncService:
             if not results['ids']:
                 return 0
                 
-            self.chroma_service.collection.delete(ids=results['ids'])
+            self.chroma_service.delete_chunks(results['ids'])
             return len(results['ids'])
             
         except Exception as e:
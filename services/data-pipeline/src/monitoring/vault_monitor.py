@@ -6,15 +6,19 @@ Coordinates file watching, incremental updates, and startup synchronization
 
 import asyncio
 import logging
+import os
 import signal
 import sys
 from typing import Dict, Any, Optional
 from pathlib import Path
 
-from .file_watcher import DebouncedFileWatcher
+from .file_watcher import OptimizedFileWatcher, FileEventBatch
 from .incremental_updater import IncrementalUpdateService
 from .startup_sync import StartupSyncService
 from ..ingestion.filesystem_client import FilesystemVaultClient
+from ..ingestion.vault_manifest import VaultManifest
+from ..ingestion.vault_scanner import VaultScanner
+from ..cache.version_tracker import CollectionVersionTracker, change_journal_path
 from ..processing.content_processor import ContentProcessor
 from ..embeddings.embedding_service import EmbeddingService
 from ..vector.chroma_service import ChromaService
@@ -43,32 +47,47 @@ class VaultMonitorService:
         self.is_running = False
         self.startup_complete = False
         
-        # Initialize core services
-        self.filesystem_client = FilesystemVaultClient(vault_path)
+        # Initialize core services (directory mtimes persist next to the manifest, so rescans
+        # after a restart can still reuse unchanged directory listings)
+        self.filesystem_client = FilesystemVaultClient(vault_path, scanner=VaultScanner(
+            vault_path, state_path=os.path.join(chroma_db_path, f"scanner_{collection_name}.sqlite3")
+        ))
         self.content_processor = ContentProcessor(embedding_model)
         self.embedding_service = EmbeddingService(embedding_model)
         self.chroma_service = ChromaService(
             persist_directory=chroma_db_path,
             collection_name=collection_name,
-            embedding_model=embedding_model
+            embedding_model=embedding_model,
+            use_embedding_function=False  # embeddings come from self.embedding_service
         )
         
+        # What has been indexed, so restarts only open changed files
+        self.manifest = VaultManifest(os.path.join(chroma_db_path, f"manifest_{collection_name}.sqlite3"))
+        # Changed notes, journaled so search services in other processes drop their cached results
+        self.version_tracker = CollectionVersionTracker(change_journal_path(chroma_db_path, collection_name))
+        
         # Initialize monitoring services
-        self.file_watcher = DebouncedFileWatcher(vault_path, debounce_delay)
+        self.file_watcher = OptimizedFileWatcher(vault_path, debounce_delay)
         self.incremental_updater = IncrementalUpdateService(
-            vault_path, self.chroma_service, self.embedding_service, self.content_processor
+            vault_path, self.chroma_service, self.embedding_service, self.content_processor,
+            version_tracker=self.version_tracker, manifest=self.manifest, filesystem_client=self.filesystem_client
         )
-        self.startup_sync = StartupSyncService(vault_path, self.chroma_service)
+        self.startup_sync = StartupSyncService(vault_path, self.chroma_service, version_tracker=self.version_tracker,
+                                               manifest=self.manifest, incremental_updater=self.incremental_updater,
+                                               filesystem_client=self.filesystem_client)
         
-        # Set up file watcher callbacks
+        # Set up file watcher callbacks (events arrive as coalesced batches)
+        self.file_watcher.on_file_batch = self._handle_file_batch
         self.file_watcher.on_file_modified = self._handle_file_modified
         self.file_watcher.on_file_created = self._handle_file_created
         self.file_watcher.on_file_deleted = self._handle_file_deleted
+        self.file_watcher.on_file_moved = self._handle_file_moved
         
         # Statistics
         self.stats = {
             "files_processed": 0,
             "files_deleted": 0,
+            "files_moved": 0,
             "total_chunks_processed": 0,
             "total_processing_time_ms": 0,
             "errors": 0,
@@ -137,6 +156,33 @@ class VaultMonitorService:
         self.is_running = False
         logger.info("Vault monitoring service stopped")
 
+    async def _handle_file_batch(self, batch: FileEventBatch):
+        """Handle a batch of coalesced file events (moves, updates and deletions)."""
+        try:
+            result = await self.incremental_updater.process_file_changes(batch.updated, batch.deleted, batch.moved)
+            
+            for file_result in result.get('results', []):
+                if isinstance(file_result, dict) and file_result.get('success', False):
+                    if 'moved_from' in file_result:
+                        self.stats["files_moved"] += 1
+                    elif 'chunks_processed' in file_result:
+                        self.stats["files_processed"] += 1
+                        self.stats["total_chunks_processed"] += file_result.get('chunks_processed', 0)
+                    else:
+                        self.stats["files_deleted"] += 1
+                    self.stats["total_processing_time_ms"] += file_result.get('processing_time_ms', 0)
+                else:
+                    self.stats["errors"] += 1
+                    error = file_result.get('error', 'Unknown error') if isinstance(file_result, dict) else file_result
+                    logger.error(f"Failed to process file event: {error}")
+            logger.info(f"Processed file batch: {result.get('moved', 0)} moved "
+                        f"({result.get('paired_by_content', 0)} by content hash), {result.get('updated', 0)} updated, "
+                        f"{result.get('deleted', 0)} deleted, {result.get('failed', 0)} failed")
+                
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error handling file batch: {e}")
+
     async def _handle_file_modified(self, file_path: str):
         """Handle file modification events."""
         try:
@@ -190,6 +236,23 @@ class VaultMonitorService:
             self.stats["errors"] += 1
             logger.error(f"Error handling file deletion {file_path}: {e}")
 
+    async def _handle_file_moved(self, old_path: str, new_path: str):
+        """Handle file rename/move events."""
+        try:
+            result = await self.incremental_updater.process_file_move(old_path, new_path)
+            
+            if result.get('success', False):
+                self.stats["files_moved"] += 1
+                self.stats["total_processing_time_ms"] += result.get('processing_time_ms', 0)
+                logger.info(f"Successfully processed moved file: {old_path} -> {new_path}")
+            else:
+                self.stats["errors"] += 1
+                logger.error(f"Failed to process moved file {old_path} -> {new_path}: {result.get('error', 'Unknown error')}")
+                
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.error(f"Error handling file move {old_path} -> {new_path}: {e}")
+
     def _setup_signal_handlers(self):
         """Set up signal handlers for graceful shutdown."""
         def signal_handler(signum, frame):
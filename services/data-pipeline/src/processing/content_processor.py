@@ -4,29 +4,67 @@ Advanced Intelligent Content Processor
 Context-aware chunking with hybrid strategy: heading-based splitting, sliding window with overlap, and sentence boundary detection
 """
 
-from typing import List, Dict, Any, Iterator
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from transformers import AutoTokenizer
+from bisect import bisect_left
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+# Same boundaries as ContentProcessor._split_by_sentences
+SENTENCE_BOUNDARY_PATTERN = re.compile(r'(?<=[.!?])\s+(?=[A-Z])|(?<=[.!?])\s*\n\s*(?=[A-Z])')
+
+
+def token_start_offsets(tokenizer, text: str) -> List[int]:
+    """
+    Tokenize text once and return the character offset where each token starts.
+    Requires a fast (Rust) tokenizer for return_offsets_mapping.
+    """
+    encoding = tokenizer(text, add_special_tokens=False, truncation=False,
+                         return_offsets_mapping=True, return_attention_mask=False,
+                         return_token_type_ids=False)
+    return [start for start, _ in encoding["offset_mapping"]]
+
+
+def count_tokens_in_span(token_starts: List[int], start: int, end: int) -> int:
+    """Number of tokens starting inside text[start:end] (token_starts is sorted)."""
+    return bisect_left(token_starts, end) - bisect_left(token_starts, start)
+
+
+def strip_span(text: str, start: int, end: int) -> Tuple[int, int]:
+    """Shrink a span the same way str.strip() would shrink text[start:end]."""
+    piece = text[start:end]
+    stripped = piece.strip()
+    if not stripped:
+        return start, start
+    leading = len(piece) - len(piece.lstrip())
+    return start + leading, start + leading + len(stripped)
+
+
 class ContentProcessor:
     """Advanced intelligent content processor with hybrid chunking strategy"""
     
-    def __init__(self, model_name: str = 'sentence-transformers/all-MiniLM-L6-v2', max_chunk_size: int = 512, chunk_overlap: int = 128):
+    def __init__(self, model_name: str = 'sentence-transformers/all-MiniLM-L6-v2', max_chunk_size: int = 512, chunk_overlap: int = 128,
+                 single_pass_tokenization: bool = True):
         """
         Initialize the content processor with advanced chunking capabilities.
         Args:
             model_name (str): The name of the embedding model for its tokenizer.
             max_chunk_size (int): Maximum number of tokens per chunk.
             chunk_overlap (int): Number of tokens to overlap between chunks.
+            single_pass_tokenization (bool): Tokenize each section once with offset mapping and
+                carry token counts forward instead of re-encoding sentences and chunks.
+                Requires a fast tokenizer; falls back to per-sentence encoding otherwise.
         """
         self.model_name = model_name
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.max_chunk_size = max_chunk_size
         self.chunk_overlap = chunk_overlap
-        logger.info(f"Initialized Advanced ContentProcessor with model: {model_name}, max_chunk_size: {max_chunk_size}, chunk_overlap: {chunk_overlap}")
+        self.single_pass_tokenization = single_pass_tokenization and getattr(self.tokenizer, "is_fast", False)
+        if single_pass_tokenization and not self.single_pass_tokenization:
+            logger.warning(f"Tokenizer for {model_name} is not a fast tokenizer, single-pass tokenization disabled")
+        logger.info(f"Initialized Advanced ContentProcessor with model: {model_name}, max_chunk_size: {max_chunk_size}, chunk_overlap: {chunk_overlap}, single_pass: {self.single_pass_tokenization}")
 
     def _count_tokens(self, text: str) -> int:
         """Count tokens using the embedding model's tokenizer."""
@@ -86,6 +124,65 @@ class ContentProcessor:
         
         return cleaned_sentences
 
+    def _split_text_by_token_offsets(self, text: str, token_starts: List[int]) -> Iterator[Tuple[str, int]]:
+        """
+        Single-pass variant of _split_text_by_tokens.
+        Sentence token counts are read off the section's offset mapping, so the
+        section is tokenized exactly once; yields (chunk_text, chunk_token_count).
+        """
+        if not text.strip():
+            return
+
+        sentences = []
+        for start, end in self._sentence_spans(text):
+            sentences.append((text[start:end], count_tokens_in_span(token_starts, start, end)))
+
+        current_chunk: List[Tuple[str, int]] = []
+        current_size = 0
+
+        for sentence, sentence_size in sentences:
+            # If adding this sentence would exceed max_chunk_size and we have content
+            if current_size + sentence_size > self.max_chunk_size and current_chunk:
+                chunk_text = " ".join(s for s, _ in current_chunk).strip()
+                if chunk_text:
+                    yield chunk_text, current_size
+
+                # Start new chunk with overlap from previous chunk
+                current_chunk = self._get_overlap_counted_sentences(current_chunk) + [(sentence, sentence_size)]
+                current_size = sum(size for _, size in current_chunk)
+            else:
+                current_chunk.append((sentence, sentence_size))
+                current_size += sentence_size
+
+        if current_chunk:
+            chunk_text = " ".join(s for s, _ in current_chunk).strip()
+            if chunk_text:
+                yield chunk_text, current_size
+
+    def _sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """Character spans of the sentences _split_by_sentences would return."""
+        spans = []
+        position = 0
+        for match in SENTENCE_BOUNDARY_PATTERN.finditer(text):
+            spans.append(strip_span(text, position, match.start()))
+            position = match.end()
+        spans.append(strip_span(text, position, len(text)))
+        return [(start, end) for start, end in spans if end > start]
+
+    def _get_overlap_counted_sentences(self, sentences: List[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        """Same selection as _get_overlap_sentences, using carried token counts."""
+        overlap_tokens = 0
+        overlap_sentences = []
+
+        for sentence, sentence_tokens in reversed(sentences):
+            if overlap_tokens + sentence_tokens <= self.chunk_overlap:
+                overlap_sentences.insert(0, (sentence, sentence_tokens))
+                overlap_tokens += sentence_tokens
+            else:
+                break
+
+        return overlap_sentences
+
     def _get_overlap_sentences(self, sentences: List[str]) -> List[str]:
         """Get overlap sentences from the end of current chunk."""
         if not sentences:
@@ -157,6 +254,9 @@ class ContentProcessor:
         if not section_content:
             return chunk_index
 
+        if self.single_pass_tokenization:
+            return self._process_section_single_pass(chunks, section, section_content, path, file_metadata, chunk_index)
+
         section_tokens = self._count_tokens(section_content)
         
         if section_tokens > self.max_chunk_size:
@@ -185,8 +285,43 @@ class ContentProcessor:
         
         return chunk_index
 
+    def _process_section_single_pass(self, chunks: List[Dict], section: Dict, section_content: str, path: str,
+                                     file_metadata: Dict[str, Any], chunk_index: int) -> int:
+        """
+        _process_section with one tokenizer call per section.
+        Returns updated chunk_index.
+        """
+        token_starts = token_start_offsets(self.tokenizer, section_content)
+        section_tokens = len(token_starts)
+
+        if section_tokens > self.max_chunk_size:
+            logger.debug(f"Splitting large section '{section['heading']}' ({section_tokens} tokens) into smaller chunks")
+
+            for i, (small_chunk, token_count) in enumerate(self._split_text_by_token_offsets(section_content, token_starts)):
+                chunks.append(self._create_chunk_dict(
+                    content=small_chunk,
+                    heading=f"{section['heading']} (Part {i+1})",
+                    path=path,
+                    file_metadata=file_metadata,
+                    chunk_index=chunk_index,
+                    token_count=token_count
+                ))
+                chunk_index += 1
+        else:
+            chunks.append(self._create_chunk_dict(
+                content=section_content,
+                heading=section["heading"],
+                path=path,
+                file_metadata=file_metadata,
+                chunk_index=chunk_index,
+                token_count=section_tokens
+            ))
+            chunk_index += 1
+
+        return chunk_index
 
-    def _create_chunk_dict(self, content: str, heading: str, path: str, file_metadata: Dict, chunk_index: int) -> Dict[str, Any]:
+    def _create_chunk_dict(self, content: str, heading: str, path: str, file_metadata: Dict, chunk_index: int,
+                           token_count: Optional[int] = None) -> Dict[str, Any]:
         """Create a chunk with comprehensive inherited and computed metadata."""
         return {
             # Core Chunk Data
@@ -217,7 +352,8 @@ class ContentProcessor:
             "content_type": file_metadata.get("content_type", ""),
             "links": file_metadata.get("links", []),
             # Computed Chunk Metadata
-            "chunk_token_count": self._count_tokens(content),  # Pre-computed for ChromaDB
+            "chunk_token_count": token_count if token_count is not None else self._count_tokens(content),  # Pre-computed for ChromaDB
+            "chunk_tokenizer": self.model_name,  # Counts are only comparable within one tokenizer
             "chunk_word_count": len(content.split()),
             "chunk_char_count": len(content),
             # Legacy fields for backward compatibility
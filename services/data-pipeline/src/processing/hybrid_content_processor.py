@@ -10,7 +10,7 @@ import re
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 
-from .content_processor import ContentProcessor
+from .content_processor import ContentProcessor, token_start_offsets, count_tokens_in_span
 
 logger = logging.getLogger(__name__)
 
@@ -21,13 +21,16 @@ class SimpleChunkingProcessor:
     """
     
     def __init__(self, model_name: str = 'sentence-transformers/all-MiniLM-L6-v2', 
-                 max_chunk_size: int = 512, chunk_overlap: int = 128):
+                 max_chunk_size: int = 512, chunk_overlap: int = 128,
+                 single_pass_tokenization: bool = True):
         from transformers import AutoTokenizer
         self.model_name = model_name
         self.tokenizer = AutoTokenizer.from_pretrained(model_name)
         self.max_chunk_size = max_chunk_size
         self.chunk_overlap = chunk_overlap
-        logger.info(f"Initialized SimpleChunkingProcessor: {model_name}, max_chunk_size: {max_chunk_size}, chunk_overlap: {chunk_overlap}")
+        # Word token counts come from one offset-mapped encode of the whole content
+        self.single_pass_tokenization = single_pass_tokenization and getattr(self.tokenizer, "is_fast", False)
+        logger.info(f"Initialized SimpleChunkingProcessor: {model_name}, max_chunk_size: {max_chunk_size}, chunk_overlap: {chunk_overlap}, single_pass: {self.single_pass_tokenization}")
 
     def _count_tokens(self, text: str) -> int:
         """Count tokens using the embedding model's tokenizer."""
@@ -38,6 +41,9 @@ class SimpleChunkingProcessor:
         Simple chunking: Fixed-size sliding window with character-based overlap
         Optimized for speed and token efficiency
         """
+        if self.single_pass_tokenization:
+            return self._chunk_content_single_pass(content, file_metadata, path)
+        
         chunks = []
         chunk_index = 0
         
@@ -83,7 +89,56 @@ class SimpleChunkingProcessor:
         logger.info(f"Simple chunking created {len(chunks)} chunks for file: {path}")
         return chunks
 
-    def _create_chunk_dict(self, content: str, heading: str, path: str, file_metadata: Dict, chunk_index: int) -> Dict[str, Any]:
+    def _chunk_content_single_pass(self, content: str, file_metadata: Dict[str, Any], path: str) -> List[Dict[str, Any]]:
+        """
+        Same sliding window as chunk_content, but the content is tokenized once
+        and per-word token counts are read from the offset mapping and carried
+        forward instead of re-encoding words, overlaps and finished chunks.
+        """
+        chunks = []
+        chunk_index = 0
+        
+        token_starts = token_start_offsets(self.tokenizer, content)
+        words = [(match.group(), count_tokens_in_span(token_starts, match.start(), match.end()))
+                 for match in re.finditer(r'\S+', content)]
+        current_chunk_words = []
+        current_tokens = 0
+        
+        for word, word_tokens in words:
+            if current_tokens + word_tokens > self.max_chunk_size and current_chunk_words:
+                chunks.append(self._create_chunk_dict(
+                    content=" ".join(w for w, _ in current_chunk_words),
+                    heading=f"Chunk {chunk_index + 1}",
+                    path=path,
+                    file_metadata=file_metadata,
+                    chunk_index=chunk_index,
+                    token_count=current_tokens
+                ))
+                chunk_index += 1
+                
+                # Simple overlap: keep last N words
+                overlap_words = int(len(current_chunk_words) * 0.25)  # 25% overlap
+                current_chunk_words = current_chunk_words[-overlap_words:] + [(word, word_tokens)]
+                current_tokens = sum(tokens for _, tokens in current_chunk_words)
+            else:
+                current_chunk_words.append((word, word_tokens))
+                current_tokens += word_tokens
+        
+        if current_chunk_words:
+            chunks.append(self._create_chunk_dict(
+                content=" ".join(w for w, _ in current_chunk_words),
+                heading=f"Chunk {chunk_index + 1}",
+                path=path,
+                file_metadata=file_metadata,
+                chunk_index=chunk_index,
+                token_count=current_tokens
+            ))
+        
+        logger.info(f"Simple chunking created {len(chunks)} chunks for file: {path}")
+        return chunks
+
+    def _create_chunk_dict(self, content: str, heading: str, path: str, file_metadata: Dict, chunk_index: int,
+                           token_count: Optional[int] = None) -> Dict[str, Any]:
         """Create a chunk with comprehensive metadata including enhanced fields."""
         return {
             "content": content,
@@ -111,7 +166,8 @@ class SimpleChunkingProcessor:
             "file_type": file_metadata.get("file_type", ""),
             "content_type": file_metadata.get("content_type", ""),
             "links": file_metadata.get("links", []),
-            "chunk_token_count": self._count_tokens(content),
+            "chunk_token_count": token_count if token_count is not None else self._count_tokens(content),
+            "chunk_tokenizer": self.model_name,  # Counts are only comparable within one tokenizer
             "chunk_word_count": len(content.split()),
             "chunk_char_count": len(content),
             "file_metadata": file_metadata,
@@ -217,7 +273,8 @@ class HybridContentProcessor:
     
     def __init__(self, model_name: str = 'sentence-transformers/all-MiniLM-L6-v2', 
                  max_chunk_size: int = 512, chunk_overlap: int = 128,
-                 force_method: Optional[str] = None):
+                 force_method: Optional[str] = None,
+                 single_pass_tokenization: bool = True):
         """
         Initialize hybrid processor with intelligent method selection
         
@@ -226,23 +283,27 @@ class HybridContentProcessor:
             max_chunk_size: Maximum tokens per chunk
             chunk_overlap: Overlap tokens between chunks
             force_method: Force specific method ('simple', 'advanced', or None for auto)
+            single_pass_tokenization: Tokenize once per section/file with offset mapping
         """
         self.model_name = model_name
         self.max_chunk_size = max_chunk_size
         self.chunk_overlap = chunk_overlap
         self.force_method = force_method
+        self.single_pass_tokenization = single_pass_tokenization
         
         # Initialize processors
         self.simple_processor = SimpleChunkingProcessor(
             model_name=model_name,
             max_chunk_size=max_chunk_size,
-            chunk_overlap=chunk_overlap
+            chunk_overlap=chunk_overlap,
+            single_pass_tokenization=single_pass_tokenization
         )
         
         self.advanced_processor = ContentProcessor(
             model_name=model_name,
             max_chunk_size=max_chunk_size,
-            chunk_overlap=chunk_overlap
+            chunk_overlap=chunk_overlap,
+            single_pass_tokenization=single_pass_tokenization
         )
         
         self.analyzer = DocumentAnalyzer()
@@ -309,7 +370,8 @@ class HybridContentProcessor:
                 "model_name": self.model_name,
                 "max_chunk_size": self.max_chunk_size,
                 "chunk_overlap": self.chunk_overlap,
-                "force_method": self.force_method
+                "force_method": self.force_method,
+                "single_pass_tokenization": self.advanced_processor.single_pass_tokenization
             },
             "analyzer_config": {
                 "heading_patterns": len(self.analyzer.heading_patterns),
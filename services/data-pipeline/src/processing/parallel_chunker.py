@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Process-Pool Parallel Chunking Backend
+Runs the service's content processor (HybridContentProcessor by default) in worker processes so tokenization scales with CPU cores
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Type
+
+from .content_processor import ContentProcessor
+from .hybrid_content_processor import HybridContentProcessor
+
+logger = logging.getLogger(__name__)
+
+# Processor owned by the current worker process (built once by _init_worker)
+_worker_processor: Optional[Any] = None
+
+
+def _available_cpus() -> int:
+    """CPUs this process may run on (respects container/affinity limits)."""
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0)) or 1
+    return os.cpu_count() or 1
+
+
+def _init_worker(processor_class: Type, processor_config: Dict[str, Any]):
+    """Load the tokenizer once per worker process."""
+    global _worker_processor
+    _worker_processor = processor_class(**processor_config)
+
+
+def _chunk_payloads(payloads: List[Dict[str, Any]]) -> List[Any]:
+    """
+    Chunk a group of file payloads inside a worker process.
+
+    Failures are returned in place as RuntimeError so one bad file does not
+    lose the rest of the group (and so the error always pickles).
+    """
+    results = []
+    for payload in payloads:
+        try:
+            results.append(_worker_processor.chunk_content(
+                content=payload['content'],
+                file_metadata=payload.get('metadata', {}),
+                path=payload['path']
+            ))
+        except Exception as e:
+            results.append(RuntimeError(f"{payload.get('path')}: {type(e).__name__}: {e}"))
+    return results
+
+
+class ParallelChunkingBackend:
+    """
+    Multiprocessing chunking backend for ContentProcessor / HybridContentProcessor.
+
+    Accepts batches of FilesystemVaultClient.get_file_content payloads
+    ({"path", "content", "metadata"}) and returns one chunk list per payload,
+    in input order. The workers must run the same processor class and settings
+    as the in-process content processor they stand in for, otherwise the same
+    note is chunked (and content-addressed) differently depending on the path
+    that handled it; see for_processor() and matches().
+    """
+
+    def __init__(self,
+                 model_name: str = 'sentence-transformers/all-MiniLM-L6-v2',
+                 max_chunk_size: int = 512,
+                 chunk_overlap: int = 128,
+                 force_method: Optional[str] = None,
+                 single_pass_tokenization: bool = True,
+                 max_workers: Optional[int] = None,
+                 files_per_task: int = 4,
+                 processor_class: Type = HybridContentProcessor):
+        """
+        Initialize the backend (worker processes start lazily on first use).
+
+        Args:
+            model_name: Tokenizer/embedding model name used for chunking
+            max_chunk_size: Maximum tokens per chunk
+            chunk_overlap: Overlap tokens between chunks
+            force_method: Force specific method ('simple', 'advanced', or None for auto); HybridContentProcessor only
+            single_pass_tokenization: Tokenize once per section/file with offset mapping
+            max_workers: Number of worker processes (default: available CPUs)
+            files_per_task: Files sent to a worker per task
+            processor_class: ContentProcessor or HybridContentProcessor, built once in each worker
+        """
+        if processor_class not in (ContentProcessor, HybridContentProcessor):
+            raise ValueError(f"Unsupported processor_class: {processor_class.__name__}")
+        if force_method and processor_class is not HybridContentProcessor:
+            raise ValueError("force_method is only supported with HybridContentProcessor")
+        self.processor_class = processor_class
+        self.processor_config = {
+            "model_name": model_name,
+            "max_chunk_size": max_chunk_size,
+            "chunk_overlap": chunk_overlap,
+            "single_pass_tokenization": single_pass_tokenization
+        }
+        if processor_class is HybridContentProcessor:
+            self.processor_config["force_method"] = force_method
+        self.max_workers = max_workers or _available_cpus()
+        self.files_per_task = max(1, files_per_task)
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+        self.stats = {
+            "files_chunked": 0,
+            "chunks_created": 0,
+            "errors": 0,
+            "total_chunking_time": 0.0
+        }
+
+        logger.info(f"Initialized ParallelChunkingBackend ({processor_class.__name__}) with {self.max_workers} workers, "
+                   f"{self.files_per_task} files per task")
+
+    @staticmethod
+    def _chunking_settings(processor_class: Type, config: Dict[str, Any]) -> tuple:
+        """Settings that decide chunk boundaries (single-pass tokenization does not change them)."""
+        return (processor_class, config.get("model_name"), config.get("max_chunk_size"),
+                config.get("chunk_overlap"), config.get("force_method"))
+
+    @classmethod
+    def for_processor(cls, processor, **kwargs) -> "ParallelChunkingBackend":
+        """
+        Build a backend whose workers chunk exactly like an existing processor.
+
+        Args:
+            processor: ContentProcessor or HybridContentProcessor instance
+            **kwargs: max_workers / files_per_task
+        """
+        return cls(model_name=processor.model_name,
+                   max_chunk_size=processor.max_chunk_size,
+                   chunk_overlap=processor.chunk_overlap,
+                   force_method=getattr(processor, "force_method", None),
+                   single_pass_tokenization=processor.single_pass_tokenization,
+                   processor_class=type(processor),
+                   **kwargs)
+
+    def matches(self, processor) -> bool:
+        """Whether the workers produce the same chunks as the given processor."""
+        processor_config = {
+            "model_name": getattr(processor, "model_name", None),
+            "max_chunk_size": getattr(processor, "max_chunk_size", None),
+            "chunk_overlap": getattr(processor, "chunk_overlap", None),
+            "force_method": getattr(processor, "force_method", None)
+        }
+        return (self._chunking_settings(self.processor_class, self.processor_config)
+                == self._chunking_settings(type(processor), processor_config))
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Create the worker pool on first use."""
+        if self._executor is None:
+            # spawn avoids forking a parent that already runs torch/tokenizer threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.processor_class, self.processor_config)
+            )
+        return self._executor
+
+    def _group_payloads(self, payloads: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Split payloads into per-task groups, preserving order."""
+        return [payloads[i:i + self.files_per_task] for i in range(0, len(payloads), self.files_per_task)]
+
+    def _collect(self, group_results: List[List[Any]], return_exceptions: bool, start_time: float) -> List[Any]:
+        """Flatten worker results back into input order and update stats."""
+        results = [result for group in group_results for result in group]
+
+        for result in results:
+            if isinstance(result, Exception):
+                self.stats["errors"] += 1
+            else:
+                self.stats["files_chunked"] += 1
+                self.stats["chunks_created"] += len(result)
+        self.stats["total_chunking_time"] += time.time() - start_time
+
+        if not return_exceptions:
+            for result in results:
+                if isinstance(result, Exception):
+                    raise result
+        return results
+
+    def chunk_files(self, payloads: List[Dict[str, Any]], return_exceptions: bool = False) -> List[Any]:
+        """
+        Chunk a batch of file payloads across the worker pool.
+
+        Args:
+            payloads: get_file_content payloads
+            return_exceptions: Return per-file errors in place instead of raising
+
+        Returns:
+            List with one chunk list (or exception) per payload, in input order
+        """
+        if not payloads:
+            return []
+        start_time = time.time()
+        group_results = list(self._get_executor().map(_chunk_payloads, self._group_payloads(payloads)))
+        return self._collect(group_results, return_exceptions, start_time)
+
+    async def achunk_files(self, payloads: List[Dict[str, Any]], return_exceptions: bool = False) -> List[Any]:
+        """
+        Async variant of chunk_files that does not block the event loop.
+
+        Args:
+            payloads: get_file_content payloads
+            return_exceptions: Return per-file errors in place instead of raising
+
+        Returns:
+            List with one chunk list (or exception) per payload, in input order
+        """
+        if not payloads:
+            return []
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        group_results = await asyncio.gather(*[
+            loop.run_in_executor(executor, _chunk_payloads, group)
+            for group in self._group_payloads(payloads)
+        ])
+        return self._collect(list(group_results), return_exceptions, start_time)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get backend configuration and throughput statistics."""
+        elapsed = self.stats["total_chunking_time"]
+        return {
+            "processor_class": self.processor_class.__name__,
+            "max_workers": self.max_workers,
+            "files_per_task": self.files_per_task,
+            "processor_config": dict(self.processor_config),
+            **self.stats,
+            "files_per_second": self.stats["files_chunked"] / elapsed if elapsed > 0 else 0
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+            logger.info("ParallelChunkingBackend worker pool shut down")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Result Diversification
+Maximal Marginal Relevance and threshold clustering over one cosine similarity matrix of the candidates' stored embeddings
+"""
+
+import logging
+from typing import List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def similarity_matrix(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Pairwise cosine similarities with one matmul.
+
+    Args:
+        embeddings: (n, dim) matrix; zero rows (missing embeddings) are similar to nothing
+
+    Returns:
+        (n, n) float32 matrix
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    normalized = np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+    return normalized @ normalized.T
+
+
+def mmr_select(relevance: np.ndarray, similarities: np.ndarray, k: int, lambda_: float = 0.7) -> List[int]:
+    """
+    Greedy Maximal Marginal Relevance.
+
+    Each step picks argmax(lambda * relevance - (1 - lambda) * max similarity to
+    the already selected candidates); the running max is updated with one
+    vector maximum per pick, so selection is O(k * n).
+
+    Args:
+        relevance: (n,) query relevance of each candidate (e.g. cosine similarity)
+        similarities: (n, n) candidate similarity matrix
+        k: Number of candidates to select
+        lambda_: Relevance/diversity trade-off (1.0 is plain relevance order)
+
+    Returns:
+        Selected candidate indices in selection order
+    """
+    n = len(relevance)
+    k = min(k, n)
+    relevance = np.asarray(relevance, dtype=np.float32)
+    max_similarity = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: List[int] = []
+
+    for _ in range(k):
+        if selected:
+            scores = lambda_ * relevance - (1 - lambda_) * max_similarity
+        else:
+            scores = relevance.copy()
+        scores[~available] = -np.inf
+        chosen = int(np.argmax(scores))
+        selected.append(chosen)
+        available[chosen] = False
+        np.maximum(max_similarity, similarities[chosen], out=max_similarity)
+    return selected
+
+
+def threshold_clusters(similarities: np.ndarray, threshold: float) -> List[List[int]]:
+    """
+    Greedy leader clustering in candidate order.
+
+    The first unassigned candidate leads a new cluster joined by every other
+    unassigned candidate with similarity >= threshold to it (the same greedy
+    scheme as the previous pairwise loop, one vectorized row per cluster).
+
+    Returns:
+        Clusters as lists of candidate indices, leader first
+    """
+    n = len(similarities)
+    adjacent = np.asarray(similarities) >= threshold
+    np.fill_diagonal(adjacent, False)
+    has_neighbours = adjacent.any(axis=1).tolist()
+    unassigned = np.ones(n, dtype=bool)
+    clusters: List[List[int]] = []
+    for leader in range(n):
+        if not unassigned[leader]:
+            continue
+        unassigned[leader] = False
+        if not has_neighbours[leader]:
+            clusters.append([leader])
+            continue
+        members = np.flatnonzero(unassigned & adjacent[leader])
+        unassigned[members] = False
+        clusters.append([leader] + members.tolist())
+    return clusters
@@ -23,8 +23,8 @@ class EnhancedSearchService(SemanticSearchService):
     Extends our existing comprehensive hybrid search system
     """
     
-    def __init__(self, chroma_service, embedding_service):
-        super().__init__(chroma_service, embedding_service)
+    def __init__(self, chroma_service, embedding_service, embedding_batcher=None):
+        super().__init__(chroma_service, embedding_service, embedding_batcher=embedding_batcher)
         self.search_analytics = {}
         self.query_expansion_cache = {}
         self.synonym_cache = {}
@@ -127,35 +127,27 @@ class EnhancedSearchService(SemanticSearchService):
         logger.info(f"Found {len(results)} results with temporal filtering")
         return results
 
-    def search_with_semantic_clustering(self, query: str, n_results: int = 5,
-                                      cluster_threshold: float = 0.7) -> List[Dict[str, Any]]:
+    async def search_with_semantic_clustering(self, query: str, n_results: int = 5,
+                                            cluster_threshold: float = 0.85,
+                                            strategy: str = "cluster",
+                                            mmr_lambda: float = 0.7,
+                                            candidates: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        Enhanced search with semantic clustering of results
+        Enhanced search with diversified results: threshold clustering (best result per
+        cluster) or Maximal Marginal Relevance over the candidates' stored embeddings
         """
-        logger.info(f"🔍 Semantic clustering for: '{query}'")
-        
-        # Get more results for clustering
-        extended_results = self.search_similar(query, n_results=n_results * 2)
-        
-        if len(extended_results) <= 1:
-            return extended_results
-        
-        # Cluster results by semantic similarity
-        clusters = self._cluster_results_semantically(extended_results, cluster_threshold)
-        
-        # Select best result from each cluster
-        clustered_results = []
-        for cluster in clusters:
-            if cluster:
-                # Sort cluster by similarity and take best
-                cluster.sort(key=lambda x: x.get('similarity', 0), reverse=True)
-                best_result = cluster[0]
-                best_result['cluster_size'] = len(cluster)
-                best_result['search_type'] = 'clustered'
-                clustered_results.append(best_result)
-        
-        logger.info(f"Clustered {len(extended_results)} results into {len(clusters)} clusters")
-        return clustered_results[:n_results]
+        logger.info(f"🔍 Semantic clustering for: '{query}' (strategy: {strategy})")
+        
+        # Get more results for diversification
+        extended_results = await self.search_similar(query, n_results=candidates or n_results * 4)
+        
+        diversified_results = await self.diversify_results(
+            extended_results, n_results, strategy=strategy,
+            mmr_lambda=mmr_lambda, cluster_threshold=cluster_threshold
+        )
+        
+        logger.info(f"Diversified {len(extended_results)} candidates into {len(diversified_results)} results")
+        return diversified_results
 
     def search_with_auto_suggestions(self, partial_query: str, max_suggestions: int = 5) -> List[str]:
         """
@@ -333,54 +325,6 @@ class EnhancedSearchService(SemanticSearchService):
             # Score based on absolute recency (exponential decay)
             return max(0.0, 1.0 - (age_days / 365))  # Decay over a year
 
-    def _cluster_results_semantically(self, results: List[Dict], threshold: float) -> List[List[Dict]]:
-        """Cluster results by semantic similarity"""
-        if len(results) <= 1:
-            return [results]
-        
-        clusters = []
-        used_indices = set()
-        
-        for i, result1 in enumerate(results):
-            if i in used_indices:
-                continue
-            
-            cluster = [result1]
-            used_indices.add(i)
-            
-            for j, result2 in enumerate(results[i+1:], i+1):
-                if j in used_indices:
-                    continue
-                
-                # Calculate semantic similarity between results
-                similarity = self._calculate_result_similarity(result1, result2)
-                
-                if similarity >= threshold:
-                    cluster.append(result2)
-                    used_indices.add(j)
-            
-            clusters.append(cluster)
-        
-        return clusters
-
-    def _calculate_result_similarity(self, result1: Dict, result2: Dict) -> float:
-        """Calculate similarity between two search results"""
-        # Use content similarity as proxy for semantic similarity
-        content1 = result1.get('content', '').lower()
-        content2 = result2.get('content', '').lower()
-        
-        # Simple word overlap similarity
-        words1 = set(content1.split())
-        words2 = set(content2.split())
-        
-        if not words1 or not words2:
-            return 0.0
-        
-        intersection = len(words1.intersection(words2))
-        union = len(words1.union(words2))
-        
-        return intersection / union if union > 0 else 0.0
-
     def _rank_fuzzy_results(self, results: List[Dict], query: str) -> List[Dict]:
         """Rank results combining semantic and fuzzy scores"""
         for result in results:
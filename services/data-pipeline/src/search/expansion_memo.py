@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Query Expansion Memo
+Persistent SQLite memo of LLM query expansions keyed by (model, normalized query) so a query never costs a second Gemini call
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ExpansionMemo:
+    """
+    Two-tier memo for LLM expansions.
+
+    Results live in a SQLite table keyed by (model_name, normalized_query) with
+    a bounded in-memory LRU in front of it. Entries older than ``ttl`` seconds
+    are ignored (None keeps them forever).
+    """
+
+    def __init__(self,
+                 model_name: str,
+                 db_path: Optional[str] = "./data/query_cache/expansions.sqlite3",
+                 max_memory_entries: int = 5000,
+                 ttl: Optional[float] = 30 * 86400):
+        """
+        Initialize the memo.
+
+        Args:
+            model_name: LLM the expansions came from
+            db_path: SQLite file for the persistent tier (None for memory only)
+            max_memory_entries: Max expansions held in the in-memory LRU tier
+            ttl: Seconds an expansion stays valid (None never expires)
+        """
+        self.model_name = model_name
+        self.db_path = db_path
+        self.max_memory_entries = max(0, max_memory_entries)
+        self.ttl = ttl
+
+        self._memory: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.stats = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "writes": 0
+        }
+
+        if db_path:
+            self._open(db_path)
+
+        logger.info(f"Initialized ExpansionMemo for {model_name} (db: {db_path or 'memory only'})")
+
+    def _open(self, db_path: str):
+        """Open (and create if needed) the SQLite database."""
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS expansions (
+                model_name TEXT NOT NULL,
+                query TEXT NOT NULL,
+                expanded_query TEXT NOT NULL,
+                confidence REAL NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (model_name, query)
+            ) WITHOUT ROWID
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """Memo key for a query: case-folded with whitespace collapsed."""
+        return re.sub(r"\s+", " ", query).strip().casefold()
+
+    def _fresh(self, created_at: float) -> bool:
+        return self.ttl is None or created_at > time.time() - self.ttl
+
+    def _remember(self, key: str, value: Tuple[str, float, float]):
+        if self.max_memory_entries == 0:
+            return
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, query: str) -> Optional[Tuple[str, float]]:
+        """
+        Look up a memoized expansion.
+
+        Returns:
+            (expanded_query, confidence), or None if the query was never expanded
+        """
+        key = self.normalize(query)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None and self._fresh(value[2]):
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return value[0], value[1]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT expanded_query, confidence, created_at FROM expansions "
+                    "WHERE model_name = ? AND query = ?",
+                    (self.model_name, key)
+                ).fetchone()
+                if row is not None and self._fresh(row[2]):
+                    self._remember(key, row)
+                    self.stats["disk_hits"] += 1
+                    return row[0], row[1]
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, query: str, expanded_query: str, confidence: float):
+        """Memoize an expansion."""
+        key = self.normalize(query)
+        value = (expanded_query, float(confidence), time.time())
+        with self._lock:
+            self._remember(key, value)
+            if self._conn is not None:
+                try:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO expansions "
+                        "(model_name, query, expanded_query, confidence, created_at) VALUES (?, ?, ?, ?, ?)",
+                        (self.model_name, key, *value)
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"Failed to persist query expansion: {e}")
+            self.stats["writes"] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get memo statistics."""
+        with self._lock:
+            lookups = self.stats["memory_hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+    def close(self):
+        """Close the SQLite connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Result List Fusion
+Reciprocal rank fusion of ranked search result lists from different queries or retrievers
+"""
+
+import logging
+from typing import List, Dict, Any, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+
+def reciprocal_rank_fusion(result_lists: Sequence[List[Dict[str, Any]]],
+                           k: int = 60,
+                           weights: Optional[Sequence[float]] = None,
+                           n_results: Optional[int] = None,
+                           labels: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    """
+    Fuse ranked result lists with reciprocal rank fusion.
+
+    Each result scores sum(weight / (k + rank)) over the lists it appears in
+    (rank is 1-based), so only ranks matter and scores from different
+    retrievers never need to be calibrated against each other.
+
+    Args:
+        result_lists: Ranked lists of result dicts identified by their "id"
+        k: RRF damping constant (larger flattens the rank curve)
+        weights: Per-list weights (default 1.0 each)
+        n_results: Number of fused results to return (None for all)
+        labels: Per-list names recorded in each result's "fusion" info
+
+    Returns:
+        Fused results best first; each is the first copy seen of that id with a
+        "fusion" dict holding the RRF score and the rank it had in each list
+    """
+    weights = list(weights) if weights is not None else [1.0] * len(result_lists)
+    labels = list(labels) if labels is not None else [str(i) for i in range(len(result_lists))]
+
+    fused: Dict[str, Dict[str, Any]] = {}
+    for results, weight, label in zip(result_lists, weights, labels):
+        for rank, result in enumerate(results, start=1):
+            entry = fused.get(result["id"])
+            if entry is None:
+                entry = fused[result["id"]] = {"result": result, "score": 0.0, "ranks": {}}
+            if label in entry["ranks"]:
+                continue
+            entry["score"] += weight / (k + rank)
+            entry["ranks"][label] = rank
+
+    ordered = sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)
+    if n_results is not None:
+        ordered = ordered[:n_results]
+    return [
+        {**entry["result"], "fusion": {"rrf_score": entry["score"], "ranks": entry["ranks"]}}
+        for entry in ordered
+    ]
@@ -6,8 +6,10 @@ from typing import List, Dict, Any, Optional, Tuple
 import re
 from datetime import datetime
 import asyncio
-from sentence_transformers import CrossEncoder
+import numpy as np
 from .query_expansion_service import QueryExpansionService, ExpansionStrategy
+from .reranker import get_shared_reranker
+from .snippets import QueryTerms, extract_snippet
 
 logger = logging.getLogger(__name__)
 
@@ -15,9 +17,12 @@ logger = logging.getLogger(__name__)
 class ImprovedSemanticSearchService:
     """Improved service for semantic search with better cross-encoder re-ranking"""
     
-    def __init__(self, chroma_service, embedding_service, gemini_api_key: Optional[str] = None):
+    def __init__(self, chroma_service, embedding_service, gemini_api_key: Optional[str] = None,
+                 embedding_batcher=None):
         self.chroma_service = chroma_service
         self.embedding_service = embedding_service
+        # Optional AsyncEmbeddingBatcher shared by all query paths
+        self.embedding_batcher = embedding_batcher
         self.search_cache = {}
         self.cache_hits = 0
         self.cache_misses = 0
@@ -25,13 +30,14 @@ class ImprovedSemanticSearchService:
         # Initialize a better cross-encoder for re-ranking
         logger.info("Initializing improved cross-encoder for re-ranking...")
         try:
-            # Try a more general-purpose cross-encoder
-            self.cross_encoder = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-12-v2', max_length=512)
+            # Try a more general-purpose cross-encoder (shared, micro-batched, loaded once per process)
+            self.reranker = get_shared_reranker('cross-encoder/ms-marco-MiniLM-L-12-v2', max_length=512)
             logger.info("Improved cross-encoder initialized successfully")
         except Exception as e:
             logger.warning(f"Failed to load improved cross-encoder, falling back to default: {e}")
-            self.cross_encoder = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2', max_length=512)
+            self.reranker = get_shared_reranker('cross-encoder/ms-marco-MiniLM-L-6-v2', max_length=512)
             logger.info("Fallback cross-encoder initialized")
+        self.cross_encoder = self.reranker.model
         
         # Initialize query expansion service
         logger.info("Initializing query expansion service...")
@@ -50,6 +56,12 @@ class ImprovedSemanticSearchService:
         current_time = datetime.utcnow().timestamp()
         return (current_time - cache_time) < ttl
     
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a query off the event loop, micro-batched with concurrent queries when a batcher is set."""
+        if self.embedding_batcher is not None:
+            return await self.embedding_batcher.embed(query)
+        return await asyncio.to_thread(self.embedding_service.generate_embedding_array, query)
+    
     async def search_similar(self, query: str, n_results: int = 5, 
                       where: Optional[Dict] = None, 
                       where_document: Optional[Dict] = None,
@@ -97,11 +109,11 @@ class ImprovedSemanticSearchService:
         
         try:
             # Generate query embedding
-            query_embedding = self.embedding_service.generate_embedding(search_query)
+            query_embedding = await self._embed_query(search_query)
             
             # Search in ChromaDB with rich metadata filtering
-            results = self.chroma_service.collection.query(
-                query_embeddings=[query_embedding],
+            results = self.chroma_service.query_by_embedding(
+                query_embedding,
                 n_results=n_results,
                 where=where,
                 where_document=where_document
@@ -171,12 +183,13 @@ class ImprovedSemanticSearchService:
             
             logger.info(f"Re-ranking {len(initial_results)} initial results")
             
-            # Step 2: Create pairs for the cross-encoder
-            pairs = [(query, result['content']) for result in initial_results]
-            
-            # Step 3: Get cross-encoder scores
+            # Step 2-3: Get cross-encoder scores (batched with concurrent requests, off the event loop)
             logger.debug("Computing cross-encoder scores...")
-            cross_scores = self.cross_encoder.predict(pairs)
+            cross_scores = await self.reranker.score(
+                query,
+                [result['content'] for result in initial_results],
+                [result.get('id') for result in initial_results]
+            )
             
             # Step 4: Improved score combination and enhance results
             for i, result in enumerate(initial_results):
@@ -226,12 +239,18 @@ class ImprovedSemanticSearchService:
         """Enhance search results with additional information"""
         enhanced_results = []
         
+        # Query terms are compiled once and each result's content is scanned once
+        terms = QueryTerms(query)
         for result in results:
+            occurrences = terms.find(result["content"])
+            
             # Add query relevance score
-            result["query_relevance"] = self._calculate_query_relevance(result["content"], query)
+            result["query_relevance"] = terms.relevance(result["content"], occurrences)
             
-            # Add content preview
-            result["preview"] = self._generate_content_preview(result["content"], query)
+            # Add content preview and the query term spans inside it
+            snippet = extract_snippet(result["content"], terms, occurrences=occurrences)
+            result["preview"] = snippet.text
+            result["preview_highlights"] = snippet.highlights
             
             # Add search metadata
             result["search_timestamp"] = datetime.utcnow().isoformat()
@@ -243,48 +262,12 @@ class ImprovedSemanticSearchService:
     
     def _calculate_query_relevance(self, content: str, query: str) -> float:
         """Calculate relevance score between content and query"""
-        content_lower = content.lower()
-        query_lower = query.lower()
-        
-        # Count word matches
-        query_words = query_lower.split()
-        content_words = content_lower.split()
-        
-        matches = sum(1 for word in query_words if word in content_words)
-        relevance = matches / len(query_words) if query_words else 0
-        
-        return relevance
+        terms = QueryTerms(query)
+        return terms.relevance(content, terms.find(content))
     
     def _generate_content_preview(self, content: str, query: str, max_length: int = 200) -> str:
         """Generate content preview highlighting query terms"""
-        if len(content) <= max_length:
-            return content
-        
-        # Find query terms in content
-        query_lower = query.lower()
-        content_lower = content.lower()
-        
-        # Find the best position to start the preview
-        best_position = 0
-        max_matches = 0
-        
-        for i in range(len(content) - max_length + 1):
-            snippet = content_lower[i:i + max_length]
-            matches = sum(1 for word in query_lower.split() if word in snippet)
-            if matches > max_matches:
-                max_matches = matches
-                best_position = i
-        
-        # Generate preview
-        preview = content[best_position:best_position + max_length]
-        
-        # Add ellipsis if needed
-        if best_position > 0:
-            preview = "..." + preview
-        if best_position + max_length < len(content):
-            preview = preview + "..."
-        
-        return preview
+        return extract_snippet(content, QueryTerms(query), max_length).text
     
     def get_search_stats(self) -> Dict[str, Any]:
         """Get search statistics"""
@@ -24,6 +24,7 @@ from dataclasses import dataclass
 
 from ..vector.chroma_service import ChromaService
 from ..embeddings.embedding_service import EmbeddingService
+from ..embeddings.async_batcher import AsyncEmbeddingBatcher
 from ..cache.cache_manager import CacheManager
 
 logger = logging.getLogger(__name__)
@@ -81,7 +82,8 @@ class OptimizedAIAgentSearchService:
                  chroma_service: ChromaService,
                  embedding_service: EmbeddingService,
                  cache_manager: CacheManager,
-                 config: Optional[AIAgentSearchConfig] = None):
+                 config: Optional[AIAgentSearchConfig] = None,
+                 embedding_batcher: Optional[AsyncEmbeddingBatcher] = None):
         """
         Initialize the optimized AI agent search service.
         
@@ -90,11 +92,13 @@ class OptimizedAIAgentSearchService:
             embedding_service: Embedding generation service
             cache_manager: Cache management for query embeddings
             config: AI agent specific configuration
+            embedding_batcher: Optional micro-batcher for concurrent query embeddings
         """
         self.chroma_service = chroma_service
         self.embedding_service = embedding_service
         self.cache_manager = cache_manager
         self.config = config or AIAgentSearchConfig()
+        self.embedding_batcher = embedding_batcher
         
         # Performance tracking
         self.search_stats = {
@@ -109,6 +113,12 @@ class OptimizedAIAgentSearchService:
         
         logger.info("OptimizedAIAgentSearchService initialized with AI agent optimization")
     
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a query off the event loop, micro-batched with concurrent queries when a batcher is set."""
+        if self.embedding_batcher is not None:
+            return await self.embedding_batcher.embed(query)
+        return await asyncio.to_thread(self.embedding_service.generate_embedding_array, query)
+    
     async def search_for_ai_agent(self, 
                                  query: str,
                                  n_results: int = 5,
@@ -213,13 +223,13 @@ class OptimizedAIAgentSearchService:
             logger.debug(f"Using cached query embedding for: {query[:50]}...")
         else:
             self.search_stats["cache_misses"] += 1
-            query_embedding = self.embedding_service.generate_embedding(query)
+            query_embedding = await self._embed_query(query)
             self.cache_manager.cache_query_embedding(query, query_embedding)
             logger.debug(f"Generated and cached new query embedding for: {query[:50]}...")
         
         # Execute search
-        results = self.chroma_service.collection.query(
-            query_embeddings=[query_embedding],
+        results = self.chroma_service.query_by_embedding(
+            query_embedding,
             n_results=n_results
         )
         
@@ -234,14 +244,14 @@ class OptimizedAIAgentSearchService:
         # Use cached baseline search with keyword filtering
         query_embedding = self.cache_manager.get_cached_query_embedding(query)
         if query_embedding is None:
-            query_embedding = self.embedding_service.generate_embedding(query)
+            query_embedding = await self._embed_query(query)
             self.cache_manager.cache_query_embedding(query, query_embedding)
         
         # Apply keyword filtering for precision
         where_document = {"$contains": keywords[0]} if keywords else None
         
-        results = self.chroma_service.collection.query(
-            query_embeddings=[query_embedding],
+        results = self.chroma_service.query_by_embedding(
+            query_embedding,
             n_results=n_results,
             where_document=where_document
         )
@@ -254,12 +264,12 @@ class OptimizedAIAgentSearchService:
         # Get more results for re-ranking
         query_embedding = self.cache_manager.get_cached_query_embedding(query)
         if query_embedding is None:
-            query_embedding = self.embedding_service.generate_embedding(query)
+            query_embedding = await self._embed_query(query)
             self.cache_manager.cache_query_embedding(query, query_embedding)
         
         # Get more results for re-ranking
-        results = self.chroma_service.collection.query(
-            query_embeddings=[query_embedding],
+        results = self.chroma_service.query_by_embedding(
+            query_embedding,
             n_results=n_results * 2  # More results for re-ranking
         )
         
@@ -414,9 +424,9 @@ class OptimizedAIAgentSearchService:
         
         try:
             # Simple baseline search without caching
-            query_embedding = self.embedding_service.generate_embedding(query)
-            results = self.chroma_service.collection.query(
-                query_embeddings=[query_embedding],
+            query_embedding = await self._embed_query(query)
+            results = self.chroma_service.query_by_embedding(
+                query_embedding,
                 n_results=n_results
             )
             
@@ -521,7 +531,7 @@ class OptimizedAIAgentSearchService:
         for query in queries:
             try:
                 # Generate and cache embedding
-                query_embedding = self.embedding_service.generate_embedding(query)
+                query_embedding = await self._embed_query(query)
                 self.cache_manager.cache_query_embedding(query, query_embedding)
                 precomputed += 1
             except Exception as e:
@@ -11,6 +11,7 @@ from dataclasses import dataclass
 from enum import Enum
 import google.generativeai as genai
 import os
+from .expansion_memo import ExpansionMemo
 
 logger = logging.getLogger(__name__)
 
@@ -34,17 +35,25 @@ class QueryAnalysis:
 class QueryExpansionService:
     """Service for expanding and understanding user queries"""
     
-    def __init__(self, gemini_api_key: Optional[str] = None):
+    def __init__(self, gemini_api_key: Optional[str] = None,
+                 memo_path: Optional[str] = "./data/query_cache/expansions.sqlite3"):
         self.gemini_api_key = gemini_api_key or os.getenv('GEMINI_API_KEY')
         self.expansion_rules = self._initialize_expansion_rules()
         self.synonym_library = self._initialize_synonym_library()
         self.intent_patterns = self._initialize_intent_patterns()
         
+        # LLM expansions are memoized by normalized query (persisted across restarts),
+        # and concurrent requests for the same query share one in-flight call
+        self.llm_model_name = 'gemini-1.5-flash'
+        self.expansion_memo = ExpansionMemo(self.llm_model_name, db_path=memo_path)
+        self._inflight_expansions: Dict[str, asyncio.Future] = {}
+        self.llm_calls = 0
+        
         # Initialize Gemini if API key is available
         if self.gemini_api_key:
             try:
                 genai.configure(api_key=self.gemini_api_key)
-                self.gemini_model = genai.GenerativeModel('gemini-1.5-flash')
+                self.gemini_model = genai.GenerativeModel(self.llm_model_name)
                 logger.info("✅ Gemini model initialized for query expansion")
             except Exception as e:
                 logger.warning(f"⚠️ Failed to initialize Gemini: {e}")
@@ -375,11 +384,36 @@ class QueryExpansionService:
         return expanded_query, confidence
     
     async def llm_based_expansion(self, query: str) -> Tuple[str, float]:
-        """Expand query using LLM (Gemini)"""
+        """Expand query using LLM (Gemini), memoized by normalized query"""
         if not self.gemini_model:
             logger.warning("LLM model not available, falling back to rule-based expansion")
             return self.rule_based_expansion(query)
         
+        memoized = self.expansion_memo.get(query)
+        if memoized is not None:
+            return memoized
+        
+        key = ExpansionMemo.normalize(query)
+        inflight = self._inflight_expansions.get(key)
+        if inflight is not None:
+            return await asyncio.shield(inflight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight_expansions[key] = future
+        try:
+            result = await self._call_llm_expansion(query)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not logged as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight_expansions.pop(key, None)
+    
+    async def _call_llm_expansion(self, query: str) -> Tuple[str, float]:
+        """One Gemini round-trip; only successfully parsed expansions are memoized"""
         try:
             prompt = f"""
             Expand and enhance the following search query to make it more comprehensive and specific. 
@@ -396,6 +430,7 @@ class QueryExpansionService:
             REASONING: [brief explanation]
             """
             
+            self.llm_calls += 1
             response = await asyncio.to_thread(
                 self.gemini_model.generate_content, prompt
             )
@@ -413,6 +448,7 @@ class QueryExpansionService:
                 # Calculate confidence based on response quality
                 confidence = 0.8 if len(expanded_query) > len(query) * 1.5 else 0.6
                 
+                self.expansion_memo.put(query, expanded_query, confidence)
                 return expanded_query, confidence
             else:
                 # Fallback if parsing fails
@@ -0,0 +1,405 @@
+#!/usr/bin/env python3
+"""
+Shared Cross-Encoder Reranker
+One CrossEncoder per process, predictions micro-batched across concurrent requests on a worker thread, with an LRU score cache
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Optional, Tuple
+
+import numpy as np
+from sentence_transformers import CrossEncoder
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RERANKER_MODEL = 'cross-encoder/ms-marco-MiniLM-L-6-v2'
+
+# Process-wide rerankers keyed by (model_name, max_length)
+_shared_rerankers: Dict[Tuple[str, int], "CrossEncoderReranker"] = {}
+_shared_rerankers_lock = threading.Lock()
+
+
+def get_shared_reranker(model_name: str = DEFAULT_RERANKER_MODEL, max_length: int = 512,
+                        **kwargs) -> "CrossEncoderReranker":
+    """
+    Get the process-wide reranker for a model, loading it on first use.
+
+    Args:
+        model_name: Cross-encoder model name
+        max_length: Max tokens per (query, document) pair
+        **kwargs: Extra CrossEncoderReranker options, only used when the reranker is created
+
+    Returns:
+        Shared CrossEncoderReranker
+    """
+    key = (model_name, max_length)
+    with _shared_rerankers_lock:
+        reranker = _shared_rerankers.get(key)
+        if reranker is None:
+            reranker = CrossEncoderReranker(model_name, max_length=max_length, **kwargs)
+            _shared_rerankers[key] = reranker
+        return reranker
+
+
+@dataclass
+class CascadeResult:
+    """Outcome of CrossEncoderReranker.cascade_rerank"""
+    order: List[int]  # surviving candidate indices, best first
+    scores: Dict[int, float]  # cross-encoder score per survivor (from its last stage)
+    stages: Dict[int, str]  # "full" or "truncated" per survivor
+    pruned: Dict[str, int] = field(default_factory=dict)  # pairs dropped at each stage
+
+
+class CrossEncoderReranker:
+    """
+    Async cross-encoder scoring service.
+
+    Concurrent score() calls are queued and merged into one model.predict call
+    (requests are added until ``max_batch_pairs`` pairs are reached or
+    ``max_wait_ms`` passes),
+    which runs on a single dedicated thread so the event loop keeps serving other
+    requests. Scores are cached per (query, chunk id, document text).
+    """
+
+    def __init__(self,
+                 model_name: str = DEFAULT_RERANKER_MODEL,
+                 max_length: int = 512,
+                 max_batch_pairs: int = 64,
+                 max_wait_ms: float = 2.0,
+                 cache_size: int = 50000):
+        """
+        Load the model and set up batching (the batching task starts on first use).
+
+        Args:
+            model_name: Cross-encoder model name
+            max_length: Max tokens per (query, document) pair
+            max_batch_pairs: Max pairs per model.predict call
+            max_wait_ms: How long the first request of a batch waits for company
+            cache_size: Max cached (query, chunk) scores
+        """
+        logger.info(f"Loading cross-encoder {model_name} (max_length={max_length})...")
+        self.model = CrossEncoder(model_name, max_length=max_length)
+        self.model_name = model_name
+        self.max_length = max_length
+        self.max_batch_pairs = max(1, max_batch_pairs)
+        self.max_wait = max_wait_ms / 1000.0
+        self.cache_size = max(0, cache_size)
+
+        # One thread owns the model: predictions never run concurrently
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="reranker")
+        self._cache: "OrderedDict[Tuple[str, str, int, int], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        self.stats = {
+            "requests": 0,
+            "pairs_requested": 0,
+            "cache_hits": 0,
+            "pairs_scored": 0,
+            "pair_tokens_scored": 0,
+            "batches": 0,
+            "cascade_requests": 0,
+            "cascade_candidates": 0,
+            "cascade_pruned_by_margin": 0,
+            "cascade_truncated_scored": 0,
+            "cascade_pruned_after_truncated": 0,
+            "cascade_full_scored": 0,
+            "errors": 0,
+            "total_predict_time": 0.0
+        }
+
+        logger.info(f"Initialized CrossEncoderReranker with {model_name}")
+
+    @staticmethod
+    def _cache_key(query: str, doc_id: Optional[str], document: str, max_length: int) -> Tuple[str, str, int, int]:
+        # The text fingerprint keeps an edited chunk that kept its id from reusing a stale score
+        return (query, doc_id or "", hash(document), max_length)
+
+    @staticmethod
+    def _estimate_pair_tokens(pairs: List[Tuple[str, str]], max_length: int) -> int:
+        """Rough token count of the scored pairs (chars/4), the cost proxy for cross-encoder FLOPs."""
+        return sum(min(max_length, (len(query) + len(document)) // 4 + 3) for query, document in pairs)
+
+    def _cache_get_many(self, keys: List[Tuple[str, str, int, int]]) -> Dict[int, float]:
+        found = {}
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                score = self._cache.get(key)
+                if score is not None:
+                    self._cache.move_to_end(key)
+                    found[i] = score
+        return found
+
+    def _cache_put_many(self, items: List[Tuple[Tuple[str, str, int, int], float]]):
+        if not self.cache_size:
+            return
+        with self._cache_lock:
+            for key, score in items:
+                self._cache[key] = score
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _predict(self, pairs: List[Tuple[str, str]], max_length: Optional[int] = None) -> np.ndarray:
+        """Run the model at a given truncation length (called on the reranker thread, which owns the model)."""
+        max_length = max_length or self.max_length
+        self.model.max_length = max_length
+        try:
+            scores = self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        finally:
+            self.model.max_length = self.max_length
+        self.stats["pair_tokens_scored"] += self._estimate_pair_tokens(pairs, max_length)
+        return np.asarray(scores, dtype=np.float32).reshape(-1)
+
+    def _ensure_worker(self):
+        """Start the batching task on the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+    def _lookup(self, query: str, documents: List[str], doc_ids: Optional[List[str]],
+                max_length: int) -> Tuple[np.ndarray, List[Tuple[str, str, int, int]], List[int]]:
+        """Fill cached scores; return (scores, cache keys, indices still to score)."""
+        scores = np.empty(len(documents), dtype=np.float32)
+        ids = doc_ids or [None] * len(documents)
+        keys = [self._cache_key(query, doc_id, doc, max_length) for doc_id, doc in zip(ids, documents)]
+        cached = self._cache_get_many(keys)
+        self.stats["cache_hits"] += len(cached)
+        for i, score in cached.items():
+            scores[i] = score
+        missing = [i for i in range(len(documents)) if i not in cached]
+        return scores, keys, missing
+
+    async def score(self, query: str, documents: List[str], doc_ids: Optional[List[str]] = None,
+                    max_length: Optional[int] = None) -> np.ndarray:
+        """
+        Score documents against a query.
+
+        Args:
+            query: Search query
+            documents: Candidate texts
+            doc_ids: Optional chunk ids (improves cache hits across result formats)
+            max_length: Truncation length for this request (default: the model's max_length)
+
+        Returns:
+            float32 array of cross-encoder scores aligned with documents
+        """
+        max_length = max_length or self.max_length
+        self.stats["requests"] += 1
+        self.stats["pairs_requested"] += len(documents)
+        scores, keys, missing = self._lookup(query, documents, doc_ids, max_length)
+
+        if missing:
+            self._ensure_worker()
+            future = self._loop.create_future()
+            await self._queue.put(([(query, documents[i]) for i in missing], max_length, future))
+            fresh = await future
+            scores[missing] = fresh
+            self._cache_put_many([(keys[i], float(score)) for i, score in zip(missing, fresh)])
+        return scores
+
+    def score_sync(self, query: str, documents: List[str], doc_ids: Optional[List[str]] = None,
+                   max_length: Optional[int] = None) -> np.ndarray:
+        """Blocking variant of score() for non-async callers (uses the cache and the reranker thread)."""
+        max_length = max_length or self.max_length
+        self.stats["requests"] += 1
+        self.stats["pairs_requested"] += len(documents)
+        scores, keys, missing = self._lookup(query, documents, doc_ids, max_length)
+
+        if missing:
+            pairs = [(query, documents[i]) for i in missing]
+            fresh = self._executor.submit(self._predict, pairs, max_length).result()
+            self.stats["pairs_scored"] += len(pairs)
+            scores[missing] = fresh
+            self._cache_put_many([(keys[i], float(score)) for i, score in zip(missing, fresh)])
+        return scores
+
+    async def cascade_rerank(self,
+                             query: str,
+                             documents: List[str],
+                             similarities: List[float],
+                             doc_ids: Optional[List[str]] = None,
+                             keep_top: int = 5,
+                             margin: float = 0.1,
+                             margin_std_factor: float = 1.0,
+                             truncated_length: int = 128) -> CascadeResult:
+        """
+        Rerank in stages so most candidates never reach a full-length cross-encoder pass.
+
+        1. Margin pruning: drop candidates whose bi-encoder similarity is more than
+           max(margin, margin_std_factor * std(similarities)) below the best one
+           (at least keep_top candidates always survive).
+        2. Truncated pass: score the survivors with max_length=truncated_length.
+        3. Full pass: rescore only the keep_top best truncated candidates at full length.
+
+        Args:
+            query: Search query
+            documents: Candidate texts
+            similarities: Bi-encoder similarity per candidate
+            doc_ids: Optional chunk ids for the score cache
+            keep_top: Candidates that get a full-length score
+            margin: Minimum similarity margin from the top candidate
+            margin_std_factor: Margin in standard deviations of the similarity distribution
+            truncated_length: Truncation length of the cheap pass
+
+        Returns:
+            CascadeResult; full-length survivors come first in order, then truncated-only ones
+        """
+        n = len(documents)
+        ids = doc_ids or [None] * n
+        keep_top = max(1, keep_top)
+        self.stats["cascade_requests"] += 1
+        self.stats["cascade_candidates"] += n
+        if not n:
+            return CascadeResult(order=[], scores={}, stages={})
+
+        # Stage 1: similarity margin from the top
+        sims = np.asarray(similarities, dtype=np.float32)
+        dynamic_margin = max(margin, margin_std_factor * float(sims.std()))
+        by_similarity = list(np.argsort(-sims, kind="stable"))
+        survivors = [int(i) for i in by_similarity if sims[i] >= sims[by_similarity[0]] - dynamic_margin]
+        if len(survivors) < min(keep_top, n):
+            survivors = [int(i) for i in by_similarity[:keep_top]]
+        pruned_by_margin = n - len(survivors)
+
+        # Stage 2: cheap truncated pass, only worth it when it actually prunes something
+        stages: Dict[int, str] = {}
+        scores: Dict[int, float] = {}
+        full_candidates = survivors
+        truncated_scored = 0
+        if len(survivors) > keep_top and truncated_length < self.max_length:
+            truncated = await self.score(query, [documents[i] for i in survivors],
+                                         [ids[i] for i in survivors], max_length=truncated_length)
+            truncated_scored = len(survivors)
+            ranked = [survivors[j] for j in np.argsort(-truncated, kind="stable")]
+            full_candidates = ranked[:keep_top]
+            for j, i in enumerate(survivors):
+                scores[i] = float(truncated[j])
+                stages[i] = "truncated"
+
+        # Stage 3: full-length pass on the best few
+        full = await self.score(query, [documents[i] for i in full_candidates],
+                                [ids[i] for i in full_candidates])
+        for j, i in enumerate(full_candidates):
+            scores[i] = float(full[j])
+            stages[i] = "full"
+
+        full_order = sorted(full_candidates, key=lambda i: scores[i], reverse=True)
+        rest = sorted((i for i in survivors if stages[i] == "truncated"), key=lambda i: scores[i], reverse=True)
+        pruned = {
+            "margin": pruned_by_margin,
+            "truncated": truncated_scored - len(full_candidates) if truncated_scored else 0
+        }
+
+        self.stats["cascade_pruned_by_margin"] += pruned["margin"]
+        self.stats["cascade_truncated_scored"] += truncated_scored
+        self.stats["cascade_pruned_after_truncated"] += pruned["truncated"]
+        self.stats["cascade_full_scored"] += len(full_candidates)
+
+        return CascadeResult(order=full_order + rest, scores=scores, stages=stages, pruned=pruned)
+
+    async def _collect(self, batch: List[Tuple[List[Tuple[str, str]], int, asyncio.Future]]):
+        """Wait for one request, then merge more until the pair budget is used or the window closes."""
+        batch.append(await self._queue.get())
+        pair_count = len(batch[0][0])
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.max_wait
+
+        while pair_count < self.max_batch_pairs:
+            if self._queue.empty():
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            else:
+                item = self._queue.get_nowait()
+            batch.append(item)
+            pair_count += len(item[0])
+
+    async def _run(self):
+        """Batching loop: merge requests, predict on the reranker thread, split scores back."""
+        loop = asyncio.get_running_loop()
+        batch: List[Tuple[List[Tuple[str, str]], int, asyncio.Future]] = []
+        try:
+            while True:
+                batch = []
+                await self._collect(batch)
+                batch = [item for item in batch if not item[2].done()]
+
+                # One model call per truncation length present in the batch
+                by_length: Dict[int, List[Tuple[List[Tuple[str, str]], int, asyncio.Future]]] = {}
+                for item in batch:
+                    by_length.setdefault(item[1], []).append(item)
+
+                for max_length, group in by_length.items():
+                    all_pairs = [pair for pairs, _, _ in group for pair in pairs]
+                    start_time = time.perf_counter()
+                    try:
+                        all_scores = await loop.run_in_executor(self._executor, self._predict, all_pairs, max_length)
+                    except Exception as e:
+                        self.stats["errors"] += 1
+                        logger.error(f"Cross-encoder batch of {len(all_pairs)} pairs failed: {e}")
+                        for _, _, future in group:
+                            if not future.done():
+                                future.set_exception(e)
+                        continue
+                    finally:
+                        self.stats["total_predict_time"] += time.perf_counter() - start_time
+
+                    self.stats["batches"] += 1
+                    self.stats["pairs_scored"] += len(all_pairs)
+                    offset = 0
+                    for pairs, _, future in group:
+                        if not future.done():
+                            future.set_result(all_scores[offset:offset + len(pairs)])
+                        offset += len(pairs)
+        except asyncio.CancelledError:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("CrossEncoderReranker closed"))
+            raise
+
+    def clear_cache(self):
+        """Drop all cached scores."""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get batching and cache statistics."""
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "model_name": self.model_name,
+            "cache_entries": len(self._cache),
+            "cache_hit_rate": (self.stats["cache_hits"] / self.stats["pairs_requested"]
+                               if self.stats["pairs_requested"] else 0.0),
+            "avg_pairs_per_batch": self.stats["pairs_scored"] / batches if batches else 0.0
+        }
+
+    async def close(self):
+        """Stop the batching task and fail requests still waiting."""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("CrossEncoderReranker closed"))
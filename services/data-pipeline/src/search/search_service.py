@@ -7,9 +7,22 @@ from typing import List, Dict, Any, Optional, Tuple
 import re
 from datetime import datetime
 import asyncio
-from sentence_transformers import CrossEncoder
-from .query_expansion_service import QueryExpansionService, ExpansionStrategy
-from cache.cache_manager import CacheManager
+from collections import OrderedDict
+import numpy as np
+from .query_expansion_service import QueryExpansionService, ExpansionStrategy, QueryAnalysis
+from .expansion_memo import ExpansionMemo
+from .fusion import reciprocal_rank_fusion
+from .diversification import similarity_matrix, mmr_select, threshold_clusters
+from .reranker import get_shared_reranker
+from .snippets import QueryTerms, extract_snippet
+try:
+    from ..cache.cache_manager import CacheManager
+    from ..cache.semantic_cache import SemanticResultCache
+    from ..cache.version_tracker import CollectionVersionTracker, get_version_tracker
+except ImportError:
+    from cache.cache_manager import CacheManager
+    from cache.semantic_cache import SemanticResultCache
+    from cache.version_tracker import CollectionVersionTracker, get_version_tracker
 
 logger = logging.getLogger(__name__)
 
@@ -18,23 +31,64 @@ class SemanticSearchService:
     """Service for semantic search combining vector and metadata search"""
     
     def __init__(self, chroma_service, embedding_service, gemini_api_key: Optional[str] = None, 
-                 cache_manager: Optional[CacheManager] = None):
+                 cache_manager: Optional[CacheManager] = None, embedding_batcher=None,
+                 semantic_cache: Optional[SemanticResultCache] = None,
+                 version_tracker: Optional[CollectionVersionTracker] = None,
+                 search_cache_ttl: int = 1800,
+                 search_cache_max_entries: int = 1024,
+                 speculative_expansion: bool = False,
+                 expansion_deadline: float = 0.4,
+                 expansion_memo_path: Optional[str] = "./data/query_cache/expansions.sqlite3"):
         self.chroma_service = chroma_service
         self.embedding_service = embedding_service
+        # Optional AsyncEmbeddingBatcher shared by all query paths
+        self.embedding_batcher = embedding_batcher
         self.cache_manager = cache_manager or CacheManager()
-        self.search_cache = {}
+        # Insertion-ordered, so the oldest (first to expire) entries are pruned from the front
+        self.search_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.search_cache_ttl = search_cache_ttl
+        self.search_cache_max_entries = max(1, search_cache_max_entries)
+        # Optional near-duplicate (paraphrase) result cache, checked after the exact-match cache
+        self.semantic_cache = semantic_cache
         self.cache_hits = 0
         self.cache_misses = 0
         
-        # Initialize a lightweight cross-encoder for re-ranking
+        # Cached results remember the note versions they were built from; update paths
+        # report rewritten notes so only the entries containing them are dropped, and
+        # notes joining the collection drop every entry (they may match any query)
+        self.version_tracker = version_tracker or get_version_tracker()
+        self._search_cache_keys_by_path: Dict[str, set] = {}
+        self.invalidated_entries = 0
+        self.version_tracker.add_listener(self._on_collection_change)
+        
+        # Shared, micro-batched cross-encoder for re-ranking (loaded once per process)
         logger.info("Initializing cross-encoder for re-ranking...")
-        self.cross_encoder = CrossEncoder('cross-encoder/ms-marco-MiniLM-L-6-v2', max_length=512)
+        self.reranker = get_shared_reranker('cross-encoder/ms-marco-MiniLM-L-6-v2', max_length=512)
+        self.cross_encoder = self.reranker.model
         logger.info("Cross-encoder initialized successfully")
         
         # Initialize query expansion service
         logger.info("Initializing query expansion service...")
-        self.query_expansion_service = QueryExpansionService(gemini_api_key=gemini_api_key)
+        self.query_expansion_service = QueryExpansionService(gemini_api_key=gemini_api_key,
+                                                             memo_path=expansion_memo_path)
         logger.info("Query expansion service initialized successfully")
+        
+        # Speculative mode: retrieve with the original query while expansion runs, and only
+        # add (and fuse) a second retrieval if the expansion lands within expansion_deadline seconds
+        self.speculative_expansion = speculative_expansion
+        self.expansion_deadline = expansion_deadline
+        # Hybrid search: per-retriever RRF weights and latency statistics
+        self.hybrid_weights = {"semantic": 1.0, "keyword": 1.0, "tag": 0.5}
+        self.hybrid_rrf_k = 60
+        self.hybrid_stats = {"searches": 0, "total_ms": 0.0, "retrievers": {}}
+        
+        self.speculative_stats = {
+            "searches": 0,
+            "expansions_in_time": 0,
+            "expansions_late": 0,
+            "expansion_errors": 0,
+            "second_retrievals": 0
+        }
     
     def _generate_cache_key(self, query: str, filters: Optional[Dict[str, Any]] = None, n_results: int = 5) -> str:
         """Generate cache key for search query"""
@@ -42,11 +96,141 @@ class SemanticSearchService:
         cache_data = f"{query}:{filters}:{n_results}"
         return hashlib.md5(cache_data.encode('utf-8')).hexdigest()
     
-    def _is_cache_valid(self, cache_entry: Dict[str, Any], ttl: int = 1800) -> bool:
-        """Check if cache entry is still valid"""
+    def _is_cache_valid(self, cache_entry: Dict[str, Any], ttl: Optional[int] = None) -> bool:
+        """Check if cache entry is still valid (within TTL, no notes added since, built from the current note versions)"""
         cache_time = cache_entry.get("timestamp", 0)
         current_time = datetime.utcnow().timestamp()
-        return (current_time - cache_time) < ttl
+        if (current_time - cache_time) >= (ttl or self.search_cache_ttl):
+            return False
+        if self.version_tracker.includes_additions_since(cache_entry.get("generation", 0)):
+            return False
+        return self.version_tracker.is_current(cache_entry.get("versions", {}))
+    
+    def _on_collection_change(self, paths: set, generation: int):
+        """Drop cached results built from notes that were just rewritten or deleted, or all of them when notes were added."""
+        if self.version_tracker.membership_generation == generation:
+            dropped = len(self.search_cache)
+            self.search_cache.clear()
+            self._search_cache_keys_by_path.clear()
+            if self.semantic_cache is not None:
+                dropped += self.semantic_cache.get_stats()["size"]
+                self.semantic_cache.clear()
+        else:
+            dropped = 0
+            for path in paths:
+                for cache_key in list(self._search_cache_keys_by_path.get(path, ())):
+                    if self._drop_search_cache_entry(cache_key):
+                        dropped += 1
+            if self.semantic_cache is not None:
+                dropped += self.semantic_cache.invalidate_paths(paths)
+        self.invalidated_entries += dropped
+        if dropped:
+            logger.debug(f"Invalidated {dropped} cached searches for {len(paths)} changed notes (generation {generation})")
+    
+    def _drop_search_cache_entry(self, cache_key: str) -> bool:
+        """Remove one cached search and its path -> key references."""
+        cache_entry = self.search_cache.pop(cache_key, None)
+        if cache_entry is None:
+            return False
+        for path in cache_entry.get("versions", {}):
+            cache_keys = self._search_cache_keys_by_path.get(path)
+            if cache_keys is not None:
+                cache_keys.discard(cache_key)
+                if not cache_keys:
+                    del self._search_cache_keys_by_path[path]
+        return True
+    
+    def _cache_search_results(self, cache_key: str, results: List[Dict[str, Any]], generation: int):
+        """Store results with the versions of the notes they contain and the generation the search started at."""
+        paths = {result.get('metadata', {}).get('path') for result in results} - {None}
+        self._drop_search_cache_entry(cache_key)
+        self.search_cache[cache_key] = {
+            "results": results,
+            "timestamp": datetime.utcnow().timestamp(),
+            "generation": generation,
+            "versions": self.version_tracker.snapshot(paths)
+        }
+        for path in paths:
+            self._search_cache_keys_by_path.setdefault(path, set()).add(cache_key)
+        
+        # Entries share one TTL, so expired ones sit at the front; then enforce the size bound
+        expired_before = datetime.utcnow().timestamp() - self.search_cache_ttl
+        while self.search_cache:
+            oldest_key, oldest_entry = next(iter(self.search_cache.items()))
+            if len(self.search_cache) <= self.search_cache_max_entries and oldest_entry["timestamp"] > expired_before:
+                break
+            self._drop_search_cache_entry(oldest_key)
+    
+    def close(self):
+        """Stop receiving collection change notifications."""
+        self.version_tracker.remove_listener(self._on_collection_change)
+    
+    async def _embed_query(self, query: str) -> np.ndarray:
+        """Embed a query off the event loop, micro-batched with concurrent queries when a batcher is set."""
+        if self.embedding_batcher is not None:
+            return await self.embedding_batcher.embed(query)
+        return await asyncio.to_thread(self.embedding_service.generate_embedding_array, query)
+    
+    @staticmethod
+    def _query_analysis_info(query_analysis: QueryAnalysis) -> Dict[str, Any]:
+        """Query expansion details attached to each result"""
+        return {
+            'original_query': query_analysis.original_query,
+            'expanded_query': query_analysis.expanded_query,
+            'intent': query_analysis.intent,
+            'entities': query_analysis.entities,
+            'expansion_confidence': query_analysis.expansion_confidence,
+            'strategy_used': query_analysis.strategy_used.value,
+            'expansion_reasoning': query_analysis.expansion_reasoning
+        }
+    
+    async def _speculative_search(self, query: str, n_results: int, where: Optional[Dict],
+                                  where_document: Optional[Dict], use_cache: bool,
+                                  expansion_strategy: ExpansionStrategy) -> List[Dict[str, Any]]:
+        """
+        Retrieve with the original query immediately while the query is expanded concurrently.
+        
+        If the expansion finishes within expansion_deadline seconds of the start, a second
+        retrieval runs with the expanded query and both lists are fused with reciprocal rank
+        fusion. A late expansion keeps running in the background so its memo entry is ready
+        for the next identical query.
+        """
+        started = time.perf_counter()
+        self.speculative_stats["searches"] += 1
+        expansion_task = asyncio.create_task(
+            self.query_expansion_service.expand_query(query, expansion_strategy)
+        )
+        
+        base_results = await self.search_similar(query, n_results, where, where_document,
+                                                 use_cache=use_cache, expand_query=False)
+        
+        remaining = self.expansion_deadline - (time.perf_counter() - started)
+        try:
+            query_analysis = await asyncio.wait_for(asyncio.shield(expansion_task), timeout=max(0.0, remaining))
+        except asyncio.TimeoutError:
+            self.speculative_stats["expansions_late"] += 1
+            expansion_task.add_done_callback(lambda task: task.cancelled() or task.exception())
+            logger.debug(f"Query expansion missed the {self.expansion_deadline:.2f}s deadline for: {query[:50]}")
+            return base_results
+        except Exception as e:
+            self.speculative_stats["expansion_errors"] += 1
+            logger.warning(f"Query expansion failed: {e}")
+            return base_results
+        
+        self.speculative_stats["expansions_in_time"] += 1
+        if ExpansionMemo.normalize(query_analysis.expanded_query) == ExpansionMemo.normalize(query):
+            return base_results
+        
+        self.speculative_stats["second_retrievals"] += 1
+        expanded_results = await self.search_similar(query_analysis.expanded_query, n_results, where,
+                                                     where_document, use_cache=use_cache, expand_query=False)
+        
+        fused_results = reciprocal_rank_fusion([base_results, expanded_results], n_results=n_results,
+                                               labels=["original", "expanded"])
+        analysis_info = self._query_analysis_info(query_analysis)
+        for result in fused_results:
+            result['query_analysis'] = analysis_info
+        return fused_results
     
     async def search_similar(self, query: str, n_results: int = 5, 
                       where: Optional[Dict] = None, 
@@ -66,6 +250,10 @@ class SemanticSearchService:
             expansion_strategy (ExpansionStrategy): Strategy for query expansion.
         """
         
+        if expand_query and self.speculative_expansion:
+            return await self._speculative_search(query, n_results, where, where_document,
+                                                  use_cache, expansion_strategy)
+        
         start_time = time.time()
         status = "success"
         
@@ -86,10 +274,14 @@ class SemanticSearchService:
         
         # Check cache first
         if use_cache:
+            # Apply notes the vault monitor process rewrote, added or deleted since the last search
+            self.version_tracker.poll()
             cache_key = self._generate_cache_key(search_query, where, n_results)
             if cache_key in self.search_cache:
                 cache_entry = self.search_cache[cache_key]
-                if self._is_cache_valid(cache_entry):
+                if not self._is_cache_valid(cache_entry):
+                    self._drop_search_cache_entry(cache_key)
+                else:
                     self.cache_hits += 1
                     logger.debug(f"Cache hit for query: {search_query[:50]}...")
                     cached_results = cache_entry["results"]
@@ -97,15 +289,7 @@ class SemanticSearchService:
                     # Add query analysis info to cached results
                     if query_analysis:
                         for result in cached_results:
-                            result['query_analysis'] = {
-                                'original_query': query_analysis.original_query,
-                                'expanded_query': query_analysis.expanded_query,
-                                'intent': query_analysis.intent,
-                                'entities': query_analysis.entities,
-                                'expansion_confidence': query_analysis.expansion_confidence,
-                                'strategy_used': query_analysis.strategy_used.value,
-                                'expansion_reasoning': query_analysis.expansion_reasoning
-                            }
+                            result['query_analysis'] = self._query_analysis_info(query_analysis)
                     
                     return cached_results
         
@@ -114,15 +298,39 @@ class SemanticSearchService:
             query_embedding = self.cache_manager.get_cached_query_embedding(search_query)
             if query_embedding is None:
                 # Generate new embedding and cache it
-                query_embedding = self.embedding_service.generate_embedding(search_query)
+                query_embedding = await self._embed_query(search_query)
                 self.cache_manager.cache_query_embedding(search_query, query_embedding)
                 logger.debug(f"Generated and cached new query embedding for: {search_query[:50]}...")
             else:
                 logger.debug(f"Using cached query embedding for: {search_query[:50]}...")
             
+            # Paraphrase of a recent query with the same filters: reuse its results
+            semantic_hit = None
+            semantic_filter_key = None
+            if use_cache and self.semantic_cache is not None:
+                semantic_filter_key = SemanticResultCache.filter_key(n_results, where, where_document)
+                semantic_hit = self.semantic_cache.lookup(query_embedding, semantic_filter_key)
+                if semantic_hit is not None and not semantic_hit.verify:
+                    logger.debug(f"Semantic cache hit for '{search_query[:50]}' via '{semantic_hit.cached_query[:50]}' "
+                                 f"(similarity {semantic_hit.similarity:.3f})")
+                    # Copies, so the cached entry keeps its own previews; highlights, preview and
+                    # query relevance are recomputed for this query rather than the cached one
+                    hit_results = [
+                        {**result, 'semantic_cache': {'cached_query': semantic_hit.cached_query,
+                                                      'similarity': semantic_hit.similarity}}
+                        for result in semantic_hit.results
+                    ]
+                    if query_analysis:
+                        for result in hit_results:
+                            result['query_analysis'] = self._query_analysis_info(query_analysis)
+                    return self._enhance_search_results(hit_results, search_query)
+            
+            # A note rewritten while this query runs may or may not be reflected in its results
+            generation = self.version_tracker.generation
+            
             # Search in ChromaDB with rich metadata filtering
-            results = self.chroma_service.collection.query(
-                query_embeddings=[query_embedding],
+            results = self.chroma_service.query_by_embedding(
+                query_embedding,
                 n_results=n_results,
                 where=where,          # ✅ Leverage rich metadata filtering
                 where_document=where_document  # ✅ Leverage keyword filtering
@@ -140,30 +348,29 @@ class SemanticSearchService:
                 
                 # Add query analysis info if available
                 if query_analysis:
-                    result['query_analysis'] = {
-                        'original_query': query_analysis.original_query,
-                        'expanded_query': query_analysis.expanded_query,
-                        'intent': query_analysis.intent,
-                        'entities': query_analysis.entities,
-                        'expansion_confidence': query_analysis.expansion_confidence,
-                        'strategy_used': query_analysis.strategy_used.value,
-                        'expansion_reasoning': query_analysis.expansion_reasoning
-                    }
+                    result['query_analysis'] = self._query_analysis_info(query_analysis)
                 
                 formatted_results.append(result)
             
             # Enhance results with additional metadata
             enhanced_results = self._enhance_search_results(formatted_results, search_query)
             
-            # Cache results
-            if use_cache:
+            # Cache results (unless the collection changed underneath the query)
+            cacheable = use_cache and self.version_tracker.is_stable(generation)
+            if cacheable:
                 cache_key = self._generate_cache_key(search_query, where, n_results)
-                self.search_cache[cache_key] = {
-                    "results": enhanced_results,
-                    "timestamp": datetime.utcnow().timestamp()
-                }
+                self._cache_search_results(cache_key, enhanced_results, generation)
+            if use_cache:
                 self.cache_misses += 1
             
+            if semantic_hit is not None:
+                # Shadow-verified hit: the fresh results are served, the comparison feeds false-hit stats
+                if self.semantic_cache.record_verification(semantic_hit.results, enhanced_results):
+                    logger.info(f"Semantic cache false hit: '{search_query[:50]}' matched "
+                                f"'{semantic_hit.cached_query[:50]}' (similarity {semantic_hit.similarity:.3f})")
+            elif semantic_filter_key is not None and cacheable:
+                self.semantic_cache.store(search_query, query_embedding, semantic_filter_key, enhanced_results)
+            
             logger.debug(f"Found {len(enhanced_results)} results for query: {query[:50]}...")
             return enhanced_results
             
@@ -251,40 +458,46 @@ class SemanticSearchService:
     
     async def search_by_keywords(self, keywords: List[str], n_results: int = 5,
                           filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Search by keywords using text matching"""
+        """Search by keywords with the BM25 lexical index (falls back to filtering semantic results)"""
         try:
             # Create a text query from keywords
             query_text = " ".join(keywords)
             
-            # Use semantic search with the keyword query
-            results = await self.search_similar(query_text, n_results, filters)
-            
-            # Filter results by keyword presence
-            keyword_results = []
-            for result in results:
-                content_lower = result["content"].lower()
-                if any(keyword.lower() in content_lower for keyword in keywords):
-                    # Add keyword match score
-                    keyword_matches = sum(1 for keyword in keywords 
-                                        if keyword.lower() in content_lower)
-                    result["keyword_score"] = keyword_matches / len(keywords)
-                    keyword_results.append(result)
-            
-            # Sort by keyword score
-            keyword_results.sort(key=lambda x: x.get("keyword_score", 0), reverse=True)
+            if getattr(self.chroma_service, "lexical_index", None) is not None:
+                results = await asyncio.to_thread(self.chroma_service.keyword_search, query_text, n_results, filters)
+                for result in results:
+                    result["keyword_score"] = result["matched_terms"]
+                    result["search_type"] = "keyword"
+                return self._enhance_search_results(results, query_text)
             
-            return keyword_results[:n_results]
+            # No keyword index: use semantic search with the keyword query
+            results = await self.search_similar(query_text, n_results, filters)
+            return self._filter_by_keywords(results, keywords)[:n_results]
             
         except Exception as e:
             logger.error(f"Error in keyword search: {e}")
             raise
     
+    def _filter_by_keywords(self, results: List[Dict[str, Any]], keywords: List[str]) -> List[Dict[str, Any]]:
+        """Keep results containing any keyword, scored by the fraction of keywords present"""
+        keyword_results = []
+        for result in results:
+            content_lower = result["content"].lower()
+            keyword_matches = sum(1 for keyword in keywords if keyword.lower() in content_lower)
+            if keyword_matches:
+                keyword_results.append({**result, "keyword_score": keyword_matches / len(keywords),
+                                        "search_type": "keyword"})
+        
+        # Sort by keyword score
+        keyword_results.sort(key=lambda x: x["keyword_score"], reverse=True)
+        return keyword_results
+    
     async def search_by_tags(self, tags: List[str], n_results: int = 5) -> List[Dict[str, Any]]:
         """Search by tags"""
         try:
             # Search using metadata filters
             filters = {"tags": {"$in": tags}}
-            results = self.chroma_service.search_by_metadata(filters, n_results)
+            results = await asyncio.to_thread(self.chroma_service.search_by_metadata, filters, n_results)
             
             # Enhance results
             enhanced_results = []
@@ -329,50 +542,125 @@ class SemanticSearchService:
             logger.error(f"Error in path search: {e}")
             raise
     
+    async def _timed_retriever(self, name: str, retriever) -> Tuple[str, List[Dict[str, Any]], float]:
+        """Run one hybrid retriever, timing it; a failing retriever contributes no results"""
+        start_time = time.perf_counter()
+        try:
+            results = await retriever
+        except Exception as e:
+            logger.warning(f"Hybrid retriever '{name}' failed: {e}")
+            self.hybrid_stats["retrievers"].setdefault(name, self._empty_retriever_stats())["errors"] += 1
+            results = []
+        return name, results, (time.perf_counter() - start_time) * 1000
+    
+    @staticmethod
+    def _empty_retriever_stats() -> Dict[str, Any]:
+        return {"calls": 0, "errors": 0, "total_ms": 0.0, "last_ms": 0.0}
+    
     async def hybrid_search(self, query: str, n_results: int = 5,
                      include_keywords: bool = True,
                      include_tags: bool = True,
                      filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
-        """Perform hybrid search combining multiple search methods"""
+        """
+        Hybrid search: semantic, keyword and tag retrievers run concurrently and their
+        ranked lists are merged with weighted reciprocal rank fusion.
+        
+        The query is expanded and embedded once, inside the semantic retriever; keyword
+        retrieval uses the BM25 index (or, without one, filters the semantic results), so
+        hybrid latency is roughly that of the slowest retriever rather than their sum.
+        """
+        start_time = time.perf_counter()
         try:
-            all_results = []
-            
-            # Semantic search
-            semantic_results = await self.search_similar(query, n_results, filters)
-            for result in semantic_results:
-                result["search_type"] = "semantic"
-                result["search_score"] = result["similarity"]
-            all_results.extend(semantic_results)
-            
-            # Keyword search
-            if include_keywords:
-                keywords = query.split()
-                keyword_results = await self.search_by_keywords(keywords, n_results, filters)
-                for result in keyword_results:
-                    result["search_type"] = "keyword"
-                    result["search_score"] = result.get("keyword_score", 0)
-                all_results.extend(keyword_results)
+            candidates = max(n_results * 2, 10)
+            use_lexical_index = getattr(self.chroma_service, "lexical_index", None) is not None
             
-            # Tag search (extract tags from query)
+            retrievers = [self._timed_retriever("semantic", self.search_similar(query, candidates, filters))]
+            if include_keywords and use_lexical_index:
+                retrievers.append(self._timed_retriever(
+                    "keyword", self.search_by_keywords(query.split(), candidates, filters)))
             if include_tags:
                 tags = self._extract_tags_from_query(query)
                 if tags:
-                    tag_results = await self.search_by_tags(tags, n_results)
-                    for result in tag_results:
-                        result["search_type"] = "tag"
-                        result["search_score"] = 1.0
-                    all_results.extend(tag_results)
-            
-            # Remove duplicates and rank
-            unique_results = self._deduplicate_results(all_results)
-            ranked_results = self._rank_hybrid_results(unique_results, query)
-            
-            return ranked_results[:n_results]
+                    retrievers.append(self._timed_retriever("tag", self.search_by_tags(tags, candidates)))
+            
+            ranked_lists = {}
+            latencies = {}
+            for name, results, latency_ms in await asyncio.gather(*retrievers):
+                ranked_lists[name] = results
+                latencies[name] = latency_ms
+            
+            if include_keywords and not use_lexical_index:
+                # Keyword signal from the semantic candidates instead of a second vector query
+                ranked_lists["keyword"] = self._filter_by_keywords(ranked_lists["semantic"], query.split())
+            
+            names = list(ranked_lists)
+            fused_results = reciprocal_rank_fusion(
+                [ranked_lists[name] for name in names],
+                k=self.hybrid_rrf_k,
+                weights=[self.hybrid_weights.get(name, 1.0) for name in names],
+                n_results=n_results,
+                labels=names
+            )
+            for result in fused_results:
+                ranks = result["fusion"]["ranks"]
+                result["search_type"] = min(ranks, key=ranks.get)
+                result["retrievers"] = list(ranks)
+                result["combined_score"] = result["fusion"]["rrf_score"]
+            
+            total_ms = (time.perf_counter() - start_time) * 1000
+            self.hybrid_stats["searches"] += 1
+            self.hybrid_stats["total_ms"] += total_ms
+            for name, latency_ms in latencies.items():
+                retriever_stats = self.hybrid_stats["retrievers"].setdefault(name, self._empty_retriever_stats())
+                retriever_stats["calls"] += 1
+                retriever_stats["total_ms"] += latency_ms
+                retriever_stats["last_ms"] = latency_ms
+            logger.debug(f"Hybrid search for '{query[:50]}' in {total_ms:.1f}ms "
+                         f"(retrievers: {', '.join(f'{n} {ms:.1f}ms' for n, ms in latencies.items())})")
+            
+            return fused_results
             
         except Exception as e:
             logger.error(f"Error in hybrid search: {e}")
             raise
     
+    async def diversify_results(self, results: List[Dict[str, Any]], n_results: int = 5,
+                                strategy: str = "mmr", mmr_lambda: float = 0.7,
+                                cluster_threshold: float = 0.85) -> List[Dict[str, Any]]:
+        """
+        Diversify ranked candidates using their stored embeddings.
+        
+        The candidates' embeddings are fetched from ChromaDB in one call and compared with a
+        single cosine similarity matmul.
+        
+        Args:
+            results (List[Dict]): Candidates, best first (relevance is their 'similarity').
+            n_results (int): Number of results to return.
+            strategy (str): "mmr" (Maximal Marginal Relevance) or "cluster" (threshold clustering,
+                best result per cluster with its cluster_size).
+            mmr_lambda (float): MMR relevance/diversity trade-off.
+            cluster_threshold (float): Cosine similarity at which candidates share a cluster.
+        """
+        if len(results) <= 1:
+            return results[:n_results]
+        
+        embeddings = await asyncio.to_thread(self.chroma_service.get_embeddings, [r["id"] for r in results])
+        similarities = similarity_matrix(embeddings)
+        relevance = np.array([r.get("similarity", 0.0) for r in results], dtype=np.float32)
+        
+        if strategy == "mmr":
+            selected = mmr_select(relevance, similarities, n_results, mmr_lambda)
+            return [{**results[i], "search_type": "mmr", "mmr_rank": rank + 1} for rank, i in enumerate(selected)]
+        if strategy == "cluster":
+            clusters = threshold_clusters(similarities, cluster_threshold)
+            diversified = []
+            for members in clusters:
+                best = max(members, key=lambda i: relevance[i])
+                diversified.append({**results[best], "search_type": "clustered", "cluster_size": len(members)})
+            diversified.sort(key=lambda r: r.get("similarity", 0.0), reverse=True)
+            return diversified[:n_results]
+        raise ValueError(f"Unknown diversification strategy: {strategy}")
+    
     def _extract_tags_from_query(self, query: str) -> List[str]:
         """Extract tags from query text"""
         # Look for #tag patterns
@@ -380,53 +668,26 @@ class SemanticSearchService:
         tags = re.findall(tag_pattern, query)
         return tags
     
-    def _deduplicate_results(self, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Remove duplicate results based on ID"""
-        seen_ids = set()
-        unique_results = []
-        
-        for result in results:
-            if result["id"] not in seen_ids:
-                seen_ids.add(result["id"])
-                unique_results.append(result)
-        
-        return unique_results
-    
-    def _rank_hybrid_results(self, results: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
-        """Rank hybrid search results"""
-        for result in results:
-            # Combine different scores
-            semantic_score = result.get("similarity", 0)
-            keyword_score = result.get("keyword_score", 0)
-            tag_score = 1.0 if result.get("search_type") == "tag" else 0
-            
-            # Calculate combined score
-            combined_score = (
-                semantic_score * 0.6 +  # Semantic similarity weight
-                keyword_score * 0.3 +    # Keyword match weight
-                tag_score * 0.1          # Tag match weight
-            )
-            
-            result["combined_score"] = combined_score
-        
-        # Sort by combined score
-        results.sort(key=lambda x: x["combined_score"], reverse=True)
-        return results
-    
     def _enhance_search_results(self, results: List[Dict[str, Any]], query: str) -> List[Dict[str, Any]]:
         """Enhance search results with additional information"""
         enhanced_results = []
         
+        # Query terms are compiled once and each result's content is scanned once
+        terms = QueryTerms(query)
         for result in results:
+            occurrences = terms.find(result["content"])
+            
             # Add query relevance score
-            result["query_relevance"] = self._calculate_query_relevance(result["content"], query)
+            result["query_relevance"] = terms.relevance(result["content"], occurrences)
             
-            # Add content preview
-            result["preview"] = self._generate_content_preview(result["content"], query)
+            # Add content preview and the query term spans inside it
+            snippet = extract_snippet(result["content"], terms, occurrences=occurrences)
+            result["preview"] = snippet.text
+            result["preview_highlights"] = snippet.highlights
             
             # Add search metadata
             result["search_timestamp"] = datetime.utcnow().isoformat()
-            result["search_type"] = "semantic"
+            result.setdefault("search_type", "semantic")
             
             enhanced_results.append(result)
         
@@ -434,48 +695,12 @@ class SemanticSearchService:
     
     def _calculate_query_relevance(self, content: str, query: str) -> float:
         """Calculate relevance score between content and query"""
-        content_lower = content.lower()
-        query_lower = query.lower()
-        
-        # Count word matches
-        query_words = query_lower.split()
-        content_words = content_lower.split()
-        
-        matches = sum(1 for word in query_words if word in content_words)
-        relevance = matches / len(query_words) if query_words else 0
-        
-        return relevance
+        terms = QueryTerms(query)
+        return terms.relevance(content, terms.find(content))
     
     def _generate_content_preview(self, content: str, query: str, max_length: int = 200) -> str:
         """Generate content preview highlighting query terms"""
-        if len(content) <= max_length:
-            return content
-        
-        # Find query terms in content
-        query_lower = query.lower()
-        content_lower = content.lower()
-        
-        # Find the best position to start the preview
-        best_position = 0
-        max_matches = 0
-        
-        for i in range(len(content) - max_length + 1):
-            snippet = content_lower[i:i + max_length]
-            matches = sum(1 for word in query_lower.split() if word in snippet)
-            if matches > max_matches:
-                max_matches = matches
-                best_position = i
-        
-        # Generate preview
-        preview = content[best_position:best_position + max_length]
-        
-        # Add ellipsis if needed
-        if best_position > 0:
-            preview = "..." + preview
-        if best_position + max_length < len(content):
-            preview = preview + "..."
-        
-        return preview
+        return extract_snippet(content, QueryTerms(query), max_length).text
     
     def get_search_stats(self) -> Dict[str, Any]:
         """Get comprehensive search statistics including cache performance"""
@@ -486,13 +711,15 @@ class SemanticSearchService:
         # Get cache manager statistics
         cache_stats = self.cache_manager.get_cache_stats()
         
-        return {
+        stats = {
             "search_result_cache": {
                 "cache_size": cache_size,
                 "cache_hits": self.cache_hits,
                 "cache_misses": self.cache_misses,
                 "hit_rate": hit_rate,
-                "total_searches": total_searches
+                "total_searches": total_searches,
+                "invalidated_entries": self.invalidated_entries,
+                "collection_generation": self.version_tracker.generation
             },
             "query_embedding_cache": cache_stats["query_embedding_cache"],
             "total_performance": {
@@ -502,8 +729,33 @@ class SemanticSearchService:
                 "total_search_requests": cache_stats["total_requests"]["search_results"]
             }
         }
+        if self.embedding_batcher is not None:
+            stats["query_embedding_batching"] = self.embedding_batcher.get_stats()
+        stats["reranker"] = self.reranker.get_stats()
+        if self.semantic_cache is not None:
+            stats["semantic_result_cache"] = self.semantic_cache.get_stats()
+        searches = self.hybrid_stats["searches"]
+        stats["hybrid_search"] = {
+            "searches": searches,
+            "avg_ms": self.hybrid_stats["total_ms"] / searches if searches else 0.0,
+            "weights": self.hybrid_weights,
+            "retrievers": {
+                name: {**retriever_stats,
+                       "avg_ms": retriever_stats["total_ms"] / retriever_stats["calls"] if retriever_stats["calls"] else 0.0}
+                for name, retriever_stats in self.hybrid_stats["retrievers"].items()
+            }
+        }
+        stats["query_expansion"] = {
+            "speculative": self.speculative_expansion,
+            "deadline_seconds": self.expansion_deadline,
+            **self.speculative_stats,
+            "llm_calls": self.query_expansion_service.llm_calls,
+            "memo": self.query_expansion_service.expansion_memo.get_stats()
+        }
+        return stats
     
-    async def search_with_rerank(self, query: str, n_results: int = 5, rerank_top_k: int = 20) -> List[Dict[str, Any]]:
+    async def search_with_rerank(self, query: str, n_results: int = 5, rerank_top_k: int = 20,
+                                 cascade: bool = False) -> List[Dict[str, Any]]:
         """
         Search with cross-encoder re-ranking for higher precision.
         
@@ -511,6 +763,8 @@ class SemanticSearchService:
             query (str): The user's search query.
             n_results (int): Number of final results to return.
             rerank_top_k (int): Number of initial results to re-rank.
+            cascade (bool): Prune candidates by similarity margin and a truncated cross-encoder
+                pass, so only the best n_results get a full-length score.
         
         Returns:
             List[Dict[str, Any]]: Re-ranked search results with cross-encoder scores.
@@ -527,15 +781,26 @@ class SemanticSearchService:
             
             logger.info(f"Re-ranking {len(initial_results)} initial results")
             
-            # Step 2: Create pairs for the cross-encoder
-            pairs = [(query, result['content']) for result in initial_results]
-            
-            # Step 3: Get cross-encoder scores
+            # Step 2-3: Get cross-encoder scores (batched with concurrent requests, off the event loop)
             logger.debug("Computing cross-encoder scores...")
-            cross_scores = self.cross_encoder.predict(pairs)
+            documents = [result['content'] for result in initial_results]
+            doc_ids = [result.get('id') for result in initial_results]
+            if cascade:
+                cascade_result = await self.reranker.cascade_rerank(
+                    query, documents, [result['similarity'] for result in initial_results], doc_ids,
+                    keep_top=n_results
+                )
+                candidates = [initial_results[i] for i in cascade_result.order]
+                cross_scores = [cascade_result.scores[i] for i in cascade_result.order]
+                stages = [cascade_result.stages[i] for i in cascade_result.order]
+                logger.debug(f"Cascade pruned {cascade_result.pruned}")
+            else:
+                candidates = initial_results
+                cross_scores = await self.reranker.score(query, documents, doc_ids)
+                stages = ['full'] * len(candidates)
             
             # Step 4: Combine scores and enhance results
-            for i, result in enumerate(initial_results):
+            for i, result in enumerate(candidates):
                 result['cross_score'] = float(cross_scores[i])
                 
                 # Simple combination: final_score = 0.3 * vector_similarity + 0.7 * cross_score
@@ -548,12 +813,15 @@ class SemanticSearchService:
                     'vector_similarity': result['similarity'],
                     'cross_encoder_score': result['cross_score'],
                     'final_score': result['final_score'],
-                    'rerank_position': i + 1
+                    'rerank_position': i + 1,
+                    'rerank_stage': stages[i]
                 }
             
             # Step 5: Sort by the new final score and return top N
-            initial_results.sort(key=lambda x: x['final_score'], reverse=True)
-            final_results = initial_results[:n_results]
+            # (truncated-only cascade scores are not comparable, so full-length ones always rank first)
+            candidates.sort(key=lambda x: (x['rerank_metadata']['rerank_stage'] == 'full', x['final_score']),
+                            reverse=True)
+            final_results = candidates[:n_results]
             
             logger.info(f"Re-ranking complete. Returning top {len(final_results)} results")
             
@@ -666,6 +934,7 @@ class SemanticSearchService:
     def clear_search_cache(self):
         """Clear search cache"""
         self.search_cache.clear()
+        self._search_cache_keys_by_path.clear()
         self.cache_hits = 0
         self.cache_misses = 0
         logger.info("Search cache cleared")
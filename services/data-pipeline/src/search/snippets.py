@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Snippet Extraction Engine
+Single-pass query term matching with a compiled regex and a two-pointer densest-window sweep for previews and highlights
+"""
+
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (start, end, term index)
+Occurrence = Tuple[int, int, int]
+
+
+@dataclass
+class Snippet:
+    """A preview window of a result's content"""
+    text: str  # preview, with "..." where content was cut
+    start: int  # window offset in the original content
+    end: int
+    highlights: List[Tuple[int, int]] = field(default_factory=list)  # term spans, relative to text
+    matched_terms: int = 0  # query words fully inside the window
+
+
+class QueryTerms:
+    """
+    Query words compiled once and matched against many results.
+
+    Words are the whitespace-split, lower-cased query (repeated words count
+    once per repetition, like the per-word checks this replaces) and match as
+    case-insensitive substrings. A single lookahead regex with longest terms
+    first finds every term start in one pass; a shorter term found inside a
+    longer match (e.g. "java" inside "javascript") is added from precomputed
+    offsets, so occurrences are exactly those a per-term substring search
+    would report.
+    """
+
+    def __init__(self, query: str):
+        words = query.lower().split()
+        self.word_count = len(words)
+        counts = Counter(words)
+        self.terms = list(counts)
+        self.weights = [counts[term] for term in self.terms]
+
+        self._pattern = None
+        self._contained: List[List[Tuple[int, int]]] = []
+        if self.terms:
+            by_length = sorted(range(len(self.terms)), key=lambda i: -len(self.terms[i]))
+            self._pattern = re.compile(
+                "(?=" + "|".join(f"(?P<t{i}>{re.escape(self.terms[i])})" for i in by_length) + ")"
+            )
+            # Offsets of every other term inside each term
+            for term in self.terms:
+                inner = []
+                for j, other in enumerate(self.terms):
+                    if other == term or len(other) > len(term):
+                        continue
+                    offset = term.find(other)
+                    while offset != -1:
+                        inner.append((j, offset))
+                        offset = term.find(other, offset + 1)
+                self._contained.append(inner)
+
+    def find(self, content: str) -> List[Occurrence]:
+        """All term occurrences in content, sorted by start offset."""
+        if self._pattern is None:
+            return []
+        text = content.lower()
+        if len(text) != len(content):
+            # Lower-casing changed the length (rare Unicode); fall back to case-insensitive matching
+            text = content
+            pattern = re.compile(self._pattern.pattern, re.IGNORECASE)
+        else:
+            pattern = self._pattern
+
+        occurrences = []
+        for match in pattern.finditer(text):
+            index = int(match.lastgroup[1:])
+            start = match.start()
+            occurrences.append((start, start + len(self.terms[index]), index))
+            for inner_index, offset in self._contained[index]:
+                inner_start = start + offset
+                occurrences.append((inner_start, inner_start + len(self.terms[inner_index]), inner_index))
+        if any(self._contained):
+            occurrences = sorted(set(occurrences))
+        return occurrences
+
+    def relevance(self, content: str, occurrences: List[Occurrence]) -> float:
+        """
+        Fraction of query words that appear as whole whitespace-separated tokens.
+
+        Derived from the substring occurrences: a token match is an occurrence
+        bounded by whitespace or the content edges on both sides.
+        """
+        if not self.word_count:
+            return 0
+        present = set()
+        for start, end, index in occurrences:
+            if index in present:
+                continue
+            if (start == 0 or content[start - 1].isspace()) and (end == len(content) or content[end].isspace()):
+                present.add(index)
+        return sum(self.weights[index] for index in present) / self.word_count
+
+
+def densest_window(occurrences: List[Occurrence], weights: List[int],
+                   content_length: int, max_length: int) -> Tuple[int, int]:
+    """
+    Earliest window start maximizing the weighted count of distinct terms fully inside it.
+
+    The score only changes where an occurrence enters (start = end - max_length)
+    or leaves (start = occurrence start + 1) the window, and a leave can only
+    lower it, so the earliest best window starts at 0 or at an entry point.
+    Candidates are swept in order with two pointers over the occurrences sorted
+    by end (entering) and by start (leaving).
+
+    Returns:
+        (window start, score)
+    """
+    last_start = max(0, content_length - max_length)
+    fitting = [occ for occ in occurrences if occ[1] - occ[0] <= max_length]
+    if not fitting:
+        return 0, 0
+
+    by_end = sorted(fitting, key=lambda occ: occ[1])
+    by_start = sorted(fitting)
+    candidates = sorted({0} | {min(last_start, max(0, end - max_length)) for _, end, _ in fitting})
+
+    inside = [0] * len(weights)
+    score = 0
+    best_start, best_score = 0, 0
+    enter = leave = 0
+    for window_start in candidates:
+        window_end = window_start + max_length
+        while enter < len(by_end) and by_end[enter][1] <= window_end:
+            index = by_end[enter][2]
+            if inside[index] == 0:
+                score += weights[index]
+            inside[index] += 1
+            enter += 1
+        while leave < len(by_start) and by_start[leave][0] < window_start:
+            index = by_start[leave][2]
+            inside[index] -= 1
+            if inside[index] == 0:
+                score -= weights[index]
+            leave += 1
+        if score > best_score:
+            best_start, best_score = window_start, score
+    return best_start, best_score
+
+
+def extract_snippet(content: str, terms: QueryTerms, max_length: int = 200,
+                    occurrences: List[Occurrence] = None) -> Snippet:
+    """
+    Build the preview window with the most query words, plus highlight spans.
+
+    Args:
+        content: Result content
+        terms: Compiled query terms
+        max_length: Window length in characters
+        occurrences: Precomputed terms.find(content), if the caller already has it
+
+    Returns:
+        Snippet; content no longer than max_length is returned whole
+    """
+    if occurrences is None:
+        occurrences = terms.find(content)
+
+    if len(content) <= max_length:
+        start, matched = 0, sum(terms.weights[index] for index in {index for _, _, index in occurrences})
+        text, prefix = content, 0
+    else:
+        start, matched = densest_window(occurrences, terms.weights, len(content), max_length)
+        text = content[start:start + max_length]
+        prefix = 0
+        if start > 0:
+            text = "..." + text
+            prefix = 3
+        if start + max_length < len(content):
+            text = text + "..."
+    end = min(len(content), start + max_length)
+
+    highlights = []
+    last_end = -1
+    for occ_start, occ_end, _ in occurrences:
+        if occ_start >= start and occ_end <= end:
+            # Merge overlapping spans (nested terms) so highlights never overlap
+            if highlights and occ_start - start + prefix < last_end:
+                highlights[-1] = (highlights[-1][0], max(last_end, occ_end - start + prefix))
+            else:
+                highlights.append((occ_start - start + prefix, occ_end - start + prefix))
+            last_end = highlights[-1][1]
+    return Snippet(text=text, start=start, end=end, highlights=highlights, matched_terms=matched)
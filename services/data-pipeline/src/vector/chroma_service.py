@@ -5,19 +5,73 @@ Rich metadata storage and advanced querying capabilities
 """
 
 import chromadb
-import chromadb.utils.embedding_functions as embedding_functions
 import hashlib
+import os
+import re
 import time
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union
 import logging
 
+import numpy as np
+
+try:
+    from ..embeddings.model_registry import SharedSentenceTransformerEmbeddingFunction, canonical_model_name
+except ImportError:  # imported as the top-level "vector" package (src/ on sys.path, as in main.py)
+    from embeddings.model_registry import SharedSentenceTransformerEmbeddingFunction, canonical_model_name
+
+from .lexical_index import LexicalIndex
+
 logger = logging.getLogger(__name__)
 
+# chromadb < 0.5 validates embeddings as lists of Python floats; newer clients accept ndarrays as-is
+_CHROMA_ACCEPTS_NDARRAY = tuple(int(part) for part in re.findall(r"\d+", chromadb.__version__)[:2]) >= (0, 5)
+
+Embeddings = Union[np.ndarray, List[np.ndarray], List[List[float]]]
+
+
+def _to_client_embeddings(embeddings: Embeddings) -> Any:
+    """
+    Convert embeddings for the Chroma client at the last possible moment.
+    ndarray input (a float32 matrix or a list of row vectors) is converted with a
+    single .tolist() only when the installed client cannot take arrays directly.
+    """
+    if isinstance(embeddings, np.ndarray):
+        matrix = embeddings
+    elif len(embeddings) and isinstance(embeddings[0], np.ndarray):
+        matrix = np.stack(embeddings)
+    else:
+        return embeddings
+
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    return matrix if _CHROMA_ACCEPTS_NDARRAY else matrix.tolist()
+
+
+def content_chunk_ids(chunks: List[Dict[str, Any]]) -> List[str]:
+    """
+    Content-addressed chunk ids: sha256 of the note path and the chunk text.
+    An edit only changes the ids of the chunks whose text changed, so unchanged
+    chunks keep their id (and stored embedding) wherever they move in the note.
+    Identical texts within one note are told apart by their occurrence number.
+    """
+    ids = []
+    occurrences: Dict[tuple, int] = {}
+    for chunk in chunks:
+        digest = hashlib.sha256(chunk['content'].encode("utf-8")).hexdigest()
+        key = (chunk['path'], digest)
+        occurrence = occurrences.get(key, 0)
+        occurrences[key] = occurrence + 1
+        ids.append(hashlib.sha256(f"{chunk['path']}::{digest}::{occurrence}".encode("utf-8")).hexdigest())
+    return ids
+
+
 class ChromaService:
     """Enhanced ChromaDB service with rich metadata and advanced querying"""
     
     def __init__(self, collection_name: str = "obsidian_vault", persist_directory: str = "./data/chroma", 
-                 embedding_model: str = "all-MiniLM-L6-v2", optimize_for_large_vault: bool = True):
+                 embedding_model: str = "all-MiniLM-L6-v2", optimize_for_large_vault: bool = True,
+                 use_embedding_function: bool = True, lexical_index: bool = True):
         """
         Initialize the optimized ChromaDB service with HNSW configuration.
         Args:
@@ -25,6 +79,9 @@ class ChromaService:
             persist_directory (str): Directory to persist ChromaDB data.
             embedding_model (str): Name of the embedding model to use.
             optimize_for_large_vault (bool): Enable optimizations for large vaults (7.25GB+).
+            use_embedding_function (bool): Attach an embedding function so text queries work. When False
+                the service never touches the model and only accepts precomputed embeddings.
+            lexical_index (bool): Maintain a BM25 keyword index next to the Chroma files.
         """
         # Initialize ChromaDB client with optimized settings and disabled telemetry
         self.client = chromadb.PersistentClient(
@@ -37,14 +94,12 @@ class ChromaService:
         
         # Configure embedding function
         # Handle both cases: with and without sentence-transformers/ prefix
-        if embedding_model.startswith("sentence-transformers/"):
-            model_name = embedding_model
-        else:
-            model_name = f"sentence-transformers/{embedding_model}"
+        model_name = canonical_model_name(embedding_model)
+        self.model_name = model_name
         
-        self.embedding_function = embedding_functions.SentenceTransformerEmbeddingFunction(
-            model_name=model_name
-        )
+        # The function loads the shared registry model lazily, on the first text query
+        self.embedding_function = (SharedSentenceTransformerEmbeddingFunction(model_name)
+                                   if use_embedding_function else None)
         
         # Optimized HNSW configuration for large vaults
         if optimize_for_large_vault:
@@ -98,93 +153,110 @@ class ChromaService:
                 self.collection = self.client.get_collection(name=collection_name)
                 logger.warning(f"Using existing collection without embedding function: {e}")
         
+        # BM25 keyword index kept in step with every store/delete that goes through this service
+        self.lexical_index = None
+        if lexical_index:
+            self.lexical_index = LexicalIndex(os.path.join(persist_directory, f"lexical_{collection_name}.sqlite3"))
+            if len(self.lexical_index) == 0 and self.collection.count() > 0:
+                self.rebuild_lexical_index()
+        
         logger.info(f"Initialized optimized ChromaService with collection: {collection_name}, model: {embedding_model}")
         logger.info(f"HNSW optimization enabled: {optimize_for_large_vault}")
 
-    def store_embeddings(self, chunks: List[Dict[str, Any]], embeddings: List[List[float]]):
-        """Store chunks and embeddings with rich, validated metadata."""
+    @staticmethod
+    def _chunk_metadata(chunk: Dict[str, Any]) -> Dict[str, Any]:
+        """Validate a chunk and build its ChromaDB metadata (no None values)."""
+        # Validate critical fields
+        required_fields = ["path", "heading", "chunk_index", "chunk_token_count"]
+        for field in required_fields:
+            if field not in chunk:
+                raise KeyError(f"Chunk missing required metadata field: '{field}'")
+
+        return {
+            # Core
+            "path": chunk['path'],
+            "heading": chunk['heading'],
+            "chunk_index": chunk['chunk_index'],
+            "source_file": chunk['path'],  # Redundant but useful for filtering
+            # File Stats (Inherited)
+            "file_word_count": chunk.get('file_word_count', 0),
+            "file_char_count": chunk.get('file_char_count', 0),
+            "file_size": chunk.get('file_size', 0),
+            "file_modified": chunk.get('file_modified', 0),
+            "file_created": chunk.get('file_created', 0),
+            # Tags (Inherited & Separated)
+            "file_tags": ",".join(chunk.get('frontmatter_tags', []) + chunk.get('content_tags', [])),
+            "frontmatter_tags": ",".join(chunk.get('frontmatter_tags', [])),
+            "content_tags": ",".join(chunk.get('content_tags', [])),
+            # Chunk Stats (Computed)
+            "chunk_token_count": chunk.get('chunk_token_count', 0),  # ✅ Uses pre-computed value
+            "chunk_tokenizer": chunk.get('chunk_tokenizer', ""),
+            "chunk_word_count": chunk.get('chunk_word_count', 0),
+            "chunk_char_count": chunk.get('chunk_char_count', 0),
+            # Frontmatter (Inherited)
+            "has_frontmatter": chunk.get('has_frontmatter', False),
+            "frontmatter_keys": ",".join(chunk.get('frontmatter_keys', [])),
+            # File Structure (Inherited)
+            "file_extension": chunk.get('file_extension', ""),
+            "directory_path": chunk.get('directory_path', ""),
+            "file_name": chunk.get('file_name', ""),
+            # Enhanced Metadata Fields (ensure no None values for ChromaDB)
+            "path_year": chunk.get('path_year') or 0,
+            "path_month": chunk.get('path_month') or 0,
+            "path_day": chunk.get('path_day') or 0,
+            "path_category": chunk.get('path_category', ""),
+            "path_subcategory": chunk.get('path_subcategory', ""),
+            "file_type": chunk.get('file_type', ""),
+            "content_type": chunk.get('content_type', ""),
+            "links": ",".join(chunk.get('links', [])),
+        }
+
+    def store_embeddings(self, chunks: List[Dict[str, Any]], embeddings: Embeddings,
+                         ids: Optional[List[str]] = None) -> List[str]:
+        """
+        Store chunks and embeddings with rich, validated metadata.
+        Args:
+            chunks (List[Dict]): Chunk dictionaries from the content processor.
+            embeddings: (n, dim) float32 matrix, list of row vectors, or list of float lists.
+            ids (List[str]): Chunk ids computed with content_chunk_ids over each whole note. Required
+                whenever chunks is a subset of a note or splits a note, since occurrence numbers of
+                repeated texts depend on the full chunk list; defaults to content_chunk_ids(chunks).
+        Returns:
+            List[str]: Stored chunk ids, in chunk order.
+        """
         if len(chunks) != len(embeddings):
             raise ValueError("Mismatch: Number of chunks must equal number of embeddings.")
+        if ids is not None and len(ids) != len(chunks):
+            raise ValueError("Mismatch: Number of ids must equal number of chunks.")
 
         logger.info(f"Storing {len(chunks)} chunks with rich metadata in ChromaDB")
         
         start_time = time.time()
         status = "success"
 
-        ids = []
-        documents = []
-        metadatas = []
-
-        for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
-            # Validate critical fields
-            required_fields = ["path", "heading", "chunk_index", "chunk_token_count"]
-            for field in required_fields:
-                if field not in chunk:
-                    raise KeyError(f"Chunk missing required metadata field: '{field}'")
-
-            # Create a UNIQUE, STABLE ID
-            # Using path, heading, ACTUAL chunk_index, and storage index 'i' for absolute uniqueness
-            unique_id = hashlib.sha256(
-                f"{chunk['path']}::{chunk['heading']}::{chunk['chunk_index']}::{i}".encode()
-            ).hexdigest()
-
-            ids.append(unique_id)
-            documents.append(chunk['content'])
-
-            # Prepare METADATA (enhanced with new fields)
-            meta = {
-                # Core
-                "path": chunk['path'],
-                "heading": chunk['heading'],
-                "chunk_index": chunk['chunk_index'],
-                "source_file": chunk['path'],  # Redundant but useful for filtering
-                # File Stats (Inherited)
-                "file_word_count": chunk.get('file_word_count', 0),
-                "file_char_count": chunk.get('file_char_count', 0),
-                "file_size": chunk.get('file_size', 0),
-                "file_modified": chunk.get('file_modified', 0),
-                "file_created": chunk.get('file_created', 0),
-                # Tags (Inherited & Separated)
-                "file_tags": ",".join(chunk.get('frontmatter_tags', []) + chunk.get('content_tags', [])),
-                "frontmatter_tags": ",".join(chunk.get('frontmatter_tags', [])),
-                "content_tags": ",".join(chunk.get('content_tags', [])),
-                # Chunk Stats (Computed)
-                "chunk_token_count": chunk.get('chunk_token_count', 0),  # ✅ Uses pre-computed value
-                "chunk_word_count": chunk.get('chunk_word_count', 0),
-                "chunk_char_count": chunk.get('chunk_char_count', 0),
-                # Frontmatter (Inherited)
-                "has_frontmatter": chunk.get('has_frontmatter', False),
-                "frontmatter_keys": ",".join(chunk.get('frontmatter_keys', [])),
-                # File Structure (Inherited)
-                "file_extension": chunk.get('file_extension', ""),
-                "directory_path": chunk.get('directory_path', ""),
-                "file_name": chunk.get('file_name', ""),
-                # Enhanced Metadata Fields (ensure no None values for ChromaDB)
-                "path_year": chunk.get('path_year') or 0,
-                "path_month": chunk.get('path_month') or 0,
-                "path_day": chunk.get('path_day') or 0,
-                "path_category": chunk.get('path_category', ""),
-                "path_subcategory": chunk.get('path_subcategory', ""),
-                "file_type": chunk.get('file_type', ""),
-                "content_type": chunk.get('content_type', ""),
-                "links": ",".join(chunk.get('links', [])),
-            }
-            metadatas.append(meta)
+        metadatas = [self._chunk_metadata(chunk) for chunk in chunks]
+        if ids is None:
+            ids = content_chunk_ids(chunks)
+        documents = [chunk['content'] for chunk in chunks]
 
         # Log sample for debugging
         if metadatas:
             logger.debug(f"Storing chunk with metadata sample: {metadatas[0]}")
 
         try:
-            # Store in ChromaDB
-            self.collection.add(
+            # Store in ChromaDB (content-addressed ids make re-storing a chunk idempotent)
+            self.collection.upsert(
                 ids=ids,
                 documents=documents,
-                embeddings=embeddings,
+                embeddings=_to_client_embeddings(embeddings),
                 metadatas=metadatas
             )
 
             logger.info(f"Successfully stored {len(chunks)} chunks in ChromaDB.")
+            
+            if self.lexical_index is not None:
+                self.lexical_index.add_documents(ids, documents, metadatas)
+            return ids
         except Exception as e:
             status = "error"
             logger.error(f"Failed to store embeddings: {e}")
@@ -210,6 +282,10 @@ class ChromaService:
         Returns:
             List[Dict]: List of search results with metadata.
         """
+        if self.embedding_function is None:
+            raise ValueError("ChromaService was created with use_embedding_function=False; "
+                             "embed the query and call query_by_embedding instead")
+        
         logger.info(f"Searching for: '{query_text}' with {n_results} results")
         
         start_time = time.time()
@@ -284,6 +360,235 @@ class ChromaService:
         logger.info(f"Found {len(formatted_results)} results")
         return formatted_results
 
+    def query_by_embedding(self, query_embedding: Union[np.ndarray, List[float]], n_results: int = 5,
+                           where: Optional[Dict] = None, where_document: Optional[Dict] = None,
+                           include: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Query the collection with a precomputed embedding.
+        Args:
+            query_embedding: 1-D float32 array (or list of floats) for a single query.
+            n_results (int): Number of results to return.
+            where (Dict): Optional metadata filter.
+            where_document (Dict): Optional document content filter.
+            include (List[str]): Optional fields to include (Chroma defaults if None).
+        Returns:
+            Dict: Raw Chroma query result (lists nested per query).
+        """
+        start_time = time.time()
+        status = "success"
+
+        query_params = {
+            "query_embeddings": _to_client_embeddings([np.asarray(query_embedding, dtype=np.float32)]),
+            "n_results": n_results
+        }
+        if where:
+            query_params["where"] = where
+        if where_document:
+            query_params["where_document"] = where_document
+        if include is not None:
+            query_params["include"] = include
+
+        try:
+            return self.collection.query(**query_params)
+        except Exception as e:
+            status = "error"
+            logger.error(f"ChromaDB embedding query failed: {e}")
+            raise
+        finally:
+            duration = time.time() - start_time
+            try:
+                from ..monitoring.metrics import get_metrics
+                metrics = get_metrics()
+                metrics.record_chroma_query("query_by_embedding", duration, status)
+            except Exception as e:
+                logger.warning(f"Failed to record metrics: {e}")
+
+    def get_embeddings(self, ids: List[str]) -> np.ndarray:
+        """
+        Fetch stored embeddings for chunk ids in one call.
+        Args:
+            ids (List[str]): Chunk ids.
+        Returns:
+            np.ndarray: (len(ids), dim) float32 matrix aligned with ids (zero rows for unknown ids).
+        """
+        if not ids:
+            return np.zeros((0, 0), dtype=np.float32)
+        
+        stored = self.collection.get(ids=list(dict.fromkeys(ids)), include=["embeddings"])
+        rows = {chunk_id: row for chunk_id, row in zip(stored["ids"], stored["embeddings"])}
+        if not rows:
+            return np.zeros((len(ids), 0), dtype=np.float32)
+        
+        dim = len(next(iter(rows.values())))
+        matrix = np.zeros((len(ids), dim), dtype=np.float32)
+        for i, chunk_id in enumerate(ids):
+            row = rows.get(chunk_id)
+            if row is not None:
+                matrix[i] = row
+        return matrix
+
+    def move_file_chunks(self, old_path: str, new_path: str, path_metadata: Dict[str, Any]) -> List[str]:
+        """
+        Re-key a renamed or moved note's chunks under its new path, reusing the stored
+        embeddings and documents (no model inference).
+        Args:
+            old_path (str): Relative path the chunks are stored under.
+            new_path (str): Relative path the note now lives at.
+            path_metadata (Dict): Path-derived fields for new_path (FilesystemVaultClient.path_metadata).
+        Returns:
+            List[str]: New chunk ids in chunk order (empty when nothing was stored for old_path).
+        """
+        start_time = time.time()
+        status = "success"
+        moved = 0
+        try:
+            stored = self.collection.get(where={"path": old_path}, include=["documents", "metadatas", "embeddings"])
+            if not stored["ids"]:
+                return []
+            
+            # Chunk order decides the occurrence numbers of repeated texts, as in content_chunk_ids
+            order = sorted(range(len(stored["ids"])), key=lambda i: stored["metadatas"][i].get("chunk_index", 0))
+            documents = [stored["documents"][i] for i in order]
+            path_fields = {
+                "path": new_path,
+                "source_file": new_path,
+                "file_name": path_metadata.get("file_name", ""),
+                "file_extension": path_metadata.get("file_extension", ""),
+                "directory_path": path_metadata.get("directory_path", ""),
+                "path_year": path_metadata.get("path_year") or 0,
+                "path_month": path_metadata.get("path_month") or 0,
+                "path_day": path_metadata.get("path_day") or 0,
+                "path_category": path_metadata.get("path_category") or "",
+                "path_subcategory": path_metadata.get("path_subcategory") or "",
+                "file_type": path_metadata.get("file_type") or "",
+                "content_type": path_metadata.get("content_type") or "",
+            }
+            metadatas = [{**stored["metadatas"][i], **path_fields} for i in order]
+            embeddings = np.asarray([stored["embeddings"][i] for i in order], dtype=np.float32)
+            new_ids = content_chunk_ids([{"path": new_path, "content": document} for document in documents])
+            
+            # A note moved over an existing one replaces it
+            new_id_set = set(new_ids)
+            replaced = [chunk_id for chunk_id in self.get_chunk_ids(new_path) if chunk_id not in new_id_set]
+            
+            self.collection.upsert(
+                ids=new_ids,
+                documents=documents,
+                embeddings=_to_client_embeddings(embeddings),
+                metadatas=metadatas
+            )
+            if self.lexical_index is not None:
+                self.lexical_index.add_documents(new_ids, documents, metadatas)
+            self.delete_chunks(list(stored["ids"]) + replaced)
+            moved = len(new_ids)
+            
+            logger.info(f"Moved {moved} chunks from {old_path} to {new_path}")
+            return new_ids
+        except Exception as e:
+            status = "error"
+            logger.error(f"Failed to move chunks from {old_path} to {new_path}: {e}")
+            raise
+        finally:
+            duration = time.time() - start_time
+            try:
+                from ..monitoring.metrics import get_metrics
+                metrics = get_metrics()
+                metrics.record_chroma_batch_operation("move_file_chunks", moved)
+                metrics.record_chroma_query("move_file_chunks", duration, status)
+            except Exception as e:
+                logger.warning(f"Failed to record metrics: {e}")
+
+    def get_chunk_ids(self, path: str) -> List[str]:
+        """
+        Ids of every chunk stored for a note (metadata lookup, nothing else is fetched).
+        Args:
+            path (str): Relative note path.
+        Returns:
+            List[str]: Stored chunk ids.
+        """
+        return self.collection.get(where={"path": path}, include=[])["ids"]
+
+    def update_chunk_metadata(self, chunks: List[Dict[str, Any]], ids: List[str]):
+        """
+        Refresh the metadata of already-stored chunks without touching their embeddings.
+        Args:
+            chunks (List[Dict]): Chunk dictionaries from the content processor.
+            ids (List[str]): Stored ids of those chunks.
+        """
+        if not ids:
+            return
+        metadatas = [self._chunk_metadata(chunk) for chunk in chunks]
+        self.collection.update(ids=ids, metadatas=metadatas)
+        if self.lexical_index is not None:
+            self.lexical_index.update_metadata(ids, metadatas)
+
+    def delete_chunks(self, ids: List[str]):
+        """
+        Delete chunks from the collection and the keyword index.
+        Args:
+            ids (List[str]): Chunk ids to delete.
+        """
+        if not ids:
+            return
+        self.collection.delete(ids=ids)
+        if self.lexical_index is not None:
+            self.lexical_index.delete_ids(ids)
+
+    def keyword_search(self, query: str, n_results: int = 5, where: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """
+        BM25 keyword search over the lexical index (the vector store is not queried).
+        Args:
+            query (str): Keyword query.
+            n_results (int): Number of results to return.
+            where (Dict, optional): Metadata filter in ChromaDB syntax.
+        Returns:
+            List[Dict]: Results with id, content, metadata, bm25_score and matched_terms.
+        """
+        if self.lexical_index is None:
+            raise ValueError("Keyword search needs a ChromaService created with lexical_index=True")
+        
+        start_time = time.time()
+        status = "success"
+        try:
+            return self.lexical_index.search(query, n_results=n_results, where=where)
+        except Exception as e:
+            status = "error"
+            logger.error(f"Keyword search failed: {e}")
+            raise
+        finally:
+            duration = time.time() - start_time
+            try:
+                from ..monitoring.metrics import get_metrics
+                metrics = get_metrics()
+                metrics.record_chroma_query("keyword_search", duration, status)
+            except Exception as e:
+                logger.warning(f"Failed to record metrics: {e}")
+
+    def rebuild_lexical_index(self, batch_size: int = 2000) -> int:
+        """
+        Rebuild the keyword index from the documents stored in the collection.
+        Args:
+            batch_size (int): Chunks read from ChromaDB per page.
+        Returns:
+            int: Number of chunks indexed.
+        """
+        if self.lexical_index is None:
+            return 0
+        
+        start_time = time.time()
+        self.lexical_index.clear()
+        total = self.collection.count()
+        logger.info(f"Building keyword index for {total} chunks...")
+        
+        indexed = 0
+        for offset in range(0, total, batch_size):
+            page = self.collection.get(include=["documents", "metadatas"], limit=batch_size, offset=offset)
+            self.lexical_index.add_documents(page["ids"], page["documents"], page["metadatas"])
+            indexed += len(page["ids"])
+        
+        logger.info(f"Keyword index built: {indexed} chunks in {time.time() - start_time:.1f}s")
+        return indexed
+
     def search_by_metadata(self, filters: Dict[str, Any], n_results: int = 5) -> List[Dict[str, Any]]:
         """
         Search by metadata filters only (no semantic search).
@@ -333,7 +638,9 @@ class ChromaService:
         return {
             "collection_name": self.collection.name,
             "total_chunks": count,
-            "embedding_model": self.embedding_function.model_name if hasattr(self.embedding_function, 'model_name') else "unknown",
+            "embedding_model": self.model_name,
+            "embedding_function": self.embedding_function is not None,
+            "lexical_index_chunks": len(self.lexical_index) if self.lexical_index is not None else None,
             "hnsw_optimization": collection_metadata.get("optimized_for_large_vault", False),
             "hnsw_config": collection_metadata.get("hnsw_config", {}),
             "batch_optimization_enabled": collection_metadata.get("created_with_batch_optimization", False)
@@ -380,9 +687,14 @@ class ChromaService:
         """Get performance metrics for the optimized ChromaDB setup."""
         try:
             # Test search performance
-            test_query = "test query for performance measurement"
             start_time = time.time()
-            results = self.search_similar(test_query, n_results=5)
+            if self.embedding_function is not None:
+                self.search_similar("test query for performance measurement", n_results=5)
+            else:
+                # Embedding-only mode: query with a stored vector instead of loading the model
+                sample = self.collection.get(limit=1, include=["embeddings"])
+                if len(sample["embeddings"]):
+                    self.query_by_embedding(sample["embeddings"][0], n_results=5)
             search_time = time.time() - start_time
             
             # Test metadata filtering performance
@@ -405,6 +717,8 @@ class ChromaService:
     def delete_collection(self):
         """Delete the entire collection."""
         self.client.delete_collection(self.collection.name)
+        if self.lexical_index is not None:
+            self.lexical_index.clear()
         logger.info(f"Deleted collection: {self.collection.name}")
 
     def reset_collection(self):
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""
+Lexical BM25 Index
+Persistent SQLite inverted index over chunk contents with vectorized BM25 scoring over cached postings arrays
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# SQLite caps the number of bound parameters per statement
+_SQLITE_BATCH = 500
+
+_TOKEN_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+# Very common English/Portuguese words: near-zero IDF, but long postings lists
+STOPWORDS = frozenset("""
+a an and are as at be but by for from has have in is it its of on or that the this to was were will with
+o os as um uma uns umas de do da dos das em no na nos nas por para com que se ao aos e ou mas é são foi
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case word tokens (Unicode-aware), dropping single characters and stopwords."""
+    return [token for token in _TOKEN_PATTERN.findall(text.lower())
+            if len(token) > 1 and token not in STOPWORDS]
+
+
+def _matches(metadata: Dict[str, Any], where: Dict[str, Any]) -> bool:
+    """Evaluate a Chroma-style metadata filter ($and/$or, $eq/$ne/$in/$nin/$gt/$gte/$lt/$lte)."""
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(_matches(metadata, clause) for clause in condition):
+                return False
+            continue
+        if key == "$or":
+            if not any(_matches(metadata, clause) for clause in condition):
+                return False
+            continue
+
+        value = metadata.get(key)
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, operand in condition.items():
+            try:
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+                if op == "$gt" and not value > operand:
+                    return False
+                if op == "$gte" and not value >= operand:
+                    return False
+                if op == "$lt" and not value < operand:
+                    return False
+                if op == "$lte" and not value <= operand:
+                    return False
+            except TypeError:
+                return False
+    return True
+
+
+class LexicalIndex:
+    """
+    BM25 keyword retriever over stored chunks.
+
+    SQLite is the persistent store: postings (term, doc_id, tf) live in a
+    WITHOUT ROWID table clustered by term, next to the chunk contents and
+    metadata, so results never need the vector store. Queries score with numpy:
+    each query term's postings are loaded once into (doc_ids, tfs) arrays kept in
+    an LRU bounded by ``max_cached_postings``, and BM25 is accumulated into a
+    dense score array indexed by doc_id. Writes invalidate only the cached terms
+    of the chunks they touch.
+    """
+
+    def __init__(self, db_path: Optional[str] = "./data/chroma/lexical_index.sqlite3",
+                 k1: float = 1.2, b: float = 0.75, max_cached_postings: int = 5_000_000):
+        """
+        Initialize the index.
+
+        Args:
+            db_path: SQLite file (None keeps the index in memory)
+            k1: BM25 term-frequency saturation
+            b: BM25 document-length normalisation
+            max_cached_postings: Max postings held in the in-memory term cache (~12 bytes each)
+        """
+        self.db_path = db_path
+        self.k1 = k1
+        self.b = b
+        self.max_cached_postings = max_cached_postings
+        self._lock = threading.Lock()
+
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                doc_id INTEGER PRIMARY KEY,
+                chunk_id TEXT NOT NULL UNIQUE,
+                path TEXT,
+                length INTEGER NOT NULL,
+                terms TEXT NOT NULL,
+                content TEXT NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS chunks_path ON chunks(path);
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, doc_id)
+            ) WITHOUT ROWID;
+        """)
+        self._conn.commit()
+
+        # Dense doc_id -> length array (0 for free ids) and corpus totals, kept in step with writes
+        rows = self._conn.execute("SELECT doc_id, length FROM chunks").fetchall()
+        max_doc_id = max((doc_id for doc_id, _ in rows), default=0)
+        self._lengths = np.zeros(max(1024, max_doc_id + 1), dtype=np.float32)
+        for doc_id, length in rows:
+            self._lengths[doc_id] = length
+        self._doc_count = len(rows)
+        self._total_length = int(sum(length for _, length in rows))
+
+        self._postings: "OrderedDict[str, Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._cached_postings = 0
+
+        self.stats = {"queries": 0, "query_time_total": 0.0, "documents_added": 0, "documents_deleted": 0,
+                      "postings_cache_hits": 0, "postings_cache_misses": 0}
+        logger.info(f"Initialized LexicalIndex ({db_path or 'memory only'}, {self._doc_count} chunks)")
+
+    def __len__(self) -> int:
+        return self._doc_count
+
+    def _invalidate_terms(self, terms: Iterable[str]):
+        for term in terms:
+            cached = self._postings.pop(term, None)
+            if cached is not None:
+                self._cached_postings -= len(cached[0])
+
+    def _set_length(self, doc_id: int, length: int):
+        if doc_id >= len(self._lengths):
+            grown = np.zeros(max(doc_id + 1, len(self._lengths) * 2), dtype=np.float32)
+            grown[:len(self._lengths)] = self._lengths
+            self._lengths = grown
+        self._lengths[doc_id] = length
+
+    def _delete_doc_ids(self, rows: List[tuple]) -> int:
+        """Remove chunks (rows of doc_id, length, terms) and their postings; caller holds the lock."""
+        for doc_id, length, terms in rows:
+            term_list = terms.split()
+            self._conn.executemany("DELETE FROM postings WHERE term = ? AND doc_id = ?",
+                                   ((term, doc_id) for term in term_list))
+            self._conn.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+            self._invalidate_terms(term_list)
+            self._lengths[doc_id] = 0
+            self._doc_count -= 1
+            self._total_length -= length
+        self.stats["documents_deleted"] += len(rows)
+        return len(rows)
+
+    def _select_chunks(self, column: str, values: List[str]) -> List[tuple]:
+        rows = []
+        for i in range(0, len(values), _SQLITE_BATCH):
+            batch = values[i:i + _SQLITE_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            rows.extend(self._conn.execute(
+                f"SELECT doc_id, length, terms FROM chunks WHERE {column} IN ({placeholders})", batch
+            ).fetchall())
+        return rows
+
+    def add_documents(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+        """
+        Index chunks (existing chunk ids are replaced).
+
+        Args:
+            ids: Chunk ids (as stored in the vector collection)
+            documents: Chunk contents
+            metadatas: Chunk metadata dicts
+        """
+        with self._lock:
+            self._delete_doc_ids(self._select_chunks("chunk_id", list(ids)))
+            for chunk_id, content, metadata in zip(ids, documents, metadatas):
+                counts = Counter(tokenize(content))
+                length = sum(counts.values())
+                cursor = self._conn.execute(
+                    "INSERT INTO chunks (chunk_id, path, length, terms, content, metadata) VALUES (?, ?, ?, ?, ?, ?)",
+                    (chunk_id, metadata.get("path"), length, " ".join(counts), content,
+                     json.dumps(metadata, default=str))
+                )
+                doc_id = cursor.lastrowid
+                self._conn.executemany("INSERT INTO postings (term, doc_id, tf) VALUES (?, ?, ?)",
+                                       ((term, doc_id, tf) for term, tf in counts.items()))
+                self._invalidate_terms(counts)
+                self._set_length(doc_id, length)
+                self._doc_count += 1
+                self._total_length += length
+            self._conn.commit()
+            self.stats["documents_added"] += len(ids)
+
+    def update_metadata(self, ids: List[str], metadatas: List[Dict[str, Any]]):
+        """Replace the metadata of indexed chunks (content and postings are unchanged)."""
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE chunks SET path = ?, metadata = ? WHERE chunk_id = ?",
+                ((metadata.get("path"), json.dumps(metadata, default=str), chunk_id)
+                 for chunk_id, metadata in zip(ids, metadatas))
+            )
+            self._conn.commit()
+
+    def delete_ids(self, ids: Iterable[str]) -> int:
+        """Remove chunks by id; returns how many were indexed."""
+        with self._lock:
+            deleted = self._delete_doc_ids(self._select_chunks("chunk_id", list(ids)))
+            self._conn.commit()
+            return deleted
+
+    def delete_paths(self, paths: Iterable[str]) -> int:
+        """Remove every chunk of the given note paths; returns how many were indexed."""
+        with self._lock:
+            deleted = self._delete_doc_ids(self._select_chunks("path", list(paths)))
+            self._conn.commit()
+            return deleted
+
+    def clear(self):
+        """Drop the whole index."""
+        with self._lock:
+            self._conn.execute("DELETE FROM postings")
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.commit()
+            self._lengths = np.zeros(1024, dtype=np.float32)
+            self._postings.clear()
+            self._cached_postings = 0
+            self._doc_count = 0
+            self._total_length = 0
+
+    def _term_postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(doc_ids, tfs) arrays for a term, from the LRU or SQLite; caller holds the lock."""
+        cached = self._postings.get(term)
+        if cached is not None:
+            self._postings.move_to_end(term)
+            self.stats["postings_cache_hits"] += 1
+            return cached
+
+        self.stats["postings_cache_misses"] += 1
+        cursor = self._conn.execute("SELECT doc_id, tf FROM postings WHERE term = ?", (term,))
+        pairs = np.fromiter(chain.from_iterable(cursor), dtype=np.int64).reshape(-1, 2)
+        postings = (pairs[:, 0], pairs[:, 1].astype(np.float32))
+
+        self._postings[term] = postings
+        self._cached_postings += len(pairs)
+        while self._cached_postings > self.max_cached_postings and len(self._postings) > 1:
+            _, evicted = self._postings.popitem(last=False)
+            self._cached_postings -= len(evicted[0])
+        return postings
+
+    def search(self, query: str, n_results: int = 5, where: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        Rank chunks for a keyword query with BM25.
+
+        Args:
+            query: Free-text query (tokenized like the indexed content)
+            n_results: Number of results to return
+            where: Optional Chroma-style metadata filter, applied to an over-fetched candidate list
+
+        Returns:
+            List of result dicts (id, content, metadata, bm25_score, matched_terms), best first
+        """
+        start_time = time.time()
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self._doc_count:
+            return []
+
+        with self._lock:
+            n_docs = self._doc_count
+            avg_length = self._total_length / n_docs
+            length_norm = self.k1 * (1 - self.b + self.b * self._lengths / avg_length)
+            scores = np.zeros(len(self._lengths), dtype=np.float32)
+            matched = np.zeros(len(self._lengths), dtype=np.int16)
+
+            for term in terms:
+                doc_ids, tfs = self._term_postings(term)
+                if not len(doc_ids):
+                    continue
+                idf = math.log(1 + (n_docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+                # doc_ids are unique per term, so fancy-index accumulation is safe
+                scores[doc_ids] += idf * tfs * (self.k1 + 1) / (tfs + length_norm[doc_ids])
+                matched[doc_ids] += 1
+
+            candidates = np.flatnonzero(matched)
+            if not len(candidates):
+                return []
+            limit = n_results if where is None else max(n_results * 10, 100)
+            if len(candidates) > limit:
+                candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+            ranked_ids = [int(doc_id) for doc_id in candidates]
+            rows = {}
+            for i in range(0, len(ranked_ids), _SQLITE_BATCH):
+                batch = ranked_ids[i:i + _SQLITE_BATCH]
+                placeholders = ",".join("?" * len(batch))
+                for doc_id, chunk_id, content, metadata_json in self._conn.execute(
+                    f"SELECT doc_id, chunk_id, content, metadata FROM chunks WHERE doc_id IN ({placeholders})", batch
+                ):
+                    rows[doc_id] = (chunk_id, content, metadata_json)
+
+        results = []
+        for doc_id in ranked_ids:
+            chunk_id, content, metadata_json = rows[doc_id]
+            metadata = json.loads(metadata_json)
+            if where is not None and not _matches(metadata, where):
+                continue
+            results.append({
+                "id": chunk_id,
+                "content": content,
+                "metadata": metadata,
+                "bm25_score": float(scores[doc_id]),
+                "matched_terms": int(matched[doc_id]) / len(terms)
+            })
+            if len(results) >= n_results:
+                break
+
+        self.stats["queries"] += 1
+        self.stats["query_time_total"] += time.time() - start_time
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size, postings cache and query statistics."""
+        queries = self.stats["queries"]
+        return {
+            **self.stats,
+            "indexed_chunks": self._doc_count,
+            "avg_chunk_length": self._total_length / self._doc_count if self._doc_count else 0.0,
+            "cached_terms": len(self._postings),
+            "cached_postings": self._cached_postings,
+            "avg_query_time_ms": self.stats["query_time_total"] / queries * 1000 if queries else 0.0
+        }
+
+    def close(self):
+        """Close the SQLite connection."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Concurrent query latency benchmark for the async embedding micro-batcher
+Compares blocking per-request embedding inside async handlers against AsyncEmbeddingBatcher under concurrent load
+"""
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List, Dict, Any
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.embeddings.embedding_service import EmbeddingService
+from src.embeddings.async_batcher import AsyncEmbeddingBatcher
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+TOTAL_REQUESTS = int(os.getenv("BENCHMARK_REQUESTS", "400"))
+REQUEST_RATE = float(os.getenv("BENCHMARK_REQUEST_RATE", "100"))  # requests per second
+
+BASE_QUERIES = [
+    "machine learning algorithms",
+    "como criar um plano de negócios",
+    "python async programming patterns",
+    "notas sobre produtividade pessoal",
+    "vector database indexing strategies",
+    "estratégias de investimento a longo prazo",
+    "how to structure an obsidian vault",
+    "resumo do livro hábitos atômicos"
+]
+
+
+class AsyncEmbeddingBatcherTester:
+    """Measure per-request query embedding latency with and without micro-batching"""
+
+    def __init__(self):
+        # No cache tiers: every request pays for a forward pass
+        self.embedding_service = EmbeddingService(MODEL_NAME, cache_path=None, memory_cache_size=0)
+
+    @staticmethod
+    def _query(i: int) -> str:
+        # Unique texts so micro-batching cannot win by deduplication alone
+        return f"{BASE_QUERIES[i % len(BASE_QUERIES)]} #{i}"
+
+    async def _run_load(self, embed) -> Dict[str, Any]:
+        """
+        Open-loop load: request i arrives at i / REQUEST_RATE seconds regardless of
+        how fast earlier ones finish, and latency is measured from its arrival time,
+        so time spent waiting behind a blocked event loop is counted.
+        """
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        latencies: List[float] = []
+
+        async def request(i: int):
+            arrival = start_time + i / REQUEST_RATE
+            await asyncio.sleep(max(0.0, arrival - loop.time()))
+            await embed(self._query(i))
+            latencies.append(loop.time() - arrival)
+
+        await asyncio.gather(*[request(i) for i in range(TOTAL_REQUESTS)])
+        wall_time = loop.time() - start_time
+
+        latencies_ms = np.array(latencies) * 1000
+        return {
+            "requests": len(latencies),
+            "wall_time": wall_time,
+            "throughput": len(latencies) / wall_time if wall_time > 0 else 0,
+            "p50_ms": float(np.percentile(latencies_ms, 50)),
+            "p95_ms": float(np.percentile(latencies_ms, 95)),
+            "p99_ms": float(np.percentile(latencies_ms, 99))
+        }
+
+    @staticmethod
+    def _log(label: str, result: Dict[str, Any]):
+        logger.info(f"  {label:<32} p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  "
+                    f"p99 {result['p99_ms']:8.1f} ms  {result['throughput']:7.1f} req/s")
+
+    async def test_blocking(self) -> Dict[str, Any]:
+        """Previous behaviour: generate_embedding called synchronously in the handler"""
+        async def embed(query: str):
+            return self.embedding_service.generate_embedding_array(query)
+        result = await self._run_load(embed)
+        self._log("blocking, batch size 1", result)
+        return result
+
+    async def test_thread_per_request(self) -> Dict[str, Any]:
+        """Off the event loop but still one forward pass per request"""
+        async def embed(query: str):
+            return await asyncio.to_thread(self.embedding_service.generate_embedding_array, query)
+        result = await self._run_load(embed)
+        self._log("to_thread, batch size 1", result)
+        return result
+
+    async def test_batched(self) -> Dict[str, Any]:
+        """AsyncEmbeddingBatcher in front of EmbeddingService"""
+        batcher = AsyncEmbeddingBatcher(self.embedding_service, max_batch_size=32, max_wait_ms=5)
+        try:
+            result = await self._run_load(batcher.embed)
+            result["batching"] = batcher.get_stats()
+        finally:
+            await batcher.close()
+        self._log("AsyncEmbeddingBatcher", result)
+        logger.info(f"    avg batch size {result['batching']['avg_batch_size']:.1f}, "
+                    f"{result['batching']['batches']} model calls")
+        return result
+
+    async def run_all_tests(self):
+        """Run the benchmark"""
+        logger.info("=" * 80)
+        logger.info(f"QUERY EMBEDDING LATENCY: {TOTAL_REQUESTS} requests at {REQUEST_RATE:.0f} req/s")
+        logger.info("=" * 80)
+
+        # Warm up the model so the first configuration is not penalised
+        self.embedding_service.generate_embedding_array("warm up")
+
+        results = {
+            "blocking": await self.test_blocking(),
+            "thread_per_request": await self.test_thread_per_request(),
+            "batched": await self.test_batched()
+        }
+
+        blocking_p99 = results["blocking"]["p99_ms"]
+        batched_p99 = results["batched"]["p99_ms"]
+        logger.info("=" * 80)
+        logger.info("MICRO-BATCHING SUMMARY")
+        logger.info("=" * 80)
+        logger.info(f"p99 latency: {blocking_p99:.1f} ms -> {batched_p99:.1f} ms "
+                    f"({blocking_p99 / batched_p99 if batched_p99 else 0:.1f}x lower)")
+        return results
+
+
+async def main():
+    """Main test function"""
+    tester = AsyncEmbeddingBatcherTester()
+    await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
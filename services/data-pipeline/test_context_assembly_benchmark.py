@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Benchmark for LLM context assembly
+Request-path tokenizer calls, latency and context-window utilization of the ContextAssembler (ingest-time counts + knapsack) vs the previous tokenize-twice, stop-at-first-overflow loop
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+import tiktoken
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.llm.context_assembler import ContextAssembler, ContextChunk, knapsack_select
+from src.processing.content_processor import ContentProcessor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+MAX_CONTEXT_TOKENS = 3072
+RESULTS_PER_QUERY = int(os.getenv("BENCHMARK_CONTEXT_RESULTS", "20"))
+QUERIES = int(os.getenv("BENCHMARK_CONTEXT_QUERIES", "50"))
+
+WORDS = ("the of and to in is for that with on as python data search vector index cache query embedding model "
+         "performance latency memory async function class notes vault obsidian markdown heading chunk token").split()
+# Markdown and code fragments, where the embedding tokenizer and cl100k_base disagree most
+MARKUP = ["\n- ", "\n\n", "`query()`", "**cache**", "[[Note Link]]", "#tag", "->", "x=1;", "(see above)", "2024-05-01"]
+
+
+class CountingTokenizer:
+    """cl100k_base token counter that records how often it is called"""
+
+    def __init__(self):
+        self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.calls = 0
+
+    def __call__(self, text: str) -> int:
+        self.calls += 1
+        return len(self.encoding.encode(text))
+
+
+def legacy_assemble(context_chunks: List[Dict[str, Any]], count_tokens, max_tokens: int) -> Dict[str, Any]:
+    """The previous GeminiClient.assemble_context (chunk content and formatted chunk both tokenized)"""
+    formatter = ContextAssembler(lambda text: 0, max_tokens)
+    chunks = []
+    for chunk_data in context_chunks:
+        metadata = chunk_data.get('metadata', {})
+        chunks.append(ContextChunk(
+            content=chunk_data.get('content', ''), metadata=metadata,
+            relevance_score=chunk_data.get('final_score', chunk_data.get('similarity', 0)),
+            token_count=count_tokens(chunk_data.get('content', '')),
+            source_file=metadata.get('path', 'unknown'), chunk_index=metadata.get('chunk_index', 0)
+        ))
+    chunks.sort(key=lambda x: x.relevance_score, reverse=True)
+
+    used_chunks, total_tokens = [], 0
+    for chunk in chunks:
+        chunk_tokens = count_tokens(formatter.format_chunk(chunk))
+        if total_tokens + chunk_tokens > max_tokens:
+            break
+        used_chunks.append(chunk)
+        total_tokens += chunk_tokens
+    return {"used_chunks": used_chunks, "total_tokens": total_tokens}
+
+
+class ContextAssemblyBenchmark:
+    """Compare both assembly paths over the same search results"""
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        # Stored counts come from the embedding model's tokenizer, exactly as at ingest
+        ingest_processor = ContentProcessor(MODEL_NAME)
+        vocabulary = WORDS * 4 + MARKUP
+        self.result_sets = []
+        for _ in range(QUERIES):
+            results = []
+            for i in range(RESULTS_PER_QUERY):
+                # Chunk sizes vary like real notes: short sections next to full 512-token windows
+                content = " ".join(rng.choice(vocabulary, size=int(rng.integers(40, 420))))
+                metadata = {"path": f"notes/note-{int(rng.integers(0, 30))}.md", "heading": f"Section {i % 4}",
+                            "chunk_index": i, "chunk_token_count": ingest_processor._count_tokens(content),
+                            "chunk_tokenizer": ingest_processor.model_name}
+                results.append({"content": content, "metadata": metadata,
+                                 "similarity": float(rng.uniform(0.3, 0.9))})
+            self.result_sets.append(results)
+
+    def benchmark(self) -> Dict[str, Any]:
+        """Tokenizer calls, latency and relevance/budget use per query"""
+        legacy_tokenizer = CountingTokenizer()
+        tokenizer = CountingTokenizer()
+        assembler = ContextAssembler(tokenizer, MAX_CONTEXT_TOKENS, tokenizer_name="cl100k_base")
+        # Warm the header memo and the tokenizer ratio calibration, as a running service would be
+        for results in self.result_sets:
+            assembler.assemble(results)
+        setup_calls = tokenizer.calls
+
+        timings = {"legacy": [], "assembler": []}
+        totals = {"legacy": {"tokens": 0, "chunks": 0, "relevance": 0.0, "exact_tokens": 0},
+                  "assembler": {"tokens": 0, "chunks": 0, "relevance": 0.0, "exact_tokens": 0}}
+        over_budget = 0
+        for results in self.result_sets:
+            start_time = time.perf_counter()
+            legacy = legacy_assemble(results, legacy_tokenizer, MAX_CONTEXT_TOKENS)
+            timings["legacy"].append((time.perf_counter() - start_time) * 1000)
+
+            start_time = time.perf_counter()
+            context_text, used_chunks, total_tokens = assembler.assemble(results)
+            timings["assembler"].append((time.perf_counter() - start_time) * 1000)
+
+            exact = len(legacy_tokenizer.encoding.encode(context_text))
+            over_budget += exact > MAX_CONTEXT_TOKENS
+            for name, chunks, tokens in (("legacy", legacy["used_chunks"], legacy["total_tokens"]),
+                                         ("assembler", used_chunks, total_tokens)):
+                totals[name]["tokens"] += tokens
+                totals[name]["chunks"] += len(chunks)
+                totals[name]["relevance"] += sum(chunk.relevance_score for chunk in chunks)
+            totals["assembler"]["exact_tokens"] += exact
+
+        results = {}
+        for name in ("legacy", "assembler"):
+            calls = (legacy_tokenizer.calls if name == "legacy" else tokenizer.calls - setup_calls) / QUERIES
+            results[name] = {
+                "avg_ms": float(np.mean(timings[name])),
+                "tokenizer_calls_per_query": calls,
+                "utilization": totals[name]["tokens"] / (MAX_CONTEXT_TOKENS * QUERIES),
+                "chunks_per_query": totals[name]["chunks"] / QUERIES,
+                "relevance_per_query": totals[name]["relevance"] / QUERIES
+            }
+            logger.info(f"  {name:>9}: {results[name]['avg_ms']:6.2f} ms, "
+                        f"{calls:5.1f} tokenizer calls/query, {results[name]['utilization']:.1%} of window, "
+                        f"{results[name]['chunks_per_query']:.1f} chunks, "
+                        f"relevance {results[name]['relevance_per_query']:.2f}")
+        estimate_error = (totals["assembler"]["tokens"] - totals["assembler"]["exact_tokens"]) / max(1, totals["assembler"]["exact_tokens"])
+        results["estimate_error"] = estimate_error
+        results["over_budget"] = over_budget
+        results["tokenizer_ratios"] = assembler.get_stats()["tokenizer_ratios"]
+        logger.info(f"  Calibrated cl100k_base / ingest token ratios: {results['tokenizer_ratios']}")
+        logger.info(f"  Estimated vs exact context tokens: {estimate_error:+.2%}, {over_budget} contexts over budget")
+        return results
+
+    def test_selection(self) -> Dict[str, bool]:
+        """Knapsack and fallback checks"""
+        checks = {}
+        checks["knapsack fills capacity better than greedy"] = knapsack_select([6, 5, 5], [1.0, 0.9, 0.9], 10) == [1, 2]
+        checks["knapsack never exceeds bucketed capacity"] = sum(
+            [5000, 3000, 2500, 1200][i] for i in knapsack_select([5000, 3000, 2500, 1200], [1, 1, 1, 1], 6700)) <= 6700
+
+        tokenizer = CountingTokenizer()
+        assembler = ContextAssembler(tokenizer, 120)
+        big = {"content": "word " * 90, "metadata": {"path": "a.md", "chunk_token_count": 90}, "similarity": 0.9}
+        small = {"content": "tiny", "metadata": {"path": "b.md"}, "similarity": 0.1}
+        _, used, _ = assembler.assemble([small, big])
+        checks["most relevant chunk kept first"] = [chunk.source_file for chunk in used][:1] == ["a.md"]
+        checks["missing counts fall back to the tokenizer"] = assembler.stats["fallback_counts"] == 1
+
+        matching = ContextAssembler(CountingTokenizer(), 120, tokenizer_name="cl100k_base", calibration_chunks=1)
+        same = {"content": "word " * 10, "similarity": 0.5,
+                "metadata": {"path": "c.md", "chunk_token_count": 10, "chunk_tokenizer": "cl100k_base"}}
+        foreign = {"content": "word " * 10, "similarity": 0.5,
+                   "metadata": {"path": "d.md", "chunk_token_count": 5, "chunk_tokenizer": MODEL_NAME}}
+        matching.assemble([same, foreign])
+        checks["matching tokenizer counts are trusted"] = matching.stats["precomputed_counts"] == 1
+        checks["foreign tokenizer counts are calibrated"] = matching.stats["calibration_counts"] == 1
+        matching.calibration_rate = 0.0
+        converted = matching.to_context_chunk(foreign)
+        checks["calibrated counts carry the safety margin"] = converted.token_count == int(np.ceil(
+            5 * matching.tokenizer_ratio(MODEL_NAME) * (1 + matching.safety_margin)))
+        for label, passed in checks.items():
+            logger.info(f"  {'✅' if passed else '❌'} {label}")
+        return checks
+
+    async def run_all_tests(self):
+        """Run the benchmark"""
+        logger.info("=" * 80)
+        logger.info(f"CONTEXT ASSEMBLY ({QUERIES} queries x {RESULTS_PER_QUERY} results, {MAX_CONTEXT_TOKENS}-token window)")
+        logger.info("=" * 80)
+        results = {"benchmark": self.benchmark(), "checks": self.test_selection()}
+
+        logger.info("=" * 80)
+        logger.info("CONTEXT ASSEMBLY SUMMARY")
+        logger.info("=" * 80)
+        benchmark = results["benchmark"]
+        if benchmark["assembler"]["tokenizer_calls_per_query"] <= 0.05 * RESULTS_PER_QUERY:
+            logger.info(f"✅ {benchmark['assembler']['tokenizer_calls_per_query']:.1f} tokenizer calls per query "
+                        f"(calibration samples) once headers are memoized")
+        else:
+            logger.warning(f"⚠️ {benchmark['assembler']['tokenizer_calls_per_query']:.1f} tokenizer calls per query")
+        if benchmark["over_budget"] == 0:
+            logger.info(f"✅ Window utilization {benchmark['legacy']['utilization']:.1%} -> "
+                        f"{benchmark['assembler']['utilization']:.1%}, never over budget")
+        else:
+            logger.warning(f"⚠️ {benchmark['over_budget']} assembled contexts exceeded the budget")
+        if not all(results["checks"].values()):
+            logger.warning("⚠️ Some selection checks failed")
+        return results
+
+
+async def main():
+    """Main test function"""
+    benchmark = ContextAssemblyBenchmark()
+    await benchmark.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
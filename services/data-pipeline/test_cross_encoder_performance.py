@@ -8,6 +8,7 @@ import asyncio
 import logging
 import time
 import json
+import math
 import statistics
 from pathlib import Path
 from typing import List, Dict, Any
@@ -334,6 +335,71 @@ class CrossEncoderTester:
         logger.info(f"Re-ranked search complete. Avg time: {results['performance']['avg_search_time']:.3f}s")
         return results
     
+    @staticmethod
+    def _ndcg(ranked_ids: List[str], gains: Dict[str, float], k: int) -> float:
+        """nDCG@k of a ranking against graded relevance"""
+        dcg = sum(gains.get(doc_id, 0.0) / math.log2(rank + 2) for rank, doc_id in enumerate(ranked_ids[:k]))
+        ideal = sorted(gains.values(), reverse=True)[:k]
+        idcg = sum(gain / math.log2(rank + 2) for rank, gain in enumerate(ideal))
+        return dcg / idcg if idcg > 0 else 0.0
+
+    async def _rerank_cost(self, queries: List[str], cascade: bool) -> Dict[str, Any]:
+        """Run every query in one rerank mode with a cold score cache and collect rankings and model cost"""
+        reranker = self.search_service.reranker
+        reranker.clear_cache()
+        before = dict(reranker.stats)
+        rankings = {}
+        start_time = time.time()
+        for query in queries:
+            search_results = await self.search_service.search_with_rerank(
+                query=query, n_results=5, rerank_top_k=10, cascade=cascade
+            )
+            rankings[query] = [r['id'] for r in search_results]
+        elapsed = time.time() - start_time
+        delta = {key: reranker.stats[key] - before[key] for key in before}
+        return {"rankings": rankings, "time": elapsed, "stats": delta}
+
+    async def test_cascade_reranked_search(self, queries: List[str]) -> Dict[str, Any]:
+        """Compare cascaded reranking against full-length reranking of every candidate"""
+        logger.info("Testing cascaded re-ranked search...")
+
+        full = await self._rerank_cost(queries, cascade=False)
+        cascade = await self._rerank_cost(queries, cascade=True)
+
+        # Graded relevance from the full rerank: rank 1 gets 5, rank 5 gets 1
+        ndcg_scores = []
+        for query in queries:
+            reference = full["rankings"][query]
+            gains = {doc_id: float(len(reference) - rank) for rank, doc_id in enumerate(reference)}
+            ndcg_scores.append(self._ndcg(cascade["rankings"][query], gains, k=5))
+
+        full_tokens = full["stats"]["pair_tokens_scored"]
+        cascade_tokens = cascade["stats"]["pair_tokens_scored"]
+        results = {
+            "ndcg_at_5_vs_full": statistics.mean(ndcg_scores) if ndcg_scores else 0.0,
+            "full": {
+                "time": full["time"],
+                "pairs_scored": full["stats"]["pairs_scored"],
+                "pair_tokens_scored": full_tokens
+            },
+            "cascade": {
+                "time": cascade["time"],
+                "pairs_scored": cascade["stats"]["pairs_scored"],
+                "pair_tokens_scored": cascade_tokens,
+                "candidates": cascade["stats"]["cascade_candidates"],
+                "pruned_by_margin": cascade["stats"]["cascade_pruned_by_margin"],
+                "truncated_scored": cascade["stats"]["cascade_truncated_scored"],
+                "pruned_after_truncated": cascade["stats"]["cascade_pruned_after_truncated"],
+                "full_scored": cascade["stats"]["cascade_full_scored"]
+            },
+            # Estimated tokens through the cross-encoder, proportional to its FLOPs
+            "flop_ratio": cascade_tokens / full_tokens if full_tokens else 0.0
+        }
+
+        logger.info(f"Cascade nDCG@5 vs full rerank: {results['ndcg_at_5_vs_full']:.3f}, "
+                    f"cross-encoder tokens {cascade_tokens} / {full_tokens} ({results['flop_ratio']:.1%})")
+        return results
+
     def compare_results(self, baseline: Dict, reranked: Dict) -> Dict[str, Any]:
         """Compare baseline vs re-ranked results"""
         logger.info("Comparing results...")
@@ -414,6 +480,12 @@ class CrossEncoderTester:
             logger.info("="*50)
             reranked_results = await self.test_reranked_search(test_queries)
             
+            # Test cascaded re-ranking
+            logger.info("\n" + "="*50)
+            logger.info("TESTING CASCADED RE-RANKING")
+            logger.info("="*50)
+            cascade_results = await self.test_cascade_reranked_search(test_queries)
+            
             # Compare
             logger.info("\n" + "="*50)
             logger.info("COMPARING RESULTS")
@@ -424,6 +496,7 @@ class CrossEncoderTester:
             self.results = {
                 "baseline": baseline_results,
                 "reranked": reranked_results,
+                "cascade": cascade_results,
                 "comparison": comparison
             }
             
@@ -446,6 +519,7 @@ class CrossEncoderTester:
             "test_type": "cross_encoder_performance",
             "baseline": self.results["baseline"],
             "reranked": self.results["reranked"],
+            "cascade": self.results["cascade"],
             "comparison": self.results["comparison"]
         }
         
@@ -478,6 +552,15 @@ class CrossEncoderTester:
         print(f"   Average Final Score: {reranked['quality']['avg_final_score']:.3f}")
         print(f"   Average Cross Score: {reranked['quality']['avg_cross_score']:.3f}")
         
+        cascade = self.results["cascade"]
+        print(f"\n✂️ CASCADED RE-RANKING:")
+        print(f"   nDCG@5 vs Full Re-rank: {cascade['ndcg_at_5_vs_full']:.3f}")
+        print(f"   Cross-Encoder Tokens: {cascade['cascade']['pair_tokens_scored']} / "
+              f"{cascade['full']['pair_tokens_scored']} ({cascade['flop_ratio']:.1%})")
+        print(f"   Pruned by Margin: {cascade['cascade']['pruned_by_margin']} / {cascade['cascade']['candidates']}")
+        print(f"   Pruned after Truncated Pass: {cascade['cascade']['pruned_after_truncated']}")
+        print(f"   Full-Length Scored: {cascade['cascade']['full_scored']}")
+        
         print(f"\n📈 COMPARISON:")
         print(f"   Time Change: {comparison['performance']['time_percent_change']:+.1f}%")
         print(f"   Quality Change: {comparison['quality']['quality_percent_change']:+.1f}%")
@@ -201,7 +201,7 @@ class EnhancedSearchTester:
             logger.info(f"Test: {test['description']}")
             
             try:
-                results = self.search_service.search_with_semantic_clustering(
+                results = await self.search_service.search_with_semantic_clustering(
                     query=test["query"],
                     n_results=5,
                     cluster_threshold=0.6
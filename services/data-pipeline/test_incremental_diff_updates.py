@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Test diff-based incremental updates
+Edits a long note and checks that content-addressed chunk ids limit re-embedding to the chunks that changed
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.vector.chroma_service import ChromaService, content_chunk_ids
+from src.embeddings.embedding_service import EmbeddingService
+from src.processing.content_processor import ContentProcessor
+from src.monitoring.incremental_updater import IncrementalUpdateService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+SECTIONS = int(os.getenv("BENCHMARK_DIFF_SECTIONS", "40"))
+NOTE_PATH = "projects/long-note.md"
+
+
+def section_text(index: int, extra: str = "") -> str:
+    return (f"## Section {index}\n\nDetails for part {index} of the project: design notes, open questions "
+            f"and follow-ups about search latency and caching.{extra}\n")
+
+
+class CountingEmbeddingService(EmbeddingService):
+    """EmbeddingService that counts how many texts it was asked to embed"""
+
+    texts_embedded = 0
+
+    def batch_generate_embedding_matrix(self, texts, *args, **kwargs):
+        self.texts_embedded += len(texts)
+        return super().batch_generate_embedding_matrix(texts, *args, **kwargs)
+
+
+class IncrementalDiffUpdateTester:
+    """Compare diff updates against delete-and-re-embed on the same edits"""
+
+    def __init__(self, vault_path: Path, chroma_path: str):
+        self.vault_path = vault_path
+        self.embedding_service = CountingEmbeddingService(MODEL_NAME, cache_path=None)
+        self.content_processor = ContentProcessor(MODEL_NAME)
+        self.chroma_service = ChromaService(collection_name="diff_update_test", persist_directory=chroma_path,
+                                            embedding_model=MODEL_NAME, use_embedding_function=False)
+        self.sections = [section_text(i) for i in range(SECTIONS)]
+
+    def updater(self, diff_updates: bool) -> IncrementalUpdateService:
+        return IncrementalUpdateService(str(self.vault_path), self.chroma_service, self.embedding_service,
+                                        self.content_processor, diff_updates=diff_updates)
+
+    def write_note(self):
+        note_path = self.vault_path / NOTE_PATH
+        note_path.parent.mkdir(parents=True, exist_ok=True)
+        note_path.write_text("# Long note\n\n" + "\n".join(self.sections), encoding="utf-8")
+
+    async def _timed_update(self, diff_updates: bool) -> Dict[str, Any]:
+        self.embedding_service.texts_embedded = 0
+        start_time = time.perf_counter()
+        result = await self.updater(diff_updates).process_file_update(NOTE_PATH)
+        result["elapsed_ms"] = (time.perf_counter() - start_time) * 1000
+        result["texts_embedded"] = self.embedding_service.texts_embedded
+        return result
+
+    async def test_edits(self) -> Dict[str, Any]:
+        """One-line edit, inserted section and removed section, each applied both ways"""
+        self.write_note()
+        initial = await self._timed_update(diff_updates=True)
+        ids_before = set(self.chroma_service.get_chunk_ids(NOTE_PATH))
+
+        edits = {}
+        for name, apply_edit in (
+            ("one-line edit", lambda: self.sections.__setitem__(SECTIONS // 2, section_text(SECTIONS // 2, " Rye."))),
+            ("inserted section", lambda: self.sections.insert(1, section_text(999))),
+            ("removed section", lambda: self.sections.pop(5))
+        ):
+            apply_edit()
+            self.write_note()
+            diff = await self._timed_update(diff_updates=True)
+            # Re-applying the same file the old way re-embeds every chunk
+            full = await self._timed_update(diff_updates=False)
+            edits[name] = {"diff": diff, "full": full}
+            logger.info(f"{name:>16}: diff embedded {diff['texts_embedded']}/{diff['chunks_processed']} chunks "
+                        f"({diff['elapsed_ms']:.1f}ms), full re-embed {full['texts_embedded']} "
+                        f"({full['elapsed_ms']:.1f}ms)")
+
+        # A second copy of an existing section must get its own id, not overwrite the first copy,
+        # and a follow-up update of the unchanged file must find both copies already stored
+        self.sections.append(self.sections[10])
+        self.write_note()
+        duplicate = await self._timed_update(diff_updates=True)
+        repeat = await self._timed_update(diff_updates=True)
+        logger.info(f"duplicated section: diff embedded {duplicate['texts_embedded']} chunks, "
+                    f"unchanged re-update embedded {repeat['texts_embedded']}")
+
+        stored = self.chroma_service.collection.get(where={"path": NOTE_PATH}, include=["documents", "metadatas"])
+        chunks = self.content_processor.chunk_content(
+            (self.vault_path / NOTE_PATH).read_text(encoding="utf-8"), {}, NOTE_PATH)
+        return {
+            "initial": initial,
+            "edits": edits,
+            "duplicate": duplicate,
+            "repeat": repeat,
+            "ids_unchanged_survive": len(ids_before & set(stored["ids"])) >= SECTIONS - 3,
+            "stored_matches_chunks": sorted(stored["ids"]) == sorted(content_chunk_ids(chunks)),
+            "chunk_index_refreshed": sorted(m["chunk_index"] for m in stored["metadatas"]) == list(range(len(chunks))),
+            "keyword_index_updated": bool(self.chroma_service.keyword_search("rye", n_results=1))
+                                     if self.chroma_service.lexical_index is not None else True,
+            "keyword_index_size": (len(self.chroma_service.lexical_index) == len(stored["ids"]))
+                                  if self.chroma_service.lexical_index is not None else True
+        }
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        results = await self.test_edits()
+
+        logger.info("=" * 80)
+        logger.info("DIFF-BASED INCREMENTAL UPDATE SUMMARY")
+        logger.info("=" * 80)
+        edits = results["edits"]
+        checks = {
+            "one-line edit embeds one chunk": edits["one-line edit"]["diff"]["texts_embedded"] == 1,
+            "inserted section embeds only itself": edits["inserted section"]["diff"]["texts_embedded"] == 1,
+            "removed section embeds nothing": edits["removed section"]["diff"]["texts_embedded"] == 0
+                                              and edits["removed section"]["diff"]["chunks_deleted"] == 1,
+            "duplicated section embeds one chunk": results["duplicate"]["texts_embedded"] == 1,
+            "duplicate stays indexed on re-update": results["repeat"]["texts_embedded"] == 0
+                                                    and results["repeat"]["chunks_deleted"] == 0,
+            "unchanged chunks keep their ids": results["ids_unchanged_survive"],
+            "collection holds exactly the current chunks": results["stored_matches_chunks"],
+            "reused chunks get fresh metadata": results["chunk_index_refreshed"],
+            "keyword index follows the edits": results["keyword_index_updated"] and results["keyword_index_size"]
+        }
+        for label, passed in checks.items():
+            logger.info(f"{'✅' if passed else '❌'} {label}")
+        diff_ms = sum(edit["diff"]["elapsed_ms"] for edit in edits.values())
+        full_ms = sum(edit["full"]["elapsed_ms"] for edit in edits.values())
+        logger.info(f"Update time over {len(edits)} edits: diff {diff_ms:.1f}ms vs full re-embed {full_ms:.1f}ms")
+        return all(checks.values())
+
+
+async def main():
+    """Main test function"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        vault_path = Path(temp_dir) / "vault"
+        vault_path.mkdir()
+        tester = IncrementalDiffUpdateTester(vault_path, str(Path(temp_dir) / "chroma"))
+        success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
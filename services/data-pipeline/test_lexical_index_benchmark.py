@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Benchmark and checks for the BM25 lexical index
+Builds a synthetic Zipf-distributed corpus of 100k+ chunks and measures keyword query latency, plus ranking/delete/filter checks
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.vector.lexical_index import LexicalIndex
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CORPUS_CHUNKS = int(os.getenv("BENCHMARK_LEXICAL_CHUNKS", "100000"))
+CHUNK_TOKENS = int(os.getenv("BENCHMARK_LEXICAL_CHUNK_TOKENS", "120"))
+VOCABULARY_SIZE = 30000
+QUERIES = 300
+TARGET_P95_MS = float(os.getenv("BENCHMARK_LEXICAL_TARGET_P95_MS", "20"))
+
+
+class LexicalIndexBenchmark:
+    """Build a large synthetic index and time BM25 queries against it"""
+
+    def __init__(self, db_path: str):
+        self.rng = np.random.default_rng(0)
+        self.vocabulary = [f"term{i}" for i in range(VOCABULARY_SIZE)]
+        self.index = LexicalIndex(db_path)
+
+    def _sample_words(self, count: int) -> List[str]:
+        ranks = np.minimum(self.rng.zipf(1.2, size=count), VOCABULARY_SIZE) - 1
+        return [self.vocabulary[rank] for rank in ranks]
+
+    def build(self) -> Dict[str, Any]:
+        """Index the corpus in batches the size ChromaService.store_embeddings sees"""
+        start_time = time.perf_counter()
+        batch = 1000
+        for offset in range(0, CORPUS_CHUNKS, batch):
+            ids, documents, metadatas = [], [], []
+            for i in range(offset, min(offset + batch, CORPUS_CHUNKS)):
+                ids.append(f"chunk-{i}")
+                documents.append(" ".join(self._sample_words(CHUNK_TOKENS)))
+                metadatas.append({"path": f"notes/note-{i // 8}.md", "chunk_index": i % 8,
+                                  "file_type": "dated_note" if i % 3 == 0 else "note"})
+            self.index.add_documents(ids, documents, metadatas)
+
+        # A few notes with a distinctive phrase the ranking checks look for
+        self.index.add_documents(
+            ["needle-0", "needle-1"],
+            ["zephyrine quokka migration notes zephyrine", "quokka sighting " + " ".join(self._sample_words(40))],
+            [{"path": "needles/zephyrine.md", "file_type": "note"},
+             {"path": "needles/quokka.md", "file_type": "dated_note"}]
+        )
+        build_time = time.perf_counter() - start_time
+        db_size = os.path.getsize(self.index.db_path) if self.index.db_path else 0
+        logger.info(f"  Indexed {len(self.index)} chunks in {build_time:.1f}s "
+                    f"({len(self.index) / build_time:.0f} chunks/s, {db_size / 2**20:.1f} MB)")
+        return {"chunks": len(self.index), "build_seconds": build_time, "db_mb": db_size / 2**20}
+
+    def benchmark_queries(self) -> Dict[str, Any]:
+        """Latency of 1-3 term queries drawn from the corpus distribution, cold then warm postings cache"""
+        queries = [" ".join(self._sample_words(int(self.rng.integers(1, 4)))) for _ in range(QUERIES)]
+        results = {}
+        for phase in ("cold", "warm"):
+            latencies = []
+            for query in queries:
+                start_time = time.perf_counter()
+                self.index.search(query, n_results=10)
+                latencies.append((time.perf_counter() - start_time) * 1000)
+            latencies = np.array(latencies)
+            results[phase] = {"p50_ms": float(np.percentile(latencies, 50)),
+                              "p95_ms": float(np.percentile(latencies, 95)),
+                              "max_ms": float(latencies.max())}
+            logger.info(f"  {QUERIES} queries ({phase}): p50 {results[phase]['p50_ms']:.2f} ms, "
+                        f"p95 {results[phase]['p95_ms']:.2f} ms, max {results[phase]['max_ms']:.2f} ms")
+        return results
+
+    def test_ranking_and_maintenance(self) -> Dict[str, bool]:
+        """Ranking, metadata filters and delete paths"""
+        checks = {}
+        top = self.index.search("zephyrine quokka", n_results=3)
+        checks["rare terms rank their chunk first"] = bool(top) and top[0]["id"] == "needle-0"
+
+        filtered = self.index.search("quokka", n_results=3, where={"file_type": "dated_note"})
+        checks["metadata filter applied"] = [r["id"] for r in filtered] == ["needle-1"]
+
+        self.index.delete_paths(["needles/zephyrine.md"])
+        checks["deleted path no longer returned"] = all(
+            r["id"] != "needle-0" for r in self.index.search("zephyrine", n_results=3)
+        )
+
+        self.index.add_documents(["needle-1"], ["quokka rewritten"], [{"path": "needles/quokka.md"}])
+        rewritten = self.index.search("rewritten", n_results=1)
+        checks["re-added chunk replaces the old one"] = bool(rewritten) and rewritten[0]["id"] == "needle-1"
+
+        for label, passed in checks.items():
+            logger.info(f"  {'✅' if passed else '❌'} {label}")
+        return checks
+
+    async def run_all_tests(self):
+        """Run the benchmark"""
+        logger.info("=" * 80)
+        logger.info(f"BM25 LEXICAL INDEX ({CORPUS_CHUNKS} chunks x {CHUNK_TOKENS} tokens)")
+        logger.info("=" * 80)
+        results = {"build": self.build(), "queries": self.benchmark_queries(),
+                   "checks": self.test_ranking_and_maintenance(), "stats": self.index.get_stats()}
+
+        logger.info("=" * 80)
+        logger.info("LEXICAL INDEX SUMMARY")
+        logger.info("=" * 80)
+        warm_p95 = results["queries"]["warm"]["p95_ms"]
+        if warm_p95 <= TARGET_P95_MS:
+            logger.info(f"✅ Warm p95 query latency {warm_p95:.2f} ms (target {TARGET_P95_MS:.0f} ms)")
+        else:
+            logger.warning(f"⚠️ Warm p95 query latency {warm_p95:.2f} ms exceeds {TARGET_P95_MS:.0f} ms")
+        if not all(results["checks"].values()):
+            logger.warning("⚠️ Some ranking/maintenance checks failed")
+        return results
+
+
+async def main():
+    """Main test function"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        benchmark = LexicalIndexBenchmark(os.path.join(temp_dir, "lexical_index.sqlite3"))
+        await benchmark.run_all_tests()
+        benchmark.index.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -6,6 +6,7 @@ Comprehensive testing of file watching, incremental updates, and startup sync
 
 import asyncio
 import logging
+import os
 import tempfile
 import shutil
 from pathlib import Path
@@ -60,7 +61,18 @@ async def test_live_vault_sync():
         )
         
         print("✅ Vault monitor initialized successfully")
-        
+
+        # Directory mtimes must persist across restarts, and every component must list through that scanner
+        scanner = vault_monitor.filesystem_client.scanner
+        if not scanner.state_path or not os.path.exists(scanner.state_path):
+            print("❌ Vault scanner has no persistent state file")
+            return False
+        if (vault_monitor.incremental_updater.filesystem_client is not vault_monitor.filesystem_client
+                or vault_monitor.startup_sync.filesystem_client is not vault_monitor.filesystem_client):
+            print("❌ Incremental updater and startup sync do not share the monitor's vault client")
+            return False
+        print(f"✅ Vault scanner state persisted at {scanner.state_path}")
+
         # Test 2: Startup Synchronization
         print("\n🚀 TEST 2: Startup Synchronization")
         print("-" * 40)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the LRU/TTL cache core
+Per-operation insert and lookup cost of LRUTTLCache vs the previous scan-and-sort CacheManager cleanup as the cache grows to 100k entries
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.cache.lru_ttl_cache import CacheEntry, LRUTTLCache
+from src.cache.cache_manager import CacheManager
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SIZES = [int(size) for size in os.getenv("BENCHMARK_CACHE_SIZES", "1000,10000,100000").split(",")]
+LEGACY_MAX_SIZE = int(os.getenv("BENCHMARK_LEGACY_MAX_SIZE", "10000"))  # the old path is O(n log n) per write
+OPERATIONS = 2000
+EMBEDDING_DIM = 384
+
+
+def legacy_cleanup(cache: Dict[str, CacheEntry], max_entries: int):
+    """The per-insert cleanup CacheManager used before LRUTTLCache"""
+    current_time = time.time()
+    expired_keys = [key for key, entry in cache.items() if (current_time - entry.timestamp) >= entry.ttl]
+    for key in expired_keys:
+        del cache[key]
+    if len(cache) > max_entries:
+        sorted_entries = sorted(cache.items(), key=lambda x: x[1].last_accessed)
+        for key, _ in sorted_entries[:len(cache) - max_entries]:
+            del cache[key]
+
+
+class LRUTTLCacheBenchmark:
+    """Measure insert and lookup latency at increasing cache sizes"""
+
+    def __init__(self):
+        self.vector = np.random.default_rng(0).random(EMBEDDING_DIM, dtype=np.float32)
+
+    def _new_cache(self, size: int) -> Dict[str, Any]:
+        """LRUTTLCache filled to capacity, so every further insert evicts"""
+        cache = LRUTTLCache("benchmark", max_entries=size, default_ttl=3600)
+        for i in range(size):
+            cache.put(f"key-{i}", self.vector)
+
+        start_time = time.perf_counter()
+        for i in range(OPERATIONS):
+            cache.put(f"new-{i}", self.vector)
+        insert_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for i in range(OPERATIONS):
+            cache.get(f"key-{size - 1 - i}")
+        lookup_time = time.perf_counter() - start_time
+
+        return {"insert_us": insert_time / OPERATIONS * 1e6, "lookup_us": lookup_time / OPERATIONS * 1e6,
+                "size": len(cache)}
+
+    def _legacy_cache(self, size: int) -> Dict[str, Any]:
+        """Dict + scan/sort cleanup on every insert"""
+        cache: Dict[str, CacheEntry] = {}
+        now = time.time()
+        for i in range(size):
+            cache[f"key-{i}"] = CacheEntry(data=self.vector, timestamp=now, ttl=3600, last_accessed=now)
+
+        operations = max(1, min(OPERATIONS, 200_000_000 // (size * 20)))
+        start_time = time.perf_counter()
+        for i in range(operations):
+            now = time.time()
+            cache[f"new-{i}"] = CacheEntry(data=self.vector, timestamp=now, ttl=3600, last_accessed=now)
+            legacy_cleanup(cache, size)
+        insert_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        for i in range(OPERATIONS):
+            entry = cache.get(f"key-{size - 1 - i}")
+            if entry and time.time() - entry.timestamp < entry.ttl:
+                entry.access_count += 1
+                entry.last_accessed = time.time()
+        lookup_time = time.perf_counter() - start_time
+
+        return {"insert_us": insert_time / operations * 1e6, "lookup_us": lookup_time / OPERATIONS * 1e6,
+                "size": len(cache)}
+
+    def test_byte_budget(self) -> Dict[str, Any]:
+        """A 16 MB budget holds ~10k 384-dim float32 vectors however many are inserted"""
+        budget = 16 * 1024 * 1024
+        cache = LRUTTLCache("embeddings", max_bytes=budget, default_ttl=3600)
+        for i in range(50_000):
+            cache.put(f"key-{i}", self.vector.copy())
+        stats = cache.get_stats()
+        logger.info(f"  16 MB budget: {stats['size']} entries, {stats['bytes'] / 2**20:.1f} MB, "
+                    f"{stats['evictions']} evictions")
+        return {"within_budget": stats["bytes"] <= budget, **stats}
+
+    def test_cache_manager(self) -> Dict[str, Any]:
+        """CacheManager on top of LRUTTLCache at 100k query embeddings"""
+        manager = CacheManager(max_query_embeddings=100_000)
+        start_time = time.perf_counter()
+        for i in range(100_000):
+            manager.cache_query_embedding(f"query {i}", self.vector)
+        insert_time = time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        for i in range(100_000):
+            manager.get_cached_query_embedding(f"query {i}")
+        lookup_time = time.perf_counter() - start_time
+        logger.info(f"  CacheManager 100k: insert {insert_time / 100_000 * 1e6:.2f} us, "
+                    f"lookup {lookup_time / 100_000 * 1e6:.2f} us")
+        return {"insert_us": insert_time / 100_000 * 1e6, "lookup_us": lookup_time / 100_000 * 1e6,
+                "stats": manager.get_cache_stats()["namespaces"]}
+
+    async def run_all_tests(self):
+        """Run the benchmark"""
+        logger.info("=" * 80)
+        logger.info("CACHE OPERATION COST BY SIZE (microseconds per operation)")
+        logger.info("=" * 80)
+
+        results: Dict[str, Any] = {"lru_ttl": {}, "legacy": {}}
+        for size in SIZES:
+            new = self._new_cache(size)
+            results["lru_ttl"][size] = new
+            line = f"  {size:>7} entries  LRUTTLCache insert {new['insert_us']:7.2f}  lookup {new['lookup_us']:6.2f}"
+            if size <= LEGACY_MAX_SIZE:
+                legacy = self._legacy_cache(size)
+                results["legacy"][size] = legacy
+                line += f"  |  legacy insert {legacy['insert_us']:10.1f}  lookup {legacy['lookup_us']:6.2f}"
+            logger.info(line)
+
+        results["byte_budget"] = self.test_byte_budget()
+        results["cache_manager"] = self.test_cache_manager()
+
+        inserts: List[float] = [results["lru_ttl"][size]["insert_us"] for size in SIZES]
+        growth = inserts[-1] / inserts[0] if inserts[0] else 0
+        logger.info("=" * 80)
+        logger.info("LRU/TTL CACHE SUMMARY")
+        logger.info("=" * 80)
+        logger.info(f"Insert cost {SIZES[0]} -> {SIZES[-1]} entries: {growth:.2f}x (flat means constant time)")
+        if results["byte_budget"]["within_budget"]:
+            logger.info("✅ Byte budget respected")
+        else:
+            logger.warning("⚠️ Byte budget exceeded")
+        return results
+
+
+async def main():
+    """Main test function"""
+    benchmark = LRUTTLCacheBenchmark()
+    await benchmark.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Startup time and memory benchmark for the shared embedding model registry
+Compares per-service model copies (EmbeddingService + Chroma's SentenceTransformerEmbeddingFunction) against one registry model with an embedding-only ChromaService
+"""
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Any
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+
+# Each mode runs in a fresh interpreter so RSS and load time are not shared between them
+_MODE_SCRIPT = r'''
+import json, sys, time, psutil
+sys.path.append(sys.argv[3])
+mode, model_name = sys.argv[1], sys.argv[2]
+process = psutil.Process()
+rss_before = process.memory_info().rss
+start_time = time.time()
+
+if mode == "separate_copies":
+    # Previous behaviour: each service loads its own model
+    import chromadb.utils.embedding_functions as embedding_functions
+    from sentence_transformers import SentenceTransformer
+    from src.vector.chroma_service import ChromaService
+    embedding_model = SentenceTransformer(model_name)
+    chroma_function = embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
+    chroma_service = ChromaService(collection_name="registry_benchmark", persist_directory=sys.argv[4],
+                                   embedding_model=model_name, use_embedding_function=False)
+    query_vector = embedding_model.encode("warm up query")
+    chroma_function(["warm up query"])
+else:
+    from src.embeddings.embedding_service import EmbeddingService
+    from src.vector.chroma_service import ChromaService
+    embedding_service = EmbeddingService(model_name, cache_path=None)
+    chroma_service = ChromaService(collection_name="registry_benchmark", persist_directory=sys.argv[4],
+                                   embedding_model=model_name, use_embedding_function=False)
+    query_vector = embedding_service.generate_embedding_array("warm up query")
+
+startup_time = time.time() - start_time
+print(json.dumps({"startup_time": startup_time,
+                  "rss_mb": process.memory_info().rss / 2**20,
+                  "rss_delta_mb": (process.memory_info().rss - rss_before) / 2**20}))
+'''
+
+
+class ModelRegistryMemoryTester:
+    """Measure startup time and RSS with and without the shared model registry"""
+
+    def _run_mode(self, mode: str) -> Dict[str, Any]:
+        with tempfile.TemporaryDirectory() as chroma_dir:
+            completed = subprocess.run(
+                [sys.executable, "-c", _MODE_SCRIPT, mode, MODEL_NAME, str(Path(__file__).parent), chroma_dir],
+                capture_output=True, text=True, check=True
+            )
+        result = json.loads(completed.stdout.strip().splitlines()[-1])
+        logger.info(f"  {mode:<18} startup {result['startup_time']:6.2f}s  RSS {result['rss_mb']:8.1f} MB "
+                    f"(+{result['rss_delta_mb']:.1f} MB)")
+        return result
+
+    async def run_all_tests(self):
+        """Run the benchmark"""
+        logger.info("=" * 80)
+        logger.info(f"EMBEDDING MODEL FOOTPRINT: {MODEL_NAME}")
+        logger.info("=" * 80)
+
+        results = {
+            "separate_copies": self._run_mode("separate_copies"),
+            "shared_registry": self._run_mode("shared_registry")
+        }
+
+        separate = results["separate_copies"]
+        shared = results["shared_registry"]
+        logger.info("=" * 80)
+        logger.info("MODEL REGISTRY SUMMARY")
+        logger.info("=" * 80)
+        logger.info(f"RSS: {separate['rss_mb']:.1f} MB -> {shared['rss_mb']:.1f} MB "
+                    f"({separate['rss_mb'] - shared['rss_mb']:.1f} MB saved)")
+        logger.info(f"Startup: {separate['startup_time']:.2f}s -> {shared['startup_time']:.2f}s")
+        return results
+
+
+async def main():
+    """Main test function"""
+    tester = ModelRegistryMemoryTester()
+    await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the NumPy-native embedding path
+Compares memory and time of per-vector .tolist() lists against one float32 matrix per batch on a synthetic 50k-chunk ingest
+"""
+import asyncio
+import gc
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+NUM_CHUNKS = int(os.getenv("BENCHMARK_NUM_CHUNKS", "50000"))
+EMBEDDING_DIM = int(os.getenv("BENCHMARK_EMBEDDING_DIM", "384"))
+BATCH_SIZE = int(os.getenv("BENCHMARK_BATCH_SIZE", "64"))
+
+
+class NumpyEmbeddingPathTester:
+    """Compare list-of-floats and float32-matrix embedding handling without loading a model"""
+
+    def __init__(self):
+        rng = np.random.default_rng(42)
+        # Stand-in for model.encode output: one float32 array per batch
+        self.encoded_batches = [
+            rng.standard_normal((min(BATCH_SIZE, NUM_CHUNKS - start), EMBEDDING_DIM), dtype=np.float32)
+            for start in range(0, NUM_CHUNKS, BATCH_SIZE)
+        ]
+
+    def _legacy_path(self) -> List[List[float]]:
+        """What batch_generate_embeddings used to do: .tolist() every vector and keep the lists"""
+        cache: Dict[int, List[float]] = {}
+        all_embeddings = []
+        for batch in self.encoded_batches:
+            for emb in batch:
+                vector = emb.tolist()
+                cache[len(cache)] = vector
+                all_embeddings.append(vector)
+        return all_embeddings
+
+    def _matrix_path(self) -> np.ndarray:
+        """batch_generate_embedding_matrix: rows written into one contiguous float32 matrix"""
+        matrix = np.empty((NUM_CHUNKS, EMBEDDING_DIM), dtype=np.float32)
+        cache: Dict[int, np.ndarray] = {}
+        row = 0
+        for batch in self.encoded_batches:
+            matrix[row:row + len(batch)] = batch
+            for i in range(row, row + len(batch)):
+                cache[i] = matrix[i]  # row view, no copy
+            row += len(batch)
+        return matrix
+
+    @staticmethod
+    def _measure(label: str, func) -> Dict[str, Any]:
+        """Time func, then run it again under tracemalloc for peak/retained memory"""
+        gc.collect()
+        start_time = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start_time
+        del result
+
+        # tracemalloc slows allocation-heavy code a lot, so memory gets its own run
+        gc.collect()
+        tracemalloc.start()
+        result = func()
+        retained, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        del result
+
+        logger.info(f"  {label:<34} {elapsed:7.3f}s  retained {retained / 1024 ** 2:8.1f} MB  "
+                    f"peak {peak / 1024 ** 2:8.1f} MB")
+        return {"time": elapsed, "retained_mb": retained / 1024 ** 2, "peak_mb": peak / 1024 ** 2}
+
+    def test_generation_path(self) -> Dict[str, Any]:
+        """Embedding generation + caching, as done during ingestion"""
+        logger.info("=" * 80)
+        logger.info(f"EMBEDDING PATH: {NUM_CHUNKS} chunks x {EMBEDDING_DIM} dims, batches of {BATCH_SIZE}")
+        logger.info("=" * 80)
+
+        legacy = self._measure("list of floats per vector", self._legacy_path)
+        matrix = self._measure("float32 matrix per request", self._matrix_path)
+
+        memory_saving = 1 - matrix["retained_mb"] / legacy["retained_mb"] if legacy["retained_mb"] else 0
+        speedup = legacy["time"] / matrix["time"] if matrix["time"] > 0 else 0
+        logger.info(f"  Memory saving: {memory_saving:.1%}, speedup: {speedup:.1f}x")
+        return {"legacy": legacy, "matrix": matrix, "memory_saving": memory_saving, "speedup": speedup}
+
+    def test_client_boundary(self) -> Dict[str, Any]:
+        """Cost of the single conversion still done at the Chroma client boundary"""
+        logger.info("=" * 80)
+        logger.info("CHROMA CLIENT BOUNDARY")
+        logger.info("=" * 80)
+
+        matrix = np.concatenate(self.encoded_batches)
+        start_time = time.perf_counter()
+        for start in range(0, NUM_CHUNKS, BATCH_SIZE):
+            matrix[start:start + BATCH_SIZE].tolist()
+        conversion_time = time.perf_counter() - start_time
+        logger.info(f"  One .tolist() per stored batch (chromadb < 0.5 only): {conversion_time:.3f}s "
+                    f"for {NUM_CHUNKS} vectors")
+        return {"boundary_conversion_time": conversion_time}
+
+    async def run_all_tests(self):
+        """Run the benchmark"""
+        results = {
+            "generation": self.test_generation_path(),
+            "boundary": self.test_client_boundary()
+        }
+
+        generation = results["generation"]
+        logger.info("=" * 80)
+        logger.info("NUMPY EMBEDDING PATH SUMMARY")
+        logger.info("=" * 80)
+        logger.info(f"Retained memory: {generation['legacy']['retained_mb']:.1f} MB -> "
+                    f"{generation['matrix']['retained_mb']:.1f} MB ({generation['memory_saving']:.1%} less)")
+        logger.info(f"Time: {generation['legacy']['time']:.3f}s -> {generation['matrix']['time']:.3f}s "
+                    f"({generation['speedup']:.1f}x faster)")
+        return results
+
+
+async def main():
+    """Main test function"""
+    tester = NumpyEmbeddingPathTester()
+    await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -339,6 +339,12 @@ async def test_full_pipeline_performance():
         logger.info(f"Chunks processed: {stats['ingestion_summary']['total_chunks_created']}")
         logger.info(f"Embeddings stored: {stats['ingestion_summary']['total_embeddings_stored']}")
         
+        # Per-stage throughput of the overlapped pipeline
+        for stage_name, stage_stats in stats.get('stage_metrics', {}).items():
+            logger.info(f"  {stage_name:>6}: {stage_stats['throughput_per_second']:.1f} items/sec, "
+                       f"utilization {stage_stats['utilization']:.0%}, "
+                       f"max queue depth {stage_stats['max_queue_depth']}")
+        
         return pipeline_results
         
     except Exception as e:
@@ -322,16 +322,167 @@ class FileWatcherTester:
         # Stop watcher
         self.watcher.stop()
 
+    async def test_burst_coalescing(self):
+        """Test a bulk change (git pull / sync plugin) arriving as batches"""
+        logger.info("🧪 Testing Burst Coalescing...")
+
+        burst_files = 500
+        self.watcher = OptimizedFileWatcher(
+            vault_path=self.test_vault,
+            debounce_delay=0.5,
+            max_concurrent_tasks=20
+        )
+        self.watcher.batch_size = 50
+
+        batches = []
+
+        async def on_file_batch(events):
+            batches.append(events.updated)
+            await asyncio.sleep(0.05)  # Simulate one batched embedding call
+
+        self.watcher.on_file_batch = on_file_batch
+        self.watcher.start()
+
+        # Every file is written twice in quick succession
+        burst_dir = Path(self.test_vault) / "burst"
+        burst_dir.mkdir(exist_ok=True)
+        start_time = time.time()
+        for round_number in range(2):
+            for i in range(burst_files):
+                with open(burst_dir / f"pulled_{i:04d}.md", 'w') as f:
+                    f.write(f"# Pulled {i}\n\nRevision {round_number}\n")
+
+        quiet = await self.watcher.wait_for_quiet_period(timeout=30.0)
+        elapsed = time.time() - start_time
+        status = self.watcher.get_status()
+        dispatched = [path for batch in batches for path in batch]
+
+        self.test_results['burst_coalescing'] = {
+            'files_written': burst_files,
+            'events_coalesced': status['queue']['coalesced_events'],
+            'files_dispatched': len(dispatched),
+            'batches': len(batches),
+            'max_lag_seconds': status['performance']['max_lag_seconds'],
+            'drain_time': round(elapsed, 2),
+            'success': quiet and len(dispatched) == burst_files and len(set(dispatched)) == burst_files
+                       and len(batches) <= burst_files // self.watcher.batch_size + 2
+        }
+
+        logger.info(f"✅ Burst test: {burst_files} files x2 writes -> {len(dispatched)} dispatched "
+                    f"in {len(batches)} batches ({elapsed:.2f}s)")
+
+        self.watcher.stop()
+
+    async def test_backpressure(self):
+        """Test that a full queue delays events instead of dropping them"""
+        logger.info("🧪 Testing Backpressure...")
+
+        burst_files = 200
+        self.watcher = OptimizedFileWatcher(
+            vault_path=self.test_vault,
+            debounce_delay=0.1,
+            max_concurrent_tasks=5,
+            max_pending_events=20
+        )
+        self.watcher.batch_size = 10
+
+        processed = set()
+
+        async def on_file_modified(file_path):
+            await asyncio.sleep(0.01)  # Slower than the writer
+            processed.add(file_path)
+
+        self.watcher.on_file_modified = on_file_modified
+        self.watcher.on_file_created = on_file_modified
+        self.watcher.start()
+
+        pressure_dir = Path(self.test_vault) / "pressure"
+        pressure_dir.mkdir(exist_ok=True)
+
+        def write_burst():
+            for i in range(burst_files):
+                with open(pressure_dir / f"note_{i:04d}.md", 'w') as f:
+                    f.write(f"# Note {i}\n")
+
+        # Write from a thread so the event loop keeps dispatching meanwhile
+        await asyncio.to_thread(write_burst)
+        await asyncio.sleep(0.5)
+        quiet = await self.watcher.wait_for_quiet_period(timeout=30.0)
+        status = self.watcher.get_status()
+
+        self.test_results['backpressure'] = {
+            'files_written': burst_files,
+            'files_processed': len(processed),
+            'backpressure_waits': status['queue']['backpressure_waits'],
+            'max_queue_depth': status['queue']['max_depth'],
+            'success': quiet and len(processed) == burst_files
+        }
+
+        logger.info(f"✅ Backpressure test: {len(processed)}/{burst_files} files processed, "
+                    f"{status['queue']['backpressure_waits']} waits on a {status['queue']['max_depth']}-deep queue")
+
+        self.watcher.stop()
+
+    async def test_move_events(self):
+        """Test that renames and folder moves arrive as moves, not delete + create"""
+        logger.info("🧪 Testing Move Events...")
+
+        self.watcher = OptimizedFileWatcher(
+            vault_path=self.test_vault,
+            debounce_delay=0.3,
+            max_concurrent_tasks=5
+        )
+
+        batches = []
+
+        async def on_file_batch(events):
+            batches.append(events)
+
+        self.watcher.on_file_batch = on_file_batch
+
+        move_dir = Path(self.test_vault) / "to_move"
+        move_dir.mkdir(exist_ok=True)
+        for i in range(5):
+            (move_dir / f"moved_{i}.md").write_text(f"# Moved {i}\n")
+        (Path(self.test_vault) / "rename_me.md").write_text("# Rename me\n")
+
+        self.watcher.start()
+        await asyncio.sleep(0.2)
+
+        os.rename(Path(self.test_vault) / "rename_me.md", Path(self.test_vault) / "renamed.md")
+        os.rename(move_dir, Path(self.test_vault) / "archive")
+        await asyncio.sleep(0.5)
+        quiet = await self.watcher.wait_for_quiet_period(timeout=10.0)
+
+        moved = {old: new for events in batches for old, new in events.moved}
+        other = [path for events in batches for path in events.updated + events.deleted]
+        expected = {"rename_me.md": "renamed.md"}
+        expected.update({f"to_move/moved_{i}.md": f"archive/moved_{i}.md" for i in range(5)})
+
+        self.test_results['move_events'] = {
+            'moves_expected': len(expected),
+            'moves_dispatched': len(moved),
+            'other_events': len(other),
+            'success': quiet and moved == expected and not other
+        }
+
+        logger.info(f"✅ Move test: {len(moved)}/{len(expected)} moves dispatched, {len(other)} other events")
+
+        self.watcher.stop()
+
     async def run_comprehensive_test(self):
         """Run all tests and generate comprehensive report"""
         logger.info("🚀 Starting Comprehensive File Watcher Testing...")
-        
+
         try:
             await self.test_basic_functionality()
             await self.test_debouncing()
             await self.test_resource_management()
             await self.test_large_vault_optimization()
             await self.test_performance_monitoring()
+            await self.test_burst_coalescing()
+            await self.test_backpressure()
+            await self.test_move_events()
             
             # Generate final report
             self._generate_final_report()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Benchmark the process-pool chunking backend
+Chunking throughput by worker count against the in-process processor, plus order, per-file error and processor-match checks
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.processing.content_processor import ContentProcessor
+from src.processing.hybrid_content_processor import HybridContentProcessor
+from src.processing.parallel_chunker import ParallelChunkingBackend
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+CHUNKING_FILES = int(os.getenv("BENCHMARK_CHUNKING_FILES", "400"))
+SECTIONS_PER_FILE = int(os.getenv("BENCHMARK_CHUNKING_SECTIONS", "12"))
+
+
+def note_payload(index: int) -> Dict[str, Any]:
+    """A get_file_content-style payload for a synthetic multi-section note"""
+    sections = []
+    for s in range(SECTIONS_PER_FILE):
+        sentences = " ".join(f"Note {index} section {s} sentence {k} covers vector search, caching and async IO."
+                             for k in range(8 + (index + s) % 10))
+        sections.append(f"## Section {s}\n\n{sentences}\n")
+    path = f"notes/area-{index % 20:02d}/note-{index:05d}.md"
+    return {"path": path, "content": f"# Note {index}\n\n" + "\n".join(sections), "metadata": {"file_name": path}}
+
+
+class ParallelChunkingTester:
+    """Compare the in-process processor with the worker pool at growing worker counts"""
+
+    def __init__(self):
+        self.payloads = [note_payload(i) for i in range(CHUNKING_FILES)]
+        self.processor = HybridContentProcessor(MODEL_NAME)
+
+    def serial_chunks(self, payloads: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        return [self.processor.chunk_content(p['content'], p['metadata'], p['path']) for p in payloads]
+
+    async def test_scaling(self) -> Dict[str, Any]:
+        """Files per second by worker count (pools are warmed first, so model loading is excluded)"""
+        start_time = time.perf_counter()
+        serial = self.serial_chunks(self.payloads)
+        serial_s = time.perf_counter() - start_time
+        logger.info(f"  in-process: {CHUNKING_FILES / serial_s:8.1f} files/s")
+
+        cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+        worker_counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1)))
+        runs = {}
+        for workers in worker_counts:
+            backend = ParallelChunkingBackend.for_processor(self.processor, max_workers=workers)
+            try:
+                await backend.achunk_files(self.payloads[:workers * backend.files_per_task])
+                start_time = time.perf_counter()
+                chunked = await backend.achunk_files(self.payloads)
+                elapsed = time.perf_counter() - start_time
+            finally:
+                backend.shutdown()
+            runs[workers] = {"files_per_second": CHUNKING_FILES / elapsed,
+                             "same_chunks": [[c['content'] for c in chunks] for chunks in chunked]
+                                            == [[c['content'] for c in chunks] for chunks in serial]}
+        base = runs[worker_counts[0]]["files_per_second"]
+        for workers, run in runs.items():
+            run["speedup"] = run["files_per_second"] / base
+            run["efficiency"] = run["speedup"] / workers
+            logger.info(f"  {workers:>2} workers: {run['files_per_second']:8.1f} files/s, "
+                        f"{run['speedup']:.2f}x vs 1 worker ({run['efficiency']:.0%} efficiency)")
+        return {"serial_files_per_second": CHUNKING_FILES / serial_s, "runs": runs, "cpus": cpus}
+
+    def test_order_and_errors(self) -> Dict[str, bool]:
+        """Results stay in input order and a bad file fails alone"""
+        payloads = self.payloads[:9]
+        broken = dict(payloads[4], content=None)
+        mixed = payloads[:4] + [broken] + payloads[5:]
+        backend = ParallelChunkingBackend.for_processor(self.processor, max_workers=2, files_per_task=2)
+        try:
+            results = backend.chunk_files(mixed, return_exceptions=True)
+            try:
+                backend.chunk_files(mixed)
+                raised = False
+            except Exception:
+                raised = True
+        finally:
+            backend.shutdown()
+        expected = self.serial_chunks(payloads)
+        kept = [i for i in range(len(mixed)) if i != 4]
+        return {
+            "one result per payload in input order": len(results) == len(mixed) and all(
+                [c['path'] for c in results[i]] == [c['path'] for c in expected[i]] for i in kept),
+            "bad file returned in place": isinstance(results[4], Exception) and "note-00004" in str(results[4]),
+            "other files still chunked": all(not isinstance(results[i], Exception) for i in kept),
+            "errors raise without return_exceptions": raised
+        }
+
+    def test_processor_match(self) -> Dict[str, bool]:
+        """Workers must chunk with the same processor class and settings as the service"""
+        content_processor = ContentProcessor(MODEL_NAME)
+        default_backend = ParallelChunkingBackend(MODEL_NAME)
+        matched_backend = ParallelChunkingBackend.for_processor(content_processor, max_workers=1)
+        try:
+            payload = self.payloads[0]
+            worker_chunks = matched_backend.chunk_files([payload])[0]
+        finally:
+            matched_backend.shutdown()
+        serial_chunks = content_processor.chunk_content(payload['content'], payload['metadata'], payload['path'])
+
+        from src.monitoring.incremental_updater import IncrementalUpdateService
+        try:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                IncrementalUpdateService(temp_dir, None, None, content_processor, chunking_backend=default_backend)
+            rejected = False
+        except ValueError:
+            rejected = True
+        return {
+            "hybrid workers do not match a ContentProcessor": not default_backend.matches(content_processor),
+            "for_processor matches its processor": matched_backend.matches(content_processor),
+            "matched workers produce the service's chunks": [c['content'] for c in worker_chunks]
+                                                            == [c['content'] for c in serial_chunks],
+            "mismatched backend rejected at construction": rejected
+        }
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        logger.info("=" * 80)
+        logger.info(f"PARALLEL CHUNKING ({CHUNKING_FILES} notes x {SECTIONS_PER_FILE} sections)")
+        logger.info("=" * 80)
+        scaling = await self.test_scaling()
+        checks = {f"{workers} workers match in-process chunks": run["same_chunks"]
+                  for workers, run in scaling["runs"].items()}
+        checks.update(self.test_order_and_errors())
+        checks.update(self.test_processor_match())
+
+        logger.info("=" * 80)
+        logger.info("PARALLEL CHUNKING SUMMARY")
+        logger.info("=" * 80)
+        for label, passed in checks.items():
+            logger.info(f"{'✅' if passed else '❌'} {label}")
+        widest = max(scaling["runs"])
+        efficiency = scaling["runs"][widest]["efficiency"]
+        if widest == 1:
+            logger.info("Only one CPU available, scaling not measured")
+        elif efficiency >= 0.7:
+            logger.info(f"✅ {widest} workers scale near-linearly ({efficiency:.0%} efficiency)")
+        else:
+            logger.warning(f"⚠️ {widest} workers reach only {efficiency:.0%} scaling efficiency")
+        return all(checks.values())
+
+
+async def main():
+    """Main test function"""
+    tester = ParallelChunkingTester()
+    success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
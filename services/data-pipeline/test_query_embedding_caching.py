@@ -10,6 +10,8 @@ import time
 from pathlib import Path
 from typing import List, Dict, Any
 
+import numpy as np
+
 # Add the src directory to the Python path
 sys.path.append(str(Path(__file__).parent / "src"))
 
@@ -17,11 +19,27 @@ from src.vector.chroma_service import ChromaService
 from src.embeddings.embedding_service import EmbeddingService
 from src.search.search_service import SemanticSearchService
 from src.cache.cache_manager import CacheManager
+from src.cache.semantic_cache import SemanticResultCache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# (original, paraphrase) pairs: the paraphrase should be served from the original's cached results
+PARAPHRASED_QUERIES = [
+    ("python async tips", "async tips in python"),
+    ("machine learning algorithms", "algorithms for machine learning"),
+    ("how to optimize database queries", "database query optimization"),
+    ("best practices for API development", "API development best practices"),
+    ("debugging techniques for beginners", "beginner debugging techniques"),
+    ("cloud computing services overview", "overview of cloud computing services"),
+    ("data analysis with pandas", "pandas data analysis"),
+    ("software architecture patterns", "patterns of software architecture"),
+    ("notas sobre produtividade pessoal", "produtividade pessoal notas"),
+    ("como criar um plano de negócios", "criar plano de negócios")
+]
+SEMANTIC_THRESHOLDS = [0.85, 0.90, 0.95]
+
 class QueryEmbeddingCachingTester:
     """Test class for query embedding caching performance"""
     
@@ -285,6 +303,98 @@ class QueryEmbeddingCachingTester:
             "cache_stats": cache_stats
         }
     
+    async def test_semantic_result_cache(self):
+        """Test latency savings and false hits of the semantic result cache on paraphrased queries"""
+        logger.info("=" * 80)
+        logger.info("TEST 4: SEMANTIC RESULT CACHE ON PARAPHRASED QUERIES")
+        logger.info("=" * 80)
+        
+        # Reference: every paraphrase searched for real
+        fresh_results = {}
+        fresh_times = []
+        for _, paraphrase in PARAPHRASED_QUERIES:
+            start_time = time.time()
+            fresh_results[paraphrase] = await self.search_service.search_similar(
+                query=paraphrase, n_results=3, expand_query=False, use_cache=False
+            )
+            fresh_times.append(time.time() - start_time)
+        avg_fresh_time = sum(fresh_times) / len(fresh_times)
+        logger.info(f"Uncached paraphrase search: {avg_fresh_time:.3f}s average")
+        
+        results = {"avg_uncached_time": avg_fresh_time, "thresholds": {}}
+        for threshold in SEMANTIC_THRESHOLDS:
+            semantic_cache = SemanticResultCache(threshold=threshold)
+            semantic_search_service = SemanticSearchService(
+                chroma_service=self.chroma_service,
+                embedding_service=self.embedding_service,
+                cache_manager=CacheManager(),
+                semantic_cache=semantic_cache
+            )
+            
+            # Warm the cache with the originals, then ask the paraphrases
+            for original, _ in PARAPHRASED_QUERIES:
+                await semantic_search_service.search_similar(query=original, n_results=3, expand_query=False)
+            
+            times = []
+            stale_previews = 0
+            for _, paraphrase in PARAPHRASED_QUERIES:
+                start_time = time.time()
+                served = await semantic_search_service.search_similar(query=paraphrase, n_results=3, expand_query=False)
+                times.append(time.time() - start_time)
+                if served and 'semantic_cache' in served[0]:
+                    semantic_cache.record_verification(served, fresh_results[paraphrase])
+                    # Previews and relevance must describe the paraphrase, not the cached original
+                    stale_previews += sum(
+                        result['preview'] != semantic_search_service._generate_content_preview(result['content'], paraphrase)
+                        or result['query_relevance'] != semantic_search_service._calculate_query_relevance(result['content'], paraphrase)
+                        for result in served
+                    )
+            
+            stats = semantic_cache.get_stats()
+            avg_time = sum(times) / len(times)
+            paraphrase_hits = stats["verified_hits"]
+            results["thresholds"][threshold] = {
+                "avg_search_time": avg_time,
+                "paraphrase_hit_rate": paraphrase_hits / len(PARAPHRASED_QUERIES),
+                "false_hit_rate": stats["false_hit_rate"],
+                "stale_previews": stale_previews,
+                "latency_saving": (avg_fresh_time - avg_time) / avg_fresh_time * 100 if avg_fresh_time > 0 else 0,
+                "cache_stats": stats
+            }
+            logger.info(f"  threshold {threshold:.2f}: {paraphrase_hits}/{len(PARAPHRASED_QUERIES)} paraphrases served "
+                        f"from cache, {stats['false_hits']} false hits, {avg_time:.3f}s average "
+                        f"({results['thresholds'][threshold]['latency_saving']:.1f}% faster), "
+                        f"{stale_previews} results with previews from the cached query")
+        
+        return results
+    
+    def test_semantic_filter_keys_bounded(self):
+        """Filter keys are forgotten with their last cached entry (evicted, invalidated or expired)"""
+        vector = np.ones(8, dtype=np.float32)
+        result = [{"id": "a", "metadata": {"path": "notes/a.md"}}]
+        semantic_cache = SemanticResultCache(max_entries=4)
+        for n_results in range(1, 51):
+            semantic_cache.store(f"query {n_results}", vector, SemanticResultCache.filter_key(n_results), result)
+        after_eviction = semantic_cache.get_stats()["filter_keys"]
+        newest_still_hits = semantic_cache.lookup(vector, SemanticResultCache.filter_key(50)) is not None
+        semantic_cache.invalidate_paths(["notes/a.md"])
+        after_invalidation = semantic_cache.get_stats()["filter_keys"]
+        
+        expiring_cache = SemanticResultCache(max_entries=4, ttl=0)
+        for n_results in (1, 2, 3):
+            expiring_cache.store(f"query {n_results}", vector, SemanticResultCache.filter_key(n_results), result)
+        after_expiry = expiring_cache.get_stats()["filter_keys"]
+        
+        logger.info(f"Semantic cache filter keys: {after_eviction} after 50 stores into 4 slots, "
+                    f"{after_invalidation} after invalidation, {after_expiry} with expired entries")
+        return {
+            "after_eviction": after_eviction,
+            "newest_still_hits": newest_still_hits,
+            "after_invalidation": after_invalidation,
+            "after_expiry": after_expiry,
+            "bounded": after_eviction <= 4 and newest_still_hits and after_invalidation == 0 and after_expiry == 1
+        }
+    
     async def run_all_tests(self):
         """Run all query embedding caching tests"""
         try:
@@ -294,6 +404,8 @@ class QueryEmbeddingCachingTester:
             perf_results = await self.test_query_embedding_caching_performance()
             warm_up_results = await self.test_cache_warm_up_performance()
             efficiency_results = await self.test_cache_efficiency()
+            semantic_results = await self.test_semantic_result_cache()
+            filter_key_results = self.test_semantic_filter_keys_bounded()
             
             # Summary
             logger.info("=" * 80)
@@ -307,6 +419,12 @@ class QueryEmbeddingCachingTester:
             logger.info(f"Warm-up Time: {warm_up_results['warm_up_time']:.3f}s")
             logger.info(f"Post-Warm-up Search Time: {warm_up_results['avg_search_time']:.3f}s")
             logger.info(f"Cache Hit Efficiency: {efficiency_results['hit_efficiency']:.1f}%")
+            for threshold, threshold_results in semantic_results["thresholds"].items():
+                logger.info(f"Semantic Cache @ {threshold:.2f}: "
+                            f"{threshold_results['paraphrase_hit_rate'] * 100:.0f}% paraphrase hits, "
+                            f"{threshold_results['false_hit_rate'] * 100:.0f}% false hits, "
+                            f"{threshold_results['latency_saving']:.1f}% latency saving")
+            logger.info(f"Semantic Cache Filter Keys Bounded: {filter_key_results['bounded']}")
             
             logger.info("\n✅ All query embedding caching tests completed successfully!")
             
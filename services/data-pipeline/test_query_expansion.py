@@ -256,6 +256,51 @@ class QueryExpansionTester:
         for strategy_name, stats in results.items():
             logger.info(f"{strategy_name}: {stats['avg_time_ms']:.1f}ms avg, {stats['avg_confidence']:.2f} confidence")
     
+    async def test_speculative_expansion(self):
+        """Compare blocking expansion with speculative expansion under a deadline"""
+        logger.info("\n🏎️ Testing Speculative Query Expansion")
+        logger.info("=" * 60)
+        
+        try:
+            if self.chroma_service.collection.count() == 0:
+                logger.warning("⚠️ No data in collection. Please run data ingestion first.")
+                return
+        except Exception as e:
+            logger.error(f"❌ Error checking collection: {e}")
+            return
+        
+        service = self.search_service
+        queries = self.test_queries[:5]
+        timings = {}
+        for speculative in (False, True):
+            service.speculative_expansion = speculative
+            service.clear_search_cache()
+            times = []
+            for query in queries:
+                start_time = time.time()
+                await service.search_similar(query, n_results=5, expand_query=True,
+                                             expansion_strategy=ExpansionStrategy.HYBRID)
+                times.append(time.time() - start_time)
+            timings["speculative" if speculative else "blocking"] = times
+        service.speculative_expansion = False
+        
+        for mode, times in timings.items():
+            logger.info(f"  {mode}: avg {sum(times) / len(times) * 1000:.1f}ms, max {max(times) * 1000:.1f}ms")
+        
+        stats = service.get_search_stats()["query_expansion"]
+        logger.info(f"  Deadline: {stats['deadline_seconds'] * 1000:.0f}ms")
+        logger.info(f"  Expansions in time: {stats['expansions_in_time']}, late: {stats['expansions_late']}, "
+                    f"second retrievals: {stats['second_retrievals']}")
+        
+        # Repeated queries must be served from the expansion memo, never a second LLM call
+        llm_calls_before = service.query_expansion_service.llm_calls
+        for query in queries:
+            await service.query_expansion_service.expand_query(query, ExpansionStrategy.HYBRID)
+        repeat_calls = service.query_expansion_service.llm_calls - llm_calls_before
+        logger.info(f"  LLM calls for repeated queries: {repeat_calls} (memo hit rate: {stats['memo']['hit_rate']:.2f})")
+        if service.query_expansion_service.gemini_model and repeat_calls:
+            logger.warning("⚠️ Repeated queries reached the LLM again")
+    
     async def run_comprehensive_test(self):
         """Run comprehensive query expansion tests"""
         logger.info("🎯 Starting Comprehensive Query Expansion Tests")
@@ -270,6 +315,9 @@ class QueryExpansionTester:
             # Test search with expansion
             await self.test_search_with_expansion()
             
+            # Test speculative expansion
+            await self.test_speculative_expansion()
+            
             # Test query suggestions
             await self.test_query_suggestions()
             
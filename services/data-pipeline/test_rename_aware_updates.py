@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Test rename/move-aware incremental updates
+Renames a note, moves a folder and replays a delete + create rename, checking that no chunk is re-embedded
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.vector.chroma_service import ChromaService
+from src.embeddings.embedding_service import EmbeddingService
+from src.processing.content_processor import ContentProcessor
+from src.ingestion.vault_manifest import VaultManifest
+from src.monitoring.incremental_updater import IncrementalUpdateService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+FOLDER_NOTES = int(os.getenv("BENCHMARK_MOVE_NOTES", "20"))
+
+
+def note_text(index: int) -> str:
+    return (f"# Note {index}\n\n## Context\n\nMeeting notes about sourdough starter {index}: hydration, "
+            f"feeding schedule and flour blends.\n\n## Follow-ups\n\nTry a rye levain for batch {index}.\n")
+
+
+class CountingEmbeddingService(EmbeddingService):
+    """EmbeddingService that counts how many texts it was asked to embed"""
+
+    texts_embedded = 0
+
+    def batch_generate_embedding_matrix(self, texts, *args, **kwargs):
+        self.texts_embedded += len(texts)
+        return super().batch_generate_embedding_matrix(texts, *args, **kwargs)
+
+
+class RenameAwareUpdateTester:
+    """Apply renames and folder moves through the updater and check what gets re-embedded"""
+
+    def __init__(self, vault_path: Path, chroma_path: str):
+        self.vault_path = vault_path
+        self.embedding_service = CountingEmbeddingService(MODEL_NAME, cache_path=None)
+        self.content_processor = ContentProcessor(MODEL_NAME)
+        self.chroma_service = ChromaService(collection_name="rename_update_test", persist_directory=chroma_path,
+                                            embedding_model=MODEL_NAME, use_embedding_function=False)
+        self.manifest = VaultManifest(str(Path(chroma_path) / "manifest.sqlite3"))
+        self.updater = IncrementalUpdateService(str(self.vault_path), self.chroma_service, self.embedding_service,
+                                                self.content_processor, manifest=self.manifest)
+
+    def write_note(self, relative_path: str, content: str):
+        note_path = self.vault_path / relative_path
+        note_path.parent.mkdir(parents=True, exist_ok=True)
+        note_path.write_text(content, encoding="utf-8")
+
+    def move(self, old_path: str, new_path: str):
+        (self.vault_path / new_path).parent.mkdir(parents=True, exist_ok=True)
+        os.rename(self.vault_path / old_path, self.vault_path / new_path)
+
+    def stored(self, relative_path: str) -> Dict[str, Any]:
+        return self.chroma_service.collection.get(where={"path": relative_path},
+                                                  include=["documents", "metadatas", "embeddings"])
+
+    async def setup(self):
+        """Index a single note and a folder of notes"""
+        paths = ["inbox/starter-idea.md"] + [f"projects/baking/note-{i}.md" for i in range(FOLDER_NOTES)]
+        for i, relative_path in enumerate(paths):
+            self.write_note(relative_path, note_text(i))
+        result = await self.updater.batch_process_files(paths)
+        logger.info(f"Indexed {result['successful']} notes ({self.embedding_service.texts_embedded} chunks embedded)")
+        return paths
+
+    async def _timed_changes(self, updated, deleted, moved) -> Dict[str, Any]:
+        self.embedding_service.texts_embedded = 0
+        start_time = time.perf_counter()
+        result = await self.updater.process_file_changes(updated, deleted, moved)
+        result["elapsed_ms"] = (time.perf_counter() - start_time) * 1000
+        result["texts_embedded"] = self.embedding_service.texts_embedded
+        return result
+
+    async def test_rename(self) -> Dict[str, Any]:
+        """A renamed note keeps its chunks and embeddings under the new path"""
+        before = self.stored("inbox/starter-idea.md")
+        self.move("inbox/starter-idea.md", "archive/2024/levain-notes.md")
+        result = await self._timed_changes([], [], [("inbox/starter-idea.md", "archive/2024/levain-notes.md")])
+
+        after = self.stored("archive/2024/levain-notes.md")
+        metadata = after["metadatas"][0] if after["metadatas"] else {}
+        entry = self.manifest.get("archive/2024/levain-notes.md")
+        logger.info(f"Rename: {len(after['ids'])} chunks moved, {result['texts_embedded']} embedded "
+                    f"({result['elapsed_ms']:.1f}ms)")
+        return {
+            "result": result,
+            "old_path_gone": not self.stored("inbox/starter-idea.md")["ids"],
+            "documents_kept": sorted(after["documents"]) == sorted(before["documents"]),
+            "embeddings_kept": sorted(map(tuple, after["embeddings"])) == sorted(map(tuple, before["embeddings"])),
+            "path_metadata_updated": metadata.get("file_name") == "levain-notes.md"
+                                     and metadata.get("directory_path") == "archive/2024"
+                                     and metadata.get("path_year") == 2024,
+            "manifest_renamed": self.manifest.get("inbox/starter-idea.md") is None
+                                and entry is not None and sorted(entry.chunk_ids) == sorted(after["ids"])
+        }
+
+    async def test_folder_move(self) -> Dict[str, Any]:
+        """Moving a folder re-keys every note in it"""
+        moved = [(f"projects/baking/note-{i}.md", f"archive/baking/note-{i}.md") for i in range(FOLDER_NOTES)]
+        os.rename(self.vault_path / "projects/baking", self.vault_path / "archive/baking")
+        result = await self._timed_changes([], [], moved)
+
+        stored = self.chroma_service.collection.get(include=["metadatas"])
+        hits = self.chroma_service.keyword_search("levain", n_results=50) \
+            if self.chroma_service.lexical_index is not None else None
+        logger.info(f"Folder move: {result['moved']} notes moved, {result['texts_embedded']} embedded "
+                    f"({result['elapsed_ms']:.1f}ms)")
+        return {
+            "result": result,
+            "no_stale_paths": not any(m["path"].startswith("projects/") for m in stored["metadatas"]),
+            "category_updated": all(m.get("path_category") == "baking" and m.get("directory_path") == "archive/baking"
+                                    for m in stored["metadatas"] if m["path"].startswith("archive/baking/")),
+            "keyword_index_follows": hits is None
+                                     or (bool(hits) and all(hit["metadata"]["path"].startswith("archive/") for hit in hits))
+        }
+
+    async def test_delete_create_pairing(self) -> Dict[str, Any]:
+        """A rename reported as delete + create is matched by content hash"""
+        self.move("archive/baking/note-0.md", "recipes/rye-levain.md")
+        self.write_note("recipes/brand-new.md", note_text(999))
+        result = await self._timed_changes(["recipes/rye-levain.md", "recipes/brand-new.md"],
+                                           ["archive/baking/note-0.md"], [])
+        logger.info(f"Delete + create: {result['paired_by_content']} paired by content, "
+                    f"{result['texts_embedded']} embedded")
+        return {
+            "result": result,
+            "paired_note_stored": bool(self.stored("recipes/rye-levain.md")["ids"])
+                                  and not self.stored("archive/baking/note-0.md")["ids"]
+        }
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        await self.setup()
+        rename = await self.test_rename()
+        folder = await self.test_folder_move()
+        pairing = await self.test_delete_create_pairing()
+
+        logger.info("=" * 80)
+        logger.info("RENAME-AWARE INCREMENTAL UPDATE SUMMARY")
+        logger.info("=" * 80)
+        new_note_chunks = len(self.stored("recipes/brand-new.md")["ids"])
+        checks = {
+            "rename embeds nothing": rename["result"]["success"] and rename["result"]["texts_embedded"] == 0,
+            "rename keeps documents and embeddings": rename["documents_kept"] and rename["embeddings_kept"]
+                                                     and rename["old_path_gone"],
+            "rename refreshes path metadata": rename["path_metadata_updated"],
+            "manifest follows the rename": rename["manifest_renamed"],
+            "folder move embeds nothing": folder["result"]["success"] and folder["result"]["texts_embedded"] == 0
+                                          and folder["result"]["moved"] == FOLDER_NOTES,
+            "folder move leaves no stale paths": folder["no_stale_paths"] and folder["category_updated"],
+            "keyword index follows moves": folder["keyword_index_follows"],
+            "delete + create paired by content hash": pairing["result"]["paired_by_content"] == 1
+                                                      and pairing["paired_note_stored"],
+            "only the genuinely new note is embedded": pairing["result"]["texts_embedded"] == new_note_chunks
+        }
+        for label, passed in checks.items():
+            logger.info(f"{'✅' if passed else '❌'} {label}")
+        self.manifest.close()
+        return all(checks.values())
+
+
+async def main():
+    """Main test function"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        vault_path = Path(temp_dir) / "vault"
+        vault_path.mkdir()
+        tester = RenameAwareUpdateTester(vault_path, str(Path(temp_dir) / "chroma"))
+        success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
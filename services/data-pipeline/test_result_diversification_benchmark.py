@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Benchmark for embedding-based result diversification
+Cost of diversifying 100 candidates (~512-token chunks, 384-dim embeddings) with one similarity matmul + MMR/threshold clustering vs the previous pairwise Jaccard clustering
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.search.diversification import similarity_matrix, mmr_select, threshold_clusters
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CANDIDATES = int(os.getenv("BENCHMARK_DIVERSIFY_CANDIDATES", "100"))
+EMBEDDING_DIM = 384
+CHUNK_WORDS = 400  # ~512 tokens of English prose
+ROUNDS = int(os.getenv("BENCHMARK_DIVERSIFY_ROUNDS", "50"))
+TARGET_MS = float(os.getenv("BENCHMARK_DIVERSIFY_TARGET_MS", "1"))
+
+WORDS = ("the of and to in is for that with on as python data search vector index cache query embedding model "
+         "performance latency memory async function class notes vault obsidian markdown heading chunk token").split()
+
+
+def legacy_result_similarity(result1: Dict[str, Any], result2: Dict[str, Any]) -> float:
+    """The previous EnhancedSearchService._calculate_result_similarity"""
+    words1 = set(result1.get('content', '').lower().split())
+    words2 = set(result2.get('content', '').lower().split())
+    if not words1 or not words2:
+        return 0.0
+    return len(words1.intersection(words2)) / len(words1.union(words2))
+
+
+def legacy_cluster(results: List[Dict[str, Any]], threshold: float) -> List[List[Dict[str, Any]]]:
+    """The previous EnhancedSearchService._cluster_results_semantically"""
+    clusters = []
+    used = set()
+    for i, result in enumerate(results):
+        if i in used:
+            continue
+        cluster = [result]
+        used.add(i)
+        for j, other in enumerate(results[i + 1:], i + 1):
+            if j in used:
+                continue
+            if legacy_result_similarity(result, other) >= threshold:
+                cluster.append(other)
+                used.add(j)
+        clusters.append(cluster)
+    return clusters
+
+
+class ResultDiversificationBenchmark:
+    """Time both diversification paths over the same candidate set"""
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        # Candidates in a few topical groups so clustering has something to find
+        centers = rng.normal(size=(8, EMBEDDING_DIM))
+        groups = rng.integers(0, len(centers), size=CANDIDATES)
+        self.embeddings = (centers[groups] + 0.6 * rng.normal(size=(CANDIDATES, EMBEDDING_DIM))).astype(np.float32)
+        self.relevance = np.sort(rng.uniform(0.3, 0.9, size=CANDIDATES))[::-1].astype(np.float32)
+        self.results = [
+            {"id": f"chunk-{i}", "content": " ".join(rng.choice(WORDS, size=CHUNK_WORDS)),
+             "similarity": float(self.relevance[i])}
+            for i in range(CANDIDATES)
+        ]
+
+    def _time(self, func) -> Dict[str, float]:
+        latencies = []
+        for _ in range(ROUNDS):
+            start_time = time.perf_counter()
+            func()
+            latencies.append((time.perf_counter() - start_time) * 1000)
+        return {"avg_ms": float(np.mean(latencies)), "p95_ms": float(np.percentile(latencies, 95))}
+
+    def benchmark(self) -> Dict[str, Any]:
+        """Pairwise Jaccard clustering vs matmul + MMR / threshold clustering"""
+        results = {
+            "jaccard_clustering": self._time(lambda: legacy_cluster(self.results, 0.7)),
+            "mmr": self._time(lambda: mmr_select(self.relevance, similarity_matrix(self.embeddings), 5)),
+            "threshold_clustering": self._time(lambda: threshold_clusters(similarity_matrix(self.embeddings), 0.85)),
+        }
+        results["speedup"] = results["jaccard_clustering"]["avg_ms"] / max(results["mmr"]["avg_ms"],
+                                                                           results["threshold_clustering"]["avg_ms"])
+        for name in ("jaccard_clustering", "mmr", "threshold_clustering"):
+            logger.info(f"  {name:>20}: {results[name]['avg_ms']:8.3f} ms avg, {results[name]['p95_ms']:8.3f} ms p95")
+        return results
+
+    def test_selection(self) -> Dict[str, bool]:
+        """Behaviour checks on small hand-built inputs"""
+        checks = {}
+        duplicate = np.array([[1, 0], [1, 0], [0, 1]], dtype=np.float32)
+        relevance = np.array([0.9, 0.85, 0.6], dtype=np.float32)
+        similarities = similarity_matrix(duplicate)
+        checks["mmr skips a near-duplicate of the top result"] = mmr_select(relevance, similarities, 2, 0.5) == [0, 2]
+        checks["mmr with lambda 1.0 keeps relevance order"] = mmr_select(relevance, similarities, 3, 1.0) == [0, 1, 2]
+        checks["threshold clusters group duplicates"] = threshold_clusters(similarities, 0.9) == [[0, 1], [2]]
+        checks["missing embeddings stay singletons"] = threshold_clusters(
+            similarity_matrix(np.zeros((2, 4), dtype=np.float32)), 0.5) == [[0], [1]]
+        for label, passed in checks.items():
+            logger.info(f"  {'✅' if passed else '❌'} {label}")
+        return checks
+
+    async def run_all_tests(self):
+        """Run the benchmark"""
+        logger.info("=" * 80)
+        logger.info(f"RESULT DIVERSIFICATION ({CANDIDATES} candidates, {EMBEDDING_DIM}-dim, ~{CHUNK_WORDS} words)")
+        logger.info("=" * 80)
+        results = {"timings": self.benchmark(), "checks": self.test_selection()}
+
+        logger.info("=" * 80)
+        logger.info("RESULT DIVERSIFICATION SUMMARY")
+        logger.info("=" * 80)
+        timings = results["timings"]
+        slowest = max(timings["mmr"]["avg_ms"], timings["threshold_clustering"]["avg_ms"])
+        logger.info(f"Speedup over pairwise Jaccard: {timings['speedup']:.0f}x")
+        if slowest <= TARGET_MS:
+            logger.info(f"✅ Diversification {slowest:.3f} ms avg (target {TARGET_MS:g} ms)")
+        else:
+            logger.warning(f"⚠️ Diversification {slowest:.3f} ms avg exceeds {TARGET_MS:g} ms")
+        if not all(results["checks"].values()):
+            logger.warning("⚠️ Some selection checks failed")
+        return results
+
+
+async def main():
+    """Main test function"""
+    benchmark = ResultDiversificationBenchmark()
+    await benchmark.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
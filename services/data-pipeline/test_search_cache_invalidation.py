@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Test version-aware search cache invalidation
+Rewrites one note through IncrementalUpdateService and checks that only the cached searches built from it are dropped,
+then repeats the checks across the API's search service (main.py wiring) and a separate vault monitor
+"""
+import asyncio
+import gc
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, Any
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.vector.chroma_service import ChromaService
+from src.embeddings.embedding_service import EmbeddingService
+from src.processing.content_processor import ContentProcessor
+from src.monitoring.incremental_updater import IncrementalUpdateService
+from src.search.search_service import SemanticSearchService
+from src.cache.version_tracker import CollectionVersionTracker
+from src.monitoring.vault_monitor import VaultMonitorService
+
+# config.Settings (imported by main) requires these
+os.environ.setdefault("OBSIDIAN_API_KEY", "test")
+os.environ.setdefault("GEMINI_API_KEY", "test")
+import main
+from config import Settings
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+
+NOTES = {
+    "python/asyncio.md": "# Asyncio\n\nPython asyncio event loops, tasks and coroutines for concurrent IO.",
+    "cooking/bread.md": "# Sourdough\n\nBaking sourdough bread with a levain, long fermentation and a hot oven.",
+    "finance/budget.md": "# Budget\n\nMonthly budgeting, savings rate and tracking expenses in a spreadsheet."
+}
+
+
+class SearchCacheInvalidationTester:
+    """Check targeted invalidation of cached searches after note rewrites"""
+
+    def __init__(self, vault_path: Path, chroma_path: str):
+        self.vault_path = vault_path
+        # One tracker shared explicitly by the update path and the search service
+        self.version_tracker = CollectionVersionTracker()
+        self.embedding_service = EmbeddingService(MODEL_NAME, cache_path=None)
+        self.chroma_service = ChromaService(collection_name="cache_invalidation_test", persist_directory=chroma_path,
+                                            embedding_model=MODEL_NAME, use_embedding_function=False)
+        self.updater = IncrementalUpdateService(str(vault_path), self.chroma_service, self.embedding_service,
+                                                ContentProcessor(MODEL_NAME), version_tracker=self.version_tracker)
+        self.search_service = SemanticSearchService(self.chroma_service, self.embedding_service,
+                                                    version_tracker=self.version_tracker,
+                                                    search_cache_ttl=86400)
+
+    async def setup(self):
+        """Write and index the test notes"""
+        for relative_path, content in NOTES.items():
+            note_path = self.vault_path / relative_path
+            note_path.parent.mkdir(parents=True, exist_ok=True)
+            note_path.write_text(content, encoding="utf-8")
+            await self.updater.process_file_update(relative_path)
+
+    async def _search(self, query: str):
+        return await self.search_service.search_similar(query, n_results=1, expand_query=False)
+
+    async def test_targeted_invalidation(self) -> Dict[str, Any]:
+        """Rewrite the bread note: its cached search is dropped, the asyncio one survives"""
+        await self._search("python coroutines")
+        await self._search("baking bread")
+        cached_before = len(self.search_service.search_cache)
+
+        note_path = self.vault_path / "cooking/bread.md"
+        note_path.write_text(NOTES["cooking/bread.md"] + "\n\nUpdated: rye flour works too.", encoding="utf-8")
+        await self.updater.process_file_update("cooking/bread.md")
+        cached_after = len(self.search_service.search_cache)
+
+        hits_before = self.search_service.cache_hits
+        await self._search("python coroutines")
+        asyncio_served_from_cache = self.search_service.cache_hits == hits_before + 1
+        bread_results = await self._search("baking bread")
+        bread_refreshed = self.search_service.cache_hits == hits_before + 1 and "rye" in bread_results[0]["content"]
+
+        results = {
+            "cached_before": cached_before,
+            "cached_after_update": cached_after,
+            "unrelated_entry_kept": asyncio_served_from_cache,
+            "changed_entry_refreshed": bread_refreshed,
+            "stats": self.search_service.get_search_stats()["search_result_cache"]
+        }
+        logger.info(f"Cached searches: {cached_before} -> {cached_after} after rewriting cooking/bread.md")
+        return results
+
+    async def test_deletion_invalidation(self) -> Dict[str, Any]:
+        """Delete the budget note: its cached search must not be served again"""
+        await self._search("monthly budget")
+        await self.updater.process_file_deletion("finance/budget.md")
+        hits_before = self.search_service.cache_hits
+        results = await self._search("monthly budget")
+        served_stale = self.search_service.cache_hits > hits_before
+        stale_path = any(r["metadata"].get("path") == "finance/budget.md" for r in results)
+        logger.info(f"After deleting finance/budget.md: served from cache={served_stale}, still returned={stale_path}")
+        return {"served_stale": served_stale, "deleted_note_returned": stale_path}
+
+    async def test_addition_invalidation(self) -> Dict[str, Any]:
+        """Add a note that better matches a cached query: the cached result must not be served"""
+        await self._search("rye sourdough starter")
+        note_path = self.vault_path / "cooking/rye.md"
+        note_path.write_text("# Rye starter\n\nFeeding a rye sourdough starter twice a day.", encoding="utf-8")
+        await self.updater.process_file_update("cooking/rye.md")
+        hits_before = self.search_service.cache_hits
+        results = await self._search("rye sourdough starter")
+        served_stale = self.search_service.cache_hits > hits_before
+        new_note_returned = results[0]["metadata"].get("path") == "cooking/rye.md"
+        logger.info(f"After adding cooking/rye.md: served from cache={served_stale}, new note returned={new_note_returned}")
+        return {"served_stale": served_stale, "new_note_returned": new_note_returned}
+
+    def test_listener_release(self) -> Dict[str, Any]:
+        """A dropped search service must not stay registered on the shared tracker"""
+        service = SemanticSearchService(self.chroma_service, self.embedding_service,
+                                        version_tracker=self.version_tracker, expansion_memo_path=None)
+        service.close()
+        closed_released = not self.version_tracker._listeners[1:]
+        service = SemanticSearchService(self.chroma_service, self.embedding_service,
+                                        version_tracker=self.version_tracker, expansion_memo_path=None)
+        del service
+        gc.collect()
+        self.version_tracker.record_change("cooking/bread.md", "gc-check")
+        dropped_released = not self.version_tracker._listeners[1:]
+        return {"closed_released": closed_released, "dropped_released": dropped_released}
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        await self.setup()
+        targeted = await self.test_targeted_invalidation()
+        deletion = await self.test_deletion_invalidation()
+        addition = await self.test_addition_invalidation()
+        listeners = self.test_listener_release()
+
+        logger.info("=" * 80)
+        logger.info("SEARCH CACHE INVALIDATION SUMMARY")
+        logger.info("=" * 80)
+        checks = {
+            "unrelated cached search survives a rewrite": targeted["unrelated_entry_kept"],
+            "rewritten note's cached search is rebuilt": targeted["changed_entry_refreshed"],
+            "deleted note's cached search is not served": not deletion["served_stale"],
+            "added note invalidates cached searches": not addition["served_stale"] and addition["new_note_returned"],
+            "closed search service stops listening": listeners["closed_released"],
+            "dropped search service is released": listeners["dropped_released"]
+        }
+        for label, passed in checks.items():
+            logger.info(f"{'✅' if passed else '❌'} {label}")
+        logger.info(f"Tracker: {self.version_tracker.get_stats()}")
+        return all(checks.values())
+
+
+class ServiceWiringInvalidationTester:
+    """
+    The API's search service as main.py builds it, with notes updated by a VaultMonitorService
+    that shares nothing with it but the collection directory (as the separate monitor process does)
+    """
+
+    def __init__(self, vault_path: Path, chroma_path: str):
+        self.vault_path = vault_path
+        self.chroma_path = chroma_path
+        self.settings = Settings(chroma_persist_directory=chroma_path, chroma_collection_name="wiring_test",
+                                 embedding_model=MODEL_NAME,
+                                 expansion_memo_path=str(Path(chroma_path).parent / "expansions.sqlite3"))
+        self.monitor = self._start_monitor()
+        embedding_service = EmbeddingService(MODEL_NAME, cache_path=None)
+        chroma_service = ChromaService(collection_name=self.settings.chroma_collection_name,
+                                       persist_directory=chroma_path, embedding_model=MODEL_NAME,
+                                       use_embedding_function=False)
+        self.search_service = main.build_search_service(self.settings, chroma_service, embedding_service)
+        self.version_tracker = self.search_service.version_tracker
+
+    def _start_monitor(self) -> VaultMonitorService:
+        return VaultMonitorService(str(self.vault_path), chroma_db_path=self.chroma_path,
+                                   collection_name=self.settings.chroma_collection_name, embedding_model=MODEL_NAME)
+
+    async def setup(self):
+        """Index the test notes through the monitor and cache one search per note in the API service"""
+        for relative_path, content in NOTES.items():
+            note_path = self.vault_path / relative_path
+            note_path.parent.mkdir(parents=True, exist_ok=True)
+            note_path.write_text(content, encoding="utf-8")
+            await self.monitor.incremental_updater.process_file_update(relative_path)
+        for query in ("python coroutines", "baking bread", "monthly budget"):
+            await self._search(query)
+
+    async def _search(self, query: str):
+        # Journal reads are throttled to one per poll_interval
+        await asyncio.sleep(self.version_tracker.poll_interval)
+        return await self.search_service.search_similar(query, n_results=1, expand_query=False)
+
+    async def _served_from_cache(self, query: str) -> bool:
+        hits_before = self.search_service.cache_hits
+        await self._search(query)
+        return self.search_service.cache_hits > hits_before
+
+    async def test_monitor_rewrite(self) -> Dict[str, Any]:
+        """The monitor rewrites the bread note: only the API's cached bread search is dropped"""
+        note_path = self.vault_path / "cooking/bread.md"
+        note_path.write_text(NOTES["cooking/bread.md"] + "\n\nUpdated: spelt works too.", encoding="utf-8")
+        await self.monitor.incremental_updater.process_file_update("cooking/bread.md")
+        unrelated_kept = await self._served_from_cache("python coroutines")
+        hits_before = self.search_service.cache_hits
+        bread_results = await self._search("baking bread")
+        return {"unrelated_kept": unrelated_kept,
+                "changed_refreshed": self.search_service.cache_hits == hits_before
+                                     and "spelt" in bread_results[0]["content"]}
+
+    async def test_first_edit_after_restart(self) -> Dict[str, Any]:
+        """A restarted monitor's first edit of an indexed note is not an addition"""
+        self.monitor = self._start_monitor()
+        membership_before = self.version_tracker.membership_generation
+        note_path = self.vault_path / "finance/budget.md"
+        note_path.write_text(NOTES["finance/budget.md"] + "\n\nUpdated: yearly review.", encoding="utf-8")
+        await self.monitor.incremental_updater.process_file_update("finance/budget.md")
+        unrelated_kept = await self._served_from_cache("python coroutines")
+        return {"unrelated_kept": unrelated_kept,
+                "membership_unchanged": self.version_tracker.membership_generation == membership_before}
+
+    async def test_monitor_move(self) -> Dict[str, Any]:
+        """A rename drops the searches that returned the old path, not every cached search"""
+        await self._search("baking bread")
+        membership_before = self.version_tracker.membership_generation
+        (self.vault_path / "dev").mkdir()
+        shutil.move(str(self.vault_path / "python/asyncio.md"), str(self.vault_path / "dev/asyncio.md"))
+        await self.monitor.incremental_updater.process_file_move("python/asyncio.md", "dev/asyncio.md")
+        unrelated_kept = await self._served_from_cache("baking bread")
+        hits_before = self.search_service.cache_hits
+        moved_results = await self._search("python coroutines")
+        return {"unrelated_kept": unrelated_kept,
+                "moved_refreshed": self.search_service.cache_hits == hits_before
+                                   and moved_results[0]["metadata"].get("path") == "dev/asyncio.md",
+                "membership_unchanged": self.version_tracker.membership_generation == membership_before}
+
+    async def test_monitor_addition(self) -> Dict[str, Any]:
+        """A note the monitor adds invalidates the API's cached searches"""
+        await self._search("rye sourdough starter")
+        note_path = self.vault_path / "cooking/rye.md"
+        note_path.write_text("# Rye starter\n\nFeeding a rye sourdough starter twice a day.", encoding="utf-8")
+        await self.monitor.incremental_updater.process_file_update("cooking/rye.md")
+        hits_before = self.search_service.cache_hits
+        results = await self._search("rye sourdough starter")
+        return {"served_stale": self.search_service.cache_hits > hits_before,
+                "new_note_returned": results[0]["metadata"].get("path") == "cooking/rye.md"}
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        await self.setup()
+        rewrite = await self.test_monitor_rewrite()
+        restart = await self.test_first_edit_after_restart()
+        move = await self.test_monitor_move()
+        addition = await self.test_monitor_addition()
+
+        logger.info("=" * 80)
+        logger.info("SERVICE WIRING INVALIDATION SUMMARY")
+        logger.info("=" * 80)
+        checks = {
+            "default search TTL is long": self.settings.cache_ttl_search >= 86400,
+            "monitor rewrite keeps unrelated API cache entries": rewrite["unrelated_kept"],
+            "monitor rewrite refreshes the API's cached search": rewrite["changed_refreshed"],
+            "first edit after a monitor restart is not an addition": restart["membership_unchanged"]
+                                                                     and restart["unrelated_kept"],
+            "move keeps unrelated API cache entries": move["unrelated_kept"] and move["membership_unchanged"],
+            "move refreshes searches that returned the old path": move["moved_refreshed"],
+            "monitor addition invalidates the API's cached searches": not addition["served_stale"]
+                                                                      and addition["new_note_returned"]
+        }
+        for label, passed in checks.items():
+            logger.info(f"{'✅' if passed else '❌'} {label}")
+        logger.info(f"API tracker: {self.version_tracker.get_stats()}")
+        self.search_service.close()
+        self.version_tracker.close()
+        return all(checks.values())
+
+
+async def run_tests():
+    """Main test function"""
+    success = True
+    for tester_class in (SearchCacheInvalidationTester, ServiceWiringInvalidationTester):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            vault_path = Path(temp_dir) / "vault"
+            vault_path.mkdir()
+            tester = tester_class(vault_path, str(Path(temp_dir) / "chroma"))
+            success = await tester.run_all_tests() and success
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(run_tests())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Benchmark for single-pass (offset mapping) chunking
+Compares tokenizer calls, time and chunk boundaries against the per-sentence/per-word chunker on real vault notes
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Dict, Any
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.ingestion.filesystem_client import FilesystemVaultClient
+from src.processing.content_processor import ContentProcessor
+from src.processing.hybrid_content_processor import SimpleChunkingProcessor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+VAULT_ROOT_DIR = Path(os.getenv("VAULT_PATH", "D:/Nomade Milionario"))
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+MAX_NOTES = int(os.getenv("BENCHMARK_MAX_NOTES", "200"))
+
+
+class CountingTokenizer:
+    """Tokenizer proxy that counts every encode call and the characters it tokenized"""
+
+    def __init__(self, tokenizer):
+        self._tokenizer = tokenizer
+        self.calls = 0
+        self.chars = 0
+
+    def __call__(self, text, *args, **kwargs):
+        self.calls += 1
+        self.chars += len(text)
+        return self._tokenizer(text, *args, **kwargs)
+
+    def encode(self, text, *args, **kwargs):
+        self.calls += 1
+        self.chars += len(text)
+        return self._tokenizer.encode(text, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._tokenizer, name)
+
+
+class SinglePassChunkingTester:
+    """Compare legacy and single-pass chunking on real vault notes"""
+
+    def __init__(self):
+        self.notes: List[Dict[str, Any]] = []
+
+    async def setup(self):
+        """Load a sample of vault notes"""
+        client = FilesystemVaultClient(vault_path=str(VAULT_ROOT_DIR))
+        files = await client.list_vault_files()
+        # Prefer the larger notes: that is where re-tokenization hurts most
+        files = sorted(files, key=lambda f: f["size"], reverse=True)[:MAX_NOTES]
+        for file_info in files:
+            try:
+                self.notes.append(await client.get_file_content(file_info["path"]))
+            except Exception as e:
+                logger.warning(f"Skipping {file_info['path']}: {e}")
+        logger.info(f"Loaded {len(self.notes)} notes "
+                   f"({sum(len(n['content']) for n in self.notes) / 1024:.0f} KB of content)")
+
+    def _run(self, processor, label: str) -> Dict[str, Any]:
+        """Chunk every note with a processor whose tokenizer is wrapped in a counter"""
+        counter = CountingTokenizer(processor.tokenizer)
+        processor.tokenizer = counter
+
+        chunks_per_note = []
+        start_time = time.time()
+        for note in self.notes:
+            chunks_per_note.append(processor.chunk_content(note["content"], note["metadata"], note["path"]))
+        elapsed = time.time() - start_time
+
+        processor.tokenizer = counter._tokenizer
+        total_chunks = sum(len(c) for c in chunks_per_note)
+        logger.info(f"  {label:<28} {elapsed:7.2f}s  {counter.calls:>9} tokenizer calls  "
+                   f"{counter.chars / 1024:>9.0f} KB tokenized  {total_chunks} chunks")
+        return {
+            "time": elapsed,
+            "tokenizer_calls": counter.calls,
+            "tokenized_chars": counter.chars,
+            "chunks": chunks_per_note
+        }
+
+    @staticmethod
+    def _boundaries(chunks_per_note: List[List[Dict[str, Any]]]) -> List[List[tuple]]:
+        return [[(c["heading"], c["content"], c["chunk_token_count"]) for c in chunks] for chunks in chunks_per_note]
+
+    def compare(self, name: str, legacy_processor, single_pass_processor) -> Dict[str, Any]:
+        """Run both modes of one chunker and verify identical output"""
+        logger.info("=" * 80)
+        logger.info(f"{name}")
+        logger.info("=" * 80)
+
+        legacy = self._run(legacy_processor, "per-call tokenization")
+        single = self._run(single_pass_processor, "single-pass offsets")
+
+        legacy_boundaries = self._boundaries(legacy["chunks"])
+        single_boundaries = self._boundaries(single["chunks"])
+        mismatched = [note["path"] for note, a, b in zip(self.notes, legacy_boundaries, single_boundaries) if a != b]
+
+        call_reduction = 1 - single["tokenizer_calls"] / legacy["tokenizer_calls"] if legacy["tokenizer_calls"] else 0
+        speedup = legacy["time"] / single["time"] if single["time"] > 0 else 0
+        logger.info(f"  Tokenizer call reduction: {call_reduction:.1%}")
+        logger.info(f"  Speedup: {speedup:.2f}x")
+        if mismatched:
+            logger.warning(f"  ⚠️ {len(mismatched)} notes chunked differently, e.g. {mismatched[:3]}")
+        else:
+            logger.info("  ✅ Identical chunk boundaries and token counts")
+
+        return {
+            "legacy_calls": legacy["tokenizer_calls"],
+            "single_pass_calls": single["tokenizer_calls"],
+            "call_reduction": call_reduction,
+            "speedup": speedup,
+            "mismatched_notes": len(mismatched)
+        }
+
+    async def run_all_tests(self):
+        """Run the benchmark for both chunkers"""
+        await self.setup()
+        if not self.notes:
+            logger.error("No notes loaded, nothing to benchmark")
+            return {}
+
+        results = {
+            "advanced": self.compare(
+                "ContentProcessor (heading + sentence window)",
+                ContentProcessor(MODEL_NAME, single_pass_tokenization=False),
+                ContentProcessor(MODEL_NAME, single_pass_tokenization=True)
+            ),
+            "simple": self.compare(
+                "SimpleChunkingProcessor (word window)",
+                SimpleChunkingProcessor(MODEL_NAME, single_pass_tokenization=False),
+                SimpleChunkingProcessor(MODEL_NAME, single_pass_tokenization=True)
+            )
+        }
+
+        logger.info("=" * 80)
+        logger.info("SINGLE-PASS CHUNKING SUMMARY")
+        logger.info("=" * 80)
+        for name, result in results.items():
+            logger.info(f"{name:>9}: {result['legacy_calls']} -> {result['single_pass_calls']} tokenizer calls "
+                       f"({result['call_reduction']:.1%} fewer), {result['speedup']:.2f}x faster, "
+                       f"{result['mismatched_notes']} mismatched notes")
+        return results
+
+
+async def main():
+    """Main test function"""
+    tester = SinglePassChunkingTester()
+    await tester.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the snippet extraction engine
+Preview + relevance cost per query (20 results of ~512-token chunks) for QueryTerms/extract_snippet vs the previous sliding-window scan, with output equality checks
+"""
+import asyncio
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+import numpy as np
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.search.snippets import QueryTerms, extract_snippet
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+RESULTS_PER_QUERY = 20
+CHUNK_WORDS = 400  # ~512 tokens of English prose
+QUERIES = int(os.getenv("BENCHMARK_SNIPPET_QUERIES", "20"))
+
+WORDS = ("the of and to in is for that with on as python data search vector index cache query embedding model "
+         "performance latency memory async function class notes vault obsidian markdown heading chunk token "
+         "javascript java database retrieval ranking fusion window snippet preview highlight").split()
+
+
+def legacy_query_relevance(content: str, query: str) -> float:
+    """The previous SemanticSearchService._calculate_query_relevance"""
+    query_words = query.lower().split()
+    content_words = content.lower().split()
+    matches = sum(1 for word in query_words if word in content_words)
+    return matches / len(query_words) if query_words else 0
+
+
+def legacy_content_preview(content: str, query: str, max_length: int = 200) -> str:
+    """The previous SemanticSearchService._generate_content_preview"""
+    if len(content) <= max_length:
+        return content
+    query_lower = query.lower()
+    content_lower = content.lower()
+    best_position = 0
+    max_matches = 0
+    for i in range(len(content) - max_length + 1):
+        snippet = content_lower[i:i + max_length]
+        matches = sum(1 for word in query_lower.split() if word in snippet)
+        if matches > max_matches:
+            max_matches = matches
+            best_position = i
+    preview = content[best_position:best_position + max_length]
+    if best_position > 0:
+        preview = "..." + preview
+    if best_position + max_length < len(content):
+        preview = preview + "..."
+    return preview
+
+
+class SnippetExtractionBenchmark:
+    """Compare per-query preview cost and output of the two implementations"""
+
+    def __init__(self):
+        rng = np.random.default_rng(0)
+        self.queries = [" ".join(rng.choice(WORDS[6:], size=int(rng.integers(2, 5)))) for _ in range(QUERIES)]
+        self.result_sets = [
+            [" ".join(rng.choice(WORDS, size=CHUNK_WORDS)).capitalize() + "." for _ in range(RESULTS_PER_QUERY)]
+            for _ in range(QUERIES)
+        ]
+
+    def _run_legacy(self, query: str, contents: List[str]) -> List[tuple]:
+        return [(legacy_query_relevance(c, query), legacy_content_preview(c, query)) for c in contents]
+
+    def _run_engine(self, query: str, contents: List[str]) -> List[tuple]:
+        terms = QueryTerms(query)
+        output = []
+        for content in contents:
+            occurrences = terms.find(content)
+            output.append((terms.relevance(content, occurrences),
+                           extract_snippet(content, terms, occurrences=occurrences).text))
+        return output
+
+    def benchmark(self) -> Dict[str, Any]:
+        """Time both implementations over the same queries and compare outputs"""
+        timings = {"legacy": [], "engine": []}
+        mismatches = 0
+        for query, contents in zip(self.queries, self.result_sets):
+            start_time = time.perf_counter()
+            legacy = self._run_legacy(query, contents)
+            timings["legacy"].append((time.perf_counter() - start_time) * 1000)
+
+            start_time = time.perf_counter()
+            engine = self._run_engine(query, contents)
+            timings["engine"].append((time.perf_counter() - start_time) * 1000)
+
+            mismatches += sum(1 for old, new in zip(legacy, engine) if old != new)
+
+        results = {name: {"avg_ms": float(np.mean(values)), "p95_ms": float(np.percentile(values, 95))}
+                   for name, values in timings.items()}
+        results["speedup"] = results["legacy"]["avg_ms"] / results["engine"]["avg_ms"]
+        results["mismatches"] = mismatches
+        avg_chars = np.mean([len(c) for contents in self.result_sets for c in contents])
+        logger.info(f"  {QUERIES} queries x {RESULTS_PER_QUERY} results (~{avg_chars:.0f} chars each)")
+        for name in ("legacy", "engine"):
+            logger.info(f"  {name:>6}: {results[name]['avg_ms']:8.2f} ms/query avg, {results[name]['p95_ms']:8.2f} ms p95")
+        return results
+
+    async def run_all_tests(self):
+        """Run the benchmark"""
+        logger.info("=" * 80)
+        logger.info("SNIPPET EXTRACTION PER QUERY")
+        logger.info("=" * 80)
+        results = self.benchmark()
+
+        logger.info("=" * 80)
+        logger.info("SNIPPET EXTRACTION SUMMARY")
+        logger.info("=" * 80)
+        logger.info(f"Speedup: {results['speedup']:.1f}x")
+        if results["mismatches"] == 0:
+            logger.info("✅ Previews and relevance identical to the previous implementation")
+        else:
+            logger.warning(f"⚠️ {results['mismatches']} results differ from the previous implementation")
+        return results
+
+
+async def main():
+    """Main test function"""
+    benchmark = SnippetExtractionBenchmark()
+    await benchmark.run_all_tests()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -263,6 +263,58 @@ class StreamingResponseTester:
         
         return metrics
     
+    async def test_concurrent_streams(self, streams: int = 4):
+        """Concurrent streams should overlap and leave the event loop responsive"""
+        logger.info(f"🔀 Testing {streams} Concurrent Streams")
+        
+        mock_chunks = [
+            {
+                "content": "Asyncio runs coroutines on a single event loop; blocking calls stall every other task.",
+                "metadata": {"path": "asyncio.md", "heading": "Event loop", "chunk_index": 0},
+                "similarity": 0.88,
+                "final_score": 0.88
+            }
+        ]
+        
+        # Largest gap between ticks of a 10ms heartbeat while the streams run
+        max_gap = 0.0
+        running = True
+        
+        async def heartbeat():
+            nonlocal max_gap
+            last = time.perf_counter()
+            while running:
+                await asyncio.sleep(0.01)
+                now = time.perf_counter()
+                max_gap = max(max_gap, now - last)
+                last = now
+        
+        async def consume(query: str):
+            events = []
+            async for event in self.gemini_client.stream_events(query, mock_chunks):
+                events.append(event)
+            return events
+        
+        heartbeat_task = asyncio.create_task(heartbeat())
+        start_time = time.time()
+        all_events = await asyncio.gather(*(consume(f"What is asyncio? ({i})") for i in range(streams)))
+        wall_time = time.time() - start_time
+        running = False
+        await heartbeat_task
+        
+        stream_times = [events[-1].get("total_time", 0) for events in all_events]
+        sources_first = all(events and events[0]["event"] == "sources" for events in all_events)
+        logger.info(f"  ⏱️  Wall time: {wall_time:.3f}s (sum of stream times: {sum(stream_times):.3f}s)")
+        logger.info(f"  💓 Max event loop stall: {max_gap * 1000:.1f}ms")
+        logger.info(f"  {'✅' if sources_first else '❌'} Sources sent before the first token")
+        
+        return {
+            "wall_time": wall_time,
+            "sum_stream_times": sum(stream_times),
+            "max_loop_stall_ms": max_gap * 1000,
+            "sources_first": sources_first
+        }
+    
     async def run_comprehensive_test(self):
         """Run all streaming tests"""
         logger.info("🚀 Starting Comprehensive Streaming Response Test")
@@ -284,6 +336,12 @@ class StreamingResponseTester:
         logger.info("📋 Test 3: Performance Metrics")
         performance_results = await self.test_streaming_performance_metrics()
         
+        logger.info("\n" + "=" * 80)
+        
+        # Test 4: Concurrent streams
+        logger.info("📋 Test 4: Concurrent Streams")
+        concurrency_results = await self.test_concurrent_streams()
+        
         # Summary
         logger.info("\n" + "=" * 80)
         logger.info("📊 STREAMING RESPONSE TEST SUMMARY")
@@ -308,11 +366,16 @@ class StreamingResponseTester:
             else:
                 logger.info(f"  {query_type}: {metrics['total_time']:.3f}s, {metrics['tokens_per_second']:.1f} tokens/s")
         
+        logger.info("✅ Concurrent Streams:")
+        logger.info(f"  Wall time: {concurrency_results['wall_time']:.3f}s, "
+                    f"max loop stall: {concurrency_results['max_loop_stall_ms']:.1f}ms")
+        
         logger.info("\n🎉 Streaming Response Test Complete!")
         return {
             "comparison": comparison_results,
             "prompt_styles": prompt_results,
-            "performance": performance_results
+            "performance": performance_results,
+            "concurrency": concurrency_results
         }
 
 async def main():
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Test manifest-driven startup sync
+Restarts against a persisted VaultManifest and checks that only new, deleted or edited notes are opened and re-indexed
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.vector.chroma_service import ChromaService
+from src.embeddings.embedding_service import EmbeddingService
+from src.processing.content_processor import ContentProcessor
+from src.ingestion.vault_manifest import VaultManifest
+from src.monitoring.incremental_updater import IncrementalUpdateService
+from src.monitoring.startup_sync import StartupSyncService
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+VAULT_NOTES = int(os.getenv("BENCHMARK_MANIFEST_NOTES", "200"))
+
+
+def note_text(index: int) -> str:
+    return (f"---\ntags: [topic-{index % 7}]\n---\n# Note {index}\n\n"
+            f"Notes about topic {index % 7}: vector search, caching and async pipelines, entry {index}.")
+
+
+class VaultManifestSyncTester:
+    """Restart the sync service over a persisted manifest and check what it touches"""
+
+    def __init__(self, vault_path: Path, chroma_path: str):
+        self.vault_path = vault_path
+        self.chroma_path = chroma_path
+        self.manifest_path = str(Path(chroma_path) / "manifest.sqlite3")
+        self.embedding_service = EmbeddingService(MODEL_NAME, cache_path=None)
+        self.content_processor = ContentProcessor(MODEL_NAME)
+        self.chroma_service = ChromaService(collection_name="manifest_sync_test", persist_directory=chroma_path,
+                                            embedding_model=MODEL_NAME, use_embedding_function=False)
+        self.manifest = None
+        self.sync_service = None
+
+    def restart(self, manifest_path: str = None):
+        """Reopen the manifest from disk, as a fresh process would"""
+        if self.manifest is not None:
+            self.manifest.close()
+        self.manifest = VaultManifest(manifest_path or self.manifest_path)
+        updater = IncrementalUpdateService(str(self.vault_path), self.chroma_service, self.embedding_service,
+                                           self.content_processor, manifest=self.manifest)
+        self.sync_service = StartupSyncService(str(self.vault_path), self.chroma_service,
+                                               manifest=self.manifest, incremental_updater=updater)
+
+    def write_note(self, relative_path: str, content: str):
+        note_path = self.vault_path / relative_path
+        note_path.parent.mkdir(parents=True, exist_ok=True)
+        note_path.write_text(content, encoding="utf-8")
+
+    async def setup(self):
+        """Write the vault and index it through a first (empty manifest) sync"""
+        for i in range(VAULT_NOTES):
+            self.write_note(f"topic-{i % 7}/note-{i}.md", note_text(i))
+        self.restart()
+        result = await self.sync_service.perform_startup_sync()
+        logger.info(f"Initial sync: {len(result['sync_plan']['new_files'])} new files indexed")
+        return result
+
+    async def test_no_changes(self) -> Dict[str, Any]:
+        """A restart over an untouched vault opens nothing"""
+        self.restart()
+        result = await self.sync_service.perform_startup_sync()
+        logger.info(f"Unchanged restart: {result['files_opened']} files opened, "
+                    f"{result['sync_plan']['total_actions']} actions, {result['processing_time_ms']:.1f}ms")
+        return result
+
+    async def test_touch_only(self) -> Dict[str, Any]:
+        """An mtime bump without edits is hashed but not re-indexed"""
+        note_path = self.vault_path / "topic-1/note-1.md"
+        future = time.time() + 60
+        os.utime(note_path, (future, future))
+        self.restart()
+        result = await self.sync_service.perform_startup_sync()
+        again = await self.sync_service.perform_startup_sync()
+        logger.info(f"Touched note: plan={ {k: len(v) for k, v in result['sync_plan'].items() if isinstance(v, list)} }")
+        return {"first": result, "second": again}
+
+    async def test_edit_add_delete(self) -> Dict[str, Any]:
+        """Edited, added and deleted notes are found from stats alone"""
+        self.write_note("topic-2/note-2.md", note_text(2) + "\n\nEdited: mention rye bread.")
+        self.write_note("inbox/new-note.md", "# New\n\nA brand new note about sourdough starters.")
+        (self.vault_path / "topic-3/note-3.md").unlink()
+        self.restart()
+        result = await self.sync_service.perform_startup_sync()
+
+        stored = self.chroma_service.collection.get(where={"path": "topic-2/note-2.md"}, include=["documents"])
+        entry = self.manifest.get("topic-2/note-2.md")
+        checks = {
+            "plan": result["sync_plan"],
+            "edited_content_stored": any("rye" in doc for doc in stored["documents"]),
+            "manifest_chunk_ids_match": entry is not None and sorted(entry.chunk_ids) == sorted(stored["ids"]),
+            "deleted_chunks_gone": not self.chroma_service.collection.get(where={"path": "topic-3/note-3.md"})["ids"],
+            "deleted_forgotten": self.manifest.get("topic-3/note-3.md") is None
+        }
+        logger.info(f"Edit/add/delete: {result['files_opened']} files opened, "
+                    f"{result['sync_plan']['total_actions']} actions")
+        return checks
+
+    async def test_seed_from_collection(self) -> Dict[str, Any]:
+        """A collection indexed without a manifest seeds one instead of re-indexing"""
+        self.restart(str(Path(self.chroma_path) / "seeded_manifest.sqlite3"))
+        result = await self.sync_service.perform_startup_sync()
+        logger.info(f"Seeded manifest with {result['manifest_seeded']} files, "
+                    f"{result['sync_plan']['total_actions']} actions")
+        return result
+
+    async def test_sync_speed(self) -> Dict[str, Any]:
+        """Unchanged-vault restart: legacy full scan vs manifest diff"""
+        self.restart()
+        legacy = StartupSyncService(str(self.vault_path), self.chroma_service)
+        timings = {}
+        for name, service in (("legacy", legacy), ("manifest", self.sync_service)):
+            start_time = time.perf_counter()
+            await service.perform_startup_sync()
+            timings[name] = (time.perf_counter() - start_time) * 1000
+        logger.info(f"Unchanged {VAULT_NOTES}-note vault: legacy {timings['legacy']:.1f}ms, "
+                    f"manifest {timings['manifest']:.1f}ms")
+        return timings
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        initial = await self.setup()
+        unchanged = await self.test_no_changes()
+        touched = await self.test_touch_only()
+        edits = await self.test_edit_add_delete()
+        seeded = await self.test_seed_from_collection()
+        timings = await self.test_sync_speed()
+
+        logger.info("=" * 80)
+        logger.info("VAULT MANIFEST SYNC SUMMARY")
+        logger.info("=" * 80)
+        plan = edits["plan"]
+        checks = {
+            "first sync indexes every note": len(initial["sync_plan"]["new_files"]) == VAULT_NOTES,
+            "unchanged restart opens no file": unchanged["files_opened"] == 0
+                                               and unchanged["sync_plan"]["total_actions"] == 0,
+            "touched note is hashed, not re-indexed": touched["first"]["sync_plan"]["touched_files"] == ["topic-1/note-1.md"]
+                                                      and touched["first"]["sync_plan"]["total_actions"] == 0,
+            "touch is remembered": touched["second"]["files_opened"] == 0,
+            "edited note re-indexed": plan["modified_files"] == ["topic-2/note-2.md"] and edits["edited_content_stored"],
+            "new note indexed": plan["new_files"] == ["inbox/new-note.md"],
+            "deleted note removed": plan["deleted_files"] == ["topic-3/note-3.md"]
+                                    and edits["deleted_chunks_gone"] and edits["deleted_forgotten"],
+            "manifest holds the stored chunk ids": edits["manifest_chunk_ids_match"],
+            "existing collection seeds the manifest": seeded["manifest_seeded"] == VAULT_NOTES
+                                                      and seeded["sync_plan"]["new_files"] == []
+        }
+        for label, passed in checks.items():
+            logger.info(f"{'✅' if passed else '❌'} {label}")
+        if timings["manifest"] < timings["legacy"]:
+            logger.info(f"✅ Manifest restart {timings['legacy'] / max(timings['manifest'], 1e-6):.1f}x faster")
+        else:
+            logger.warning("⚠️ Manifest restart was not faster than the full scan")
+        self.manifest.close()
+        return all(checks.values())
+
+
+async def main():
+    """Main test function"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        vault_path = Path(temp_dir) / "vault"
+        vault_path.mkdir()
+        tester = VaultManifestSyncTester(vault_path, str(Path(temp_dir) / "chroma"))
+        success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Benchmark the parallel vault scanner
+Compares Path.rglob + stat with the os.scandir thread-pool scanner and its pruned rescans on a synthetic vault
+"""
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, Any, List
+
+# Add the src directory to the Python path
+sys.path.append(str(Path(__file__).parent / "src"))
+
+from src.ingestion.vault_scanner import VaultScanner
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SCANNER_NOTES = int(os.getenv("BENCHMARK_SCANNER_NOTES", "100000"))
+NOTES_PER_DIRECTORY = int(os.getenv("BENCHMARK_SCANNER_NOTES_PER_DIR", "100"))
+SCANNER_WORKERS = int(os.getenv("BENCHMARK_SCANNER_WORKERS", "8"))
+
+
+def rglob_list_files(vault_root: Path) -> List[Dict[str, Any]]:
+    """The previous FilesystemVaultClient._sync_list_files: rglob plus one stat per file"""
+    files = []
+    for file_path in vault_root.rglob("*.md"):
+        stat = file_path.stat()
+        files.append({
+            "path": file_path.relative_to(vault_root).as_posix(),
+            "name": file_path.name,
+            "size": stat.st_size,
+            "modified": stat.st_mtime,
+            "created": stat.st_ctime,
+        })
+    return files
+
+
+class VaultScannerTester:
+    """Build a synthetic vault and compare directory walks over it"""
+
+    def __init__(self, vault_path: Path, state_path: str):
+        self.vault_path = vault_path
+        self.state_path = state_path
+        self.directories: List[Path] = []
+
+    def build_vault(self):
+        """Spread the notes over two directory levels, with a few non-markdown files"""
+        start_time = time.perf_counter()
+        directory_count = max(1, SCANNER_NOTES // NOTES_PER_DIRECTORY)
+        top_level = max(1, int(directory_count ** 0.5))
+        for d in range(directory_count):
+            directory = self.vault_path / f"area-{d % top_level:03d}" / f"topic-{d:05d}"
+            directory.mkdir(parents=True, exist_ok=True)
+            self.directories.append(directory)
+            for n in range(NOTES_PER_DIRECTORY):
+                with open(directory / f"note-{n:03d}.md", "w", encoding="utf-8") as f:
+                    f.write(f"# Note {d}-{n}\n")
+            (directory / "attachment.png").write_bytes(b"\x89PNG")
+        (self.vault_path / ".obsidian").mkdir(exist_ok=True)
+        (self.vault_path / ".obsidian" / "workspace.json").write_text("{}")
+
+        # An established vault: directory mtimes are well in the past
+        past = time.time() - 3600
+        for root, dirs, _ in os.walk(self.vault_path):
+            for name in dirs:
+                os.utime(os.path.join(root, name), (past, past))
+        os.utime(self.vault_path, (past, past))
+        logger.info(f"Built {directory_count * NOTES_PER_DIRECTORY} notes in {directory_count} directories "
+                    f"({time.perf_counter() - start_time:.1f}s)")
+
+    def _timed(self, label: str, scan) -> Dict[str, Any]:
+        start_time = time.perf_counter()
+        files = scan()
+        elapsed = (time.perf_counter() - start_time) * 1000
+        logger.info(f"{label:>28}: {len(files)} files in {elapsed:.1f}ms")
+        return {"files": files, "elapsed_ms": elapsed}
+
+    def test_full_scans(self) -> Dict[str, Any]:
+        """rglob + stat against the scanner with one and several workers"""
+        rglob = self._timed("rglob + stat", lambda: rglob_list_files(self.vault_path))
+        single = self._timed("scandir, 1 worker", lambda: VaultScanner(str(self.vault_path), max_workers=1).scan_all())
+        parallel = self._timed(f"scandir, {SCANNER_WORKERS} workers",
+                               lambda: VaultScanner(str(self.vault_path), max_workers=SCANNER_WORKERS).scan_all())
+        expected = {f["path"]: f["size"] for f in rglob["files"]}
+        return {
+            "rglob": rglob,
+            "single": single,
+            "parallel": parallel,
+            "same_files": all({f["path"]: f["size"] for f in result["files"]} == expected
+                              for result in (single, parallel))
+        }
+
+    def test_pruned_rescan(self) -> Dict[str, Any]:
+        """A restarted scanner reuses the persisted listing of unchanged directories"""
+        first = VaultScanner(str(self.vault_path), max_workers=SCANNER_WORKERS, state_path=self.state_path)
+        full = self._timed("scandir, persisting state", lambda: first.scan_all(prune=True))
+        first.close()
+
+        restarted = VaultScanner(str(self.vault_path), max_workers=SCANNER_WORKERS, state_path=self.state_path)
+        pruned = self._timed("pruned rescan (restart)", lambda: restarted.scan_all(prune=True))
+        reused = restarted.stats["directories_reused"]
+
+        # Add, delete and rename notes: each moves its directory's mtime
+        directory = self.directories[len(self.directories) // 2]
+        relative_dir = directory.relative_to(self.vault_path).as_posix()
+        (directory / "added.md").write_text("# Added\n")
+        (directory / "note-000.md").unlink()
+        os.rename(directory / "note-001.md", directory / "renamed.md")
+        changed = self._timed("pruned rescan after edits", lambda: restarted.scan_all(prune=True))
+        paths = {f["path"] for f in changed["files"]}
+        restarted.close()
+
+        return {
+            "full": full,
+            "pruned": pruned,
+            "directories_reused": reused,
+            "directories_total": 1 + sum(len(dirs) for _, dirs, _ in os.walk(self.vault_path)),
+            "same_files": sorted(f["path"] for f in pruned["files"]) == sorted(f["path"] for f in full["files"]),
+            "changes_seen": f"{relative_dir}/added.md" in paths and f"{relative_dir}/renamed.md" in paths
+                            and f"{relative_dir}/note-000.md" not in paths and f"{relative_dir}/note-001.md" not in paths,
+            "relisted": restarted.stats["directories_listed"]
+        }
+
+    def test_streaming(self) -> Dict[str, Any]:
+        """Results arrive while the walk is still running"""
+        scanner = VaultScanner(str(self.vault_path), max_workers=SCANNER_WORKERS)
+        start_time = time.perf_counter()
+        first_ms = None
+        count = 0
+        for _ in scanner.scan():
+            if first_ms is None:
+                first_ms = (time.perf_counter() - start_time) * 1000
+            count += 1
+        total_ms = (time.perf_counter() - start_time) * 1000
+        logger.info(f"Streaming: first file after {first_ms:.1f}ms, all {count} after {total_ms:.1f}ms")
+
+        # Stopping early must not leave the pool running
+        early = VaultScanner(str(self.vault_path), max_workers=SCANNER_WORKERS)
+        stream = early.scan()
+        for _ in range(10):
+            next(stream)
+        stream.close()
+        return {"first_ms": first_ms, "total_ms": total_ms, "abandoned_scan_discarded": early.stats["scans"] == 0}
+
+    async def run_all_tests(self):
+        """Run all tests"""
+        self.build_vault()
+        full = self.test_full_scans()
+        pruned = self.test_pruned_rescan()
+        streaming = self.test_streaming()
+
+        logger.info("=" * 80)
+        logger.info("VAULT SCANNER SUMMARY")
+        logger.info("=" * 80)
+        checks = {
+            "scanner finds the same notes as rglob": full["same_files"]
+                                                     and len(full["rglob"]["files"]) == len(self.directories) * NOTES_PER_DIRECTORY,
+            "pruned rescan finds the same notes": pruned["same_files"],
+            "restart reuses every unchanged directory": pruned["directories_reused"] == pruned["directories_total"],
+            "added, deleted and renamed notes are seen": pruned["changes_seen"] and pruned["relisted"] >= 1,
+            "results stream before the walk finishes": streaming["first_ms"] < streaming["total_ms"] / 2,
+            "abandoned scans keep no partial state": streaming["abandoned_scan_discarded"]
+        }
+        for label, passed in checks.items():
+            logger.info(f"{'✅' if passed else '❌'} {label}")
+
+        rglob_ms = full["rglob"]["elapsed_ms"]
+        for label, result in (("Parallel scandir", full["parallel"]), ("Pruned rescan", pruned["pruned"])):
+            speedup = rglob_ms / max(result["elapsed_ms"], 1e-6)
+            if speedup > 1:
+                logger.info(f"✅ {label} {speedup:.1f}x faster than rglob + stat")
+            else:
+                logger.warning(f"⚠️ {label} was not faster than rglob + stat ({speedup:.2f}x)")
+        return all(checks.values())
+
+
+async def main():
+    """Main test function"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        vault_path = Path(temp_dir) / "vault"
+        vault_path.mkdir()
+        tester = VaultScannerTester(vault_path, str(Path(temp_dir) / "scanner_state.sqlite3"))
+        success = await tester.run_all_tests()
+    sys.exit(0 if success else 1)
+
+if __name__ == "__main__":
+    asyncio.run(main())